@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+knowledge 중복 집계/상한 벤치마크
+
+flaky 테스트가 반복해서 실패하고 같은 invariant가 여러 design-contract에 다시 나오는
+세션을 흉내 내어 delta 로그를 쌓은 뒤
+1. before: pitfall은 그대로 추가, decision은 매번 목록 전체에서 id 검색
+2. after: 키별 색인으로 count/last_seen 집계 + knowledge.limits 상한
+으로 압축했을 때 압축 시간, knowledge.yaml 크기, SessionStart 요약 길이를 비교하고,
+다음을 확인한다.
+- 같은 실패/결정이 한 항목으로 합쳐지고 count 합이 이벤트 수와 같은지
+- 상한을 넘으면 자주 나온 항목과 최근 항목이 남고, 오래된 일회성 항목이 제거되는지
+- 압축을 여러 번에 나눠 해도 count/first_seen/last_seen이 한 번에 한 것과 같은지
+- 이전 형식으로 쌓인 중복 pitfall이 합쳐지는지
+
+사용법:
+    python3 benchmarks/bench_aggregation.py [--tests 400] [--failures 20000] [--decisions 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+PROJECT_HASH = "benchag8"
+START = datetime(2026, 1, 1)
+
+
+def stamp(minutes: float) -> str:
+    return (START + timedelta(minutes=minutes)).isoformat() + "Z"
+
+
+def pitfall(name: str, reason: str = "timeout") -> dict:
+    return {
+        "id": f"P-{name[:20]}", "description": f"{name}: {reason}",
+        "reason": "retry 추가", "learned_from": "T1-S1",
+    }
+
+
+def make_deltas(tests: int, failures: int, decisions: int, seed: int = 7) -> list:
+    """실패의 절반은 flaky 테스트 20개에 몰리고, 나머지는 고르게 퍼진 delta 목록 (시간순)"""
+    rng = random.Random(seed)
+    deltas = []
+    for i in range(failures):
+        if rng.random() < 0.5:
+            name = f"test_flaky_{rng.randrange(20)}"
+        else:
+            name = f"test_case_{rng.randrange(tests)}"
+        deltas.append({"op": "pitfall", "item": pitfall(name), "at": stamp(i)})
+    for i in range(decisions):
+        invariant = f"INV-{rng.randrange(decisions // 10)}"
+        deltas.append({
+            "op": "decision", "at": stamp(failures + i),
+            "item": {"id": invariant, "topic": invariant, "decision": f"{invariant} 규칙",
+                     "rationale": "Design invariant", "refs": [f"contracts/R1/T{i}/design-contract.yaml"]},
+        })
+    return deltas
+
+
+def legacy_apply(knowledge: dict, delta: dict) -> None:
+    """이전 apply_knowledge_delta: pitfall은 그대로 추가, decision은 목록 전체에서 id 검색"""
+    if delta["op"] == "decision":
+        item = delta["item"]
+        if all(d.get("id") != item["id"] for d in knowledge["decisions"]):
+            knowledge["decisions"].append(item)
+    else:
+        knowledge["pitfalls"] = knowledge["pitfalls"] + [delta["item"]]
+    knowledge["updated_at"] = delta["at"]
+
+
+def write_config(workdir: Path, limits: dict) -> None:
+    """knowledge.limits만 바꾼 config를 ORCHESTRATOR_CONFIG_PATH로 사용"""
+    path = workdir / f"config-{len(list(workdir.glob('config-*')))}.yaml"
+    path.write_text(
+        "knowledge:\n  limits:\n" + "".join(f"    {key}: {value}\n" for key, value in limits.items()),
+        encoding="utf-8",
+    )
+    os.environ["ORCHESTRATOR_CONFIG_PATH"] = str(path)
+
+
+def compact(deltas: list, chunks: int = 1) -> dict:
+    """빈 knowledge에 delta를 chunks번에 나눠 압축한 결과"""
+    common.save_knowledge(PROJECT_HASH, common.create_initial_knowledge(PROJECT_HASH))
+    size = -(-len(deltas) // chunks)
+    for start in range(0, len(deltas), size):
+        common.append_knowledge_deltas(PROJECT_HASH, deltas[start:start + size])
+        common.compact_knowledge(PROJECT_HASH)
+    reset_memos()
+    return common.load_knowledge(PROJECT_HASH)
+
+
+def report(label: str, knowledge: dict, elapsed: float) -> None:
+    common.save_knowledge(PROJECT_HASH, knowledge)
+    size = common.get_knowledge_path(PROJECT_HASH).stat().st_size
+    summary = common.format_knowledge_summary(knowledge)
+    print(f"{label:<28} apply {elapsed * 1000:9.1f} ms   "
+          f"{len(knowledge['pitfalls']):6} pitfalls {len(knowledge['decisions']):6} decisions   "
+          f"knowledge.yaml {size / 1024:8.1f} KB   summary {len(summary)} chars")
+
+
+def check_aggregation(deltas: list) -> None:
+    """상한 없이 집계: 같은 키는 한 항목, count 합 == 이벤트 수, first/last_seen 정확"""
+    knowledge = compact(deltas)
+    failures = sum(1 for d in deltas if d["op"] == "pitfall")
+    assert sum(p["count"] for p in knowledge["pitfalls"]) == failures, "pitfall counts lost"
+    keys = [common.pitfall_key(p) for p in knowledge["pitfalls"]]
+    assert len(keys) == len(set(keys)), "duplicate pitfalls"
+    ids = [d["id"] for d in knowledge["decisions"]]
+    assert len(ids) == len(set(ids)), "duplicate decisions"
+
+    flaky = next(p for p in knowledge["pitfalls"] if p["description"] == "test_flaky_0: timeout")
+    seen = [d["at"] for d in deltas if d["op"] == "pitfall" and d["item"]["description"] == flaky["description"]]
+    assert (flaky["count"], flaky["first_seen"], flaky["last_seen"]) == (len(seen), seen[0], seen[-1]), flaky
+    assert all(len(d.get("refs") or []) <= common.MAX_KNOWLEDGE_ITEM_REFS for d in knowledge["decisions"])
+    report_check("aggregation")
+
+
+def check_eviction(workdir: Path) -> None:
+    """상한 3: 자주 나온 항목과 최근 항목이 남고 오래된 일회성 항목이 빠짐"""
+    write_config(workdir, {"max_pitfalls": 3, "max_decisions": 0, "half_life_days": 14})
+    deltas = []
+    for i in range(8):  # 60일 전 8번 실패한 flaky
+        deltas.append({"op": "pitfall", "item": pitfall("test_old_flaky"), "at": stamp(i)})
+    deltas.append({"op": "pitfall", "item": pitfall("test_old_once"), "at": stamp(10)})
+    for i in range(3):  # 최근 3번 실패
+        deltas.append({"op": "pitfall", "item": pitfall("test_recent_flaky"), "at": stamp(60 * 24 * 60 + i)})
+    deltas.append({"op": "pitfall", "item": pitfall("test_new_once"), "at": stamp(60 * 24 * 60 + 10)})
+    deltas.append({"op": "pitfall", "item": pitfall("test_mid_once"), "at": stamp(50 * 24 * 60)})
+
+    knowledge = compact(deltas)
+    names = [p["description"].split(":")[0] for p in knowledge["pitfalls"]]
+    # 60일(약 4.3 반감기) 지난 8회 실패는 방금 한 번 실패한 것보다 우선순위가 낮음
+    assert names == ["test_recent_flaky", "test_new_once", "test_mid_once"], names
+    top = common.top_knowledge_items(knowledge["pitfalls"], 1)[0]
+    assert top["description"].startswith("test_recent_flaky"), top
+    report_check("eviction")
+
+
+def check_split_compaction(workdir: Path, deltas: list) -> None:
+    """압축 경계를 넘어 같은 항목이 나와도 한 번에 압축한 결과와 같게 합쳐짐"""
+    write_config(workdir, {"max_pitfalls": 0, "max_decisions": 0})
+    once = compact(deltas)
+    split = compact(deltas, chunks=7)
+    for knowledge in (once, split):
+        knowledge.pop("updated_at")
+        knowledge.pop("delta_log")
+    assert once == split, "split compaction differs"
+    report_check("split compaction")
+
+
+def check_legacy_duplicates() -> None:
+    """이전 형식으로 쌓인 같은 pitfall 50개 → 다음 delta 적용 시 하나로 합쳐짐"""
+    knowledge = common.create_initial_knowledge(PROJECT_HASH)
+    knowledge["pitfalls"] = [pitfall("test_flaky") for _ in range(50)]
+    common.apply_knowledge_deltas(knowledge, [{"op": "pitfall", "item": pitfall("test_flaky"), "at": stamp(0)}])
+    assert len(knowledge["pitfalls"]) == 1 and knowledge["pitfalls"][0]["count"] == 51, knowledge["pitfalls"]
+    report_check("legacy duplicate")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tests", type=int, default=400, help="고르게 실패하는 테스트 수")
+    parser.add_argument("--failures", type=int, default=20000)
+    parser.add_argument("--decisions", type=int, default=2000, help="design-contract에서 나온 invariant 수")
+    args = parser.parse_args()
+
+    with bench_workdir("bench-aggregation-") as workdir:
+        deltas = make_deltas(args.tests, args.failures, args.decisions)
+        print(f"{args.failures} test failures ({args.tests} tests + 20 flaky), {args.decisions} restated invariants")
+
+        legacy = common.create_initial_knowledge(PROJECT_HASH)
+        start = time.perf_counter()
+        for delta in deltas:
+            legacy_apply(legacy, delta)
+        report("before: append", legacy, time.perf_counter() - start)
+
+        for label, limits in (
+            ("after: aggregate, no limit", {"max_pitfalls": 0, "max_decisions": 0}),
+            ("after: aggregate + limits", common.DEFAULT_KNOWLEDGE_LIMITS),
+        ):
+            write_config(workdir, limits)
+            knowledge = common.create_initial_knowledge(PROJECT_HASH)
+            start = time.perf_counter()
+            common.apply_knowledge_deltas(knowledge, deltas)
+            report(label, knowledge, time.perf_counter() - start)
+        print()
+
+        write_config(workdir, {"max_pitfalls": 0, "max_decisions": 0})
+        check_aggregation(deltas)
+        check_eviction(workdir)
+        check_split_compaction(workdir, deltas[:3000] + deltas[-500:])
+        check_legacy_duplicates()
+
+
+if __name__ == "__main__":
+    main()
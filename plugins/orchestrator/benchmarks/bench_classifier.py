@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+프롬프트 키워드 분류 벤치마크
+
+실제와 비슷한 프롬프트 모음(짧은 요청, 질문, 세션 명령, 수 KB~수백 KB의
+스택 트레이스/diff를 붙여 넣은 프롬프트)에 대해
+1. 기존 방식: 그룹별로 패턴 문자열마다 re.search(IGNORECASE) 반복
+2. classify_prompt(): config 스냅샷에 미리 컴파일한 패턴을 소문자 프롬프트에 우선순위 순서로 검사
+을 비교하고 (두 방식 모두 config 스냅샷에서 키워드를 가져오는 비용 포함), 두 방식의 분류 결과와 is_orchestration_keyword() 결과가 같은지 확인한다.
+상위 카테고리 키워드가 하위 카테고리 키워드와 겹쳐 있어도 우선순위대로 분류되는지도 확인한다.
+
+사용법:
+    python3 benchmarks/bench_classifier.py [--iterations 50]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks.common import PROMPT_CATEGORIES, classify_prompt, is_orchestration_keyword, load_orchestrator_config
+
+from harness import bench_workdir, report_check
+
+
+STACK_FRAME = (
+    '  File "/app/src/services/payment/processor.py", line {n}, in charge_card\n'
+    "    response = self.gateway.charge(amount=order.total, token=card.token)\n"
+)
+
+DIFF_HUNK = (
+    "@@ -{n},7 +{n},9 @@ class OrderService:\n"
+    "-        return self.repository.find(order_id)\n"
+    "+        order = self.repository.find(order_id)\n"
+    "+        if order is None:\n"
+    "+            raise OrderNotFound(order_id)\n"
+    "+        return order\n"
+)
+
+
+def build_corpus() -> list:
+    """분류 대상 프롬프트 모음"""
+    trace = "Traceback (most recent call last):\n" + "".join(STACK_FRAME.format(n=i) for i in range(400))
+    diff = "diff --git a/src/order.py b/src/order.py\n" + "".join(DIFF_HUNK.format(n=i * 10) for i in range(2000))
+    return [
+        "로그인 기능 구현해줘",
+        "장바구니에 쿠폰 적용 기능 추가해 줘",
+        "이 함수가 왜 느린지 설명해줘",
+        "/orchestrator resume",
+        "이어서 진행해줘",
+        "새 세션으로 시작해줘",
+        "테스트가 왜 실패하는지 모르겠어. 확인 부탁해",
+        "/orchestrator 결제 모듈 리팩터링",
+        f"아래 에러 분석해줘\n{trace}",
+        f"이 스택 트레이스 보고 버그 수정해줘\n{trace}",
+        f"리뷰 부탁해\n{diff}",
+        f"{diff}\n위 변경 사항 반영해서 구현해줘",
+        f"{diff}\n{trace}\n처음부터 다시 하자",
+    ]
+
+
+def legacy_classify(prompt: str, keywords: dict) -> str:
+    """기존 방식: 카테고리 순서대로 패턴 문자열마다 re.search"""
+    for category, group in PROMPT_CATEGORIES:
+        for pattern in keywords.get(group, []):
+            if re.search(pattern, prompt, re.IGNORECASE):
+                return category
+    return None
+
+
+def legacy_is_orchestration_keyword(prompt: str, keywords: dict) -> bool:
+    """기존 방식: skip 키워드가 있으면 False, trigger 키워드가 있으면 True (다른 카테고리는 보지 않음)"""
+    if any(re.search(pattern, prompt, re.IGNORECASE) for pattern in keywords.get("skip", [])):
+        return False
+    return any(re.search(pattern, prompt, re.IGNORECASE) for pattern in keywords.get("trigger", []))
+
+
+def check_overlap() -> None:
+    """하위 카테고리 매치 안쪽에서 시작하는 상위 카테고리 키워드도 찾는지"""
+    keywords = {
+        "resume": ["계속\\s*진행"],
+        "skip": ["설명"],
+        "trigger": ["진행해\\s*줘", "작업 계속", "설명해\\s*줘 계속"],
+    }
+    with bench_workdir("bench-classifier-", chdir=False) as workdir:
+        config = workdir / "config.yaml"
+        config.write_text("keywords:\n" + "".join(
+            f"  {group}:\n" + "".join(f"    - '{pattern}'\n" for pattern in patterns)
+            for group, patterns in keywords.items()
+        ), encoding="utf-8")
+        os.environ["ORCHESTRATOR_CONFIG_PATH"] = str(config)
+        for prompt in ("작업 계속 진행해줘", "설명해줘 계속 진행", "작업 계속 설명"):
+            expected = legacy_classify(prompt, keywords)
+            assert classify_prompt(prompt) == expected, f"{prompt!r}: {classify_prompt(prompt)} != {expected}"
+        assert classify_prompt("작업 계속 진행해줘") == "resume"
+    report_check("priority overlap")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    keywords = load_orchestrator_config().get("keywords", {})
+    corpus = build_corpus()
+
+    for prompt in corpus:
+        expected = legacy_classify(prompt, keywords)
+        actual = classify_prompt(prompt)
+        assert expected == actual, f"mismatch: {expected} != {actual} for {prompt[:40]!r}"
+        expected = legacy_is_orchestration_keyword(prompt, keywords)
+        actual = is_orchestration_keyword(prompt)
+        assert expected == actual, f"keyword mismatch: {expected} != {actual} for {prompt[:40]!r}"
+
+    check_overlap()
+
+    print(f"{'size':>9}  {'category':<8} {'legacy':>10} {'classify':>10}  prompt")
+    total_legacy = total_single = 0.0
+    for prompt in corpus:
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            # 기존 훅도 config에서 키워드를 가져왔으므로 같은 스냅샷 조회 비용을 포함
+            legacy_classify(prompt, load_orchestrator_config().get("keywords", {}))
+        legacy_us = (time.perf_counter() - start) / args.iterations * 1e6
+
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            category = classify_prompt(prompt)
+        single_us = (time.perf_counter() - start) / args.iterations * 1e6
+
+        total_legacy += legacy_us
+        total_single += single_us
+        label = prompt.strip().splitlines()[-1][:30]
+        print(f"{len(prompt):>9}  {str(category):<8} {legacy_us:>8.1f}us {single_us:>8.1f}us  {label}")
+
+    print(f"{'total':>9}  {'':<8} {total_legacy:>8.1f}us {total_single:>8.1f}us  "
+          f"({total_legacy / total_single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+config 로드 벤치마크 (스냅샷 캐시 전/후)
+
+PostToolUse 한 번에서 config를 조회하는 헬퍼 호출 수만큼
+1. 매번 yaml.safe_load 하던 기존 방식
+2. 콜드 프로세스: 디스크 스냅샷(marshal)에서 로드 후 메모 재사용
+3. 웜 프로세스(데몬): 메모만 사용
+를 비교하고, config 수정 시 스냅샷이 무효화되는지 확인한다.
+
+사용법:
+    python3 benchmarks/bench_config.py [--calls 8] [--iterations 200]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml
+
+from hooks import common
+
+from harness import bench_workdir, report_check
+
+
+def reset_memo() -> None:
+    """콜드 프로세스 흉내: 프로세스 내 메모 비우기"""
+    common._CONFIG_MEMO.clear()
+
+
+def bench(label: str, fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_iter_ms = (time.perf_counter() - start) / iterations * 1000
+    print(f"{label:<40} {per_iter_ms:8.3f} ms")
+    return per_iter_ms
+
+
+def check_invalidation(config_path: Path) -> None:
+    """config가 바뀌면 메모와 디스크 스냅샷 모두 새 내용을 반영해야 함"""
+    reset_memo()
+    assert common.is_orchestration_enabled() is True
+
+    text = config_path.read_text(encoding="utf-8")
+    config_path.write_text(text.replace("enabled: true", "enabled: false", 1), encoding="utf-8")
+    # mtime 해상도가 낮은 파일시스템 대비
+    stat = config_path.stat()
+    os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert common.is_orchestration_enabled() is False, "memo not invalidated"
+    reset_memo()
+    assert common.is_orchestration_enabled() is False, "disk snapshot not invalidated"
+
+    config_path.write_text(text, encoding="utf-8")
+    reset_memo()
+    assert common.is_orchestration_enabled() is True
+    report_check("invalidation")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=8, help="훅 1회당 config 조회 횟수")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-config-") as workdir:
+        config_path = workdir / "orchestrator-config.yaml"
+        os.environ["ORCHESTRATOR_CONFIG_PATH"] = str(config_path)
+        shutil.copy(Path(common.__file__).parent / "orchestrator-config.yaml", config_path)
+
+        def before():
+            for _ in range(args.calls):
+                yaml.safe_load(config_path.read_text(encoding="utf-8"))
+
+        def cold():
+            reset_memo()
+            for _ in range(args.calls):
+                common.load_orchestrator_config()
+
+        def warm():
+            for _ in range(args.calls):
+                common.load_orchestrator_config()
+
+        common.load_orchestrator_config()
+        print(f"config lookups per hook: {args.calls}")
+        base = bench("before (yaml.safe_load every call)", before, args.iterations)
+        cold_ms = bench("after, cold process (marshal snapshot)", cold, args.iterations)
+        warm_ms = bench("after, warm process (memo)", warm, args.iterations)
+        print(f"speedup cold: {base / cold_ms:6.1f}x   warm: {base / warm_ms:6.1f}x")
+        print()
+        check_invalidation(config_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Contract 레지스트리 벤치마크
+
+Task/Subtask가 많은 세션에서 게이트(GATE-1/2)와 SubagentStop의 Contract 존재 확인을
+1. before: contracts/{request}/{task}/{subtask} 후보 경로를 매번 stat
+2. after: state의 Contract 레지스트리에서 조회
+로 비교하고 (확인 한 번의 시간, 파일시스템 조회 수), 백엔드(json/sqlite)별로 다음을 확인한다.
+- PostToolUse가 Contract를 쓰면 레지스트리에 size/mtime/해시가 기록되고 같은 훅의 GATE-1이 그것을 보는지
+- 훅을 거치지 않고 만든/지운 Contract는 verify로 반영되는지
+- 레지스트리가 없는 이전 state는 파일을 확인하고, 다음 Contract 기록 때 디스크에서 레지스트리를 만드는지
+- SubagentStop이 레지스트리로 생성된 Contract를 보고하는지
+
+사용법:
+    python3 benchmarks/bench_contracts.py [--tasks 50] [--subtasks 8] [--checks 20000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import contracts
+from hooks import post_tool_use
+from hooks import subagent_stop
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+def legacy_exists(project_hash: str, current_work: dict, contract_name: str) -> bool:
+    """이전 check_contract_exists_for_gate: 후보 경로를 모두 stat"""
+    sessions_path = common.get_sessions_path(project_hash)
+    request_id = current_work.get("request_id", "R1")
+    task_id = current_work.get("task_id", "")
+    subtask_id = current_work.get("subtask_id", "")
+    possible_paths = [sessions_path / "contracts" / request_id / contract_name]
+    if task_id:
+        possible_paths.append(sessions_path / "contracts" / request_id / task_id / contract_name)
+    if task_id and subtask_id:
+        possible_paths.append(sessions_path / "contracts" / request_id / task_id / subtask_id / contract_name)
+    return any(p.exists() for p in possible_paths)
+
+
+def make_state(project_hash: str, tasks: int, subtasks: int) -> dict:
+    state = common.create_initial_state(project_hash, "결제 모듈 전체 리팩터링")
+    state["request"].update({"global_phase": "task_loop", "current_task": "T1"})
+    for t in range(1, tasks + 1):
+        task_id = f"T{t}"
+        state["task_order"].append(task_id)
+        state["tasks"][task_id] = {
+            "name": f"작업 {t}", "status": "in_progress" if t == 1 else "pending",
+            "current_subtask": f"{task_id}-S1",
+            "subtask_order": [f"{task_id}-S{s}" for s in range(1, subtasks + 1)],
+            "subtasks": {
+                f"{task_id}-S{s}": {"name": f"서브태스크 {s}", "status": "pending", "phase": "test_first"}
+                for s in range(1, subtasks + 1)
+            },
+        }
+    return state
+
+
+def contract_path(project_hash: str, key: str) -> Path:
+    return contracts.get_contracts_path(project_hash) / key
+
+
+def write_contract(project_hash: str, key: str, text: str = "tests: []\n") -> str:
+    """훅을 거치지 않고 Contract 파일 생성 (Bash로 만든 것처럼)"""
+    path = contract_path(project_hash, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def run_hook(module, payload: dict) -> str:
+    """훅 main을 프로세스 안에서 실행하고 출력 반환"""
+    reset_memos()
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+        sys.stdin = io.StringIO(json.dumps(payload))
+        try:
+            module.main()
+        finally:
+            sys.stdin = sys.__stdin__
+    return stdout.getvalue()
+
+
+class ProbeCounter:
+    """Path.exists 호출 수 세기"""
+
+    def __init__(self):
+        self.count = 0
+        self._original = Path.exists
+
+    def __enter__(self):
+        original = self._original
+
+        def exists(path, *args, **kwargs):
+            self.count += 1
+            return original(path, *args, **kwargs)
+
+        Path.exists = exists
+        return self
+
+    def __exit__(self, *exc):
+        Path.exists = self._original
+
+
+def bench_checks(project_hash: str, state: dict, checks: int) -> None:
+    """현재 위치를 바꿔 가며 test-contract.yaml 존재 확인"""
+    works = []
+    for task_id in state["task_order"]:
+        for subtask_id in state["tasks"][task_id]["subtask_order"]:
+            works.append({"request_id": "R1", "task_id": task_id, "subtask_id": subtask_id})
+    registry = state["contracts"]
+
+    for label, fn in (
+        ("before: stat candidate paths", lambda w: legacy_exists(project_hash, w, "test-contract.yaml")),
+        ("after: contract registry", lambda w: common.check_contract_exists_for_gate(
+            project_hash, w, "test-contract.yaml", registry)),
+    ):
+        with ProbeCounter() as probes:
+            start = time.perf_counter()
+            found = sum(1 for i in range(checks) if fn(works[i % len(works)]))
+            elapsed = time.perf_counter() - start
+        print(f"{label:<32} {elapsed / checks * 1e6:7.2f} us/check   "
+              f"{probes.count / checks:4.1f} probes/check   found {found}")
+
+
+def check_backend(workdir: Path, backend: str) -> None:
+    """PostToolUse 기록, verify, 이전 state, SubagentStop"""
+    os.environ["ORCHESTRATOR_STATE_BACKEND"] = backend
+    project_dir = workdir / f"project-{backend}"
+    project_dir.mkdir()
+    os.chdir(project_dir)
+    project_hash = common.get_project_hash()
+    state = make_state(project_hash, 3, 2)
+    common.save_state(project_hash, state)
+    work = {"request_id": "R1", "task_id": "T1", "subtask_id": "T1-S1"}
+
+    # 1. PostToolUse: 쓰자마자 같은 훅의 GATE-1이 레지스트리로 통과
+    path = write_contract(project_hash, "R1/T1/T1-S1/test-contract.yaml")
+    output = run_hook(post_tool_use, {"tool_name": "Write", "tool_input": {"file_path": path}})
+    assert "GATE-1 passed" in output, output
+    reset_memos()
+    entry = common.load_state(project_hash)["contracts"]["R1/T1/T1-S1/test-contract.yaml"]
+    stat = Path(path).stat()
+    assert (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns), entry
+    assert entry["digest"] == contracts.describe_contract(Path(path))["digest"]
+
+    # 2. 훅 밖에서 만든 Contract는 verify 전까지 보이지 않음, 지운 것은 verify로 제거
+    write_contract(project_hash, "R1/T1/T1-S1/test-result.yaml", "execution: {result: pass}\n")
+    assert not common.contract_exists(project_hash, work, "test-result.yaml", "subtask")
+    Path(path).unlink()
+    report = contracts.verify_contracts(project_hash)
+    assert report["added"] == ["R1/T1/T1-S1/test-result.yaml"], report
+    assert report["removed"] == ["R1/T1/T1-S1/test-contract.yaml"], report
+    reset_memos()
+    assert common.contract_exists(project_hash, work, "test-result.yaml", "subtask")
+    assert not common.contract_exists(project_hash, work, "test-contract.yaml", "subtask")
+
+    # 3. 레지스트리가 없는 이전 state: 파일 확인, 다음 기록 때 디스크에서 생성
+    state = common.load_state(project_hash)
+    state.pop("contracts")
+    common.save_state(project_hash, state)
+    reset_memos()
+    assert common.contract_exists(project_hash, work, "test-result.yaml", "subtask")
+    design = write_contract(project_hash, "R1/T1/design-contract.yaml", "invariants: []\n")
+    run_hook(post_tool_use, {"tool_name": "Write", "tool_input": {"file_path": design}})
+    reset_memos()
+    assert sorted(common.load_state(project_hash)["contracts"]) == [
+        "R1/T1/T1-S1/test-result.yaml", "R1/T1/design-contract.yaml",
+    ]
+
+    # 4. SubagentStop: 레지스트리로 생성된 Contract 보고
+    output = run_hook(subagent_stop, {"agent_type": "architect"})
+    assert "design-contract.yaml created" in output, output
+    report_check(f"{backend} backend")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--subtasks", type=int, default=8)
+    parser.add_argument("--checks", type=int, default=20000)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-contracts-") as workdir:
+        project_hash = common.get_project_hash()
+
+        # 절반의 Subtask에 test-contract.yaml
+        state = make_state(project_hash, args.tasks, args.subtasks)
+        common.save_state(project_hash, state)
+        for t in range(1, args.tasks + 1):
+            for s in range(1, args.subtasks + 1, 2):
+                write_contract(project_hash, f"R1/T{t}/T{t}-S{s}/test-contract.yaml")
+        state["contracts"] = contracts.scan_contracts(project_hash)
+
+        print(f"{args.tasks} tasks x {args.subtasks} subtasks, {len(state['contracts'])} contracts, {args.checks} checks")
+        bench_checks(project_hash, state, args.checks)
+        print()
+
+        for backend in ("json", "sqlite"):
+            check_backend(workdir, backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+훅 데몬 벤치마크
+
+같은 UserPromptSubmit 훅을 `python3 hooks/client.py user_prompt_submit`로 --runs번 실행해
+1. in-process: 데몬 없이 매번 hooks 모듈 import와 설정 로드
+2. daemon: 클라이언트는 페이로드와 환경변수만 소켓으로 보내고 상주 데몬이 처리
+의 호출 한 번당 시간을 비교하고, 다음을 확인한다.
+- 데몬을 띄운 훅과 다른 환경변수(ORCHESTRATOR_HOOK_STATS 등)로 호출하면 이번 호출의 값이 적용되는지
+- 호출에 없는 훅 관련 환경변수는 그 호출 동안 지워지고, 호출이 끝나면 데몬 환경이 되돌아오는지
+
+사용법:
+    python3 benchmarks/bench_daemon.py [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import client
+from hooks import common
+from hooks import daemon
+from hooks import stats
+
+from harness import bench_workdir, report_check
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+
+PAYLOAD = json.dumps({"prompt": "계속", "session_id": "bench"}).encode("utf-8")
+
+
+def start_daemon(env: dict) -> subprocess.Popen:
+    """현재 디렉토리의 데몬 기동, 소켓이 생길 때까지 대기"""
+    socket_path = client.get_daemon_socket_path()
+    # 앞에서 종료시킨 데몬의 소켓 파일이 남아 있으면 새 데몬보다 먼저 보이므로 지움
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    proc = subprocess.Popen([sys.executable, str(PLUGIN_ROOT / "hooks" / "daemon.py")], env=env,
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(socket_path):
+        if time.monotonic() > deadline or proc.poll() is not None:
+            proc.kill()
+            raise RuntimeError("daemon did not start")
+        time.sleep(0.02)
+    return proc
+
+
+def run_client(env: dict, runs: int) -> float:
+    """client.py를 runs번 실행 -> 호출당 ms"""
+    start = time.perf_counter()
+    for _ in range(runs):
+        subprocess.run([sys.executable, str(PLUGIN_ROOT / "hooks" / "client.py"), "user_prompt_submit"],
+                       input=PAYLOAD, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def bench_client(runs: int) -> None:
+    """데몬 없음/데몬 경로에서 호출 한 번당 시간"""
+    env = dict(os.environ)
+    env.pop(client.DAEMON_ENV_KEY, None)
+    in_process = run_client(env, runs)
+
+    proc = start_daemon(env)
+    try:
+        env[client.DAEMON_ENV_KEY] = "1"
+        run_client(env, 1)
+        via_daemon = run_client(env, runs)
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(f"user_prompt_submit   before: in-process {in_process:7.1f} ms/call   after: daemon {via_daemon:7.1f} ms/call")
+
+
+def check_environ() -> None:
+    """호출마다 클라이언트의 환경변수를 적용하고 되돌림"""
+    path = stats.get_stats_path(common.get_project_hash())
+    env = dict(os.environ)
+    env.pop(stats.STATS_ENV_KEY, None)
+    proc = start_daemon(env)
+    try:
+        # 데몬은 계측 없이 기동, 이번 호출만 켬
+        os.environ[stats.STATS_ENV_KEY] = "1"
+        assert client.request_daemon("user_prompt_submit", PAYLOAD) is not None, "daemon did not reply"
+        recorded = len(stats.read_records(path))
+        assert recorded == 1, f"forwarded ORCHESTRATOR_HOOK_STATS not applied ({recorded} records)"
+
+        # 다음 호출에 없으면 데몬 환경(꺼짐)으로 돌아감
+        os.environ.pop(stats.STATS_ENV_KEY)
+        assert client.request_daemon("user_prompt_submit", PAYLOAD) is not None, "daemon did not reply"
+        assert len(stats.read_records(path)) == 1, "previous call's environment leaked"
+    finally:
+        proc.terminate()
+        proc.wait()
+
+    # 프로세스 안: 호출에 없는 키는 그 동안만 지워지고 끝나면 복원
+    environ = dict(client.forwarded_environ(), ORCHESTRATOR_OTHER="1", PATH="/nowhere")
+    os.environ["ORCHESTRATOR_BENCH_MARKER"] = "daemon"
+    reply = daemon.run_hook("user_prompt_submit", PAYLOAD.decode("utf-8"), environ)
+    assert reply["exit_code"] == 0, reply
+    assert os.environ.get("ORCHESTRATOR_BENCH_MARKER") == "daemon" and "ORCHESTRATOR_OTHER" not in os.environ
+    assert os.environ.get("PATH") != "/nowhere", "non-hook variable forwarded"
+    os.environ.pop("ORCHESTRATOR_BENCH_MARKER")
+    report_check("environment forwarding")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-daemon-", env={client.DAEMON_ENV_KEY: None, stats.STATS_ENV_KEY: None}) as workdir:
+        os.environ["TMPDIR"] = str(workdir)
+        project_dir = workdir / "project"
+        project_dir.mkdir()
+        os.chdir(project_dir)
+
+        bench_client(args.runs)
+        print()
+
+        check_environ()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+phase 소요 시간 기록 / 임계 경로 순서 벤치마크
+
+에이전트 --workers개로 계획을 진행할 때 시작할 수 있는 Subtask 중
+1. planner order: task_order/subtask_order 순서대로 (이전)
+2. critical path: 남은 의존 사슬이 긴 Subtask부터 (scheduler.critical_path_lengths)
+를 고르는 두 방식의 전체 소요 시간(모의)을 비교한다. Subtask마다 실제 소요 시간은
+phase 추정값의 0.5~1.5배로 흔들리고, 스케줄러는 phase별 추정값만 안다.
+- long chain last: 독립 Subtask 여럿 뒤에 긴 의존 사슬이 나열된 계획
+- random DAG: 무작위 depends_on 계획 --plans개 평균
+
+그리고 다음을 확인한다.
+- phase가 바뀌면 이전 phase 소요 시간이 프로젝트 기록(durations.json)에 쌓이는지 (json/sqlite)
+- 추정값은 기록의 중앙값, 기록은 phase별 최근 MAX_SAMPLES개
+- ready 순서와 병렬 안내가 임계 경로가 긴 Subtask부터인지
+- 재개 메시지의 진행 트리에 남은 시간과 임계 경로가 표시되는지
+
+사용법:
+    python3 benchmarks/bench_durations.py [--workers 4] [--plans 20]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import durations
+from hooks import scheduler
+from hooks import user_prompt_submit
+from hooks.state_store import StateSession
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+def make_state(task_specs: list) -> dict:
+    """[(task_id, [(subtask_id, depends_on)])] -> state 형식 계획 (모두 pending)"""
+    state = {"request": {}, "task_order": [], "tasks": {}}
+    for task_id, subtasks in task_specs:
+        state["task_order"].append(task_id)
+        state["tasks"][task_id] = {
+            "name": task_id, "status": "pending", "subtask_order": [s for s, _ in subtasks],
+            "subtasks": {s: {"name": s, "status": "pending", "phase": "", "depends_on": deps} for s, deps in subtasks},
+        }
+    return state
+
+
+def long_chain_plan(independent: int, chain: int) -> dict:
+    """독립 Subtask들이 먼저, 긴 의존 사슬이 마지막에 나열된 계획"""
+    specs = [("T1", [(f"T1-S{i}", []) for i in range(1, independent + 1)])]
+    specs.append(("T2", [(f"T2-S{i}", [] if i == 1 else [f"T2-S{i - 1}"]) for i in range(1, chain + 1)]))
+    return make_state(specs)
+
+
+def random_plan(rng: random.Random, tasks: int, subtasks: int) -> dict:
+    """Subtask마다 앞쪽 Subtask 0~2개에 의존하는 무작위 계획"""
+    ids = []
+    specs = []
+    for t in range(1, tasks + 1):
+        entries = []
+        for s in range(1, subtasks + 1):
+            subtask_id = f"T{t}-S{s}"
+            entries.append((subtask_id, rng.sample(ids, min(len(ids), rng.randint(0, 2)))))
+            ids.append(subtask_id)
+        specs.append((f"T{t}", entries))
+    return make_state(specs)
+
+
+def simulate(state: dict, workers: int, actual: dict, priority: dict) -> float:
+    """시작할 수 있는 Subtask를 priority가 큰 것부터 workers개까지 → 전체 소요 시간"""
+    state = json.loads(json.dumps(state))
+    owner = {s: t for t, s, _ in scheduler.iter_subtasks(state)}
+    graph = scheduler.dependency_graph(state)
+    running = {}
+    clock = 0.0
+    while True:
+        ready = sorted(scheduler.ready_subtasks(state, graph), key=lambda s: -priority.get(s, 0.0))
+        for subtask_id in ready[:workers - len(running)]:
+            state["tasks"][owner[subtask_id]]["subtasks"][subtask_id]["status"] = "in_progress"
+            running[subtask_id] = clock + actual[subtask_id]
+        if not running:
+            return clock
+        clock = min(running.values())
+        for subtask_id in [s for s, end in running.items() if end == clock]:
+            state["tasks"][owner[subtask_id]]["subtasks"][subtask_id]["status"] = "completed"
+            del running[subtask_id]
+
+
+def compare(state: dict, workers: int, rng: random.Random) -> tuple:
+    """(planner order, critical path) 소요 시간 (초)"""
+    estimates = dict(durations.DEFAULT_PHASE_SECONDS)
+    per_subtask = sum(estimates.values())
+    actual = {s: per_subtask * rng.uniform(0.5, 1.5) for _, s, _ in scheduler.iter_subtasks(state)}
+    lengths = scheduler.critical_path_lengths(state, estimates)
+    return simulate(state, workers, actual, {}), simulate(state, workers, actual, lengths)
+
+
+def ago(seconds: float) -> str:
+    """지금부터 seconds초 전 (get_timestamp 형식)"""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(time.time() - seconds)) + ".000000Z"
+
+
+def check_history(workdir: Path, backend: str) -> None:
+    """phase 전환마다 이전 phase 소요 시간 기록"""
+    os.environ["ORCHESTRATOR_STATE_BACKEND"] = backend
+    project_dir = workdir / f"project-{backend}"
+    project_dir.mkdir()
+    os.chdir(project_dir)
+    project_hash = common.get_project_hash()
+    state = common.create_initial_state(project_hash, "소요 시간 기록")
+    state.update(long_chain_plan(1, 2))
+    state["request"].update({"id": "R1", "status": "active", "global_phase": "task_loop", "current_task": "T1"})
+    state["tasks"]["T1"]["subtasks"]["T1-S1"]["phase_started_at"] = ago(600)
+    common.save_state(project_hash, state)
+
+    with StateSession(project_hash) as session:
+        session.set_phase("test_first", "subtask", "T1", "T1-S1")
+    reset_memos()
+    history = durations.load_duration_history(project_hash)
+    assert len(history["design"]) == 1 and 595 <= history["design"][0] <= 610, history
+    subtask = common.load_state(project_hash)["tasks"]["T1"]["subtasks"]["T1-S1"]
+    assert abs(durations.parse_timestamp(subtask["phase_started_at"]) - time.time()) < 5, subtask
+
+    # 완료되면 시작 시각을 지우고 verification까지 기록
+    with StateSession(project_hash) as session:
+        session.set(("tasks", "T1", "subtasks", "T1-S1", "phase_started_at"), ago(120))
+        session.set_phase("verification", "subtask", "T1", "T1-S1")
+    with StateSession(project_hash) as session:
+        scheduler.complete_subtask(session, "T1", "T1-S1")
+    reset_memos()
+    history = durations.load_duration_history(project_hash)
+    assert len(history["test_first"]) == 1 and len(history["verification"]) == 1, history
+    subtask = common.load_state(project_hash)["tasks"]["T1"]["subtasks"]["T1-S1"]
+    assert subtask["phase"] == "complete" and not subtask.get("phase_started_at"), subtask
+    report_check(f"{backend} history")
+
+
+def check_estimates(workdir: Path) -> None:
+    """중앙값 추정, 최근 MAX_SAMPLES개 유지, 남은 시간에서 현재 phase에 쓴 시간 제외"""
+    project_dir = workdir / "project-estimates"
+    project_dir.mkdir()
+    os.chdir(project_dir)
+    project_hash = common.get_project_hash()
+    durations.record_phase_durations(project_hash, [("implementation", s) for s in (100, 300, 200, 9000)])
+    reset_memos()
+    estimates = durations.phase_estimates(project_hash)
+    assert estimates["implementation"] == 250, estimates
+    durations.record_phase_durations(project_hash, [("implementation", 60)] * (durations.MAX_SAMPLES + 5))
+    assert durations.load_duration_history(project_hash)["implementation"] == [60] * durations.MAX_SAMPLES
+
+    estimates = durations.phase_estimates(project_hash)
+    subtask = {"status": "in_progress", "phase": "test_first", "phase_started_at": ago(300)}
+    expected = estimates["test_first"] - 300 + estimates["implementation"] + estimates["verification"]
+    assert abs(durations.remaining_seconds(subtask, estimates) - expected) < 5
+    report_check("estimate")
+
+
+def check_ordering(workdir: Path) -> None:
+    """ready 순서, 병렬 안내, 재개 메시지의 남은 시간"""
+    os.environ["ORCHESTRATOR_STATE_BACKEND"] = "json"
+    project_dir = workdir / "project-ordering"
+    project_dir.mkdir()
+    os.chdir(project_dir)
+    project_hash = common.get_project_hash()
+    state = common.create_initial_state(project_hash, "임계 경로 순서")
+    state.update(long_chain_plan(3, 4))
+    state["request"].update({"id": "R1", "status": "active", "global_phase": "task_loop", "current_task": "T1"})
+    state["tasks"]["T1"]["current_subtask"] = "T1-S1"
+    common.save_state(project_hash, state)
+
+    with StateSession(project_hash) as session:
+        ready = scheduler.refresh_schedule(session)
+    assert ready == ["T2-S1", "T1-S1", "T1-S2", "T1-S3"], ready
+    state = common.load_state(project_hash)
+    assert state["request"]["ready"][0] == "T2-S1"
+    assert state["tasks"]["T2"]["subtasks"]["T2-S1"]["phase_started_at"], "design start recorded when ready"
+
+    block = scheduler.format_dispatch_block(project_hash, state)
+    assert block.index("- T2-S1") < block.index("- T1-S1"), block
+
+    reset_memos()
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+        sys.stdin = io.StringIO(json.dumps({"prompt": "/orchestrator resume"}))
+        try:
+            user_prompt_submit.main()
+        finally:
+            sys.stdin = sys.__stdin__
+    message = json.loads(stdout.getvalue())["hookSpecificOutput"]["additionalContext"]
+    assert "예상 남은 시간" in message and "T2-S1 → T2-S2 → T2-S3 → T2-S4" in message, message
+    assert "T2-S4 [ ] ~1시간 5분 *" in message, message
+    report_check("critical path ordering")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4, help="동시에 부를 에이전트 수")
+    parser.add_argument("--plans", type=int, default=20, help="무작위 계획 수")
+    args = parser.parse_args()
+
+    with bench_workdir("bench-durations-") as workdir:
+
+        rng = random.Random(11)
+        print(f"simulated wall-clock with {args.workers} workers (hours)")
+        planner, critical = compare(long_chain_plan(12, 6), args.workers, rng)
+        print(f"long chain last    before: planner order {planner / 3600:6.1f}   "
+              f"after: critical path {critical / 3600:6.1f}   ({planner / critical:.2f}x)")
+        results = [compare(random_plan(rng, 8, 6), args.workers, rng) for _ in range(args.plans)]
+        planner = sum(r[0] for r in results) / len(results)
+        critical = sum(r[1] for r in results) / len(results)
+        print(f"random DAG (x{args.plans:<3})  before: planner order {planner / 3600:6.1f}   "
+              f"after: critical path {critical / 3600:6.1f}   ({planner / critical:.2f}x)")
+        print()
+
+        for backend in ("json", "sqlite"):
+            check_history(workdir, backend)
+        check_estimates(workdir)
+        check_ordering(workdir)
+
+
+if __name__ == "__main__":
+    main()
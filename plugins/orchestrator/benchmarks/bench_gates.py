@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+GATE-3 / GATE-4 벤치마크
+
+소스 파일이 많은 프로젝트에서 implementation phase 중 파일을 하나씩 저장할 때 (PostToolUse 한 번)
+1. full: 매번 task-breakdown.yaml/design-contract.yaml을 파싱하고 invariant 대상 파일을 전부 다시 검사
+2. incremental: 레지스트리 해시가 같으면 파싱 생략, Subtask별 캐시로 바뀐 파일만 다시 검사
+의 검사 시간을 비교하고, 다음을 확인한다.
+- 금지 패턴을 넣으면 GATE-4로 차단되고, 고치면 통과하는지 (필수 패턴이 사라져도 차단)
+- 파일 하나를 저장하면 그 파일만 다시 읽는지
+- design-contract.yaml이 바뀌면 새 invariant로 다시 검사하는지
+- Planning 때 저장한 스코프 기준값에서 이름만 바뀌면 통과, Task가 추가되면 GATE-3으로 차단되는지
+- implementation phase가 아니면 검사하지 않는지
+
+사용법:
+    python3 benchmarks/bench_gates.py [--files 2000] [--writes 200]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import contracts
+from hooks import gates
+from hooks import post_tool_use
+from hooks import serializer
+from hooks.state_store import StateSession
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+BREAKDOWN = {
+    "task_breakdown": {
+        "request_id": "R1", "objective": "주문 도메인 분리",
+        "tasks": [
+            {"id": "T1", "name": "도메인 분리", "subtasks": [{"id": "T1-S1", "name": "모델"}, {"id": "T1-S2", "name": "서비스"}]},
+            {"id": "T2", "name": "API", "subtasks": [{"id": "T2-S1", "name": "컨트롤러"}]},
+        ],
+        "task_order": ["T1", "T2"],
+    },
+}
+
+DESIGN = {
+    "design_contract": {
+        "task_name": "도메인 분리",
+        "invariants": [
+            {"id": "INV-1", "rule": "도메인은 인프라에 의존하지 않는다",
+             "files": ["src/domain/**/*.py"], "forbid": [r"^from app\.infrastructure", r"^import requests"]},
+            {"id": "INV-2", "rule": "도메인은 웹 프레임워크를 모른다",
+             "files": ["src/domain/**/*.py"], "forbid": [r"^from (flask|django)"]},
+            {"id": "INV-3", "rule": "주문 서비스는 OrderRepository 포트를 거친다",
+             "files": ["src/domain/order/*.py"], "require": [r"class OrderRepository\b"]},
+            {"id": "INV-4", "rule": "좋은 설계를 따른다"},
+        ],
+    },
+}
+
+
+def run_hook(payload: dict) -> str:
+    """PostToolUse main을 프로세스 안에서 실행하고 출력 반환"""
+    reset_memos()
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+        sys.stdin = io.StringIO(json.dumps(payload))
+        try:
+            post_tool_use.main()
+        finally:
+            sys.stdin = sys.__stdin__
+    return stdout.getvalue()
+
+
+def write(path: str, text: str) -> str:
+    """Write 도구처럼 파일을 쓰고 PostToolUse 실행"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(text, encoding="utf-8")
+    return run_hook({"tool_name": "Write", "tool_input": {"file_path": path}})
+
+
+def write_contract(project_hash: str, key: str, data: dict) -> str:
+    return write(str(contracts.get_contracts_path(project_hash) / key), serializer.yaml_dumps(data))
+
+
+def set_phase(project_hash: str, global_phase: str, phase: str) -> None:
+    reset_memos()
+    state = common.load_state(project_hash)
+    state["request"]["global_phase"] = global_phase
+    state["tasks"]["T1"]["subtasks"]["T1-S1"]["phase"] = phase
+    common.save_state(project_hash, state)
+
+
+def setup_project(files: int) -> str:
+    """소스 files개 + task_loop/implementation 중인 세션"""
+    for i in range(files):
+        package = "order" if i < 20 else f"pkg{i % 40}"
+        body = "class OrderRepository:\n    pass\n" if i == 0 else ""
+        Path(f"src/domain/{package}").mkdir(parents=True, exist_ok=True)
+        Path(f"src/domain/{package}/module_{i}.py").write_text(
+            f"from app.domain.base import Entity\n\n{body}\nclass Model{i}(Entity):\n" + "    value = 1\n" * 40,
+            encoding="utf-8",
+        )
+
+    project_hash = common.get_project_hash()
+    state = common.create_initial_state(project_hash, "주문 도메인 분리")
+    state["task_order"] = ["T1", "T2"]
+    state["tasks"] = {
+        "T1": {"name": "도메인 분리", "status": "in_progress", "current_subtask": "T1-S1",
+               "subtask_order": ["T1-S1", "T1-S2"],
+               "subtasks": {"T1-S1": {"name": "모델", "status": "in_progress", "phase": "test_first"},
+                            "T1-S2": {"name": "서비스", "status": "pending", "phase": ""}}},
+        "T2": {"name": "API", "status": "pending", "subtask_order": ["T2-S1"],
+               "subtasks": {"T2-S1": {"name": "컨트롤러", "status": "pending", "phase": ""}}},
+    }
+    state["request"]["current_task"] = "T1"
+    common.save_state(project_hash, state)
+
+    # Planning 중 task-breakdown.yaml 저장 → GATE-3 기준값
+    write_contract(project_hash, "R1/task-breakdown.yaml", BREAKDOWN)
+    set_phase(project_hash, "task_loop", "test_first")
+    write_contract(project_hash, "R1/T1/design-contract.yaml", DESIGN)
+    set_phase(project_hash, "task_loop", "implementation")
+    return project_hash
+
+
+def full_check(project_hash: str) -> bool:
+    """캐시 없이: Contract 파싱 + invariant 대상 파일 전부 검사"""
+    root = contracts.get_contracts_path(project_hash)
+    breakdown = serializer.yaml_loads((root / "R1/task-breakdown.yaml").read_text(encoding="utf-8"))
+    gates.scope_fingerprint(breakdown)
+    design = serializer.yaml_loads((root / "R1/T1/design-contract.yaml").read_text(encoding="utf-8"))
+    ok = True
+    for spec in gates.checkable_invariants(design):
+        for path in gates.resolve_files(spec["files"]):
+            text = Path(path).read_text(encoding="utf-8")
+            if any(re.search(p, text, re.MULTILINE) for p in spec["forbid"]):
+                ok = False
+    return ok
+
+
+def bench(project_hash: str, writes: int) -> None:
+    targets = [f"src/domain/pkg{i % 40}/module_{i}.py" for i in range(20, 20 + writes)]
+
+    start = time.perf_counter()
+    for path in targets:
+        Path(path).write_text(Path(path).read_text(encoding="utf-8") + "# edit\n", encoding="utf-8")
+        reset_memos()
+        full_check(project_hash)
+    full = (time.perf_counter() - start) / writes * 1000
+
+    run_hook({"tool_name": "Write", "tool_input": {"file_path": targets[0]}})  # 캐시 준비
+    start = time.perf_counter()
+    for path in targets:
+        output = write(path, Path(path).read_text(encoding="utf-8") + "# edit\n")
+        assert "BLOCKED" not in output, output
+    incremental = (time.perf_counter() - start) / writes * 1000
+
+    print(f"full: parse + rescan every file      {full:8.2f} ms/write")
+    print(f"incremental (PostToolUse, whole hook) {incremental:8.2f} ms/write   {full / incremental:5.1f}x")
+
+
+def gate_output(path: str, text: str) -> str:
+    output = write(path, text)
+    return json.loads(output)["reason"] if '"decision": "block"' in output else ""
+
+
+def check_behaviour(project_hash: str) -> None:
+    target = "src/domain/pkg21/module_21.py"
+    clean = Path(target).read_text(encoding="utf-8")
+
+    reason = gate_output(target, "from app.infrastructure.db import Session\n" + clean)
+    assert "GATE-4" in reason and "INV-1" in reason, reason
+    assert gate_output(target, clean) == "", "fixed file must pass"
+
+    # 파일 하나만 다시 읽음
+    cache = gates.GateCache(project_hash)
+    session = StateSession(project_hash)
+    gates.check_invariants(session, session.current_work(), target, cache)
+    assert cache.scanned == 0, cache.scanned
+    Path(target).write_text(clean + "# touched\n", encoding="utf-8")
+    gates.check_invariants(session, session.current_work(), target, cache)
+    assert cache.scanned == 2, cache.scanned  # 이 파일을 대상으로 하는 INV-1, INV-2
+
+    # 필수 패턴 삭제
+    repo = "src/domain/order/module_0.py"
+    repo_text = Path(repo).read_text(encoding="utf-8")
+    reason = gate_output(repo, repo_text.replace("class OrderRepository", "class OrderRepo"))
+    assert "INV-3" in reason, reason
+    assert gate_output(repo, repo_text) == ""
+
+    # design-contract 변경 → 새 invariant
+    design = json.loads(json.dumps(DESIGN))
+    design["design_contract"]["invariants"].append(
+        {"id": "INV-5", "rule": "print 금지", "files": ["src/**/*.py"], "forbid": [r"^\s*print\("]})
+    set_phase(project_hash, "task_loop", "test_first")
+    write_contract(project_hash, "R1/T1/design-contract.yaml", design)
+    set_phase(project_hash, "task_loop", "implementation")
+    reason = gate_output(target, clean + "print('debug')\n")
+    assert "INV-5" in reason, reason
+    gate_output(target, clean)
+
+    # GATE-3: 이름만 바뀌면 통과, Task 추가는 차단
+    breakdown = json.loads(json.dumps(BREAKDOWN))
+    breakdown["task_breakdown"]["tasks"][0]["name"] = "도메인 모델 분리"
+    assert gate_output(str(contracts.get_contracts_path(project_hash) / "R1/task-breakdown.yaml"),
+                       serializer.yaml_dumps(breakdown)) == ""
+    breakdown["task_breakdown"]["tasks"].append({"id": "T3", "name": "결제", "subtasks": []})
+    reason = gate_output(str(contracts.get_contracts_path(project_hash) / "R1/task-breakdown.yaml"),
+                         serializer.yaml_dumps(breakdown))
+    assert "GATE-3" in reason, reason
+
+    # implementation phase가 아니면 검사 안 함
+    set_phase(project_hash, "task_loop", "verification")
+    assert gate_output(target, "from app.infrastructure.db import Session\n") == ""
+    Path(target).write_text(clean, encoding="utf-8")
+    report_check("behaviour")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--writes", type=int, default=200)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-gates-"):
+        project_hash = setup_project(args.files)
+        print(f"{args.files} source files, 3 checkable invariants, {args.writes} writes in implementation phase")
+        bench(project_hash, min(args.writes, args.files - 20))
+        print()
+        check_behaviour(project_hash)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+UserPromptSubmit 컨텍스트 주입 벤치마크
+
+Task/Subtask가 많은 계획에서 키워드 없는 프롬프트를 반복하며 (프롬프트 두 번마다 Subtask phase 진행)
+1. before: 매번 전체 재개 메시지 (injection.mode: full, 예산 없음)
+2. after: 구조가 같으면 변경분만 + 전체 주입은 max_tokens 예산
+으로 주입된 총량(바이트, 어림 토큰)과 훅 한 번의 시간을 비교하고, 다음을 확인한다.
+- 변경분 메시지에 바뀐 Subtask와 다음 행동이 들어가는지
+- 변경이 없으면 한 줄만 주입하는지
+- Task가 추가되거나, 다른 Claude Code 세션이거나, PreCompact 뒤에는 전체를 주입하는지
+- 큰 계획의 전체 주입이 예산 안이고 현재 Task의 Subtask는 펼쳐져 있는지
+
+사용법:
+    python3 benchmarks/bench_injection.py [--tasks 40] [--subtasks 6] [--prompts 200]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import injection
+from hooks import pre_compact
+from hooks import serializer
+from hooks import user_prompt_submit
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+SESSION_ID = "benchinj"
+PHASES = ["test_first", "implementation", "verification", "complete"]
+
+
+def make_state(project_hash: str, tasks: int, subtasks: int) -> dict:
+    """task_loop 중인 큰 계획"""
+    state = common.create_initial_state(project_hash, "결제 모듈 전체 리팩터링")
+    state["request"].update({"global_phase": "task_loop", "current_task": "T1", "claude_session_id": SESSION_ID})
+    for t in range(1, tasks + 1):
+        task_id = f"T{t}"
+        state["task_order"].append(task_id)
+        state["tasks"][task_id] = {
+            "name": f"작업 {t} - 모듈 분리 및 인터페이스 정리",
+            "status": "in_progress" if t == 1 else "pending",
+            "current_subtask": f"{task_id}-S1",
+            "subtask_order": [f"{task_id}-S{s}" for s in range(1, subtasks + 1)],
+            "subtasks": {
+                f"{task_id}-S{s}": {"name": f"서브태스크 {s}: 테스트 작성 후 구현", "status": "pending", "phase": ""}
+                for s in range(1, subtasks + 1)
+            },
+        }
+    task = state["tasks"]["T1"]
+    task["subtasks"]["T1-S1"].update({"status": "in_progress", "phase": "test_first"})
+    return state
+
+
+def advance(state: dict) -> None:
+    """현재 Subtask phase 한 단계 진행 (complete면 다음 Subtask/Task로)"""
+    task_id = state["request"]["current_task"]
+    task = state["tasks"][task_id]
+    subtask = task["subtasks"][task["current_subtask"]]
+    phase = PHASES[PHASES.index(subtask["phase"]) + 1]
+    subtask["phase"] = phase
+    if phase != "complete":
+        return
+
+    subtask["status"] = "completed"
+    order = task["subtask_order"]
+    index = order.index(task["current_subtask"])
+    if index + 1 < len(order):
+        task["current_subtask"] = order[index + 1]
+    else:
+        task["status"] = "completed"
+        task_order = state["task_order"]
+        task_id = task_order[task_order.index(task_id) + 1]
+        state["request"]["current_task"] = task_id
+        task = state["tasks"][task_id]
+        task["status"] = "in_progress"
+    task["subtasks"][task["current_subtask"]].update({"status": "in_progress", "phase": "test_first"})
+
+
+def write_config(workdir: Path, overrides: dict) -> None:
+    """기본 config에서 injection 섹션만 바꿔 ORCHESTRATOR_CONFIG_PATH로 사용"""
+    config = serializer.yaml_loads(Path(common.__file__).with_name("orchestrator-config.yaml").read_text(encoding="utf-8"))
+    config["injection"] = {**config.get("injection", {}), **overrides}
+    path = workdir / f"config-{len(list(workdir.glob('config-*')))}.yaml"
+    path.write_text(serializer.yaml_dumps(config), encoding="utf-8")
+    os.environ["ORCHESTRATOR_CONFIG_PATH"] = str(path)
+
+
+def prompt(text: str = "좋아, 계속 부탁해", session_id: str = SESSION_ID) -> str:
+    """콜드 훅처럼 메모를 비우고 UserPromptSubmit 한 번 → 주입된 메시지"""
+    reset_memos()
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+        sys.stdin = io.StringIO(json.dumps({"prompt": text, "session_id": session_id}))
+        try:
+            user_prompt_submit.main()
+        finally:
+            sys.stdin = sys.__stdin__
+    output = stdout.getvalue().strip()
+    return json.loads(output)["hookSpecificOutput"]["additionalContext"] if output else ""
+
+
+def run_session(project_hash: str, state: dict, prompts: int) -> dict:
+    """prompts번 프롬프트 (두 번마다 phase 진행)의 주입 총량과 시간"""
+    common.save_state(project_hash, state)
+    injection.reset_injection_record(project_hash)
+    total_bytes = total_tokens = 0
+    kinds = {"full": 0, "diff": 0, "unchanged": 0}
+    start = time.perf_counter()
+    for i in range(prompts):
+        if i and i % 2 == 0:
+            advance(state)
+            common.save_state(project_hash, state)
+        message = prompt()
+        total_bytes += len(message.encode("utf-8"))
+        total_tokens += injection.estimate_tokens(message)
+        kinds[kind_of(message)] += 1
+    elapsed = time.perf_counter() - start
+    return {"bytes": total_bytes, "tokens": total_tokens, "ms": elapsed / prompts * 1000, "kinds": kinds}
+
+
+def kind_of(message: str) -> str:
+    """주입된 메시지 종류 (full | diff | unchanged)"""
+    if message.startswith("[TDD Orchestration Mode - Resume]"):
+        return "full"
+    return "unchanged" if "변경 없음" in message else "diff"
+
+
+def check_behaviour(workdir: Path, project_hash: str) -> None:
+    """변경분/변경 없음/전체 주입 조건"""
+    write_config(workdir, {"mode": "diff", "max_tokens": 1500, "full_every": 0})
+    state = make_state(project_hash, 8, 3)
+    common.save_state(project_hash, state)
+    injection.reset_injection_record(project_hash)
+
+    assert kind_of(prompt()) == "full", "first injection must be full"
+    message = prompt()
+    assert kind_of(message) == "unchanged" and "\n" not in message, message
+
+    advance(state)
+    common.save_state(project_hash, state)
+    message = prompt()
+    assert kind_of(message) == "diff", message
+    assert "T1-S1" in message and "implementation" in message and "orchestrator:implementer" in message, message
+
+    # Task 추가 (구조 변경)
+    state["task_order"].append("T9")
+    state["tasks"]["T9"] = {"name": "추가 작업", "status": "pending", "subtask_order": [], "subtasks": {}}
+    common.save_state(project_hash, state)
+    assert kind_of(prompt()) == "full", "structure change must inject full context"
+    assert kind_of(prompt()) == "unchanged"
+
+    # 다른 Claude Code 세션이 요청을 이어받음 (같은 머신/프로젝트에서 세션은 입력의 session_id로 구분)
+    state["request"]["claude_session_id"] = "other"
+    common.save_state(project_hash, state)
+    assert kind_of(prompt(session_id="other")) == "full", "new Claude Code session must inject full context"
+    assert kind_of(prompt(session_id="other")) == "unchanged"
+    assert prompt() == "", "a session that does not own the request must not get its context"
+
+    # PreCompact 뒤 (압축한 세션의 기록만 지움)
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        sys.stdin = io.StringIO(json.dumps({"session_id": "other"}))
+        try:
+            pre_compact.main()
+        finally:
+            sys.stdin = sys.__stdin__
+    assert kind_of(prompt(session_id="other")) == "full", "compaction must reset the injection record"
+    assert injection.get_injection_record_path(project_hash, SESSION_ID).exists()
+    report_check("behaviour")
+
+
+def check_budget(workdir: Path, project_hash: str) -> None:
+    """Task 200개 계획: 전체 주입이 예산 안이고 현재 Task는 펼쳐져 있음"""
+    write_config(workdir, {"mode": "diff", "max_tokens": 1500})
+    state = make_state(project_hash, 200, 6)
+    for _ in range(3 * 6 * 120):  # 120개 Task 완료 (Subtask당 phase 세 번)
+        advance(state)
+    common.save_state(project_hash, state)
+    injection.reset_injection_record(project_hash)
+
+    message = prompt("/orchestrator resume")
+    assert injection.estimate_tokens(message) <= 1500, injection.estimate_tokens(message)
+    current = state["request"]["current_task"]
+    assert all(s in message for s in state["tasks"][current]["subtask_order"]), "current task collapsed"
+    assert "## 다음 행동" in message
+    report_check("budget", f"{injection.estimate_tokens(message)} tokens")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--subtasks", type=int, default=6)
+    parser.add_argument("--prompts", type=int, default=200)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-injection-") as workdir:
+        project_hash = common.get_project_hash()
+        common.register_session(project_hash, SESSION_ID)
+
+        print(f"{args.tasks} tasks x {args.subtasks} subtasks, {args.prompts} prompts (phase advances every 2)")
+        for label, overrides in (
+            ("before: full every prompt", {"mode": "full", "max_tokens": 0, "max_bytes": 0}),
+            ("after: diff + 1500 tokens", {"mode": "diff", "max_tokens": 1500, "full_every": 20}),
+        ):
+            write_config(workdir, overrides)
+            result = run_session(project_hash, make_state(project_hash, args.tasks, args.subtasks), args.prompts)
+            kinds = " ".join(f"{k}={v}" for k, v in result["kinds"].items())
+            print(f"{label:<28} {result['bytes'] / 1024:9.1f} KB {result['tokens']:9,} tokens   "
+                  f"{result['ms']:6.2f} ms/prompt   {kinds}")
+        print()
+
+        check_behaviour(workdir, project_hash)
+        check_budget(workdir, project_hash)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+knowledge 갱신 벤치마크 (전체 재작성 vs delta 로그)
+
+pitfall/decision이 수백 개 쌓인 knowledge.yaml에 pitfall 하나를 추가할 때
+1. 기존 방식: load_knowledge → 수정 → yaml.dump로 knowledge.yaml 전체 재작성
+2. delta 방식: knowledge.delta.jsonl에 한 줄 추가
+의 훅당 비용을 비교하고, 다음을 확인한다.
+- load_knowledge의 병합 결과가 전체 재작성 결과와 같은지
+- compact_after 개수에서 자동 압축되는지
+- 압축이 중간에 끊겨도 delta가 유실/중복되지 않는지
+  (knowledge.yaml을 쓴 뒤 로그를 지우기 전에 끊겨 mtime이 같아도 중복 없음)
+- save_knowledge가 로드 뒤에 다른 훅이 추가한 delta를 지우지 않는지
+
+사용법:
+    python3 benchmarks/bench_knowledge.py [--items 300] [--iterations 100]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml
+
+from hooks import common
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+PROJECT_HASH = "benchkn8"
+
+
+def make_knowledge(items: int) -> dict:
+    knowledge = common.create_initial_knowledge(PROJECT_HASH)
+    knowledge["patterns"] = {"build_tool": "Gradle", "framework": "Spring Boot", "testing": "JUnit5"}
+    for i in range(items):
+        knowledge["decisions"].append({
+            "id": f"INV-{i}",
+            "topic": f"INV-{i}",
+            "decision": f"도메인 모듈 {i}은 인프라 계층을 직접 참조하지 않는다",
+            "rationale": "Design invariant",
+            "refs": [f".claude/orchestrator/sessions/x/contracts/R1/T{i}/design-contract.yaml"],
+            "created_at": "2026-01-01",
+        })
+        knowledge["pitfalls"].append({
+            "id": f"P-test_case_{i}",
+            "description": f"test_case_{i}: NullPointerException in OrderService.place",
+            "reason": "Optional 처리 누락",
+            "learned_from": f"T{i}-S1",
+        })
+    return knowledge
+
+
+def pitfall(i: int) -> dict:
+    return {"id": f"P-new_{i}", "description": f"new_{i}: timeout", "reason": "retry 누락", "learned_from": "T1-S1"}
+
+
+def use_unbounded_limits(workdir: Path) -> None:
+    """delta 경로만 재기 위해 knowledge.limits 상한을 끈 config 사용"""
+    path = workdir / "config.yaml"
+    path.write_text("knowledge:\n  limits:\n    max_pitfalls: 0\n    max_decisions: 0\n", encoding="utf-8")
+    os.environ["ORCHESTRATOR_CONFIG_PATH"] = str(path)
+
+
+def strip_aggregation(knowledge: dict) -> dict:
+    """count/first_seen/last_seen/delta_log 제외 (delta를 추가한 시각과 로그에 따라 달라짐)"""
+    for section in ("pitfalls", "decisions"):
+        for item in knowledge.get(section) or []:
+            for key in ("count", "first_seen", "last_seen"):
+                item.pop(key, None)
+    knowledge.pop("updated_at", None)
+    knowledge.pop("delta_log", None)
+    return knowledge
+
+
+def reset(knowledge: dict) -> None:
+    common.save_knowledge(PROJECT_HASH, knowledge)
+    reset_memos()
+
+
+def bench(label: str, fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        reset_memos()
+        fn(i)
+    per_iter_ms = (time.perf_counter() - start) / iterations * 1000
+    print(f"{label:<40} {per_iter_ms:8.3f} ms")
+    return per_iter_ms
+
+
+def check_merged_view(knowledge: dict) -> None:
+    """delta 병합 view == 같은 변경을 전체 재작성으로 적용한 결과"""
+    reset(knowledge)
+    expected = yaml.safe_load(yaml.dump(knowledge, allow_unicode=True))
+    deltas = [
+        {"op": "pitfall", "item": pitfall(1)},
+        {"op": "decision", "item": {"id": "INV-0", "decision": "중복 - count만 올라가야 함"}},
+        {"op": "decision", "item": {"id": "INV-new", "decision": "새 결정"}},
+        {"op": "patterns", "values": {"framework": "Quarkus", "architecture": "Hexagonal"}},
+    ]
+    expected["pitfalls"].append(pitfall(1))
+    expected["decisions"].append({"id": "INV-new", "decision": "새 결정"})
+    expected["patterns"]["architecture"] = "Hexagonal"
+
+    assert common.append_knowledge_deltas(PROJECT_HASH, deltas)
+    merged = common.load_knowledge(PROJECT_HASH)
+    assert merged["decisions"][0]["count"] == 2, merged["decisions"][0]
+    assert strip_aggregation(merged) == expected, "merged view differs"
+
+    assert common.compact_knowledge(PROJECT_HASH) == len(deltas)
+    assert not common.get_knowledge_delta_path(PROJECT_HASH).exists()
+    reset_memos()
+    compacted = common.load_knowledge(PROJECT_HASH)
+    assert strip_aggregation(compacted) == expected, "compacted knowledge differs"
+    report_check("merged view")
+
+
+def check_auto_compaction(knowledge: dict) -> None:
+    """compact_after 개가 쌓이면 추가한 훅에서 바로 압축"""
+    reset(knowledge)
+    compact_after = common.DEFAULT_KNOWLEDGE_COMPACT_AFTER
+    for i in range(compact_after - 1):
+        common.append_knowledge_deltas(PROJECT_HASH, [{"op": "pitfall", "item": pitfall(i)}])
+    assert common.get_knowledge_delta_path(PROJECT_HASH).exists()
+    common.append_knowledge_deltas(PROJECT_HASH, [{"op": "pitfall", "item": pitfall(compact_after)}])
+    assert not common.get_knowledge_delta_path(PROJECT_HASH).exists(), "not compacted"
+    assert len(common.load_knowledge(PROJECT_HASH)["pitfalls"]) == len(knowledge["pitfalls"]) + compact_after
+    report_check("auto compaction")
+
+
+def check_interrupted_compaction(knowledge: dict) -> None:
+    """rename 직후 중단된 압축: 로드에는 보이고, 다음 압축에서 한 번만 반영"""
+    reset(knowledge)
+    common.append_knowledge_deltas(PROJECT_HASH, [{"op": "pitfall", "item": pitfall(1)}])
+    os.rename(common.get_knowledge_delta_path(PROJECT_HASH), common.get_knowledge_compacting_path(PROJECT_HASH))
+    common.append_knowledge_deltas(PROJECT_HASH, [{"op": "pitfall", "item": pitfall(2)}])
+
+    expected = len(knowledge["pitfalls"]) + 2
+    assert len(common.load_knowledge(PROJECT_HASH)["pitfalls"]) == expected, "pending deltas not visible"
+    assert common.compact_knowledge(PROJECT_HASH) == 1
+    assert common.compact_knowledge(PROJECT_HASH) == 1
+    reset_memos()
+    assert len(common.load_knowledge(PROJECT_HASH)["pitfalls"]) == expected, "delta lost or duplicated"
+    report_check("interrupted compaction")
+
+
+def check_replayed_compaction(knowledge: dict) -> None:
+    """knowledge.yaml을 쓴 뒤 .compacting을 지우기 전에 끊긴 압축: 다시 읽어도 한 번만 반영"""
+    reset(knowledge)
+    common.append_knowledge_deltas(PROJECT_HASH, [{"op": "pitfall", "item": pitfall(1)}])
+    compacting_path = common.get_knowledge_compacting_path(PROJECT_HASH)
+    os.rename(common.get_knowledge_delta_path(PROJECT_HASH), compacting_path)
+    leftover = compacting_path.read_bytes()
+    assert common.compact_knowledge(PROJECT_HASH) == 1
+
+    # 지우지 못한 .compacting, mtime 해상도가 낮아 knowledge.yaml과 같은 시각
+    compacting_path.write_bytes(leftover)
+    mtime = common.get_knowledge_path(PROJECT_HASH).stat().st_mtime_ns
+    os.utime(compacting_path, ns=(mtime, mtime))
+    reset_memos()
+    expected = len(knowledge["pitfalls"]) + 1
+    assert len(common.load_knowledge(PROJECT_HASH)["pitfalls"]) == expected, "replayed delta visible twice"
+    assert common.compact_knowledge(PROJECT_HASH) == 0
+    assert not compacting_path.exists()
+    reset_memos()
+    merged = common.load_knowledge(PROJECT_HASH)
+    assert len(merged["pitfalls"]) == expected and merged["pitfalls"][-1]["count"] == 1, "delta applied twice"
+    report_check("replayed compaction")
+
+
+def check_save_keeps_new_deltas(knowledge: dict) -> None:
+    """로드 → (다른 훅이 delta 추가) → save_knowledge: 추가된 delta는 남고 로드했던 것은 한 번만"""
+    reset(knowledge)
+    common.append_knowledge_deltas(PROJECT_HASH, [{"op": "pitfall", "item": pitfall(1)}])
+    current = common.load_knowledge(PROJECT_HASH)
+    common.append_knowledge_deltas(PROJECT_HASH, [{"op": "pitfall", "item": pitfall(2)}])
+    current["patterns"]["orm"] = "JPA"
+    assert common.save_knowledge(PROJECT_HASH, current)
+
+    reset_memos()
+    merged = common.load_knowledge(PROJECT_HASH)
+    descriptions = [item["description"] for item in merged["pitfalls"]]
+    assert descriptions.count(pitfall(1)["description"]) == 1 and merged["pitfalls"][-2]["count"] == 1, "loaded delta applied twice"
+    assert pitfall(2)["description"] in descriptions, "delta appended after load lost"
+    assert merged["patterns"]["orm"] == "JPA"
+    assert common.compact_knowledge(PROJECT_HASH) == 1
+    reset_memos()
+    assert strip_aggregation(common.load_knowledge(PROJECT_HASH)) == strip_aggregation(merged)
+    report_check("save during appends")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=300, help="pitfall/decision 각각의 개수")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-knowledge-") as workdir:
+        use_unbounded_limits(workdir)
+        knowledge = make_knowledge(args.items)
+        reset(knowledge)
+        size = common.get_knowledge_path(PROJECT_HASH).stat().st_size
+        print(f"knowledge.yaml: {args.items} decisions + {args.items} pitfalls, {size / 1024:.0f} KB")
+
+        def full_rewrite(i):
+            current = common.load_knowledge(PROJECT_HASH)
+            current["pitfalls"].append(pitfall(i))
+            common.save_knowledge(PROJECT_HASH, current)
+
+        def append_delta(i):
+            common.append_knowledge_deltas(PROJECT_HASH, [{"op": "pitfall", "item": pitfall(i)}])
+
+        base = bench("before: load + yaml.dump rewrite", full_rewrite, args.iterations)
+        reset(knowledge)
+        after = bench("after: append delta", append_delta, args.iterations)
+        print(f"speedup: {base / after:6.1f}x")
+        print()
+
+        check_merged_view(knowledge)
+        check_auto_compaction(knowledge)
+        check_interrupted_compaction(knowledge)
+        check_replayed_compaction(knowledge)
+        check_save_keeps_new_deltas(knowledge)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+프로젝트 전체 패턴 학습 벤치마크 (/orchestrator learn)
+
+여러 모듈로 된 모노레포를 생성해
+1. 단일 프로세스 전체 스캔
+2. 프로세스 풀 전체 스캔
+3. learn-manifest.json 기준 재실행 (변경 없음 / touch만 / 내용 변경)
+의 소요 시간을 비교하고, 다음을 확인한다.
+- 전체/병렬/증분 학습 결과가 같은지
+- 삭제된 파일에서 온 패턴은 철회되고, 값이 바뀐 패턴은 교체되는지
+- .gitignore된 파일(node_modules 등)을 건너뛰는지, git 없이 순회해도 같은 파일 목록인지
+- 학습 결과가 knowledge.yaml에 반영되고, 기존 knowledge 값은 유지되는지
+- /orchestrator learn의 백그라운드 실행은 바로 반환하고, 한 번에 하나만 돌며, 끝나면 요약을 남기는지
+
+사용법:
+    python3 benchmarks/bench_learn.py [--files 40000] [--workers 0]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import learn
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+PROJECT_HASH = "benchlr8"
+
+JAVA_SERVICE = """package com.example.{module};
+
+import org.springframework.stereotype.Service;
+
+@Service
+public class {name}Service {{
+    private final {name}Repository repository;
+
+    public {name}Service({name}Repository repository) {{
+        this.repository = repository;
+    }}
+}}
+"""
+
+JAVA_TEST = """package com.example.{module};
+
+import org.junit.jupiter.api.Test;
+import org.mockito.Mock;
+
+class {name}ServiceTest {{
+    @Mock {name}Repository repository;
+
+    @Test
+    void places() {{}}
+}}
+"""
+
+TS_COMPONENT = """export function {name}View(props: {{ items: string[] }}) {{
+  return props.items.map((item) => item.toUpperCase());
+}}
+"""
+
+
+def make_repo(root: Path, files: int) -> None:
+    """모듈별 Java 백엔드 + TypeScript 프론트엔드 + 문서로 된 모노레포"""
+    (root / "build.gradle").write_text("plugins { id 'org.springframework.boot' version '3.2.0' }\n")
+    (root / "package.json").write_text('{"dependencies": {"react": "^18.2.0"}}\n')
+    (root / ".gitignore").write_text("node_modules/\n*.log\n/generated\n")
+
+    # 무시되어야 하는 파일: 반영되면 framework/testing 값이 달라짐
+    ignored = root / "node_modules" / "vue"
+    ignored.mkdir(parents=True)
+    (ignored / "package.json").write_text('{"dependencies": {"vue": "^3.0.0"}}\n')
+    (root / "generated").mkdir()
+    (root / "generated" / "OrderSpec.test.py").write_text("import pytest\n")
+    (root / "debug.log").write_text("@Controller\n")
+
+    per_module = 40
+    for i in range(max(1, files // per_module)):
+        module = f"module{i:04d}"
+        java = root / module / "src" / "main" / "java"
+        tests = root / module / "src" / "test" / "java"
+        web = root / module / "web"
+        for directory in (java, tests, web):
+            directory.mkdir(parents=True)
+        for j in range(per_module // 4):
+            name = f"Order{j}"
+            (java / f"{name}Service.java").write_text(JAVA_SERVICE.format(module=module, name=name))
+            (tests / f"{name}ServiceTest.java").write_text(JAVA_TEST.format(module=module, name=name))
+            (web / f"{name}View.tsx").write_text(TS_COMPONENT.format(name=name))
+            (root / module / f"NOTES{j}.md").write_text(f"# {name}\n\n설계 메모\n")
+
+
+def reset_knowledge() -> None:
+    for path in (
+        common.get_knowledge_path(PROJECT_HASH),
+        common.get_knowledge_delta_path(PROJECT_HASH),
+        learn.get_learn_manifest_path(PROJECT_HASH),
+    ):
+        path.unlink(missing_ok=True)
+    reset_memos()
+
+
+def run(label: str, root: Path, workers: int, reset: bool = True) -> dict:
+    if reset:
+        reset_knowledge()
+    reset_memos()
+    start = time.perf_counter()
+    result = learn.learn_project(root, PROJECT_HASH, workers)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:8.2f} s  ({result['scanned']} files scanned, {result['files'] / elapsed:,.0f} files/s)")
+    return result
+
+
+def edit_files(root: Path, count: int, change_content: bool) -> None:
+    """앞쪽 모듈의 서비스 파일 count개 수정 (change_content=False면 mtime만 변경)"""
+    for path in sorted(root.glob("module*/src/main/java/*.java"))[:count]:
+        if change_content:
+            path.write_text(path.read_text() + "// edited\n")
+        else:
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def check_file_listing(root: Path) -> None:
+    """git ls-files 결과 == .gitignore를 반영한 순회 결과, 무시 대상 제외"""
+    git_files = learn.list_git_files(root)
+    assert git_files is not None, "git listing failed"
+    walked = learn.walk_files(root)
+    assert sorted(git_files) == sorted(walked), "walk differs from git ls-files"
+    for path in git_files:
+        assert not path.startswith(("node_modules/", "generated/")) and not path.endswith(".log"), path
+    report_check("file listing")
+
+
+def check_retraction(workdir: Path) -> None:
+    """삭제된 파일의 패턴은 철회, 근거 파일이 바뀐 패턴은 교체, learn 밖에서 정한 값은 유지"""
+    reset_knowledge()
+    root = workdir / "small"
+    (root / "src").mkdir(parents=True)
+    (root / "build.gradle").write_text("plugins { id 'java' }\n")
+    (root / "src" / "OrderController.java").write_text("class OrderController {}\n")
+    (root / "src" / "OrderRepositoryTest.java").write_text("import org.mockito.Mock;\n@Test void a() {}\n")
+
+    first = learn.learn_project(root, PROJECT_HASH, 1)
+    assert first["patterns"]["mocking"] == "Mockito" and first["patterns"]["build_tool"] == "Gradle", first
+
+    # learn이 정한 값을 사용자가 직접 고친 경우
+    knowledge = common.load_knowledge(PROJECT_HASH)
+    knowledge["patterns"]["mocking"] = "MockK"
+    common.save_knowledge(PROJECT_HASH, knowledge)
+
+    (root / "src" / "OrderRepositoryTest.java").unlink()
+    (root / "build.gradle").unlink()
+    (root / "pom.xml").write_text("<project/>\n")
+    second = learn.learn_project(root, PROJECT_HASH, 1)
+    assert second["scanned"] == 1, second["scanned"]
+    assert set(second["retracted"]) == {"testing", "data_layer"}, second["retracted"]
+    assert "build_tool: Maven" in second["added"], second["added"]
+
+    reset_memos()
+    patterns = common.load_knowledge(PROJECT_HASH)["patterns"]
+    assert patterns == {
+        "build_tool": "Maven", "architecture_hint": "MVC/Layered", "language": "Java", "mocking": "MockK",
+    }, patterns
+    report_check("retraction")
+
+
+def check_knowledge(root: Path, expected: dict) -> None:
+    """knowledge.yaml에 반영되고, 기존 값은 덮어쓰지 않음"""
+    reset_knowledge()
+    knowledge = common.create_initial_knowledge(PROJECT_HASH)
+    knowledge["patterns"] = {"framework": "Spring Boot"}
+    common.save_knowledge(PROJECT_HASH, knowledge)
+
+    result = learn.learn_project(root, PROJECT_HASH, 1)
+    assert "framework: Spring" not in result["added"], result["added"]
+    assert not common.get_knowledge_delta_path(PROJECT_HASH).exists(), "not compacted"
+    reset_memos()
+    patterns = common.load_knowledge(PROJECT_HASH)["patterns"]
+    assert patterns == {**expected, "framework": "Spring Boot"}, patterns
+    report_check("knowledge")
+
+
+def check_background(root: Path, expected: dict) -> None:
+    """spawn_learn은 기다리지 않고, 실행 중에는 다시 띄우지 않으며, 끝나면 잠금 해제 + 요약"""
+    reset_knowledge()
+    learn.get_learn_summary_path(PROJECT_HASH).unlink(missing_ok=True)
+
+    start = time.perf_counter()
+    assert learn.spawn_learn(root, PROJECT_HASH), "spawn failed"
+    spawned = time.perf_counter() - start
+    assert learn.is_learn_running(PROJECT_HASH), "lock not held"
+    assert not learn.spawn_learn(root, PROJECT_HASH), "second learn spawned"
+
+    deadline = time.monotonic() + 600
+    while learn.is_learn_running(PROJECT_HASH):
+        assert time.monotonic() < deadline, "background learn did not finish"
+        time.sleep(0.05)
+    waited = time.perf_counter() - start
+    assert not learn.get_learn_lock_path(PROJECT_HASH).exists(), "lock not released"
+
+    summary = learn.pop_learn_summary(PROJECT_HASH)
+    assert summary and "프로젝트 패턴 학습 완료" in summary, summary
+    assert learn.pop_learn_summary(PROJECT_HASH) is None, "summary not consumed"
+    reset_memos()
+    patterns = common.load_knowledge(PROJECT_HASH)["patterns"]
+    assert patterns == expected, patterns
+
+    # 죽은 프로세스의 잠금은 회수
+    learn.get_learn_lock_path(PROJECT_HASH).write_text("999999999")
+    assert not learn.is_learn_running(PROJECT_HASH), "stale lock treated as running"
+    print(f"  before: hook waits for learn            {waited:8.2f} s")
+    print(f"  after: hook returns after spawn_learn   {spawned * 1000:8.2f} ms")
+    learn.get_learn_lock_path(PROJECT_HASH).unlink()
+    report_check("background")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=40000)
+    parser.add_argument("--workers", type=int, default=0, help="0이면 CPU 수")
+    args = parser.parse_args()
+
+    with bench_workdir("bench-learn-") as workdir:
+        root = workdir / "repo"
+        root.mkdir()
+        make_repo(root, args.files)
+        subprocess.run(["git", "init", "-q", str(root)], check=True)
+        print(f"repo: {len(learn.list_project_files(root))} files (excluding ignored)")
+
+        workers = args.workers or os.cpu_count() or 1
+        base = run("full: single process", root, 1)
+        after = run(f"full: process pool ({workers} workers)", root, workers)
+        assert base["patterns"] == after["patterns"], "parallel result differs"
+
+        unchanged = run("incremental: no changes", root, workers, reset=False)
+        assert unchanged["scanned"] == 0 and not unchanged["added"], unchanged
+        edit_files(root, 100, change_content=False)
+        touched = run("incremental: 100 files touched", root, workers, reset=False)
+        assert touched["scanned"] == 0, touched["scanned"]
+        edit_files(root, 100, change_content=True)
+        edited = run("incremental: 100 files edited", root, workers, reset=False)
+        assert edited["scanned"] == 100 and edited["patterns"] == base["patterns"], edited["scanned"]
+        print()
+
+        expected = {
+            "build_tool": "Gradle", "framework": "Spring", "service_layer": "Service Layer",
+            "language": "Java", "testing": "JUnit 5", "mocking": "Mockito",
+        }
+        assert after["patterns"] == expected, after["patterns"]
+        check_file_listing(root)
+        check_retraction(workdir)
+        check_knowledge(root, expected)
+        check_background(root, expected)
+
+
+if __name__ == "__main__":
+    main()
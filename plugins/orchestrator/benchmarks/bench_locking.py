@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+프로세스 간 잠금 스트레스 벤치마크
+
+병렬 서브에이전트의 훅처럼 N개 프로세스가 동시에
+1. StateSession으로 같은 요청의 state를 읽고-고치고-씀 (프로세스마다 자기 Task의 count를 +1)
+2. knowledge delta를 추가하고, 로그가 차면 그 자리에서 압축
+을 반복한 뒤 잃어버린 갱신이 없는지 확인하고 프로세스 수에 따른 처리량을 잰다.
+
+--unlocked는 잠금과 버전 확인을 끈 이전 동작으로 같은 작업을 돌려 잃어버린 갱신 수를 보여 준다.
+
+사용법:
+    python3 benchmarks/bench_locking.py [--processes 1,2,4,8] [--updates 50] [--compact-after 8] [--unlocked]
+"""
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import request_index
+from hooks import state_store
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+def disable_locking() -> None:
+    """잠금 이전 동작: 잠그지 않고, 버전 확인도 항상 '그대로'로 통과"""
+    def no_lock(path, shared=False, timeout=0.0):
+        return contextlib.nullcontext()
+
+    for module in (common, state_store, request_index):
+        module.file_lock = no_lock
+    state_store.JsonStateStore.version = lambda self: (0, 0, 0)
+
+
+def worker(index: int, updates: int, unlocked: bool, start, results) -> None:
+    """Task T{index+1}의 count를 updates번 +1, 같은 수의 knowledge delta 추가"""
+    reset_memos(connections=True)
+    if unlocked:
+        disable_locking()
+    project_hash = common.get_project_hash()
+    task_id = f"T{index + 1}"
+    start.wait()
+
+    began = time.perf_counter()
+    for k in range(updates):
+        with state_store.StateSession(project_hash) as session:
+            count = session.state["tasks"][task_id].get("count", 0)
+            session.set(("tasks", task_id, "count"), count + 1)
+        # 도구 호출 경로와 달리 압축도 이 프로세스에서 (rename과 append가 겹치도록)
+        common.append_knowledge_deltas(project_hash, [{"op": "set", "key": f"w{index}_{k}", "value": k}])
+    results.put(time.perf_counter() - began)
+
+
+def run(workdir: Path, backend: str, processes: int, updates: int, unlocked: bool) -> dict:
+    """processes개 프로세스로 한 번 실행 → 처리량과 잃어버린 갱신 수"""
+    os.environ["ORCHESTRATOR_STATE_BACKEND"] = backend
+    project_dir = workdir / f"{backend}-{processes}-{'unlocked' if unlocked else 'locked'}"
+    project_dir.mkdir()
+    os.chdir(project_dir)
+    project_hash = common.get_project_hash()
+
+    state = common.create_initial_state(project_hash, "병렬 서브에이전트 스트레스")
+    state["task_order"] = [f"T{i}" for i in range(1, processes + 1)]
+    state["tasks"] = {task_id: {"name": task_id, "status": "in_progress", "subtasks": {}} for task_id in state["task_order"]}
+    common.save_state(project_hash, state)
+    common.save_knowledge(project_hash, common.create_initial_knowledge(project_hash))
+    reset_memos(connections=True)
+
+    context = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    start = context.Event()
+    results = context.Queue()
+    workers = [context.Process(target=worker, args=(i, updates, unlocked, start, results)) for i in range(processes)]
+    for process in workers:
+        process.start()
+    start.set()
+    elapsed = max(results.get() for _ in workers)
+    for process in workers:
+        process.join()
+
+    reset_memos(connections=True)
+    state = common.load_state(project_hash)
+    counts = [state["tasks"][task_id].get("count", 0) for task_id in state["task_order"]]
+    common.compact_knowledge(project_hash)
+    knowledge = common.load_knowledge(project_hash) or {}
+    recorded = sum(1 for i in range(processes) for k in range(updates) if f"w{i}_{k}" in knowledge)
+    return {
+        "throughput": processes * updates / elapsed,
+        "lost_state": processes * updates - sum(counts),
+        "lost_knowledge": processes * updates - recorded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", default="1,2,4,8")
+    parser.add_argument("--updates", type=int, default=50, help="프로세스당 갱신 수")
+    parser.add_argument("--compact-after", type=int, default=8, help="knowledge.compact_after")
+    parser.add_argument("--unlocked", action="store_true", help="잠금 이전 동작도 함께 측정")
+    args = parser.parse_args()
+
+    with bench_workdir("bench-locking-") as workdir:
+        config_path = workdir / "config.yaml"
+        config_path.write_text(f"knowledge:\n  compact_after: {args.compact_after}\n", encoding="utf-8")
+        os.environ["ORCHESTRATOR_CONFIG_PATH"] = str(config_path)
+
+        modes = [False, True] if args.unlocked else [False]
+        print(f"{args.updates} state updates + {args.updates} knowledge deltas per process "
+              f"(compact_after={args.compact_after})")
+        print(f"{'backend':>8} {'mode':>9} {'procs':>6} {'updates/s':>10} {'lost state':>11} {'lost knowledge':>15}")
+        for backend in ("json", "sqlite"):
+            for unlocked in modes:
+                for processes in (int(n) for n in args.processes.split(",")):
+                    result = run(workdir, backend, processes, args.updates, unlocked)
+                    mode = "unlocked" if unlocked else "locked"
+                    print(f"{backend:>8} {mode:>9} {processes:>6} {result['throughput']:>10.0f} "
+                          f"{result['lost_state']:>11} {result['lost_knowledge']:>15}")
+                    if not unlocked:
+                        assert result["lost_state"] == 0, f"{backend}: lost state updates {result}"
+                        assert result["lost_knowledge"] == 0, f"{backend}: lost knowledge deltas {result}"
+        print()
+        report_check("no lost updates")
+
+
+if __name__ == "__main__":
+    main()
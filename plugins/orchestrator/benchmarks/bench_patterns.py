@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+코드 패턴 감지 벤치마크 (if/elif 체인 vs 규칙 팩 스캐너)
+
+1. 규칙별 코퍼스: 기본 팩의 모든 규칙이 최소 한 번 이기는지, 기대값과 같은지,
+   기존 구현과 같은 결과인지 확인
+2. 수 MB 소스 파일에서 기존 구현과 스캐너의 파일당 비용 비교
+3. config 사용자 팩이 기본 팩보다 우선하는지 확인
+
+사용법:
+    python3 benchmarks/bench_patterns.py [--mb 4] [--iterations 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Any, Dict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks.patterns import DEFAULT_PATTERN_PACK, PatternScanner
+
+from harness import report_check
+
+
+def legacy_detect_code_patterns(file_path: str, content: str) -> Dict[str, Any]:
+    """
+    규칙 팩 도입 전 detect_code_patterns (비교 기준)
+
+    Returns:
+        감지된 패턴 딕셔너리 또는 빈 딕셔너리
+    """
+    patterns = {}
+    file_name = os.path.basename(file_path)
+
+    # 빌드 도구 감지
+    if file_name == "build.gradle" or file_name == "build.gradle.kts":
+        patterns["build_tool"] = "Gradle"
+        if "spring" in content.lower():
+            patterns["framework"] = "Spring"
+    elif file_name == "pom.xml":
+        patterns["build_tool"] = "Maven"
+        if "spring" in content.lower():
+            patterns["framework"] = "Spring"
+    elif file_name == "package.json":
+        patterns["build_tool"] = "npm"
+        if '"react"' in content:
+            patterns["framework"] = "React"
+        elif '"vue"' in content:
+            patterns["framework"] = "Vue"
+        elif '"@angular' in content:
+            patterns["framework"] = "Angular"
+
+    # 테스팅 프레임워크 감지
+    if "Test" in file_name or ".spec." in file_name or ".test." in file_name:
+        if "@Test" in content or "org.junit" in content:
+            if "jupiter" in content or "junit5" in content.lower():
+                patterns["testing"] = "JUnit 5"
+            else:
+                patterns["testing"] = "JUnit 4"
+        if "mockito" in content.lower():
+            patterns["mocking"] = "Mockito"
+        if "describe(" in content or "it(" in content:
+            if "jest" in content.lower():
+                patterns["testing"] = "Jest"
+            elif "vitest" in content.lower():
+                patterns["testing"] = "Vitest"
+            elif "mocha" in content.lower():
+                patterns["testing"] = "Mocha"
+        if "pytest" in content or "@pytest" in content:
+            patterns["testing"] = "pytest"
+
+    # 아키텍처 패턴 감지
+    if "Controller" in file_name or "@Controller" in content or "@RestController" in content:
+        patterns["architecture_hint"] = "MVC/Layered"
+    if "Repository" in file_name or "@Repository" in content:
+        patterns["data_layer"] = "Repository Pattern"
+    if "Service" in file_name or "@Service" in content:
+        patterns["service_layer"] = "Service Layer"
+
+    # 언어 감지
+    if file_path.endswith(".java"):
+        patterns["language"] = "Java"
+    elif file_path.endswith(".py"):
+        patterns["language"] = "Python"
+    elif file_path.endswith((".ts", ".tsx")):
+        patterns["language"] = "TypeScript"
+    elif file_path.endswith((".js", ".jsx")):
+        patterns["language"] = "JavaScript"
+    elif file_path.endswith(".go"):
+        patterns["language"] = "Go"
+    elif file_path.endswith(".rs"):
+        patterns["language"] = "Rust"
+
+    return patterns
+
+
+# (파일 경로, 내용, 기대 결과)
+CORPUS = [
+    ("build.gradle", "plugins { id 'org.springframework.boot' }", {"build_tool": "Gradle", "framework": "Spring"}),
+    ("build.gradle.kts", "plugins { kotlin(\"jvm\") }", {"build_tool": "Gradle"}),
+    ("pom.xml", "<groupId>org.springframework.boot</groupId>", {"build_tool": "Maven", "framework": "Spring"}),
+    ("package.json", '{"dependencies": {"react": "^18.0.0"}}', {"build_tool": "npm", "framework": "React"}),
+    ("package.json", '{"dependencies": {"vue": "^3.0.0"}}', {"build_tool": "npm", "framework": "Vue"}),
+    ("package.json", '{"dependencies": {"@angular/core": "^17.0.0"}}', {"build_tool": "npm", "framework": "Angular"}),
+    ("package.json", '{"dependencies": {"react": "1", "vue": "3"}}', {"build_tool": "npm", "framework": "React"}),
+    ("tests/test_order.test.py", "import pytest\n\n@pytest.fixture\ndef order(): ...",
+     {"testing": "pytest", "language": "Python"}),
+    ("src/order.test.ts", "import { jest } from '@jest/globals';\ndescribe('order', () => {});",
+     {"testing": "Jest", "language": "TypeScript"}),
+    ("src/order.spec.ts", "import { describe, it } from 'vitest';\nit('works', () => {});",
+     {"testing": "Vitest", "language": "TypeScript"}),
+    ("test/order.spec.js", "const { expect } = require('chai'); // mocha\ndescribe('order', function () {});",
+     {"testing": "Mocha", "language": "JavaScript"}),
+    ("src/test/java/OrderServiceTest.java",
+     "import org.junit.jupiter.api.Test;\nimport org.mockito.Mock;\nclass OrderServiceTest { @Test void place() {} }",
+     {"testing": "JUnit 5", "mocking": "Mockito", "service_layer": "Service Layer", "language": "Java"}),
+    ("src/test/java/LegacyTest.java", "import org.junit.Test;\npublic class LegacyTest { @Test public void a() {} }",
+     {"testing": "JUnit 4", "language": "Java"}),
+    ("src/main/java/OrderController.java", "public class OrderController {}",
+     {"architecture_hint": "MVC/Layered", "language": "Java"}),
+    ("src/main/java/Orders.java", "@RestController\npublic class Orders {}",
+     {"architecture_hint": "MVC/Layered", "language": "Java"}),
+    ("src/main/java/OrderRepository.java", "public interface OrderRepository {}",
+     {"data_layer": "Repository Pattern", "language": "Java"}),
+    ("src/main/java/OrderStore.java", "@Repository\nclass OrderStore {}",
+     {"data_layer": "Repository Pattern", "language": "Java"}),
+    ("src/main/java/OrderService.java", "public class OrderService {}",
+     {"service_layer": "Service Layer", "language": "Java"}),
+    ("src/main/java/Orders2.java", "@Service\nclass Orders2 {}", {"service_layer": "Service Layer", "language": "Java"}),
+    ("app/main.py", "print('hi')", {"language": "Python"}),
+    ("web/App.tsx", "export default function App() {}", {"language": "TypeScript"}),
+    ("web/index.jsx", "render(<App />)", {"language": "JavaScript"}),
+    ("cmd/main.go", "package main", {"language": "Go"}),
+    ("src/lib.rs", "fn main() {}", {"language": "Rust"}),
+    ("README.md", "@Service @Repository @RestController",
+     {"architecture_hint": "MVC/Layered", "data_layer": "Repository Pattern", "service_layer": "Service Layer"}),
+    ("docs/notes.txt", "plain text", {}),
+]
+
+
+def check_corpus(scanner: PatternScanner) -> None:
+    """기대값/기존 구현과 비교하고, 기본 팩의 모든 규칙이 한 번 이상 이기는지 확인"""
+    won = set()
+    for path, content, expected in CORPUS:
+        got = scanner.scan(path, content)
+        assert got == expected, f"{path}: {got} != {expected}"
+        legacy = legacy_detect_code_patterns(path, content)
+        assert got == legacy, f"{path}: differs from legacy {legacy}"
+        won.update(id(rule) for rule in scanner.match_rules(path, content))
+
+    unused = [f"{r['key']}={r['value']}" for r in scanner.rules if id(r) not in won]
+    assert not unused, f"rules without corpus case: {unused}"
+    report_check("corpus", f"{len(CORPUS)} cases, {len(scanner.rules)} rules")
+
+
+def check_user_pack() -> None:
+    """사용자 팩 규칙이 같은 key의 기본 규칙보다 우선"""
+    user_pack = {"name": "team", "rules": [
+        {"key": "framework", "value": "Quarkus", "files": ["pom.xml"], "tokens": ["io.quarkus"]},
+        {"key": "testing", "value": "Kotest", "files": ["*Test*", "*Spec*"], "tokens": ["io.kotest"]},
+        {"key": "broken"},
+    ]}
+    scanner = PatternScanner([user_pack, DEFAULT_PATTERN_PACK])
+    got = scanner.scan("pom.xml", "<groupId>io.quarkus</groupId> spring")
+    assert got == {"framework": "Quarkus", "build_tool": "Maven"}, got
+    got = scanner.scan("OrderSpec.kt", "import io.kotest.core.spec.style.StringSpec")
+    assert got == {"testing": "Kotest"}, got
+    assert scanner.scan("pom.xml", "spring") == {"framework": "Spring", "build_tool": "Maven"}
+    report_check("user pack")
+
+
+def make_source(kind: str, size: int) -> str:
+    """size 바이트 근처의 소스 파일. 신호 토큰은 끝부분에 둠 (최악의 경우)"""
+    filler = {
+        "java": "    private final OrderMapper mapper = new OrderMapper(); // padding line for scan\n",
+        "ts": "  const total = items.reduce((sum, item) => sum + item.price * item.qty, 0);\n",
+    }[kind]
+    tail = {
+        "java": "import org.junit.jupiter.api.Test;\nimport org.mockito.Mock;\n@Test void place() {}\n",
+        "ts": "import { describe, it } from 'vitest';\ndescribe('cart', () => { it('sums', () => {}) });\n",
+    }[kind]
+    return filler * (size // len(filler)) + tail
+
+
+def bench(label: str, fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call_ms = (time.perf_counter() - start) / iterations * 1000
+    print(f"{label:<48} {per_call_ms:8.2f} ms")
+    return per_call_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=4.0, help="벤치마크 파일 크기 (MB)")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    scanner = PatternScanner([DEFAULT_PATTERN_PACK])
+    check_corpus(scanner)
+    check_user_pack()
+    print()
+
+    size = int(args.mb * 1024 * 1024)
+    cases = [
+        ("OrderServiceTest.java", make_source("java", size)),
+        ("cart.spec.ts", make_source("ts", size)),
+        ("OrderMapper.java", make_source("java", size)),
+    ]
+    for path, content in cases:
+        assert scanner.scan(path, content) == legacy_detect_code_patterns(path, content)
+        print(f"{path} ({len(content) / 1024 / 1024:.1f} MB)")
+        base = bench("  before: if/elif chain", lambda: legacy_detect_code_patterns(path, content), args.iterations)
+        after = bench("  after: rule pack scanner", lambda: scanner.scan(path, content), args.iterations)
+        print(f"  speedup: {base / after:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
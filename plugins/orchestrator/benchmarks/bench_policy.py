@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+PreToolUse 정책 엔진 마이크로 벤치마크
+
+기본 규칙에 합성 규칙 수백 개를 더해 결합 정규식을 만들고,
+대표적인 도구 호출에 대한 evaluate() 1회 비용을 측정하고, 기본 규칙이 옵션 표기와
+경로 표기를 바꾼 호출(`rm --recursive --force`, `./.env`, Bash의 `cat .env`)도 잡는지 확인한다.
+
+사용법:
+    python3 benchmarks/bench_policy.py [--rules 500] [--iterations 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks.common import get_default_orchestrator_config
+from hooks.policy import PolicyEngine, build_policy_table, collect_policy_rules
+
+from harness import report_check
+
+
+SAMPLE_CALLS = [
+    ("Bash", {"command": "ls -la src/"}),
+    ("Bash", {"command": "./gradlew test --tests 'com.example.auth.*' && git status"}),
+    ("Bash", {"command": "rm -rf build/"}),
+    ("Bash", {"command": "rm --recursive --force build/"}),
+    ("Bash", {"command": "cat .env | grep API_KEY"}),
+    ("Bash", {"command": "git push origin feature/login --force"}),
+    ("Read", {"file_path": "src/main/java/com/example/auth/AuthService.java"}),
+    ("Read", {"file_path": ".env"}),
+    ("Read", {"file_path": "./src/../.env"}),
+    ("Write", {"file_path": "src/main/java/com/example/auth/JwtTokenProvider.java"}),
+    ("Edit", {"file_path": "infra/prod/terraform.tfvars"}),
+]
+
+
+# (도구, 입력, 기대 결과 "조치:규칙 ID" 또는 "allow")
+CHECK_CALLS = [
+    ("Bash", {"command": "rm -rf build"}, "deny:rm-rf"),
+    ("Bash", {"command": "rm --recursive --force build"}, "deny:rm-rf"),
+    ("Bash", {"command": "rm -r --force build"}, "deny:rm-rf"),
+    ("Bash", {"command": "rm -R -v -f build"}, "deny:rm-rf"),
+    ("Bash", {"command": "rm -r build"}, "allow"),
+    ("Bash", {"command": "git push origin main --force"}, "deny:git-push-force"),
+    ("Bash", {"command": "git push -u origin main -f"}, "deny:git-push-force"),
+    ("Bash", {"command": "git push --force-with-lease origin main"}, "allow"),
+    ("Bash", {"command": "cat .env"}, "deny:env-file"),
+    ("Bash", {"command": "cat ./.env"}, "deny:env-file"),
+    ("Bash", {"command": "echo TOKEN=1 >> .env"}, "deny:env-file"),
+    ("Bash", {"command": "cp .env.example .env.local"}, "deny:env-file"),
+    ("Bash", {"command": "cat .env.example"}, "allow"),
+    ("Bash", {"command": 'git commit -m "document .env and credentials setup"'}, "allow"),
+    ("Read", {"file_path": ".env"}, "deny:env-file"),
+    ("Read", {"file_path": "./.env"}, "deny:env-file"),
+    ("Read", {"file_path": "config/../.env"}, "deny:env-file"),
+    ("Read", {"file_path": "./.env.example"}, "allow"),
+    ("Write", {"file_path": "./infra/prod/main.tf"}, "deny:protected-dir-1"),
+    ("Write", {"file_path": "infra/staging/../prod/main.tf"}, "deny:protected-dir-1"),
+    ("Write", {"file_path": "infra/production.tf"}, "allow"),
+]
+
+
+def check_rules() -> None:
+    """옵션/경로 표기를 바꿔도 기본 규칙과 보호 디렉토리가 같은 결과"""
+    config = get_default_orchestrator_config()
+    config["policy"]["protected_dirs"] = ["infra/prod"]
+    engine = PolicyEngine(build_policy_table(collect_policy_rules(config)))
+    for tool_name, tool_input, expected in CHECK_CALLS:
+        verdict = engine.evaluate(tool_name, tool_input)
+        result = f"{verdict['action']}:{verdict['rule_id']}" if verdict else "allow"
+        assert result == expected, f"{tool_name} {tool_input}: {result} != {expected}"
+    report_check("policy normalization")
+
+
+def synthetic_rules(count: int) -> list:
+    """도구 종류를 번갈아 가며 합성 규칙 생성 (대부분 매치되지 않는 패턴)"""
+    kinds = ["bash", "write", "read"]
+    rules = []
+    for i in range(count):
+        kind = kinds[i % len(kinds)]
+        if kind == "bash":
+            pattern = rf"\bforbidden-tool-{i}\b"
+        else:
+            pattern = rf"(?:^|/)generated/secret-{i}\.(?:json|ya?ml)$"
+        rules.append({
+            "id": f"synthetic-{i}",
+            "tools": [kind],
+            "action": "deny" if i % 4 else "ask",
+            "pattern": pattern,
+            "message": f"synthetic rule {i}",
+        })
+    return rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    config = get_default_orchestrator_config()
+    config["policy"]["rules"] = config["policy"]["rules"] + synthetic_rules(args.rules)
+    config["policy"]["protected_dirs"] = ["infra/prod", ".github/workflows"]
+
+    start = time.perf_counter()
+    rules = collect_policy_rules(config)
+    table = build_policy_table(rules)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    engine = PolicyEngine(table)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    print(f"rules loaded:        {len(rules)}")
+    print(f"table build:         {build_ms:8.2f} ms (캐시 미스 시에만)")
+    print(f"regex compile:       {compile_ms:8.2f} ms (프로세스당 1회)")
+    print()
+
+    for tool_name, tool_input in SAMPLE_CALLS:
+        verdict = engine.evaluate(tool_name, tool_input)
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            engine.evaluate(tool_name, tool_input)
+        per_call_us = (time.perf_counter() - start) / args.iterations * 1e6
+        subject = next(iter(tool_input.values()))
+        result = f"{verdict['action']}:{verdict['rule_id']}" if verdict else "allow"
+        print(f"{per_call_us:8.2f} us/call  {tool_name:<6} {result:<28} {subject[:50]}")
+
+    print()
+    check_rules()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+PostToolUse(Read) 패턴 분석 벤치마크 (분석 캐시 전/후)
+
+같은 파일들을 반복해서 Read할 때
+1. 기존 방식: 매번 디스크에서 다시 읽고 detect_code_patterns로 전체 스캔
+2. 캐시 적중: (mtime, size)가 같으면 읽기/스캔 생략
+3. tool_response 사용: 바뀐 파일도 디스크 대신 훅 입력의 내용을 사용
+를 비교하고, 파일 수정/touch/부분 Read 시 동작을 확인한다.
+
+사용법:
+    python3 benchmarks/bench_read.py [--files 200] [--kb 40] [--rounds 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks.analysis_cache import AnalysisCache, analyze_read
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+PROJECT_HASH = "benchrd8"
+
+
+def make_project(root: Path, files: int, kb: int) -> list:
+    """Spring 프로젝트 흉내: Controller/Service/Repository/Test 파일"""
+    body = "    // " + "x" * 70 + "\n"
+    kinds = ["Controller", "Service", "Repository", "ServiceTest"]
+    paths = []
+    for i in range(files):
+        kind = kinds[i % len(kinds)]
+        path = root / "src" / f"Order{i}{kind}.java"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        header = f"@{kind.replace('Test', '')}\npublic class Order{i}{kind} {{\n"
+        if kind.endswith("Test"):
+            header = "import org.junit.jupiter.api.Test;\nimport org.mockito.Mock;\n" + header
+        path.write_text(header + body * (kb * 1024 // len(body)) + "}\n", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def read_response(path: str) -> dict:
+    """Claude Code Read 도구의 tool_response 형태"""
+    content = Path(path).read_text(encoding="utf-8")
+    lines = content.count("\n")
+    return {"type": "text", "file": {"filePath": path, "content": content,
+                                      "numLines": lines, "startLine": 1, "totalLines": lines}}
+
+
+def bench(label: str, fn, rounds: int, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    per_read_us = (time.perf_counter() - start) / (rounds * count) * 1_000_000
+    print(f"{label:<44} {per_read_us:8.1f} us/read")
+    return per_read_us
+
+
+def check_behaviour(path: str) -> None:
+    """수정된 파일은 다시 분석, touch만 된 파일은 해시로 생략, 부분 Read는 디스크 사용"""
+    cache = AnalysisCache(PROJECT_HASH)
+    analyze_read(path, None, cache)
+    assert analyze_read(path, None, cache) is None, "unchanged file re-analyzed"
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert analyze_read(path, None, cache) is None, "touched file re-scanned"
+
+    Path(path).write_text("@RestController\nclass A {}\n", encoding="utf-8")
+    patterns = analyze_read(path, None, cache)
+    assert patterns and patterns.get("architecture_hint") == "MVC/Layered", "modified file not re-analyzed"
+
+    Path(path).write_text("@Repository\nclass B {}\n", encoding="utf-8")
+    partial = {"file": {"content": "class B {}", "startLine": 2, "numLines": 1, "totalLines": 2}}
+    patterns = analyze_read(path, partial, cache)
+    assert patterns and patterns.get("data_layer") == "Repository Pattern", "partial read used as full content"
+    report_check("behaviour")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--kb", type=int, default=40, help="파일당 크기 (KB)")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-read-") as workdir:
+        paths = make_project(workdir, args.files, args.kb)
+        responses = {path: read_response(path) for path in paths}
+        common.save_knowledge(PROJECT_HASH, common.create_initial_knowledge(PROJECT_HASH))
+        print(f"{args.files} files x {args.kb} KB, {args.rounds} rounds")
+
+        def before():
+            for path in paths:
+                common.detect_code_patterns(path, Path(path).read_text(encoding="utf-8"))
+
+        def cold_tool_response():
+            cache = AnalysisCache(PROJECT_HASH)
+            cache._entries = {}
+            for path in paths:
+                analyze_read(path, responses[path], cache)
+
+        def warm():
+            reset_memos()
+            cache = AnalysisCache(PROJECT_HASH)
+            for path in paths:
+                analyze_read(path, responses[path], cache)
+            cache.save()
+
+        base = bench("before: read + scan every time", before, args.rounds, len(paths))
+        cold = bench("cache miss, content from tool_response", cold_tool_response, args.rounds, len(paths))
+        warm()
+        hit = bench("cache hit (stat only)", warm, args.rounds, len(paths))
+        print(f"speedup on miss: {base / cold:6.1f}x")
+        print(f"speedup on hit: {base / hit:6.1f}x")
+        print()
+        check_behaviour(paths[0])
+
+
+if __name__ == "__main__":
+    main()
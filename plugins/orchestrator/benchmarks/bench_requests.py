@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+요청 인덱스 벤치마크
+
+한 프로젝트에 요청(기능)이 여러 개 진행 중일 때 현재 요청의 Subtask phase 하나를 바꾸는 비용을
+1. single document: 모든 요청을 state.json 하나에 담고 통째로 읽고 다시 씀
+2. request index: index.json으로 현재 요청을 찾고 그 요청의 state만 읽고 씀 (json/sqlite 백엔드)
+로 요청 수를 늘려 가며 비교하고, 다음을 확인한다.
+- 진행 중인 요청이 있을 때 새 키워드 요청은 덮어쓰지 않고 새 요청(R2)을 만들어 현재 요청으로 전환하는지
+- Contract는 요청별 디렉토리에 쌓이고 레지스트리도 요청별인지
+- '/orchestrator resume R1'로 전환하고, 새 세션 키워드는 현재 요청만 취소하는지
+- sessions/{hash}/state.json 하나만 있던 프로젝트(json/sqlite)가 인덱스로 옮겨지고,
+  그 경로가 현재 요청 state.json을 가리키는 링크로 남는지
+
+사용법:
+    python3 benchmarks/bench_requests.py [--requests 1,10,50,200] [--tasks 20] [--subtasks 6] [--iterations 200]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import contracts
+from hooks import post_tool_use
+from hooks import request_index
+from hooks import state_store
+from hooks import user_prompt_submit
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+PHASES = ("test_first", "implementation", "verification")
+
+
+def make_state(project_hash: str, request_id: str, tasks: int, subtasks: int) -> dict:
+    state = common.create_initial_state(project_hash, f"기능 {request_id} 구현해줘", request_id)
+    state["request"].update({"global_phase": "task_loop", "current_task": "T1"})
+    for t in range(1, tasks + 1):
+        task_id = f"T{t}"
+        state["task_order"].append(task_id)
+        state["tasks"][task_id] = {
+            "name": f"작업 {t}", "status": "in_progress" if t == 1 else "pending",
+            "current_subtask": f"{task_id}-S1",
+            "subtask_order": [f"{task_id}-S{s}" for s in range(1, subtasks + 1)],
+            "subtasks": {
+                f"{task_id}-S{s}": {"name": f"서브태스크 {s}", "status": "pending", "phase": "test_first"}
+                for s in range(1, subtasks + 1)
+            },
+        }
+    return state
+
+
+def bench_single_document(workdir: Path, states: list, iterations: int) -> float:
+    """모든 요청을 담은 문서 하나: 읽고, 현재 요청의 phase를 바꾸고, 다시 씀"""
+    path = workdir / "single" / "state.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {"current": states[-1]["request"]["id"], "requests": {s["request"]["id"]: s for s in states}}
+    state_store.write_state_json(path, document)
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        document = json.loads(path.read_text(encoding="utf-8"))
+        state = document["requests"][document["current"]]
+        state["tasks"]["T1"]["subtasks"]["T1-S1"]["phase"] = PHASES[i % 3]
+        state_store.write_state_json(path, document)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def bench_index(workdir: Path, backend: str, count: int, states: list, iterations: int) -> float:
+    """요청 인덱스: 현재 요청의 state만 (콜드 훅처럼 메모를 비우고)"""
+    os.environ["ORCHESTRATOR_STATE_BACKEND"] = backend
+    project_dir = workdir / f"index-{backend}-{count}"
+    project_dir.mkdir()
+    os.chdir(project_dir)
+    project_hash = common.get_project_hash()
+    for state in states:
+        common.save_state(project_hash, state)
+
+    start = time.perf_counter()
+    for i in range(iterations):
+        reset_memos()
+        common.update_state_phase(project_hash, PHASES[i % 3], "subtask")
+        common.load_state(project_hash)
+    elapsed = (time.perf_counter() - start) / iterations * 1000
+    assert request_index.current_request_id(project_hash) == states[-1]["request"]["id"]
+    return elapsed
+
+
+def prompt(text: str) -> str:
+    """UserPromptSubmit 한 번 → 주입된 메시지"""
+    reset_memos()
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+        sys.stdin = io.StringIO(json.dumps({"prompt": text}))
+        try:
+            user_prompt_submit.main()
+        finally:
+            sys.stdin = sys.__stdin__
+    output = stdout.getvalue().strip()
+    return json.loads(output)["hookSpecificOutput"]["additionalContext"] if output else ""
+
+
+def add_tasks(project_hash: str) -> None:
+    """Planner가 Task를 나눈 것처럼 현재 요청에 미완료 Subtask 추가"""
+    state = common.load_state(project_hash)
+    planned = make_state(project_hash, state["request"]["id"], 2, 2)
+    state["request"].update({"global_phase": "task_loop", "current_task": "T1"})
+    state["task_order"], state["tasks"] = planned["task_order"], planned["tasks"]
+    common.save_state(project_hash, state)
+
+
+def check_backend(workdir: Path, backend: str) -> None:
+    """병렬 요청, Contract 분리, 전환/취소"""
+    os.environ["ORCHESTRATOR_STATE_BACKEND"] = backend
+    project_dir = workdir / f"project-{backend}"
+    project_dir.mkdir()
+    os.chdir(project_dir)
+    project_hash = common.get_project_hash()
+
+    # 1. R1 진행 중에 새 요청 → R2, R1은 그대로
+    prompt("결제 모듈 구현해줘")
+    add_tasks(project_hash)
+    message = prompt("알림 기능 추가해줘")
+    index = request_index.load_index(project_hash)
+    assert index["current"] == "R2" and request_index.active_requests(index) == ["R1", "R2"], index
+    assert "R1: 결제 모듈 구현해줘" in message, message
+    assert common.get_state_store(project_hash, "R1").load()["tasks"], "R1 overwritten"
+    add_tasks(project_hash)
+
+    # 2. Contract는 요청별 디렉토리, 레지스트리도 요청별
+    path = contracts.get_contracts_path(project_hash) / "R2" / "T1" / "design-contract.yaml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("invariants: []\n", encoding="utf-8")
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        sys.stdin = io.StringIO(json.dumps({"tool_name": "Write", "tool_input": {"file_path": str(path)}}))
+        try:
+            post_tool_use.main()
+        finally:
+            sys.stdin = sys.__stdin__
+    reset_memos()
+    assert list(common.load_state(project_hash)["contracts"]) == ["R2/T1/design-contract.yaml"]
+    assert common.get_state_store(project_hash, "R1").load()["contracts"] == {}
+
+    # 3. 요청 ID로 전환, 새 세션 키워드는 현재 요청만 취소
+    message = prompt("/orchestrator resume R1")
+    assert request_index.current_request_id(project_hash) == "R1"
+    assert "| Request | R1 |" in message and "R2: 알림 기능 추가해줘" in message, message
+    prompt("새 세션")
+    index = request_index.load_index(project_hash)
+    assert index["requests"]["R1"]["status"] == "cancelled", index
+    assert request_index.active_requests(index) == ["R2"], index
+    report_check(f"{backend} backend")
+
+
+def check_migration(workdir: Path) -> None:
+    """요청 인덱스 이전의 sessions/{hash}/state.json (json), state.db (sqlite)"""
+    for backend in ("json", "sqlite"):
+        os.environ["ORCHESTRATOR_STATE_BACKEND"] = backend
+        project_dir = workdir / f"legacy-{backend}"
+        project_dir.mkdir()
+        os.chdir(project_dir)
+        project_hash = common.get_project_hash()
+        sessions_path = common.get_sessions_path(project_hash)
+        sessions_path.mkdir(parents=True)
+        state = make_state(project_hash, "R1", 2, 2)
+
+        if backend == "json":
+            state_store.write_state_json(sessions_path / "state.json", state)
+        else:
+            # 이전 sqlite 저장소: 요청 행 + meta.current_request, state.json 없음
+            conn = sqlite3.connect(str(sessions_path / "state.db"))
+            conn.executescript(state_store.SQLITE_SCHEMA)
+            document = {k: v for k, v in state.items() if k != "tasks"}
+            conn.execute("INSERT INTO requests VALUES (?, ?)", ("R1", json.dumps(document, ensure_ascii=False)))
+            for position, (task_id, task) in enumerate(state["tasks"].items()):
+                task = dict(task)
+                for sub_position, (subtask_id, subtask) in enumerate(task.pop("subtasks").items()):
+                    conn.execute("INSERT INTO subtasks VALUES (?, ?, ?, ?, ?)",
+                                 ("R1", task_id, subtask_id, sub_position, json.dumps(subtask, ensure_ascii=False)))
+                conn.execute("INSERT INTO tasks VALUES (?, ?, ?, ?)",
+                             ("R1", task_id, position, json.dumps(task, ensure_ascii=False)))
+            conn.execute("INSERT INTO meta VALUES ('current_request', 'R1')")
+            conn.commit()
+            conn.close()
+
+        reset_memos()
+        assert common.load_state(project_hash) == state, f"{backend}: legacy state not loaded"
+        assert request_index.load_index(project_hash)["current"] == "R1"
+        link = sessions_path / "state.json"
+        assert link.is_symlink() and os.readlink(link) == os.path.join("requests", "R1", "state.json"), backend
+        if backend == "json":
+            assert json.loads(link.read_text(encoding="utf-8")) == state, "link does not show current state"
+        next_state = common.create_initial_state(project_hash, "다음 요청")
+        assert next_state["request"]["id"] == "R2"
+        assert common.save_state(project_hash, next_state)
+        assert os.readlink(link) == os.path.join("requests", "R2", "state.json"), "link not moved to R2"
+
+        # 인덱스를 다시 만들어도 링크를 이전 state로 보고 옮기지 않음
+        if backend == "json":
+            request_index.get_index_path(project_hash).unlink()
+            reset_memos()
+            request_index.load_index(project_hash)
+            assert not (sessions_path / "requests" / "R2" / "state.json").is_symlink(), "state replaced by link"
+    report_check("migration")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", default="1,10,50,200")
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--subtasks", type=int, default=6)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-requests-") as workdir:
+        print(f"each request: {args.tasks} tasks x {args.subtasks} subtasks, phase update + load per iteration")
+        print(f"{'requests':>8} {'single document':>16} {'index (json)':>14} {'index (sqlite)':>15}")
+        for count in (int(n) for n in args.requests.split(",")):
+            states = [make_state("bench", f"R{r}", args.tasks, args.subtasks) for r in range(1, count + 1)]
+            single = bench_single_document(workdir / f"single-{count}", states, max(args.iterations // count, 5))
+            index_json = bench_index(workdir, "json", count, states, args.iterations)
+            index_sqlite = bench_index(workdir, "sqlite", count, states, args.iterations)
+            print(f"{count:>8} {single:>13.2f} ms {index_json:>11.2f} ms {index_sqlite:>12.2f} ms")
+        print()
+
+        for backend in ("json", "sqlite"):
+            check_backend(workdir, backend)
+        check_migration(workdir)
+
+
+if __name__ == "__main__":
+    main()
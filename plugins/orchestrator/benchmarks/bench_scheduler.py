@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Subtask 의존성 스케줄러 벤치마크
+
+Subtask 200개짜리 계획(Task마다 서로 독립인 Subtask 여럿, Task 사이는 일부만 의존)을
+1. serial: 이전처럼 task_order/subtask_order 순서로 한 번에 하나씩
+2. dag: depends_on으로 시작할 수 있는 Subtask를 --workers개까지 동시에
+로 진행했을 때 걸리는 단계 수(Subtask 하나 = 1단계, 모의 소요 시간 가중)를 비교하고,
+ready 집합 계산 비용과 다음을 확인한다.
+- depends_on이 없는 계획은 이전처럼 순서대로 하나씩 (기본 의존성)
+- depends_on의 없는 ID와 순환 의존성 감지 (긴 사슬 포함)
+- PostToolUse가 task-breakdown.yaml의 Task/Subtask와 depends_on을 state에 반영 (json/sqlite),
+  의존성이 잘못된 계획은 반영하지 않고 알림
+- 병렬로 진행 중인 Subtask가 Contract 경로로 각자의 phase로 진행
+  (구현 중인 Subtask가 여럿이면 Subtask 경로의 test-result.yaml로 verification)
+- 재개 메시지에 병렬 진행 가능한 Subtask 안내
+
+사용법:
+    python3 benchmarks/bench_scheduler.py [--tasks 20] [--subtasks 10] [--workers 4] [--iterations 200]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import contracts
+from hooks import post_tool_use
+from hooks import scheduler
+from hooks import subagent_stop
+from hooks import user_prompt_submit
+from hooks.state_store import StateSession
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+BREAKDOWN = """task_breakdown:
+  request_id: "R1"
+  tasks:
+    - id: "T1"
+      name: "저장소 계층"
+      subtasks:
+        - id: "T1-S1"
+          name: "주문 저장소"
+          depends_on: []
+        - id: "T1-S2"
+          name: "결제 저장소"
+          depends_on: []
+        - id: "T1-S3"
+          name: "저장소 통합"
+          depends_on: ["T1-S1", "T1-S2"]
+    - id: "T2"
+      name: "API"
+      subtasks:
+        - id: "T2-S1"
+          name: "주문 API"
+  task_order: ["T1", "T2"]
+"""
+
+# 오타(T1-S9)와 순환(T2-S1 ↔ T2-S2)이 있는 계획
+INVALID_BREAKDOWN = """task_breakdown:
+  tasks:
+    - id: "T1"
+      subtasks:
+        - id: "T1-S1"
+          depends_on: ["T1-S9"]
+    - id: "T2"
+      subtasks:
+        - id: "T2-S1"
+          depends_on: ["T2-S2"]
+        - id: "T2-S2"
+          depends_on: ["T2-S1"]
+"""
+
+
+def make_plan(tasks: int, subtasks: int, seed: int = 7) -> dict:
+    """Task 안의 Subtask는 서로 독립, Task는 앞 Task 중 하나의 Subtask 일부에 의존"""
+    rng = random.Random(seed)
+    state = {"request": {}, "task_order": [], "tasks": {}}
+    for t in range(1, tasks + 1):
+        task_id = f"T{t}"
+        subtask_ids = [f"{task_id}-S{s}" for s in range(1, subtasks + 1)]
+        task = {
+            "name": task_id, "status": "pending", "subtask_order": subtask_ids,
+            "subtasks": {subtask_id: {"status": "pending", "phase": "", "depends_on": []} for subtask_id in subtask_ids},
+            "duration": {subtask_id: rng.randint(1, 4) for subtask_id in subtask_ids},
+        }
+        if t > 1:
+            previous = f"T{rng.randint(max(1, t - 3), t - 1)}"
+            task["depends_on"] = [f"{previous}-S{s}" for s in rng.sample(range(1, subtasks + 1), 2)]
+        state["task_order"].append(task_id)
+        state["tasks"][task_id] = task
+    return state
+
+
+def simulate(state: dict, workers: int) -> int:
+    """시작할 수 있는 Subtask를 workers개까지 동시에 진행 → 모두 끝날 때까지의 단계 수"""
+    durations = {s: d for task in state["tasks"].values() for s, d in task["duration"].items()}
+    owner = {s: t for t, s, _ in scheduler.iter_subtasks(state)}
+    graph = scheduler.dependency_graph(state)
+    running = {}
+    clock = 0
+    while True:
+        for subtask_id in scheduler.ready_subtasks(state, graph)[:workers - len(running)]:
+            state["tasks"][owner[subtask_id]]["subtasks"][subtask_id]["status"] = "in_progress"
+            running[subtask_id] = clock + durations[subtask_id]
+        if not running:
+            return clock
+        clock = min(running.values())
+        for subtask_id in [s for s, end in running.items() if end == clock]:
+            state["tasks"][owner[subtask_id]]["subtasks"][subtask_id]["status"] = "completed"
+            del running[subtask_id]
+
+
+def bench_ready(state: dict, iterations: int) -> float:
+    """의존성 그래프 + ready 집합 계산 (전환 한 번마다 하는 일)"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        scheduler.ready_subtasks(state)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run_hook(module, payload: dict) -> str:
+    """훅 main을 프로세스 안에서 실행하고 출력 반환"""
+    reset_memos()
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+        sys.stdin = io.StringIO(json.dumps(payload))
+        try:
+            module.main()
+        finally:
+            sys.stdin = sys.__stdin__
+    return stdout.getvalue()
+
+
+def write_contract(project_hash: str, key: str, text: str) -> str:
+    """Contract 파일을 쓰고 PostToolUse(Write) 실행 → 훅 출력"""
+    path = contracts.get_contracts_path(project_hash) / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return run_hook(post_tool_use, {"tool_name": "Write", "tool_input": {"file_path": str(path)}})
+
+
+def phases(project_hash: str) -> dict:
+    reset_memos()
+    state = common.load_state(project_hash)
+    return {subtask_id: (subtask.get("status"), subtask.get("phase")) for _, subtask_id, subtask in scheduler.iter_subtasks(state)}
+
+
+def check_default_serial() -> None:
+    """depends_on이 없으면 앞 Subtask, Task의 첫 Subtask는 앞 Task 전체"""
+    state = make_plan(3, 2)
+    for task in state["tasks"].values():
+        task.pop("depends_on", None)
+        for subtask in task["subtasks"].values():
+            subtask.pop("depends_on")
+    graph = scheduler.dependency_graph(state)
+    assert graph == {
+        "T1-S1": [], "T1-S2": ["T1-S1"], "T2-S1": ["T1-S1", "T1-S2"],
+        "T2-S2": ["T2-S1"], "T3-S1": ["T2-S1", "T2-S2"], "T3-S2": ["T3-S1"],
+    }, graph
+    assert scheduler.ready_subtasks(state, graph) == ["T1-S1"]
+    assert simulate(state, 4) == sum(sum(task["duration"].values()) for task in state["tasks"].values())
+    report_check("default serial order")
+
+
+def check_invalid_dependencies() -> None:
+    """없는 ID/순환은 문제로 보고, 기본 의존성만 있는 긴 사슬은 문제 없음"""
+    state = make_plan(3, 2)
+    state["tasks"]["T2"]["subtasks"]["T2-S1"]["depends_on"] = ["T2-S9"]
+    state["tasks"]["T1"]["subtasks"]["T1-S1"]["depends_on"] = ["T3-S2"]
+    state["tasks"]["T3"]["depends_on"] = ["T1"]
+    problems = scheduler.dependency_problems(state)
+    assert problems[0] == "T2-S1의 depends_on에 없는 ID: T2-S9", problems
+    assert len(problems) == 2 and problems[1].startswith("순환 의존성: "), problems
+
+    chain = make_plan(1, 20000)
+    for subtask in chain["tasks"]["T1"]["subtasks"].values():
+        subtask.pop("depends_on")
+    assert scheduler.dependency_problems(chain) == []
+    chain["tasks"]["T1"]["subtasks"]["T1-S1"]["depends_on"] = ["T1-S20000"]
+    assert len(scheduler.dependency_problems(chain)) == 1
+    report_check("invalid dependency")
+
+
+def check_backend(workdir: Path, backend: str) -> None:
+    """breakdown 반영 → 병렬 Subtask가 Contract 경로로 각자 진행 → 재개 안내"""
+    os.environ["ORCHESTRATOR_STATE_BACKEND"] = backend
+    project_dir = workdir / f"project-{backend}"
+    project_dir.mkdir()
+    os.chdir(project_dir)
+    project_hash = common.get_project_hash()
+    common.save_state(project_hash, common.create_initial_state(project_hash, "주문/결제 저장소와 API"))
+
+    # 1. 의존성이 잘못된 계획은 반영하지 않음 → 고친 task-breakdown.yaml의 Task/Subtask와 depends_on, ready 집합
+    output = write_contract(project_hash, "R1/task-breakdown.yaml", INVALID_BREAKDOWN)
+    assert "T1-S1의 depends_on에 없는 ID: T1-S9" in output and "순환 의존성" in output, output
+    reset_memos()
+    assert not common.load_state(project_hash).get("tasks")
+    write_contract(project_hash, "R1/task-breakdown.yaml", BREAKDOWN)
+    reset_memos()
+    state = common.load_state(project_hash)
+    assert state["task_order"] == ["T1", "T2"], state["task_order"]
+    assert state["tasks"]["T1"]["subtasks"]["T1-S3"]["depends_on"] == ["T1-S1", "T1-S2"]
+    assert state["request"]["ready"] == ["T1-S1", "T1-S2"], state["request"]
+    with StateSession(project_hash) as session:
+        session.set(("request", "global_phase"), "task_loop")
+
+    # 2. Task 설계 → 시작할 수 있는 Subtask 둘 다 test_first, 병렬 안내
+    output = write_contract(project_hash, "R1/T1/design-contract.yaml", "invariants: []\n")
+    assert "병렬 진행 가능 (2개)" in output, output
+    assert phases(project_hash)["T1-S1"] == ("in_progress", "test_first")
+    assert phases(project_hash)["T1-S2"] == ("in_progress", "test_first")
+
+    # 3. T1-S2만 테스트 작성 → T1-S2만 implementation
+    output = write_contract(project_hash, "R1/T1/T1-S2/test-contract.yaml", "tests: []\n")
+    assert "GATE-1 passed" in output, output
+    current = phases(project_hash)
+    assert current["T1-S1"] == ("in_progress", "test_first") and current["T1-S2"] == ("in_progress", "implementation")
+
+    # 4. 구현 중인 Subtask가 하나뿐이면 Implementer 종료로 verification, 결과 pass로 완료
+    output = run_hook(subagent_stop, {"agent_type": "implementer"})
+    assert "T1-S2 [verification] (implementation → verification)" in output, output
+    write_contract(project_hash, "R1/T1/T1-S2/test-result.yaml", "execution: {result: pass}\n")
+    current = phases(project_hash)
+    assert current["T1-S2"] == ("completed", "complete") and current["T1-S1"] == ("in_progress", "test_first")
+    assert current["T1-S3"] == ("pending", ""), "T1-S3 waits for T1-S1"
+
+    # 5. 재개 메시지: 진행 중인 T1-S1과 시작할 수 있는 T2-S1(T1 전체에 의존하므로 아직 아님)
+    output = run_hook(user_prompt_submit, {"prompt": "/orchestrator resume"})
+    assert "T1-S1" in output and "병렬 진행 가능" not in output, output
+    with StateSession(project_hash) as session:
+        session.set(("tasks", "T1", "subtasks", "T1-S3", "depends_on"), [])
+        scheduler.refresh_schedule(session)
+    output = run_hook(user_prompt_submit, {"prompt": "/orchestrator resume"})
+    assert "병렬 진행 가능 (2개)" in output and "- T1-S3" in output, output
+
+    # 6. 구현 중인 Subtask가 여럿이면 Implementer 종료로는 진행하지 않고, Subtask 경로의 결과로 진행
+    write_contract(project_hash, "R1/T1/T1-S1/test-contract.yaml", "tests: []\n")
+    write_contract(project_hash, "R1/T1/T1-S3/test-contract.yaml", "tests: []\n")
+    run_hook(subagent_stop, {"agent_type": "implementer"})
+    current = phases(project_hash)
+    assert current["T1-S1"] == current["T1-S3"] == ("in_progress", "implementation"), current
+    write_contract(project_hash, "R1/T1/T1-S3/test-result.yaml", "execution: {result: pass}\n")
+    current = phases(project_hash)
+    assert current["T1-S3"] == ("completed", "complete") and current["T1-S1"] == ("in_progress", "implementation"), current
+    report_check(f"{backend} backend")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--subtasks", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4, help="동시에 부를 에이전트 수")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-scheduler-") as workdir:
+
+        plan = make_plan(args.tasks, args.subtasks)
+        total = args.tasks * args.subtasks
+        serial = sum(sum(task["duration"].values()) for task in plan["tasks"].values())
+        per_ready = bench_ready(plan, args.iterations)
+        dag = simulate(plan, args.workers)
+        print(f"{total} subtasks, {args.workers} workers")
+        print(f"before: serial              {serial:6d} steps")
+        print(f"after: depends_on DAG       {dag:6d} steps   ({serial / dag:.1f}x, ready set {per_ready:.0f} us)")
+        print()
+
+        check_default_serial()
+        check_invalid_dependencies()
+        for backend in ("json", "sqlite"):
+            check_backend(workdir, backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+knowledge.yaml 직렬화 벤치마크
+
+pitfall/decision 항목 수(기본 100, 1000, 10000)별로 knowledge.yaml 한 번을 읽고 쓰는 비용을 비교한다.
+
+로드:
+1. before: yaml.safe_load (순수 Python SafeLoader)
+2. CSafeLoader (libyaml)
+3. marshal 스냅샷 (원본 mtime/size가 같을 때, YAML 파싱 없음)
+4. 표준 라이브러리 부분집합 파서 (PyYAML이 없을 때)
+5. load_knowledge (콜드 훅: 프로세스 메모 없음, 스냅샷 사용)
+
+저장:
+1. before: yaml.dump (순수 Python Dumper)
+2. CSafeDumper (libyaml)
+3. 표준 라이브러리 출력기
+
+그리고 다음을 확인한다.
+- 모든 로더의 결과가 같고, 각 출력기의 결과를 다른 로더로 읽어도 같은지
+- 날짜/60진수 스칼라의 타입과, 따옴표 없는 값 안의 ': ' 같은 잘못된 입력의 거부가 PyYAML 경로와 같은지
+- knowledge.yaml을 고치면 스냅샷이 무시되는지
+- PyYAML이 없을 때도 knowledge를 저장/로드/압축할 수 있는지
+
+사용법:
+    python3 benchmarks/bench_serializer.py [--sizes 100,1000,10000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml
+
+from hooks import common
+from hooks import serializer
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+PROJECT_HASH = "benchsr8"
+
+
+def make_knowledge(entries: int) -> dict:
+    """decision/pitfall을 합쳐 entries개 가진 knowledge"""
+    knowledge = common.create_initial_knowledge(PROJECT_HASH)
+    knowledge["patterns"] = {
+        "framework": "Spring Boot", "testing": "JUnit 5", "mocking": "Mockito", "build_tool": "Gradle",
+    }
+    for i in range(entries // 2):
+        knowledge["decisions"].append({
+            "id": f"INV-{i}", "topic": f"order-{i % 40}",
+            "decision": f"도메인 모듈 {i}은 인프라 계층을 직접 참조하지 않는다: 포트를 거친다",
+            "rationale": "Design invariant", "refs": [f"docs/adr/{i:04d}.md"], "created_at": "2026-01-01",
+        })
+    for i in range(entries - entries // 2):
+        knowledge["pitfalls"].append({
+            "id": f"P-test_{i}", "description": f"test_{i}: NullPointerException at line {i}",
+            "reason": "Optional 처리 누락 # 재현 조건은 'empty cart'", "learned_from": f"T{i}-S1",
+            "occurrences": i % 7, "resolved": i % 3 == 0,
+        })
+    return knowledge
+
+
+def bench(fn, budget: float = 1.0) -> float:
+    """budget초 안에서 반복해 1회 평균 ms (최소 3회)"""
+    fn()
+    runs = 0
+    start = time.perf_counter()
+    while runs < 3 or time.perf_counter() - start < budget:
+        fn()
+        runs += 1
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def run_size(entries: int) -> None:
+    knowledge = make_knowledge(entries)
+    path = common.get_knowledge_path(PROJECT_HASH)
+    common.save_knowledge(PROJECT_HASH, knowledge)
+    text = path.read_text(encoding="utf-8")
+
+    def cold_load_knowledge():
+        reset_memos()
+        return common.load_knowledge(PROJECT_HASH)
+
+    loads = [
+        ("load  before: yaml.safe_load", lambda: yaml.safe_load(text)),
+        ("load  CSafeLoader", lambda: serializer.yaml_loads(text)),
+        ("load  marshal snapshot", lambda: common.load_yaml_file(path)),
+        ("load  stdlib subset parser", lambda: serializer._BlockParser(text).parse()),
+        ("load  load_knowledge (cold hook)", cold_load_knowledge),
+    ]
+    dumps = [
+        ("dump  before: yaml.dump", lambda: yaml.dump(
+            knowledge, allow_unicode=True, default_flow_style=False, sort_keys=False)),
+        ("dump  CSafeDumper", lambda: serializer.yaml_dumps(knowledge)),
+        ("dump  stdlib emitter", lambda: serializer._dump_block(knowledge)),
+    ]
+
+    print(f"{entries:,} entries (knowledge.yaml {len(text.encode()) / 1024:,.0f} KB, backend {serializer.get_backend()})")
+    for group in (loads, dumps):
+        base = None
+        for label, fn in group:
+            ms = bench(fn)
+            base = base or ms
+            print(f"  {label:<36} {ms:9.2f} ms   {base / ms:6.1f}x")
+    print()
+
+
+def check_roundtrip() -> None:
+    """로더/출력기 조합의 결과가 모두 같은지"""
+    knowledge = make_knowledge(200)
+    knowledge["pitfalls"][0]["description"] = "줄\n바꿈, 'quote' \"double\" # hash: colon end"
+    knowledge["pitfalls"][1]["description"] = "2026-01-01"
+    knowledge["pitfalls"][2]["description"] = "0x1F"
+    knowledge["pitfalls"][3]["description"] = "line\u2028separator " * 8
+
+    texts = {
+        "yaml.dump": yaml.dump(knowledge, allow_unicode=True, default_flow_style=False, sort_keys=False),
+        "CSafeDumper": serializer.yaml_dumps(knowledge),
+        "stdlib emitter": serializer._dump_block(knowledge),
+    }
+    for name, text in texts.items():
+        for loader_name, loader in (
+            ("yaml.safe_load", yaml.safe_load),
+            ("CSafeLoader", serializer.yaml_loads),
+            ("stdlib parser", lambda t: serializer._BlockParser(t).parse()),
+        ):
+            assert loader(text) == knowledge, f"{name} -> {loader_name} differs"
+    report_check("roundtrip")
+
+
+# (YAML, PyYAML과 부분집합 파서가 함께 돌려줄 값. None이면 둘 다 SerializationError)
+SCALAR_CASES = [
+    ("first_seen: 2026-01-15", {"first_seen": "2026-01-15"}),
+    ("at: 2026-01-15T10:00:00Z", {"at": "2026-01-15T10:00:00Z"}),
+    ("at: 2026-01-15 10:00:00", {"at": "2026-01-15 10:00:00"}),
+    ("duration: 1:30", {"duration": 90}),
+    ("duration: -1:30.5", {"duration": -90.5}),
+    ("url: http://example.com/a", {"url": "http://example.com/a"}),
+    ("ratio: x:y", {"ratio": "x:y"}),
+    ("text: 'quoted: colon'", {"text": "quoted: colon"}),
+    ("text: folded\n  line", {"text": "folded line"}),
+    ("key: value: with colon", None),
+    ("key: trailing:", None),
+    ("key: first\n  second: line", None),
+    ("- key: value: with colon", None),
+    ("key: - item", None),
+]
+
+
+def check_scalar_types() -> None:
+    """PyYAML(CSafeLoader)과 부분집합 파서가 같은 타입을 돌려주고 같은 입력을 거부"""
+    loaders = (("CSafeLoader", serializer.yaml_loads), ("stdlib parser", lambda t: serializer._BlockParser(t).parse()))
+    for text, expected in SCALAR_CASES:
+        for name, loader in loaders:
+            try:
+                result = loader(text)
+            except serializer.SerializationError:
+                result = None
+            assert result == expected, f"{name}: {text!r} -> {result!r}, expected {expected!r}"
+            if expected is not None:
+                assert [type(v) for v in result.values()] == [type(v) for v in expected.values()], f"{name}: {text!r} types"
+    report_check("scalar types")
+
+
+def check_snapshot_invalidation() -> None:
+    """knowledge.yaml을 직접 고치면 스냅샷 대신 새 내용을 읽음"""
+    knowledge = make_knowledge(10)
+    common.save_knowledge(PROJECT_HASH, knowledge)
+    path = common.get_knowledge_path(PROJECT_HASH)
+    assert serializer.get_snapshot_path(path).exists(), "snapshot not written"
+
+    text = path.read_text(encoding="utf-8").replace("Spring Boot", "Quarkus")
+    stat = path.stat()
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    reset_memos()
+    assert common.load_knowledge(PROJECT_HASH)["patterns"]["framework"] == "Quarkus", "stale snapshot used"
+    report_check("snapshot invalidation")
+
+
+def check_without_pyyaml() -> None:
+    """PyYAML이 없어도 knowledge 저장/로드/압축이 되고, 결과는 PyYAML로도 읽힘"""
+    original = serializer.yaml
+    serializer.yaml = None
+    try:
+        knowledge = make_knowledge(20)
+        assert common.save_knowledge(PROJECT_HASH, knowledge), "save failed"
+        common.append_knowledge_deltas(PROJECT_HASH, [{"op": "patterns", "values": {"orm": "JPA"}}])
+        assert common.compact_knowledge(PROJECT_HASH) == 1, "compact failed"
+        serializer.get_snapshot_path(common.get_knowledge_path(PROJECT_HASH)).unlink()
+        reset_memos()
+        loaded = common.load_knowledge(PROJECT_HASH)
+    finally:
+        serializer.yaml = original
+
+    loaded.pop("updated_at", None)
+    assert loaded["patterns"]["orm"] == "JPA", loaded["patterns"]
+    assert loaded["pitfalls"] == knowledge["pitfalls"], "pitfalls differ"
+    on_disk = yaml.safe_load(common.get_knowledge_path(PROJECT_HASH).read_text(encoding="utf-8"))
+    on_disk.pop("updated_at", None)
+    assert on_disk == loaded, "PyYAML reads a different document"
+    report_check("stdlib fallback")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000", help="쉼표로 구분한 항목 수")
+    args = parser.parse_args()
+
+    with bench_workdir("bench-serializer-"):
+        for size in args.sizes.split(","):
+            run_size(int(size))
+        check_roundtrip()
+        check_scalar_types()
+        check_snapshot_invalidation()
+        check_without_pyyaml()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Claude Code 세션 레지스트리 벤치마크
+
+같은 머신에서 Claude Code 세션 여러 개가 번갈아 훅을 부를 때 현재 세션을 알아내는 비용을
+1. global file: SessionStart가 ~/.orchestrator-session-id 하나에 쓰고, 훅마다 그 파일을 읽음
+2. payload: 훅 입력의 session_id (read_stdin_json이 설정, 파일을 읽지 않음)
+로 비교하고, 다음을 확인한다.
+- 세션 두 개가 번갈아 시작해도 각자 자기 요청을 같은 세션으로 판정하는지 (global file은 마지막 세션만)
+- TTL이 지난 세션은 다음 SessionStart 때 레지스트리와 주입 기록에서 정리되는지
+- 입력에 session_id가 없으면 프로젝트에서 가장 최근에 등록된 세션을 쓰는지
+
+사용법:
+    python3 benchmarks/bench_sessions.py [--iterations 20000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import injection
+from hooks import session_start
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+def read_payload(payload: dict) -> dict:
+    """훅이 stdin을 읽는 것과 같이"""
+    sys.stdin = io.StringIO(json.dumps(payload))
+    try:
+        return common.read_stdin_json()
+    finally:
+        sys.stdin = sys.__stdin__
+
+
+def start_session(session_id: str) -> None:
+    """SessionStart 한 번"""
+    reset_memos()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        sys.stdin = io.StringIO(json.dumps({"session_id": session_id, "source": "startup"}))
+        try:
+            session_start.main()
+        finally:
+            sys.stdin = sys.__stdin__
+
+
+def bench_global_file(workdir: Path, iterations: int) -> float:
+    """이전 방식: 훅마다 전역 세션 파일 읽기"""
+    session_file = workdir / ".orchestrator-session-id"
+    session_file.write_text("a1b2c3d4", encoding="utf-8")
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if session_file.exists():
+            session_file.read_text(encoding="utf-8").strip()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def bench_payload(project_hash: str, iterations: int) -> float:
+    """훅 입력의 session_id"""
+    read_payload({"session_id": "session-a", "prompt": "계속"})
+    start = time.perf_counter()
+    for _ in range(iterations):
+        common.get_current_session_id(project_hash)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def check_concurrent(project_hash: str) -> None:
+    """세션 A, B가 번갈아 시작해도 각자 자기 요청을 같은 세션으로 판정"""
+    start_session("session-a")
+    state_a = common.create_initial_state(project_hash, "A 세션의 요청")
+    start_session("session-b")
+    state_b = common.create_initial_state(project_hash, "B 세션의 요청")
+    assert state_a["request"]["claude_session_id"] == "session-a"
+    assert state_b["request"]["claude_session_id"] == "session-b"
+
+    read_payload({"session_id": "session-a"})
+    assert common.is_same_session(state_a, project_hash) and not common.is_same_session(state_b, project_hash)
+    read_payload({"session_id": "session-b"})
+    assert common.is_same_session(state_b, project_hash) and not common.is_same_session(state_a, project_hash)
+    assert set(common.load_session_registry(project_hash)) == {"session-a", "session-b"}
+    report_check("concurrent sessions")
+
+
+def check_ttl(project_hash: str) -> None:
+    """TTL이 지난 세션 정리 (레지스트리 + 주입 기록)"""
+    record = injection.get_injection_record_path(project_hash, "session-a")
+    read_payload({"session_id": "session-a"})
+    injection.save_injection_record(project_hash, {"session_id": "session-a"})
+    assert record.exists()
+
+    # session-a를 TTL보다 오래전에 본 것으로
+    path = common.get_session_registry_path(project_hash)
+    registry = json.loads(path.read_text(encoding="utf-8"))
+    registry["sessions"]["session-a"]["seen"] -= common.get_session_ttl() + 1
+    path.write_text(json.dumps(registry), encoding="utf-8")
+
+    start_session("session-c")
+    assert set(common.load_session_registry(project_hash)) == {"session-b", "session-c"}
+    assert not record.exists(), "expired session's injection record must be removed"
+    report_check("ttl cleanup")
+
+
+def check_fallback(project_hash: str) -> None:
+    """입력에 session_id가 없으면 가장 최근에 등록된 세션"""
+    start_session("session-b")
+    read_payload({"prompt": "수동 실행"})
+    reset_memos()
+    assert common.get_current_session_id(project_hash) == "session-b"
+    report_check("fallback")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-sessions-") as workdir:
+        project_hash = common.get_project_hash()
+
+        before = bench_global_file(workdir, args.iterations)
+        after = bench_payload(project_hash, args.iterations)
+        print(f"resolve current session ({args.iterations} hooks)")
+        print(f"before: global session file      {before:8.2f} us/hook   (file read per hook)")
+        print(f"after: hook payload session_id   {after:8.2f} us/hook   (no file read)")
+        print()
+
+        check_concurrent(project_hash)
+        check_ttl(project_hash)
+        check_fallback(project_hash)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+PostToolUse 지연 벤치마크 (knowledge 동기 갱신 vs spool)
+
+pitfall/decision이 수백 개 쌓인 프로젝트에서 Read(새 파일) / design-contract 저장 /
+실패한 test-result 저장이 섞인 PostToolUse 이벤트를 처리할 때 이벤트당 지연의
+p50/p99/max를 비교한다.
+
+1. sync: 매 이벤트마다 knowledge.yaml 로드 + yaml.dump 전체 재작성 (delta 로그 이전)
+2. delta + 인라인 압축: knowledge를 로드해 새 항목만 delta로 추가, compact_after마다 훅 안에서 압축
+3. spool: knowledge를 읽지 않고 delta 한 줄 추가, 압축은 분리된 flush 프로세스
+
+각 이벤트는 콜드 훅처럼 파일 메모를 비운 상태에서 시작한다.
+끝에서 spool 결과를 합친 knowledge가 sync 결과와 같은지 확인하고, spool 경로가
+새 패턴/decision만 기록하고 보고하는지 (이미 knowledge나 delta 로그에 있는 것은 제외) 확인한다.
+
+사용법:
+    python3 benchmarks/bench_spool.py [--items 200] [--events 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import post_tool_use
+from hooks.analysis_cache import AnalysisCache, analyze_read, get_analysis_cache_path
+from hooks.state_store import StateSession
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+PROJECT_HASH = "benchsp8"
+
+SOURCES = [
+    ("OrderService.java", "import org.springframework.stereotype.Service;\n@Service\nclass OrderService {}\n"),
+    ("OrderController.java", "@RestController\nclass OrderController {}\n"),
+    ("OrderServiceTest.java", "import org.junit.jupiter.api.Test;\nimport org.mockito.Mock;\n@Test void a() {}\n"),
+    ("cart.ts", "export const cart = [];\n"),
+    ("main.go", "package main\n"),
+]
+
+
+def make_base_knowledge(items: int) -> dict:
+    knowledge = common.create_initial_knowledge(PROJECT_HASH)
+    for i in range(items):
+        knowledge["decisions"].append({
+            "id": f"INV-base-{i}", "topic": f"INV-base-{i}",
+            "decision": f"도메인 모듈 {i}은 인프라 계층을 직접 참조하지 않는다",
+            "rationale": "Design invariant", "refs": [], "created_at": "2026-01-01",
+        })
+        knowledge["pitfalls"].append({
+            "id": f"P-base_{i}", "description": f"base_{i}: NullPointerException",
+            "reason": "Optional 처리 누락", "learned_from": f"T{i}-S1",
+        })
+    return knowledge
+
+
+def make_events(workdir: Path, count: int) -> list:
+    """(kind, file_path) 목록: Read 7 : design-contract 2 : test-result 1"""
+    src = workdir / "src"
+    contracts = common.get_sessions_path(PROJECT_HASH) / "contracts" / "R1"
+    src.mkdir(parents=True, exist_ok=True)
+    events = []
+    for i in range(count):
+        slot = i % 10
+        if slot < 7:
+            name, content = SOURCES[i % len(SOURCES)]
+            path = src / f"m{i}" / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+            events.append(("read", str(path)))
+        elif slot < 9:
+            path = contracts / f"T{i}" / "design-contract.yaml"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text("invariants:\n" + "".join(
+                f"  - id: INV-{i}-{k}\n    rule: 규칙 {k}\n" for k in range(3)
+            ) + "  - id: INV-base-1\n    rule: 이미 있는 결정\n")
+            events.append(("write", str(path)))
+        else:
+            path = contracts / f"T{i}" / f"T{i}-S1" / "test-result.yaml"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(
+                f"subtask_id: T{i}-S1\nexecution: {{result: fail}}\n"
+                f"failed_tests:\n  - {{name: test_case_{i}, reason: timeout, suggestion: retry 추가}}\n"
+            )
+            events.append(("write", str(path)))
+    return events
+
+
+def contract_deltas(session: StateSession, file_path: str, knowledge: dict) -> list:
+    """process_contract_file이 기록하는 것과 같은 delta (knowledge에 없는 decision만)"""
+    content = session.contract(file_path) or {}
+    if "design-contract.yaml" in file_path:
+        existing_ids = {dec.get("id") for dec in knowledge.get("decisions") or []}
+        decisions = {}
+        for dec in post_tool_use.extract_decisions_from_design_contract(file_path, content):
+            if dec["id"] not in existing_ids:
+                decisions.setdefault(dec["id"], dec)
+        return [{"op": "decision", "item": dec} for dec in decisions.values()]
+    return [{"op": "pitfall", "item": pit} for pit in post_tool_use.extract_pitfalls_from_test_result(content)]
+
+
+def legacy_sync(kind: str, file_path: str) -> None:
+    """delta 로그 이전: knowledge.yaml 로드 → 수정 → 전체 재작성"""
+    session = StateSession(PROJECT_HASH)
+    knowledge = common.load_knowledge(PROJECT_HASH) or common.create_initial_knowledge(PROJECT_HASH)
+    changed = False
+    if kind == "read":
+        cache = AnalysisCache(PROJECT_HASH)
+        patterns = analyze_read(file_path, None, cache)
+        cache.save()
+        if patterns:
+            merged, added = common.merge_patterns(knowledge.get("patterns") or {}, patterns)
+            knowledge["patterns"] = merged
+            changed = bool(added)
+    else:
+        deltas = contract_deltas(session, file_path, knowledge)
+        common.apply_knowledge_deltas(knowledge, [{**delta, "at": common.get_timestamp()} for delta in deltas])
+        changed = bool(deltas)
+    if changed:
+        common.save_knowledge(PROJECT_HASH, knowledge)
+
+
+def legacy_inline(kind: str, file_path: str) -> None:
+    """spool 이전: knowledge를 로드해 새 항목만 delta로 추가, 압축은 훅 안에서"""
+    session = StateSession(PROJECT_HASH)
+    knowledge = common.load_knowledge(PROJECT_HASH) or common.create_initial_knowledge(PROJECT_HASH)
+    deltas = []
+    if kind == "read":
+        cache = AnalysisCache(PROJECT_HASH)
+        patterns = analyze_read(file_path, None, cache)
+        cache.save()
+        existing = knowledge.get("patterns") or {}
+        new = {key: value for key, value in (patterns or {}).items() if key not in existing}
+        if new:
+            deltas.append({"op": "patterns", "values": new})
+    else:
+        deltas = contract_deltas(session, file_path, knowledge)
+    common.append_knowledge_deltas(PROJECT_HASH, deltas)
+
+
+def spool(kind: str, file_path: str) -> None:
+    """현재 PostToolUse 경로"""
+    session = StateSession(PROJECT_HASH)
+    if kind == "read":
+        post_tool_use.process_code_read(file_path, None, session)
+    else:
+        post_tool_use.process_contract_file(file_path, session)
+    session.commit()
+
+
+def reset(base: dict) -> None:
+    common.save_knowledge(PROJECT_HASH, base)
+    get_analysis_cache_path(PROJECT_HASH).unlink(missing_ok=True)
+    reset_memos()
+
+
+def wait_for_flush(timeout: float = 30.0) -> None:
+    lock_path = common.get_knowledge_compact_lock_path(PROJECT_HASH)
+    deadline = time.monotonic() + timeout
+    while lock_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def measure(label: str, fn, events: list) -> dict:
+    latencies = []
+    for kind, file_path in events:
+        reset_memos()
+        start = time.perf_counter()
+        fn(kind, file_path)
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<32} p50 {percentile(latencies, 50):7.2f} ms   "
+          f"p99 {percentile(latencies, 99):7.2f} ms   max {max(latencies):7.2f} ms")
+    return {"p99": percentile(latencies, 99)}
+
+
+def final_knowledge() -> dict:
+    """합쳐진 knowledge (기록 시각과 delta 로그에 따라 달라지는 값 제외)"""
+    reset_memos()
+    knowledge = common.load_knowledge(PROJECT_HASH)
+    knowledge.pop("updated_at", None)
+    knowledge.pop("delta_log", None)
+    for section in ("pitfalls", "decisions"):
+        for item in knowledge[section]:
+            item.pop("first_seen", None)
+            item.pop("last_seen", None)
+    return knowledge
+
+
+def check_reporting(workdir: Path, base: dict) -> None:
+    """새 패턴/decision만 기록·보고, knowledge.yaml을 직접 고치면 키 색인 재생성"""
+    reset(base)
+    name, content = SOURCES[0]
+    first, second = workdir / "report" / "a" / name, workdir / "report" / "b" / name
+    for path in (first, second):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    contract = common.get_sessions_path(PROJECT_HASH) / "contracts" / "R9" / "T1" / "design-contract.yaml"
+    contract.parent.mkdir(parents=True, exist_ok=True)
+    contract.write_text("invariants:\n  - id: INV-new\n    rule: 새 결정\n"
+                        "  - id: INV-base-1\n    rule: 이미 있는 결정\n", encoding="utf-8")
+
+    def run(fn, path) -> list:
+        reset_memos()
+        session = StateSession(PROJECT_HASH)
+        updates = fn(str(path), session)
+        session.commit()
+        return updates
+
+    read = lambda path, session: post_tool_use.process_code_read(path, None, session)
+    added = run(read, first)
+    assert "language: Java" in added, added
+    assert run(read, second) == [], "known patterns reported again"
+    assert run(post_tool_use.process_contract_file, contract) == ["Decision added: INV-new"]
+    assert run(post_tool_use.process_contract_file, contract) == [], "decision recorded again"
+    deltas = [delta for segment in common._load_delta_segments(PROJECT_HASH) for _, delta in segment["entries"]]
+    assert [delta["op"] for delta in deltas] == ["patterns", "decision"], deltas
+
+    # 압축 후에도, knowledge.yaml을 직접 고친 뒤에도 색인이 맞는지
+    common.compact_knowledge(PROJECT_HASH)
+    assert common.load_knowledge_keys(PROJECT_HASH)["decisions"] >= {"INV-new", "INV-base-1"}
+    knowledge_path = common.get_knowledge_path(PROJECT_HASH)
+    edited = common.load_yaml_file(knowledge_path)
+    edited["patterns"].pop("language")
+    knowledge_path.write_text(common.yaml_dumps(edited), encoding="utf-8")
+    reset_memos()
+    assert "language" not in common.load_knowledge_keys(PROJECT_HASH)["patterns"], "stale key index"
+    report_check("report")
+
+
+def use_unbounded_limits(workdir: Path) -> None:
+    """지연만 비교하기 위해 knowledge.limits 상한을 끈 config 사용"""
+    path = workdir / "config.yaml"
+    path.write_text("knowledge:\n  limits:\n    max_pitfalls: 0\n    max_decisions: 0\n", encoding="utf-8")
+    os.environ["ORCHESTRATOR_CONFIG_PATH"] = str(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200, help="기존 pitfall/decision 각각의 개수")
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-spool-") as workdir:
+        try:
+            use_unbounded_limits(workdir)
+            base = make_base_knowledge(args.items)
+            events = make_events(workdir, args.events)
+            reset(base)
+            size = common.get_knowledge_path(PROJECT_HASH).stat().st_size
+            print(f"knowledge.yaml {size / 1024:.0f} KB, {len(events)} PostToolUse events")
+
+            reset(base)
+            sync = measure("before: load + yaml.dump", legacy_sync, events)
+            expected = final_knowledge()
+
+            reset(base)
+            inline = measure("delta + inline compaction", legacy_inline, events)
+            common.compact_knowledge(PROJECT_HASH)
+            assert final_knowledge() == expected, "inline result differs"
+
+            reset(base)
+            spooled = measure("after: spool", spool, events)
+            wait_for_flush()
+            common.compact_knowledge(PROJECT_HASH)
+            assert final_knowledge() == expected, "spooled result differs"
+            print(f"p99 speedup vs sync:   {sync['p99'] / spooled['p99']:6.1f}x")
+            print(f"p99 speedup vs inline: {inline['p99'] / spooled['p99']:6.1f}x")
+            print()
+            report_check("merged result")
+            check_reporting(workdir, base)
+        finally:
+            # 분리된 flush 프로세스가 작업 디렉토리를 지우기 전에 끝나도록
+            wait_for_flush()
+
+
+if __name__ == "__main__":
+    main()
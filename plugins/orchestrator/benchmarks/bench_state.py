@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+state 저장소 벤치마크 (json vs sqlite)
+
+task/subtask 수백 개짜리 state에서
+1. update_state_phase (subtask phase 한 필드 변경)
+2. save_state (subtask 하나 상태 변경 후 전체 저장)
+3. load_state (콜드), load_state (warm: 데몬처럼 같은 프로세스에서 반복)
+를 백엔드별로 비교하고, sqlite ↔ state.json 왕복 결과가 같은지 확인한다.
+sqlite 문서 메모가 다른 연결의 커밋과 자기 쓰기 뒤에 다시 조립되는지도 확인한다.
+또한 design-contract.yaml 저장 한 번에 StateSession이 state를 한 번씩만 읽고 쓰고,
+knowledge는 읽지 않고 delta만 추가하는지 확인한다.
+
+warm 외의 측정은 콜드 훅처럼 파일 메모와 sqlite 문서 메모를 비운 상태에서 시작한다.
+
+사용법:
+    python3 benchmarks/bench_state.py [--tasks 50] [--subtasks 8] [--iterations 200]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import post_tool_use
+from hooks import state_store
+
+from harness import bench_workdir, report_check, reset_memos
+
+
+PROJECT_HASH = "benchst8"
+
+
+def make_state(tasks: int, subtasks: int) -> dict:
+    """planner가 만든 것과 같은 형태의 큰 state"""
+    state = common.create_initial_state(PROJECT_HASH, "대규모 리팩터링 " * 20)
+    state["request"]["global_phase"] = "task_loop"
+    state["request"]["current_task"] = "T1"
+    for t in range(1, tasks + 1):
+        task_id = f"T{t}"
+        state["task_order"].append(task_id)
+        state["tasks"][task_id] = {
+            "name": f"작업 {t} - 모듈 분리 및 인터페이스 정리",
+            "status": "in_progress" if t == 1 else "pending",
+            "current_subtask": f"{task_id}-S1",
+            "subtasks": {
+                f"{task_id}-S{s}": {
+                    "name": f"서브태스크 {s}: 테스트 작성 후 구현",
+                    "status": "pending",
+                    "phase": "test_first",
+                    "files": [f"src/module_{t}/file_{s}.py", f"tests/module_{t}/test_file_{s}.py"],
+                }
+                for s in range(1, subtasks + 1)
+            },
+        }
+    return state
+
+
+def bench(label: str, fn, iterations: int, cold: bool = True) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        if cold:
+            reset_memos()
+            state_store._DOCUMENTS.clear()
+        fn(i)
+    per_iter_ms = (time.perf_counter() - start) / iterations * 1000
+    print(f"{label:<40} {per_iter_ms:8.3f} ms")
+    return per_iter_ms
+
+
+def run_backend(backend: str, state: dict, iterations: int) -> dict:
+    os.environ["ORCHESTRATOR_STATE_BACKEND"] = backend
+    common.save_state(PROJECT_HASH, state)
+    phases = ("test_first", "implementation", "verification")
+
+    def update_phase(i):
+        common.update_state_phase(PROJECT_HASH, phases[i % 3], "subtask")
+
+    def save_full(i):
+        loaded = common.load_state(PROJECT_HASH)
+        loaded["tasks"]["T1"]["subtasks"]["T1-S2"]["status"] = "completed" if i % 2 else "pending"
+        common.save_state(PROJECT_HASH, loaded)
+
+    def load(i):
+        common.load_state(PROJECT_HASH)
+
+    return {
+        "update_phase": bench(f"[{backend}] update_state_phase", update_phase, iterations),
+        "load_and_save": bench(f"[{backend}] load_state + save_state", save_full, iterations),
+        "load": bench(f"[{backend}] load_state", load, iterations),
+        "load_warm": bench(f"[{backend}] load_state (warm)", load, iterations, cold=False),
+    }
+
+
+def check_roundtrip(state: dict) -> None:
+    """db → state.json → db 왕복 후에도 문서가 같아야 하고, 외부 수정은 다음 로드에 반영되어야 함"""
+    os.environ["ORCHESTRATOR_STATE_BACKEND"] = "sqlite"
+    assert common.save_state(PROJECT_HASH, state)  # 새 요청으로 등록되어 현재 요청이 됨
+    store = common.get_state_store(PROJECT_HASH)
+    assert store.export_json()
+    exported = json.loads(store.state_path.read_text(encoding="utf-8"))
+    assert exported == state, "export differs from saved state"
+    assert list(exported["tasks"]) == list(state["tasks"]), "task order not preserved"
+
+    # 다른 도구가 state.json을 고친 경우
+    exported["request"]["global_phase"] = "merge"
+    state_store.write_state_json(store.state_path, exported)
+    stat = store.state_path.stat()
+    os.utime(store.state_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert common.load_state(PROJECT_HASH)["request"]["global_phase"] == "merge", "external edit not imported"
+
+    # 훅의 단일 필드 갱신은 sync 전까지 state.json에 쓰지 않음
+    before = store.state_path.stat().st_mtime_ns
+    assert common.update_state_phase(PROJECT_HASH, "verification", "subtask")
+    assert store.state_path.stat().st_mtime_ns == before
+    assert common.sync_state_json(PROJECT_HASH)
+    synced = json.loads(store.state_path.read_text(encoding="utf-8"))
+    assert synced["tasks"]["T1"]["subtasks"]["T1-S1"]["phase"] == "verification"
+    report_check("roundtrip")
+
+
+def check_document_memo(state: dict) -> None:
+    """sqlite 문서 메모: 다른 연결의 커밋, 자기 쓰기 뒤에는 다시 조립하고 반환값 수정은 메모에 새지 않음"""
+    os.environ["ORCHESTRATOR_STATE_BACKEND"] = "sqlite"
+    assert common.save_state(PROJECT_HASH, state)
+    store = common.get_state_store(PROJECT_HASH)
+    loaded = common.load_state(PROJECT_HASH)
+    loaded["request"]["global_phase"] = "changed in memory"
+    assert common.load_state(PROJECT_HASH)["request"]["global_phase"] != "changed in memory", "memo shared with caller"
+
+    # 다른 프로세스(연결)의 커밋
+    other = sqlite3.connect(str(store.db_path))
+    subtask = json.loads(other.execute(
+        "SELECT data FROM subtasks WHERE request_id = ? AND task_id = 'T1' AND subtask_id = 'T1-S1'",
+        (store.request_id,)).fetchone()[0])
+    subtask["phase"] = "merge"
+    with other:
+        other.execute("UPDATE subtasks SET data = ? WHERE request_id = ? AND task_id = 'T1' AND subtask_id = 'T1-S1'",
+                      (json.dumps(subtask), store.request_id))
+    other.close()
+    assert common.load_state(PROJECT_HASH)["tasks"]["T1"]["subtasks"]["T1-S1"]["phase"] == "merge", "other connection's commit not seen"
+
+    # 같은 연결의 쓰기
+    assert common.update_state_phase(PROJECT_HASH, "verification", "subtask")
+    assert common.load_state(PROJECT_HASH)["tasks"]["T1"]["subtasks"]["T1-S1"]["phase"] == "verification", "own write not seen"
+    report_check("sqlite document memo")
+
+
+def check_session_io(state: dict) -> None:
+    """contract 저장 1회 = state 로드 1회 + 저장 1회, delta 추가 1회 (knowledge는 로드하지 않음)"""
+    calls = {"state_load": 0, "state_write": 0, "knowledge_load": 0, "knowledge_append": 0}
+
+    def counting(name, fn):
+        def wrapper(*args, **kwargs):
+            calls[name] += 1
+            return fn(*args, **kwargs)
+        return wrapper
+
+    for backend in ("json", "sqlite"):
+        os.environ["ORCHESTRATOR_STATE_BACKEND"] = backend
+        common.save_state(PROJECT_HASH, state)
+        for path in (common.get_knowledge_path(PROJECT_HASH), common.get_knowledge_delta_path(PROJECT_HASH)):
+            path.unlink(missing_ok=True)
+        reset_memos()
+        for key in calls:
+            calls[key] = 0
+
+        contract = common.get_sessions_path(PROJECT_HASH) / "contracts" / state["request"]["id"] / "T1" / "design-contract.yaml"
+        contract.parent.mkdir(parents=True, exist_ok=True)
+        contract.write_text("invariants:\n  - id: INV-1\n    rule: 순수 함수 유지\n", encoding="utf-8")
+
+        session = state_store.StateSession(PROJECT_HASH)
+        store = session.store
+        saved = (store.load, store.save, store.update_many, state_store.load_knowledge, state_store.append_knowledge_deltas)
+        store.load = counting("state_load", store.load)
+        store.save = counting("state_write", store.save)
+        store.update_many = counting("state_write", store.update_many)
+        if backend == "json":
+            saved_changes = store.save_changes
+            store.save_changes = counting("state_write", store.save_changes)
+        state_store.load_knowledge = counting("knowledge_load", state_store.load_knowledge)
+        state_store.append_knowledge_deltas = counting("knowledge_append", state_store.append_knowledge_deltas)
+        try:
+            post_tool_use.process_contract_file(str(contract), session)
+            post_tool_use.process_state_transition(str(contract), session)
+            session.commit()
+        finally:
+            store.load, store.save, store.update_many, state_store.load_knowledge, state_store.append_knowledge_deltas = saved
+            if backend == "json":
+                store.save_changes = saved_changes
+
+        assert calls == {"state_load": 1, "state_write": 1, "knowledge_load": 0, "knowledge_append": 1}, calls
+        assert common.load_state(PROJECT_HASH)["tasks"]["T1"]["subtasks"]["T1-S1"]["phase"] == "test_first"
+    report_check("session io")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--subtasks", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-state-"):
+        state = make_state(args.tasks, args.subtasks)
+        size = len(json.dumps(state, ensure_ascii=False, indent=2).encode("utf-8"))
+        print(f"state: {args.tasks} tasks x {args.subtasks} subtasks, state.json {size / 1024:.0f} KB")
+
+        results = {backend: run_backend(backend, state, args.iterations) for backend in ("json", "sqlite")}
+        print()
+        for name in ("update_phase", "load_and_save", "load", "load_warm"):
+            print(f"{name:<20} sqlite/json: {results['sqlite'][name] / results['json'][name]:5.2f}x")
+        print()
+        check_roundtrip(make_state(args.tasks, args.subtasks))
+        check_document_memo(make_state(args.tasks, args.subtasks))
+        check_session_io(make_state(args.tasks, args.subtasks))
+
+
+if __name__ == "__main__":
+    main()
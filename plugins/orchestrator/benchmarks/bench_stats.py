@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+훅 지연 시간 계측 벤치마크
+
+1. 계측 비용: 같은 훅(PostToolUse Read, UserPromptSubmit 이어서)을 계측 켬(ORCHESTRATOR_HOOK_STATS=1, 이전 기본값)과
+   기본 설정(꺼짐)으로 --iterations번 실행해 훅 한 번당 시간
+2. 기록 비용: 최근 --capacity개를 남기는 방식별 기록 한 번의 비용
+   - JSON list: 파일 전체를 읽고 하나 추가, 넘친 것을 잘라 다시 씀 (기록 수에 비례)
+   - ring buffer: 슬롯 하나와 헤더만 씀 (기록 수와 무관)
+그리고 다음을 확인한다.
+- 기본 설정에서는 아무것도 기록하지 않는지
+- 켰을 때 훅 7개(session_start ~ pre_tool_use)가 모두 wall과 구간(stdin/config/state/knowledge/output)을 기록하는지
+- 링 버퍼가 가득 차면 오래된 기록부터 덮어쓰고 파일 크기가 일정한지, capacity를 바꾸면 새로 시작하는지
+- p50/p95/p99 (nearest-rank), '/orchestrator stats' 출력
+- 여러 스레드에서 동시에 실행한 훅의 구간이 섞이지 않는지, 기록이 실패해도 훅은 성공하는지
+
+사용법:
+    python3 benchmarks/bench_stats.py [--iterations 300] [--capacity 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks import common
+from hooks import stats
+from hooks import post_tool_use
+from hooks import pre_compact
+from hooks import pre_tool_use
+from hooks import session_start
+from hooks import stop
+from hooks import subagent_stop
+from hooks import user_prompt_submit
+
+from harness import bench_workdir, report_check
+
+
+def run_hook(module, payload: dict) -> str:
+    """훅 main을 프로세스 안에서 실행하고 출력 반환"""
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+        sys.stdin = io.StringIO(json.dumps(payload))
+        try:
+            module.main()
+        except SystemExit:
+            pass
+        finally:
+            sys.stdin = sys.__stdin__
+    return stdout.getvalue()
+
+
+def make_project(workdir: Path, name: str) -> str:
+    """active 요청이 하나 있는 프로젝트"""
+    project_dir = workdir / name
+    project_dir.mkdir()
+    os.chdir(project_dir)
+    (project_dir / "app.py").write_text("def handler(event):\n    return event\n", encoding="utf-8")
+    project_hash = common.get_project_hash()
+    state = common.create_initial_state(project_hash, "훅 통계")
+    state["request"].update({"global_phase": "task_loop", "current_task": "T1", "claude_session_id": "bench"})
+    state["task_order"] = ["T1"]
+    state["tasks"] = {"T1": {
+        "name": "작업", "status": "in_progress", "current_subtask": "T1-S1", "subtask_order": ["T1-S1"],
+        "subtasks": {"T1-S1": {"name": "서브태스크", "status": "in_progress", "phase": "implementation"}},
+    }}
+    common.save_state(project_hash, state)
+    common.save_knowledge(project_hash, common.create_initial_knowledge(project_hash))
+    return project_hash
+
+
+def bench_overhead(workdir: Path, iterations: int) -> None:
+    """계측 켬/기본 설정(꺼짐)에서 훅 한 번당 시간"""
+    make_project(workdir, "project-overhead")
+    read = {"tool_name": "Read", "tool_input": {"file_path": str(Path.cwd() / "app.py")},
+            "tool_response": {"file": {"content": "def handler(event):\n    return event\n"}}}
+    prompt = {"prompt": "계속", "session_id": "bench"}
+    for label, module, payload in (("PostToolUse Read", post_tool_use, read),
+                                   ("UserPromptSubmit", user_prompt_submit, prompt)):
+        timings = {}
+        for mode in ("1", None):
+            if mode is None:
+                os.environ.pop(stats.STATS_ENV_KEY, None)
+            else:
+                os.environ[stats.STATS_ENV_KEY] = mode
+            run_hook(module, payload)
+            start = time.perf_counter()
+            for _ in range(iterations):
+                run_hook(module, payload)
+            timings[mode] = (time.perf_counter() - start) / iterations * 1e6
+        print(f"{label:<18} before: stats on {timings['1']:8.1f} us/hook   "
+              f"after: default (off) {timings[None]:8.1f} us/hook   (recording costs {timings['1'] - timings[None]:.1f} us)")
+
+
+def append_json_list(path: Path, record: dict, capacity: int) -> None:
+    """이전 방식의 예: 전체를 읽고 추가해 최근 capacity개만 다시 씀"""
+    try:
+        records = json.loads(path.read_text(encoding="utf-8"))
+    except (ValueError, IOError):
+        records = []
+    records.append(record)
+    common.atomic_write_text(path, json.dumps(records[-capacity:], separators=(",", ":")))
+
+
+def bench_write(workdir: Path, capacity: int) -> None:
+    """가득 찬 버퍼에 기록 한 번 추가하는 비용"""
+    record = {"hook": "post_tool_use", "at": time.time(), "wall": 12.345,
+              "spans": {"stdin": 0.1, "config": 0.4, "state": 3.2, "knowledge": 1.1, "output": 0.05}, "status": 0}
+    rounds = 200
+    results = {}
+    for label, append in (("json list", append_json_list), ("ring buffer", stats.append_record)):
+        path = workdir / f"write-{label.replace(' ', '-')}"
+        for _ in range(capacity):
+            append(path, record, capacity)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            append(path, record, capacity)
+        results[label] = ((time.perf_counter() - start) / rounds * 1e6, path.stat().st_size)
+    before, after = results["json list"], results["ring buffer"]
+    print(f"append 1 record (full, {capacity} kept)  before: json list {before[0]:8.1f} us ({before[1] // 1024} KB)   "
+          f"after: ring buffer {after[0]:6.1f} us ({after[1] // 1024} KB)")
+
+
+def check_hooks(workdir: Path) -> None:
+    """기본 설정은 기록하지 않고, 켜면 훅 7개가 wall과 구간을 기록"""
+    project_hash = make_project(workdir, "project-hooks")
+    path = stats.get_stats_path(project_hash)
+    code = str(Path.cwd() / "app.py")
+
+    os.environ.pop(stats.STATS_ENV_KEY, None)
+    run_hook(user_prompt_submit, {"prompt": "계속", "session_id": "bench"})
+    assert not path.exists(), "recorded while disabled"
+    output = run_hook(user_prompt_submit, {"prompt": "/orchestrator stats", "session_id": "bench"})
+    assert "ORCHESTRATOR_HOOK_STATS=1" in json.loads(output)["hookSpecificOutput"]["additionalContext"], output
+
+    os.environ[stats.STATS_ENV_KEY] = "1"
+    run_hook(session_start, {"session_id": "bench", "source": "startup"})
+    run_hook(user_prompt_submit, {"prompt": "계속", "session_id": "bench"})
+    run_hook(pre_tool_use, {"tool_name": "Read", "tool_input": {"file_path": code}})
+    run_hook(post_tool_use, {"tool_name": "Write", "tool_input": {"file_path": code}})
+    run_hook(subagent_stop, {"agent_type": "implementer"})
+    run_hook(pre_compact, {"session_id": "bench"})
+    run_hook(stop, {"session_id": "bench"})
+
+    records = stats.read_records(path)
+    hooks = [record["hook"] for record in records]
+    assert hooks == ["session_start", "user_prompt_submit", "pre_tool_use", "post_tool_use",
+                     "subagent_stop", "pre_compact", "stop"], hooks
+    for record in records:
+        assert record["wall"] > 0 and "stdin" in record["spans"], record
+        assert sum(record["spans"].values()) <= record["wall"] * len(record["spans"]), record
+    by_hook = {record["hook"]: record for record in records}
+    assert {"state", "output"} <= set(by_hook["user_prompt_submit"]["spans"]), by_hook["user_prompt_submit"]
+    assert "knowledge" in by_hook["session_start"]["spans"], by_hook["session_start"]
+
+    # 훅 밖에서 부른 I/O는 기록하지 않음
+    common.load_state(project_hash)
+    assert len(stats.read_records(path)) == len(records)
+
+    output = run_hook(user_prompt_submit, {"prompt": "/orchestrator stats", "session_id": "bench"})
+    message = json.loads(output)["hookSpecificOutput"]["additionalContext"]
+    assert "| post_tool_use | 1 |" in message and "| user_prompt_submit | user_prompt_submit" not in message, message
+    assert "| session_start | knowledge |" in message, message
+    report_check("hook instrumentation")
+
+
+def check_ring(workdir: Path) -> None:
+    """덮어쓰기, 일정한 파일 크기, capacity 변경, 백분위수"""
+    path = workdir / "ring-check"
+    for i in range(1, 121):
+        stats.append_record(path, {"hook": "stop", "wall": float(i), "spans": {}, "status": 0}, 50)
+        if i == 50:
+            size = path.stat().st_size
+    assert path.stat().st_size == size == stats.RING_HEADER.size + 50 * stats.SLOT_SIZE
+    records = stats.read_records(path)
+    assert [r["wall"] for r in records] == [float(i) for i in range(71, 121)]
+
+    stats.append_record(path, {"hook": "stop", "wall": 1.0, "spans": {}, "status": 0}, 10)
+    assert [r["wall"] for r in stats.read_records(path)] == [1.0], "capacity change starts a new buffer"
+
+    values = [float(i) for i in range(1, 101)]
+    assert [stats.percentile(values, p) for p in stats.PERCENTILES] == [50.0, 95.0, 99.0]
+    long_record = {"hook": "stop", "wall": 1.0, "spans": {f"span{i}": 1.0 for i in range(40)}, "status": 0}
+    assert len(stats.encode_record(long_record)) == stats.SLOT_SIZE
+    report_check("ring buffer")
+
+
+def check_isolation(workdir: Path) -> None:
+    """스레드별 구간 분리, 기록 실패는 훅에 영향 없음"""
+    os.chdir(workdir)
+    os.environ[stats.STATS_ENV_KEY] = "1"
+    path = stats.get_stats_path(common.get_project_hash())
+    path.unlink(missing_ok=True)
+    barrier = threading.Barrier(2)
+
+    def make_hook(name: str, span: str):
+        @stats.timed(span)
+        def work():
+            time.sleep(0.01)
+
+        @stats.instrument_hook(name)
+        def hook():
+            barrier.wait()
+            work()
+            barrier.wait()
+        return hook
+
+    threads = [threading.Thread(target=make_hook(name, span)) for name, span in (("hook_a", "state"), ("hook_b", "knowledge"))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    spans = {record["hook"]: set(record["spans"]) for record in stats.read_records(path)}
+    assert spans == {"hook_a": {"state"}, "hook_b": {"knowledge"}}, spans
+
+    @stats.instrument_hook("hook_c")
+    def hook():
+        return "done"
+
+    saved = stats.write_record
+    stats.write_record = lambda *args: (_ for _ in ()).throw(RuntimeError("stats broken"))
+    try:
+        assert hook() == "done"
+    finally:
+        stats.write_record = saved
+    report_check("thread isolation")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--capacity", type=int, default=2000)
+    args = parser.parse_args()
+
+    with bench_workdir("bench-stats-") as workdir:
+
+        bench_overhead(workdir, args.iterations)
+        bench_write(workdir, args.capacity)
+        print()
+
+        check_hooks(workdir)
+        check_ring(workdir)
+        check_isolation(workdir)
+
+
+if __name__ == "__main__":
+    main()
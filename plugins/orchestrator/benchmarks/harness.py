@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+벤치마크 공통 뼈대
+
+bench_*.py와 run.py, simulate.py가 함께 쓰는 준비/정리 코드를 모은다.
+- bench_workdir: 임시 작업 디렉토리(HOME, XDG_CACHE_HOME 포함)에서 실행하고,
+  끝나면 환경변수 전체와 cwd, 훅 세션 ID를 되돌리고 디렉토리를 지움
+- reset_memos: 콜드 훅처럼 프로세스 메모(파일 메모, state 저장소, sqlite 문서)를 비움
+- report_check: 확인 결과 한 줄 ("xxx check:   ok")
+
+사용 예:
+    with bench_workdir("bench-state-", env={"ORCHESTRATOR_STATE_BACKEND": "sqlite"}) as workdir:
+        ...
+        report_check("roundtrip")
+"""
+
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+# hooks 패키지 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# "xxx check:" 뒤 "ok"를 맞추는 열
+CHECK_COLUMN = 41
+
+
+@contextlib.contextmanager
+def bench_workdir(prefix: str, env: Optional[Dict[str, Optional[str]]] = None, chdir: bool = True) -> Iterator[Path]:
+    """
+    임시 작업 디렉토리에서 실행
+
+    Args:
+        prefix: 임시 디렉토리 이름 접두사 (예: "bench-state-")
+        env: 추가로 바꿀 환경변수 (값이 None이면 지움)
+        chdir: 작업 디렉토리로 이동할지 (False면 cwd만 복원 대상으로 기억)
+    """
+    workdir = Path(tempfile.mkdtemp(prefix=prefix))
+    cwd = os.getcwd()
+    saved_environ = dict(os.environ)
+    try:
+        os.environ["HOME"] = str(workdir)
+        os.environ["XDG_CACHE_HOME"] = str(workdir / "cache")
+        for key, value in (env or {}).items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        if chdir:
+            os.chdir(workdir)
+        yield workdir
+    finally:
+        # hooks는 필요할 때 import (run.py는 러너 RSS가 훅 자식 프로세스에 보이지 않도록 hooks를 늦게 import)
+        from hooks import common
+        common.set_hook_session_id(None)
+        os.environ.clear()
+        os.environ.update(saved_environ)
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def reset_memos(connections: bool = False) -> None:
+    """
+    프로세스 메모를 비워 다음 호출이 콜드 훅처럼 디스크에서 읽게 함
+
+    Args:
+        connections: sqlite 연결도 닫음 (fork한 자식이 부모의 연결을 쓰지 않도록)
+    """
+    from hooks import common
+    from hooks import state_store
+
+    common._FILE_MEMO.clear()
+    common._STATE_STORES.clear()
+    state_store._DOCUMENTS.clear()
+    if connections:
+        for conn in state_store._CONNECTIONS.values():
+            conn.close()
+        state_store._CONNECTIONS.clear()
+
+
+def report_check(name: str, detail: str = "") -> None:
+    """확인 통과 한 줄 출력 (detail은 ok 뒤 괄호 안에)"""
+    print(f"{name + ' check:':<{CHECK_COLUMN}}ok" + (f" ({detail})" if detail else ""))
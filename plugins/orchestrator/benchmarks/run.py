@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+훅 벤치마크 러너 - 실제 훅 스크립트를 현실적인 stdin JSON으로 실행
+
+bench_*.py가 함수 하나씩을 재는 것과 달리, 대용량 fixture를 가진 프로젝트에서
+hooks.json이 부르는 그대로 훅을 실행해 시나리오별로 다음을 잰다.
+- cold: 매번 새 프로세스 (`python3 hooks/client.py <hook>`, 데몬 없음). import와 설정 로드 포함
+- warm: 한 프로세스에서 main()을 반복 (데몬 경로). 첫 실행은 제외
+- peak RSS: 실행한 자식 프로세스의 최대 상주 메모리 (os.wait4 / getrusage ru_maxrss)
+
+fixture (--tasks × --subtasks 계획, --knowledge개 항목)
+- state: Task --tasks개 × Subtask --subtasks개, 앞 절반 완료, 가운데 Task의 첫 Subtask가 test_first
+- knowledge.yaml: decision/pitfall 합쳐 --knowledge개
+- --read-mb MB 소스 파일, 현재 Task의 design-contract.yaml / test-contract.yaml
+
+시나리오마다 fixture를 새로 복사해 시작하므로 실행 순서와 무관하다 (같은 시나리오의
+반복 실행은 앞 실행이 바꾼 state를 이어 쓴다). 결과는 --output으로 JSON 저장해
+--compare로 다른 버전의 결과와 비교한다.
+
+사용법:
+    python3 benchmarks/run.py [--tasks 1000] [--subtasks 20] [--knowledge 10000] [--read-mb 5]
+                              [--cold-runs 5] [--warm-runs 20] [--backend json|sqlite]
+                              [--scenario 이름 ...] [--output results.json] [--compare old.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+
+# 결과 JSON 형식이 바뀌면 올림 (--compare는 같은 버전만 비교)
+RESULTS_VERSION = 1
+
+# SubagentStop을 보내는 에이전트 (orchestrator-config.yaml의 agents)
+AGENT_TYPES = ("code-explore", "planner", "architect", "qa-engineer", "implementer")
+
+SESSION_ID = "bench-run"
+
+
+def peak_rss_kb(usage) -> int:
+    """ru_maxrss -> KB (macOS는 바이트 단위)"""
+    return usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+
+# =============================================================================
+# fixture
+# =============================================================================
+
+def make_state(common, project_hash: str, tasks: int, subtasks: int) -> dict:
+    """앞 절반 Task 완료, 가운데 Task의 첫 Subtask가 test_first인 계획"""
+    state = common.create_initial_state(project_hash, "대용량 계획 벤치마크")
+    current = f"T{tasks // 2 + 1}"
+    state["request"].update({
+        "id": "R1", "status": "active", "global_phase": "task_loop",
+        "current_task": current, "claude_session_id": SESSION_ID,
+    })
+    state["task_order"] = [f"T{t}" for t in range(1, tasks + 1)]
+    state["tasks"] = {}
+    for t in range(1, tasks + 1):
+        task_id = f"T{t}"
+        done = t <= tasks // 2
+        subtask_ids = [f"{task_id}-S{s}" for s in range(1, subtasks + 1)]
+        state["tasks"][task_id] = {
+            "name": f"모듈 {t} 구현",
+            "status": "completed" if done else "pending",
+            "current_subtask": None,
+            "subtask_order": subtask_ids,
+            "subtasks": {
+                subtask_id: {
+                    "name": f"{subtask_id} 기능",
+                    "status": "completed" if done else "pending",
+                    "phase": "complete" if done else "",
+                }
+                for subtask_id in subtask_ids
+            },
+        }
+    task = state["tasks"][current]
+    task.update({"status": "in_progress", "current_subtask": f"{current}-S1"})
+    task["subtasks"][f"{current}-S1"].update({"status": "in_progress", "phase": "test_first"})
+    return state
+
+
+def make_knowledge(common, project_hash: str, entries: int) -> dict:
+    """decision/pitfall 합쳐 entries개"""
+    knowledge = common.create_initial_knowledge(project_hash)
+    knowledge["patterns"] = {"build_tool": "Gradle", "framework": "Spring Boot", "testing": "JUnit5"}
+    for i in range(entries // 2):
+        knowledge["decisions"].append({
+            "id": f"INV-{i}",
+            "decision": f"도메인 모듈 {i}은 인프라 계층을 직접 참조하지 않는다",
+            "rationale": "Design invariant",
+            "created_at": "2026-01-01",
+        })
+    for i in range(entries - entries // 2):
+        knowledge["pitfalls"].append({
+            "id": f"P-test_case_{i}",
+            "description": f"test_case_{i}: NullPointerException in OrderService.place",
+            "reason": "Optional 처리 누락",
+            "learned_from": f"T{i}-S1",
+        })
+    return knowledge
+
+
+def make_source(path: Path, megabytes: float) -> str:
+    """megabytes 크기의 Python 소스 파일"""
+    block = (
+        "import pytest\n\n\n"
+        "class OrderService{0}:\n"
+        "    def place(self, order):\n"
+        "        if order is None:\n"
+        "            raise ValueError('order required')\n"
+        "        return self.repository.save(order)\n\n\n"
+        "def test_place_{0}():\n"
+        "    assert OrderService{0}().place(None) is None\n\n\n"
+    )
+    chunks = []
+    size = 0
+    i = 0
+    while size < megabytes * 1024 * 1024:
+        chunk = block.format(i)
+        chunks.append(chunk)
+        size += len(chunk)
+        i += 1
+    content = "".join(chunks)
+    path.write_text(content, encoding="utf-8")
+    return content
+
+
+def build_fixture(project_dir: Path, args) -> dict:
+    """프로젝트 디렉토리에 fixture를 만들고 시나리오 이름 -> (훅, 페이로드) 반환"""
+    from hooks import common
+    from hooks import contracts
+
+    project_dir.mkdir()
+    os.chdir(project_dir)
+    project_hash = common.get_project_hash()
+
+    state = make_state(common, project_hash, args.tasks, args.subtasks)
+    common.save_state(project_hash, state)
+    common.save_knowledge(project_hash, make_knowledge(common, project_hash, args.knowledge))
+
+    source = project_dir / "src" / "order_service.py"
+    source.parent.mkdir()
+    content = make_source(source, args.read_mb)
+
+    current = state["request"]["current_task"]
+    contracts_path = contracts.get_contracts_path(project_hash) / "R1" / current
+    (contracts_path / f"{current}-S1").mkdir(parents=True)
+    (contracts_path / "design-contract.yaml").write_text("invariants: []\n", encoding="utf-8")
+    test_contract = contracts_path / f"{current}-S1" / "test-contract.yaml"
+    test_contract.write_text(
+        "tests:\n" + "".join(f"  - name: test_place_{i}\n    type: unit\n" for i in range(50)),
+        encoding="utf-8",
+    )
+
+    long_prompt = ("주문 서비스의 결제 실패 처리 로직을 검토해 줘. 재시도 정책과 타임아웃, "
+                   "보상 트랜잭션의 순서를 설명하고 관련 로그를 붙인다.\n") * 600
+    log_lines = "".join(f"2026-10-18T10:{i % 60:02d}:00 ERROR OrderService.place timeout order={i}\n"
+                        for i in range(2000))
+
+    read_input = {"file_path": str(source)}
+    scenarios = {
+        "session_start": ("session_start", {"session_id": SESSION_ID, "source": "startup"}),
+        "user_prompt_submit_long": ("user_prompt_submit", {"session_id": SESSION_ID, "prompt": long_prompt}),
+        "user_prompt_submit_paste": ("user_prompt_submit", {"session_id": SESSION_ID,
+                                                            "prompt": "이 로그 분석해 줘\n" + log_lines}),
+        "user_prompt_submit_resume": ("user_prompt_submit", {"session_id": SESSION_ID,
+                                                             "prompt": "/orchestrator resume"}),
+        "pre_tool_use_read_large": ("pre_tool_use", {"session_id": SESSION_ID, "tool_name": "Read",
+                                                   "tool_input": read_input}),
+        "post_tool_use_read_large": ("post_tool_use", {
+            "session_id": SESSION_ID, "tool_name": "Read", "tool_input": read_input,
+            "tool_response": {"type": "text", "file": {"filePath": str(source), "content": content}},
+        }),
+        "pre_tool_use_write_contract": ("pre_tool_use", {
+            "session_id": SESSION_ID, "tool_name": "Write",
+            "tool_input": {"file_path": str(test_contract), "content": test_contract.read_text(encoding="utf-8")},
+        }),
+        "post_tool_use_write_contract": ("post_tool_use", {
+            "session_id": SESSION_ID, "tool_name": "Write",
+            "tool_input": {"file_path": str(test_contract), "content": test_contract.read_text(encoding="utf-8")},
+        }),
+        "pre_compact": ("pre_compact", {"session_id": SESSION_ID, "trigger": "auto"}),
+        "stop": ("stop", {"session_id": SESSION_ID}),
+    }
+    for agent_type in AGENT_TYPES:
+        scenarios[f"subagent_stop_{agent_type}"] = ("subagent_stop", {"session_id": SESSION_ID,
+                                                                      "agent_type": agent_type})
+    return scenarios
+
+
+def fixture_worker(project_dir: Path, payloads: Path, args) -> None:
+    """--fixture: fixture와 시나리오별 페이로드 파일을 만들고 시나리오 이름 -> 훅 JSON 출력"""
+    scenarios = build_fixture(project_dir, args)
+    payloads.mkdir()
+    for name, (_, payload) in scenarios.items():
+        (payloads / f"{name}.json").write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    print(json.dumps({name: hook for name, (hook, _) in scenarios.items()}))
+
+
+def reset_fixture(project_dir: Path, template: Path) -> None:
+    """프로젝트의 .claude를 fixture 원본으로 되돌림"""
+    shutil.rmtree(project_dir / ".claude", ignore_errors=True)
+    shutil.copytree(template, project_dir / ".claude")
+
+
+# =============================================================================
+# 측정
+# =============================================================================
+
+def run_cold(hook: str, payload_path: Path, project_dir: Path, env: dict, runs: int) -> tuple:
+    """client.py를 매번 새 프로세스로 실행 -> (실행별 ms, 최대 RSS KB, 실패 수)"""
+    client = str(PLUGIN_ROOT / "hooks" / "client.py")
+    times = []
+    rss = 0
+    failures = 0
+    for _ in range(runs):
+        with open(payload_path, "rb") as stdin:
+            start = time.perf_counter()
+            proc = subprocess.Popen([sys.executable, client, hook], cwd=str(project_dir), env=env,
+                                    stdin=stdin, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            _, status, usage = os.wait4(proc.pid, 0)
+            times.append((time.perf_counter() - start) * 1000)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        failures += proc.returncode != 0
+        rss = max(rss, peak_rss_kb(usage))
+    return times, rss, failures
+
+
+def run_warm(hook: str, payload_path: Path, project_dir: Path, env: dict, runs: int) -> tuple:
+    """워커 프로세스 하나에서 main()을 반복 -> (실행별 ms, 최대 RSS KB, 실패 수)"""
+    result = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--worker", hook, str(payload_path), "--warm-runs", str(runs)],
+        cwd=str(project_dir), env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"warm worker failed ({hook}): {result.stderr.strip()[-500:]}")
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report["times"], report["peak_rss_kb"], report["failures"]
+
+
+def worker(hook: str, payload_path: str, runs: int) -> None:
+    """--worker: 현재 프로세스에서 훅 main()을 1 + runs번 실행하고 결과 JSON 출력 (데몬과 같은 경로)"""
+    import importlib
+
+    module = importlib.import_module(f"hooks.{hook}")
+    payload = Path(payload_path).read_bytes()
+    stdout = sys.stdout
+    times = []
+    failures = 0
+    for i in range(runs + 1):
+        sys.stdin = io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8")
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            try:
+                module.main()
+            except SystemExit as e:
+                failures += i > 0 and e.code not in (None, 0)
+        if i > 0:
+            times.append((time.perf_counter() - start) * 1000)
+    sys.stdin = sys.__stdin__
+    stdout.write(json.dumps({
+        "times": times,
+        "peak_rss_kb": peak_rss_kb(resource.getrusage(resource.RUSAGE_SELF)),
+        "failures": failures,
+    }) + "\n")
+
+
+def summarize(times: list, rss: int, failures: int) -> dict:
+    """실행별 ms -> 요약 (p50/p95는 nearest-rank)"""
+    from hooks.stats import percentile
+
+    ordered = sorted(times)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "max_ms": round(ordered[-1], 3),
+        "peak_rss_kb": rss,
+        "failures": failures,
+    }
+
+
+def environment_info(args) -> dict:
+    """결과 비교용 실행 환경과 fixture 크기"""
+    try:
+        commit = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=str(PLUGIN_ROOT),
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    try:
+        version = json.loads((PLUGIN_ROOT / ".claude-plugin" / "plugin.json").read_text(encoding="utf-8"))["version"]
+    except (IOError, ValueError, KeyError):
+        version = ""
+    return {
+        "plugin_version": version,
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "fixture": {"tasks": args.tasks, "subtasks": args.subtasks, "knowledge": args.knowledge,
+                    "read_mb": args.read_mb},
+        "cold_runs": args.cold_runs,
+        "warm_runs": args.warm_runs,
+    }
+
+
+# =============================================================================
+# 출력 / 비교
+# =============================================================================
+
+def print_results(results: dict) -> None:
+    """시나리오별 cold/warm p50, p95와 최대 RSS"""
+    print(f"{'scenario':<32} {'cold p50':>9} {'p95':>9} {'rss MB':>7}   {'warm p50':>9} {'p95':>9} {'rss MB':>7}")
+    for name, entry in results["scenarios"].items():
+        cold, warm = entry["cold"], entry["warm"]
+        failed = " (failed)" if cold["failures"] or warm["failures"] else ""
+        print(f"{name:<32} {cold['p50_ms']:9.1f} {cold['p95_ms']:9.1f} {cold['peak_rss_kb'] / 1024:7.1f}   "
+              f"{warm['p50_ms']:9.1f} {warm['p95_ms']:9.1f} {warm['peak_rss_kb'] / 1024:7.1f}{failed}")
+
+
+def compare_results(old: dict, new: dict) -> None:
+    """이전 결과 대비 p50/RSS 변화 (두 결과에 모두 있는 시나리오만)"""
+    if old.get("version") != RESULTS_VERSION:
+        print(f"compare: 결과 형식 버전이 다릅니다 ({old.get('version')} != {RESULTS_VERSION})")
+        return
+    if old["meta"].get("fixture") != new["meta"].get("fixture") or old["meta"].get("backend") != new["meta"].get("backend"):
+        print("compare: fixture/backend 설정이 다른 결과입니다 (참고용)")
+
+    before = old["meta"].get("commit") or old["meta"].get("created_at", "old")
+    after = new["meta"].get("commit") or new["meta"].get("created_at", "new")
+    print(f"{'scenario':<32} {'mode':<5} {'before p50':>11} {'after p50':>10} {'change':>8} {'rss MB':>15}   ({before} -> {after})")
+    for name, entry in new["scenarios"].items():
+        previous = old["scenarios"].get(name)
+        if previous is None:
+            continue
+        for mode in ("cold", "warm"):
+            a, b = previous[mode], entry[mode]
+            change = (b["p50_ms"] - a["p50_ms"]) / a["p50_ms"] * 100 if a["p50_ms"] else 0.0
+            print(f"{name:<32} {mode:<5} {a['p50_ms']:11.1f} {b['p50_ms']:10.1f} {change:+7.1f}% "
+                  f"{a['peak_rss_kb'] / 1024:7.1f} -> {b['peak_rss_kb'] / 1024:5.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--subtasks", type=int, default=20)
+    parser.add_argument("--knowledge", type=int, default=10000, help="knowledge 항목 수 (decision + pitfall)")
+    parser.add_argument("--read-mb", type=float, default=5.0, help="Read 시나리오의 파일 크기 (MB)")
+    parser.add_argument("--cold-runs", type=int, default=5)
+    parser.add_argument("--warm-runs", type=int, default=20)
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--scenario", action="append", help="이 시나리오만 (여러 번 지정 가능)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--worker", nargs=2, metavar=("HOOK", "PAYLOAD"), help=argparse.SUPPRESS)
+    parser.add_argument("--fixture", nargs=2, metavar=("PROJECT", "PAYLOADS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker[0], args.worker[1], args.warm_runs)
+        return
+    if args.fixture:
+        fixture_worker(Path(args.fixture[0]), Path(args.fixture[1]), args)
+        return
+
+    old = None
+    if args.compare:
+        old = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+
+    from harness import bench_workdir
+
+    cwd = os.getcwd()
+    overrides = {"ORCHESTRATOR_STATE_BACKEND": args.backend, "ORCHESTRATOR_HOOK_DAEMON": None}
+    with bench_workdir("bench-run-", env=overrides, chdir=False) as workdir:
+        # fixture는 별도 프로세스에서 만든다. Linux에서 자식의 ru_maxrss는 fork 시점의
+        # 부모 RSS부터 시작하므로, 러너가 커지면 모든 훅의 RSS가 러너 크기로 보인다
+        project_dir = workdir / "project"
+        payloads = workdir / "payloads"
+        start = time.perf_counter()
+        built = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--fixture", str(project_dir), str(payloads),
+             "--tasks", str(args.tasks), "--subtasks", str(args.subtasks),
+             "--knowledge", str(args.knowledge), "--read-mb", str(args.read_mb)],
+            stdin=subprocess.DEVNULL, capture_output=True, text=True, check=True,
+        )
+        scenarios = json.loads(built.stdout.strip().splitlines()[-1])
+        template = workdir / "fixture"
+        shutil.copytree(project_dir / ".claude", template)
+        print(f"fixture: {args.tasks} tasks x {args.subtasks} subtasks, {args.knowledge} knowledge entries, "
+              f"{args.read_mb:g} MB read ({time.perf_counter() - start:.1f}s, backend {args.backend})")
+
+        selected = args.scenario or list(scenarios)
+        unknown = [name for name in selected if name not in scenarios]
+        if unknown:
+            parser.error(f"unknown scenario: {', '.join(unknown)} (choices: {', '.join(scenarios)})")
+
+        env = dict(os.environ)
+        results = {"version": RESULTS_VERSION, "meta": environment_info(args), "scenarios": {}}
+        for name in selected:
+            hook = scenarios[name]
+            payload_path = payloads / f"{name}.json"
+            results["scenarios"][name] = {"hook": hook, "payload_bytes": payload_path.stat().st_size}
+            for mode, run in (("cold", run_cold), ("warm", run_warm)):
+                reset_fixture(project_dir, template)
+                runs = args.cold_runs if mode == "cold" else args.warm_runs
+                results["scenarios"][name][mode] = summarize(*run(hook, payload_path, project_dir, env, runs))
+
+        print()
+        print_results(results)
+        if args.output:
+            Path(cwd, args.output).write_text(json.dumps(results, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            print(f"\nresults: {args.output}")
+        if old is not None:
+            print()
+            compare_results(old, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+오케스트레이션 워크플로 시뮬레이터 - LLM 없이 실제 훅으로 요청 하나를 끝까지 진행
+
+모의 에이전트가 Contract를 쓰고, 훅은 Claude Code가 부르는 순서 그대로 실행한다.
+1. SessionStart → UserPromptSubmit(트리거)로 요청 생성
+2. Global Discovery: code-explore(explored.yaml), planner(task-breakdown.yaml) → Merge(global_phase task_loop)
+3. Task Loop: 라운드마다 병렬 안내(scheduler.dispatchable) 순서대로 --workers개까지
+   - 설계 전: architect (Task의 design-contract.yaml)
+   - test_first: qa-engineer (test-contract.yaml)
+   - implementation: implementer (소스 Read/Write). 이미 구현했으면 qa-engineer 검증
+   - verification: qa-engineer (test-result.yaml). --fail-rate 비율은 한 번 실패 → 수정 → 통과
+   Write마다 PreToolUse → 파일 쓰기 → PostToolUse, 에이전트마다 SubagentStop, 라운드 끝에 Stop,
+   --prompt-every 라운드마다 UserPromptSubmit(이어서)
+4. 모든 Subtask가 끝나면 요청 완료(global_phase complete) → Stop
+
+측정: 완료한 Subtask당 훅 시간 (훅별 합계, 앞/뒤 10% Subtask 구간 비교)
+확인 (에이전트마다 state를 읽어 검사, 위반은 모아서 출력하고 종료 코드 1):
+- status/phase 일관성, phase는 앞으로만 (설계 → test_first → implementation → verification → complete)
+- 의존하는 Subtask가 모두 끝나기 전에 시작하지 않음 (dependency_graph)
+- Task 상태가 Subtask 상태와 맞음, request.ready가 시작할 수 있는 Subtask 집합과 같음
+- 끝나지 않은 Subtask가 있으면 현재 위치가 끝나지 않은 Subtask
+- 완료한 Subtask는 test-contract.yaml / test-result.yaml이 레지스트리에 있음
+- 훅이 예외 없이 끝나고 출력이 JSON, 게이트가 막지 않음, 라운드마다 진행이 있음 (멈춤 감지)
+
+--breakdown으로 실제 task-breakdown.yaml을 주면 그 계획을 돌려, 오케스트레이터에 맡기기 전에
+라운드 수와 훅 시간을 가늠할 수 있다.
+
+사용법:
+    python3 benchmarks/simulate.py [--tasks 25] [--subtasks 20] [--deps serial|dag] [--workers 4]
+                                   [--fail-rate 0.1] [--prompt-every 5] [--backend json|sqlite] [--cold]
+                                   [--breakdown task-breakdown.yaml] [--output result.json]
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import traceback
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yaml
+
+from hooks import common
+from hooks import contracts
+from hooks import scheduler
+from hooks.state_store import StateSession
+
+from harness import bench_workdir, report_check
+
+
+PLUGIN_ROOT = Path(__file__).resolve().parent.parent
+
+SESSION_ID = "simulate"
+
+# Subtask phase 순서 (앞으로만 진행)
+PHASE_ORDER = {"": 0, "test_first": 1, "implementation": 2, "verification": 3, "complete": 4}
+
+# 진행 없는 라운드가 이만큼 이어지면 멈춘 것으로 보고 중단
+MAX_STALLED_ROUNDS = 3
+
+
+class HookRunner:
+    """훅 실행과 시간 기록 (warm: 프로세스 안에서 main, cold: 매번 client.py 새 프로세스)"""
+
+    def __init__(self, cold: bool):
+        self.cold = cold
+        self.calls = []
+        self.violations = []
+
+    def run(self, hook: str, payload: dict) -> str:
+        """훅 한 번 실행 → stdout (예외, 실패 종료, JSON이 아닌 출력은 위반)"""
+        data = json.dumps(payload, ensure_ascii=False)
+        error = ""
+        start = time.perf_counter()
+        if self.cold:
+            proc = subprocess.run([sys.executable, str(PLUGIN_ROOT / "hooks" / "client.py"), hook],
+                                  input=data.encode("utf-8"), capture_output=True)
+            output = proc.stdout.decode("utf-8", errors="replace")
+            if proc.returncode != 0:
+                error = f"exit {proc.returncode}: {proc.stderr.decode('utf-8', errors='replace').strip()[-300:]}"
+        else:
+            module = importlib.import_module(f"hooks.{hook}")
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+                sys.stdin = io.StringIO(data)
+                try:
+                    module.main()
+                except SystemExit as e:
+                    if e.code not in (None, 0):
+                        error = f"exit {e.code}"
+                except Exception:
+                    error = traceback.format_exc(limit=3).strip().splitlines()[-1]
+                finally:
+                    sys.stdin = sys.__stdin__
+            output = stdout.getvalue()
+        self.calls.append((hook, (time.perf_counter() - start) * 1000))
+
+        if not error and output.strip():
+            try:
+                json.loads(output)
+            except ValueError:
+                error = f"non-JSON output: {output.strip()[:120]}"
+        if error:
+            self.violations.append(f"{hook} failed: {error}")
+        return output
+
+    @property
+    def total_ms(self) -> float:
+        return sum(ms for _, ms in self.calls)
+
+
+# =============================================================================
+# 계획
+# =============================================================================
+
+def make_breakdown(tasks: int, subtasks: int, deps: str, seed: int) -> dict:
+    """
+    모의 Planner의 task-breakdown.yaml
+
+    - serial: depends_on 없음 (이전처럼 순서대로 하나씩)
+    - dag: Task 안의 Subtask는 서로 독립, Task는 앞 Task 하나의 Subtask 2개에 의존
+    """
+    rng = random.Random(seed)
+    entries = []
+    for t in range(1, tasks + 1):
+        task_id = f"T{t}"
+        task = {"id": task_id, "name": f"모듈 {t}", "subtasks": []}
+        for s in range(1, subtasks + 1):
+            subtask = {"id": f"{task_id}-S{s}", "name": f"모듈 {t} 기능 {s}"}
+            if deps == "dag":
+                subtask["depends_on"] = []
+            task["subtasks"].append(subtask)
+        if deps == "dag" and t > 1:
+            previous = f"T{rng.randint(max(1, t - 3), t - 1)}"
+            task["depends_on"] = [f"{previous}-S{s}" for s in rng.sample(range(1, subtasks + 1), min(2, subtasks))]
+        entries.append(task)
+    return {"task_breakdown": {"request_id": "R1", "tasks": entries, "task_order": [e["id"] for e in entries]}}
+
+
+# =============================================================================
+# 모의 에이전트
+# =============================================================================
+
+class Simulation:
+    """요청 하나를 훅으로 진행하는 모의 오케스트레이터"""
+
+    def __init__(self, project_dir: Path, args):
+        self.project_dir = project_dir
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.runner = HookRunner(args.cold)
+        self.project_hash = common.get_project_hash()
+        self.request_id = ""
+        self.rounds = 0
+        self.agents = {}
+        self.implemented = set()
+        self.failed_once = set()
+        self.completions = []
+        self.last_phases = {}
+
+    # 도구 / 에이전트 -----------------------------------------------------------
+
+    def write(self, path: Path, text: str) -> str:
+        """Write 도구: PreToolUse → (허용되면) 파일 쓰기 → PostToolUse"""
+        tool_input = {"file_path": str(path), "content": text}
+        decision = self.runner.run("pre_tool_use", {"session_id": SESSION_ID, "tool_name": "Write",
+                                                    "tool_input": tool_input})
+        if '"deny"' in decision:
+            self.runner.violations.append(f"PreToolUse denied Write {path.name}: {decision.strip()[:200]}")
+            return ""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        output = self.runner.run("post_tool_use", {"session_id": SESSION_ID, "tool_name": "Write",
+                                                   "tool_input": tool_input,
+                                                   "tool_response": {"filePath": str(path), "success": True}})
+        if '"decision": "block"' in output:
+            self.runner.violations.append(f"PostToolUse blocked {path.relative_to(self.project_dir)}: "
+                                          f"{json.loads(output).get('reason', '').strip()[:200]}")
+        return output
+
+    def read(self, path: Path) -> None:
+        """Read 도구: PreToolUse → PostToolUse (내용은 tool_response)"""
+        tool_input = {"file_path": str(path)}
+        self.runner.run("pre_tool_use", {"session_id": SESSION_ID, "tool_name": "Read", "tool_input": tool_input})
+        self.runner.run("post_tool_use", {
+            "session_id": SESSION_ID, "tool_name": "Read", "tool_input": tool_input,
+            "tool_response": {"type": "text", "file": {"filePath": str(path),
+                                                        "content": path.read_text(encoding="utf-8")}},
+        })
+
+    def agent_stop(self, agent_type: str) -> None:
+        self.agents[agent_type] = self.agents.get(agent_type, 0) + 1
+        self.runner.run("subagent_stop", {"session_id": SESSION_ID, "agent_type": agent_type,
+                                          "agent_id": f"{agent_type}-{self.agents[agent_type]}"})
+
+    def contract_path(self, *parts: str) -> Path:
+        return contracts.get_contracts_path(self.project_hash) / self.request_id / Path(*parts)
+
+    def architect(self, task_id: str) -> None:
+        self.write(self.contract_path(task_id, "design-contract.yaml"), yaml.safe_dump({
+            "task_id": task_id,
+            "interfaces": [{"name": f"{task_id}Service", "methods": ["handle"]}],
+            "invariants": [{
+                "id": f"INV-{task_id}",
+                "rule": f"{task_id} 모듈은 다른 모듈의 내부 구현을 import하지 않는다",
+                "files": [f"src/{task_id.lower()}/*.py"],
+                "forbid": ["^from src\\.\\w+\\._internal"],
+            }],
+        }, allow_unicode=True, sort_keys=False))
+        self.agent_stop("architect")
+
+    def write_tests(self, task_id: str, subtask_id: str) -> None:
+        self.write(self.contract_path(task_id, subtask_id, "test-contract.yaml"), yaml.safe_dump({
+            "subtask_id": subtask_id,
+            "tests": [{"name": f"test_{subtask_id.lower().replace('-', '_')}_{i}", "type": "unit"} for i in range(5)],
+        }, sort_keys=False))
+        self.agent_stop("qa-engineer")
+
+    def implement(self, task_id: str, subtask_id: str) -> None:
+        self.read(self.project_dir / "src" / "__init__.py")
+        module = subtask_id.lower().replace("-", "_")
+        self.write(self.project_dir / "src" / task_id.lower() / f"{module}.py",
+                   f"def handle_{module}(event):\n    return {{'subtask': '{subtask_id}', 'event': event}}\n")
+        self.implemented.add(subtask_id)
+        self.agent_stop("implementer")
+
+    def verify(self, task_id: str, subtask_id: str) -> None:
+        fail = subtask_id not in self.failed_once and self.rng.random() < self.args.fail_rate
+        result = {"subtask_id": subtask_id, "execution": {"result": "fail" if fail else "pass", "total": 5,
+                                                         "passed": 4 if fail else 5}}
+        if fail:
+            self.failed_once.add(subtask_id)
+            self.implemented.discard(subtask_id)
+            result["failed_tests"] = [{"name": f"test_{subtask_id.lower()}_timeout", "reason": "TimeoutError",
+                                       "suggestion": "재시도 간격 설정 누락"}]
+        self.write(self.contract_path(task_id, subtask_id, "test-result.yaml"), yaml.safe_dump(result, sort_keys=False))
+        self.agent_stop("qa-engineer")
+
+    # 흐름 -------------------------------------------------------------------
+
+    def start(self, breakdown: dict) -> None:
+        """세션 시작 → 요청 생성 → Global Discovery → Merge"""
+        self.runner.run("session_start", {"session_id": SESSION_ID, "source": "startup"})
+        self.runner.run("user_prompt_submit", {"session_id": SESSION_ID,
+                                               "prompt": "/orchestrator 주문/결제 모듈을 구현해줘"})
+        state = self.load()
+        self.request_id = state.get("request", {}).get("id") or "R1"
+        if state.get("request", {}).get("global_phase") != "global_discovery":
+            self.runner.violations.append(f"trigger prompt did not start global_discovery: {state.get('request')}")
+
+        self.read(self.project_dir / "src" / "__init__.py")
+        self.write(self.contract_path("explored.yaml"), yaml.safe_dump({
+            "explored": {"structure": ["src/"], "build_tool": "pip", "test_framework": "pytest"},
+        }, sort_keys=False))
+        self.agent_stop("code-explore")
+        self.write(self.contract_path("task-breakdown.yaml"), yaml.safe_dump(breakdown, allow_unicode=True,
+                                                                             sort_keys=False))
+        self.agent_stop("planner")
+
+        # Merge: 오케스트레이터가 두 결과를 검토하고 global_phase를 task_loop로 (session.md의 갱신 시점)
+        self.write(self.contract_path("design-brief.yaml"), "design_brief:\n  summary: merged\n")
+        with StateSession(self.project_hash) as session:
+            session.set(("request", "global_phase"), "task_loop")
+        self.runner.run("stop", {"session_id": SESSION_ID})
+        self.check()
+
+    def round(self) -> int:
+        """병렬 안내를 따라 에이전트를 --workers개까지 → 부른 에이전트 수"""
+        state = self.load()
+        batch = []
+        designing = set()
+        for work in scheduler.dispatchable(self.project_hash, state):
+            if len(batch) >= self.args.workers:
+                break
+            if not work["phase"]:
+                # Task 설계 하나가 그 Task에서 시작할 수 있는 Subtask 모두를 test_first로
+                if work["task_id"] in designing:
+                    continue
+                designing.add(work["task_id"])
+            batch.append(work)
+
+        for work in batch:
+            task_id, subtask_id, phase = work["task_id"], work["subtask_id"], work["phase"]
+            if not phase:
+                self.architect(task_id)
+            elif phase == "test_first":
+                self.write_tests(task_id, subtask_id)
+            elif phase == "implementation" and subtask_id not in self.implemented:
+                self.implement(task_id, subtask_id)
+            elif phase == "verification" and subtask_id not in self.implemented:
+                # 검증 실패 → 수정
+                self.implement(task_id, subtask_id)
+            else:
+                self.verify(task_id, subtask_id)
+            self.check()
+
+        self.rounds += 1
+        self.runner.run("stop", {"session_id": SESSION_ID})
+        if self.args.prompt_every and self.rounds % self.args.prompt_every == 0:
+            self.runner.run("user_prompt_submit", {"session_id": SESSION_ID, "prompt": "계속"})
+        return len(batch)
+
+    def run(self, breakdown: dict) -> None:
+        self.start(breakdown)
+        stalled = 0
+        while True:
+            before = self.last_phases.copy()
+            called = self.round()
+            if not called:
+                break
+            stalled = stalled + 1 if self.last_phases == before else 0
+            if stalled >= MAX_STALLED_ROUNDS:
+                stuck = sorted(s for s, (status, _) in self.last_phases.items() if status != "completed")
+                self.runner.violations.append(
+                    f"no progress for {stalled} rounds: {len(stuck)} subtasks left, e.g. "
+                    + ", ".join(f"{s} {self.last_phases[s]}" for s in stuck[:5]))
+                break
+
+        pending = [s for s, (status, _) in self.last_phases.items() if status != "completed"]
+        if pending and not any("no progress" in v for v in self.runner.violations):
+            self.runner.violations.append(f"nothing to dispatch but {len(pending)} subtasks left: {pending[:5]}")
+
+        # 요청 완료 (session.md: Request 완료 시 global_phase complete)
+        if not pending:
+            with StateSession(self.project_hash) as session:
+                session.set(("request", "global_phase"), "complete")
+                session.set(("request", "status"), "completed")
+        self.runner.run("pre_compact", {"session_id": SESSION_ID, "trigger": "auto"})
+        self.runner.run("stop", {"session_id": SESSION_ID})
+
+    # 검사 -------------------------------------------------------------------
+
+    def load(self) -> dict:
+        return common.load_state(self.project_hash) or {}
+
+    def check(self) -> None:
+        """state 불변 조건 검사 (위반은 runner.violations에 추가)"""
+        state = self.load()
+        violations = self.runner.violations
+        where = f"round {self.rounds}"
+        graph = scheduler.dependency_graph(state)
+        registry = state.get("contracts") or {}
+        statuses = {subtask_id: subtask.get("status") or "pending"
+                    for _, subtask_id, subtask in scheduler.iter_subtasks(state)}
+        phases = {}
+
+        for task_id, subtask_id, subtask in scheduler.iter_subtasks(state):
+            status, phase = subtask.get("status") or "pending", subtask.get("phase") or ""
+            phases[subtask_id] = (status, phase)
+            if (status == "completed") != (phase == "complete") or (status == "pending" and phase):
+                violations.append(f"{where}: {subtask_id} status {status} with phase '{phase}'")
+            previous = self.last_phases.get(subtask_id)
+            if previous and PHASE_ORDER.get(phase, -1) < PHASE_ORDER.get(previous[1], -1):
+                violations.append(f"{where}: {subtask_id} phase went back {previous[1]} → {phase}")
+            if status != "pending":
+                waiting = [d for d in graph.get(subtask_id, []) if statuses.get(d) != "completed"]
+                if waiting:
+                    violations.append(f"{where}: {subtask_id} {status} before dependencies {waiting[:3]} completed")
+            if status == "completed":
+                if previous is None or previous[0] != "completed":
+                    self.completions.append((subtask_id, self.runner.total_ms))
+                for name in ("test-contract.yaml", "test-result.yaml"):
+                    if f"{self.request_id}/{task_id}/{subtask_id}/{name}" not in registry:
+                        violations.append(f"{where}: {subtask_id} completed without {name} in registry")
+
+        for task_id, task in state.get("tasks", {}).items():
+            statuses = {s.get("status") or "pending" for s in task.get("subtasks", {}).values()}
+            expected = ("completed" if statuses == {"completed"} else
+                        "pending" if statuses <= {"pending"} else "in_progress")
+            if (task.get("status") or "pending") != expected:
+                violations.append(f"{where}: {task_id} status {task.get('status')} but subtasks {sorted(statuses)}")
+
+        request = state.get("request", {})
+        if request.get("global_phase") == "task_loop":
+            ready = scheduler.ready_subtasks(state, graph)
+            if sorted(request.get("ready") or []) != sorted(ready):
+                violations.append(f"{where}: request.ready {(request.get('ready') or [])[:5]} != ready {ready[:5]}")
+            open_subtasks = [s for s, (status, _) in phases.items() if status != "completed"]
+            current = (state.get("tasks", {}).get(request.get("current_task")) or {}).get("current_subtask")
+            if open_subtasks and phases.get(current, ("completed", ""))[0] == "completed":
+                violations.append(f"{where}: current subtask {current} is not an open subtask")
+        self.last_phases = phases
+
+
+# =============================================================================
+# 결과
+# =============================================================================
+
+def report(sim: Simulation, breakdown: dict, elapsed: float) -> dict:
+    """완료 Subtask당 훅 시간, 훅별 합계, 앞/뒤 10% 구간"""
+    runner = sim.runner
+    completed = len(sim.completions)
+    per_hook = {}
+    for hook, ms in runner.calls:
+        entry = per_hook.setdefault(hook, {"calls": 0, "total_ms": 0.0})
+        entry["calls"] += 1
+        entry["total_ms"] += ms
+    for entry in per_hook.values():
+        entry["mean_ms"] = round(entry["total_ms"] / entry["calls"], 3)
+        entry["total_ms"] = round(entry["total_ms"], 1)
+
+    decile = {}
+    if completed >= 10:
+        n = completed // 10
+        first = sim.completions[n - 1][1] / n
+        last = (sim.completions[-1][1] - sim.completions[-n - 1][1]) / n
+        decile = {"subtasks": n, "first_ms_per_subtask": round(first, 1), "last_ms_per_subtask": round(last, 1)}
+
+    root = breakdown.get("task_breakdown", breakdown)
+    return {
+        "plan": {"tasks": len(root.get("tasks", [])),
+                 "subtasks": sum(len(t.get("subtasks") or []) for t in root.get("tasks", [])),
+                 "deps": sim.args.deps if not sim.args.breakdown else sim.args.breakdown,
+                 "workers": sim.args.workers, "fail_rate": sim.args.fail_rate,
+                 "backend": sim.args.backend, "mode": "cold" if sim.args.cold else "warm"},
+        "completed_subtasks": completed,
+        "rounds": sim.rounds,
+        "agents": sim.agents,
+        "hook_calls": len(runner.calls),
+        "hook_ms_total": round(runner.total_ms, 1),
+        "hook_ms_per_subtask": round(runner.total_ms / completed, 1) if completed else None,
+        "per_hook": dict(sorted(per_hook.items(), key=lambda item: -item[1]["total_ms"])),
+        "decile": decile,
+        "wall_seconds": round(elapsed, 1),
+        "violations": runner.violations,
+    }
+
+
+def print_report(result: dict) -> None:
+    plan = result["plan"]
+    print(f"plan: {plan['tasks']} tasks, {plan['subtasks']} subtasks ({plan['deps']}), "
+          f"{plan['workers']} workers, fail rate {plan['fail_rate']:g}, {plan['backend']} backend, {plan['mode']} hooks")
+    print(f"completed {result['completed_subtasks']} subtasks in {result['rounds']} rounds "
+          f"({sum(result['agents'].values())} agent runs, {result['hook_calls']} hook calls, "
+          f"{result['wall_seconds']}s wall)")
+    if result["hook_ms_per_subtask"] is not None:
+        print(f"hook overhead: {result['hook_ms_total'] / 1000:.1f}s total, "
+              f"{result['hook_ms_per_subtask']:.1f} ms per completed subtask")
+    if result["decile"]:
+        decile = result["decile"]
+        print(f"first {decile['subtasks']} subtasks {decile['first_ms_per_subtask']:.1f} ms/subtask   "
+              f"last {decile['subtasks']} subtasks {decile['last_ms_per_subtask']:.1f} ms/subtask")
+    print()
+    print(f"{'hook':<20} {'calls':>6} {'total s':>8} {'mean ms':>8}")
+    for hook, entry in result["per_hook"].items():
+        print(f"{hook:<20} {entry['calls']:6d} {entry['total_ms'] / 1000:8.2f} {entry['mean_ms']:8.2f}")
+    print()
+    if result["violations"]:
+        print(f"invariant violations: {len(result['violations'])}")
+        for violation in result["violations"][:20]:
+            print(f"- {violation}")
+    else:
+        report_check("state machine invariants")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=25)
+    parser.add_argument("--subtasks", type=int, default=20)
+    parser.add_argument("--deps", choices=("serial", "dag"), default="dag", help="생성 계획의 의존성")
+    parser.add_argument("--workers", type=int, default=4, help="라운드마다 병렬로 부를 에이전트 수")
+    parser.add_argument("--fail-rate", type=float, default=0.1, help="검증이 한 번 실패하는 Subtask 비율")
+    parser.add_argument("--prompt-every", type=int, default=5, help="이 라운드마다 사용자 프롬프트 (0이면 없음)")
+    parser.add_argument("--backend", choices=("json", "sqlite"), default="json")
+    parser.add_argument("--cold", action="store_true", help="훅을 매번 새 프로세스(client.py)로 실행")
+    parser.add_argument("--breakdown", help="생성 대신 이 task-breakdown.yaml 계획으로")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.breakdown:
+        breakdown = yaml.safe_load(Path(args.breakdown).read_text(encoding="utf-8"))
+    else:
+        breakdown = make_breakdown(args.tasks, args.subtasks, args.deps, args.seed)
+
+    cwd = os.getcwd()
+    overrides = {"ORCHESTRATOR_STATE_BACKEND": args.backend, "ORCHESTRATOR_HOOK_DAEMON": None}
+    with bench_workdir("simulate-", env=overrides) as workdir:
+        project_dir = workdir / "project"
+        (project_dir / "src").mkdir(parents=True)
+        (project_dir / "src" / "__init__.py").write_text("import pytest\n\n__all__ = []\n", encoding="utf-8")
+        os.chdir(project_dir)
+
+        sim = Simulation(project_dir, args)
+        start = time.perf_counter()
+        sim.run(breakdown)
+        result = report(sim, breakdown, time.perf_counter() - start)
+        print_report(result)
+        if args.output:
+            Path(cwd, args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2) + "\n",
+                                              encoding="utf-8")
+
+    if result["violations"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,31 @@ Claude Code Hooks를 통한 세션 제어 시스템.
 - PostToolUse: knowledge.yaml 자동 업데이트 및 코드 패턴 분석
 - PreCompact: 컨텍스트 압축 전 세션 상태 주입
 - SubagentStop: 서브에이전트 결과 수집
+- PreToolUse: 위험 명령어/민감 파일/보호 디렉토리 정책 검증
+
+실행 방식:
+- client.py: hooks.json에서 호출되는 얇은 진입점 (데몬 전달 또는 프로세스 내 실행)
+- daemon.py: 프로젝트별 상주 데몬 (ORCHESTRATOR_HOOK_DAEMON=1 일 때)
+
+저장소:
+- state_store.py: 세션 상태 저장소 (요청별 state.json 또는 SQLite state.db)
+- request_index.py: 요청 인덱스 (진행 중인 요청 목록, 현재 요청 조회/전환)
+- analysis_cache.py: Read 패턴 분석 결과 캐시
+- knowledge_flush.py: knowledge delta 로그 백그라운드 압축 (PostToolUse가 띄움)
+- serializer.py: YAML 직렬화 (libyaml / 표준 라이브러리 대체 구현, marshal 스냅샷)
+- injection.py: UserPromptSubmit 컨텍스트 주입 기록 (변경분 주입, 토큰 예산)
+- contracts.py: Contract 레지스트리 (게이트/SubagentStop 존재 확인, verify 재구성)
+- gates.py: GATE-3 스코프 해시 / GATE-4 불변 조건 증분 검사
+- locking.py: 프로세스 간 파일 잠금 (state/인덱스/knowledge 읽기-수정-쓰기)
+- scheduler.py: Subtask 의존성(depends_on) 스케줄러 (ready 집합, 병렬 진행 안내, 임계 경로 순서)
+- durations.py: Subtask phase 소요 시간 기록과 남은 시간 추정
+- stats.py: 훅 지연 시간 계측 (링 버퍼 기록, /orchestrator stats)
+
+규칙:
+- patterns.py: 코드 패턴 감지 규칙 팩
+- learn.py: 프로젝트 전체 패턴 학습 (/orchestrator learn, learn-manifest.json 기반 증분)
 
 STUB (향후 구현):
-- PreToolUse: 도구 실행 전 검증
 - UserPromptSubmit: 키워드 감지
 - Notification: 외부 알림
 """
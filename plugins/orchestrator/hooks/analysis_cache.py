@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - Read 패턴 분석 캐시
+
+PostToolUse(Read)는 읽은 파일에서 코드 패턴을 감지해 knowledge에 반영한다.
+같은 파일을 다시 읽을 때마다 디스크에서 다시 읽고 전체를 스캔하지 않도록
+프로젝트별 analysis-cache.json에 파일별 분석 결과를 기록한다.
+
+- (mtime_ns, size)가 같으면 파일을 읽지도 스캔하지도 않음
+- 바뀌었어도 내용 해시가 같으면 (git checkout 등) 스캔하지 않음
+- 파일 내용은 가능하면 훅 입력의 tool_response에서 가져오고, 없을 때만 디스크에서 읽음
+
+캐시에 있는 파일의 패턴은 이미 knowledge에 반영된 것으로 본다.
+knowledge가 지워졌거나 패턴 규칙 팩이 바뀌었으면 캐시도 무시한다.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from hooks.common import (
+    atomic_write_text,
+    detect_code_patterns,
+    get_knowledge_delta_path,
+    get_knowledge_path,
+    memo_load,
+    memo_store,
+    _file_signature,
+)
+from hooks.patterns import get_pattern_scanner
+
+
+# 분석 규칙이나 캐시 형식이 바뀌면 올려서 이전 캐시를 무효화
+ANALYSIS_CACHE_VERSION = 1
+
+# 파일 수가 이보다 많으면 오래 전에 본 파일부터 제거
+MAX_ANALYSIS_CACHE_ENTRIES = 2000
+
+
+def get_analysis_cache_path(project_hash: str) -> Path:
+    """프로젝트별 분석 캐시 경로 (knowledge.yaml 옆)"""
+    return get_knowledge_path(project_hash).with_name("analysis-cache.json")
+
+
+def content_digest(content: str) -> str:
+    """파일 내용 해시 (mtime만 바뀐 경우 판별용)"""
+    return hashlib.blake2b(content.encode("utf-8", errors="surrogatepass"), digest_size=16).hexdigest()
+
+
+def content_from_tool_response(tool_response: Any) -> Optional[str]:
+    """
+    Read 도구 응답에 파일 전체 내용이 있으면 반환.
+
+    offset/limit으로 일부만 읽은 경우는 None (디스크에서 다시 읽어야 함).
+    """
+    if not isinstance(tool_response, dict):
+        return None
+    file_info = tool_response.get("file")
+    if not isinstance(file_info, dict):
+        return None
+
+    content = file_info.get("content")
+    if not isinstance(content, str):
+        return None
+
+    start_line = file_info.get("startLine", 1)
+    num_lines = file_info.get("numLines")
+    total_lines = file_info.get("totalLines")
+    if start_line not in (None, 0, 1):
+        return None
+    if isinstance(num_lines, int) and isinstance(total_lines, int) and num_lines < total_lines:
+        return None
+    return content
+
+
+class AnalysisCache:
+    """파일 경로 → {mtime_ns, size, digest, patterns}"""
+
+    def __init__(self, project_hash: str):
+        self.project_hash = project_hash
+        self.path = get_analysis_cache_path(project_hash)
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = self._load()
+        return self._entries
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        # knowledge가 없으면 예전에 반영한 패턴도 없으므로 처음부터 다시 분석
+        if not get_knowledge_path(self.project_hash).exists() and \
+                not get_knowledge_delta_path(self.project_hash).exists():
+            return {}
+        try:
+            data = memo_load(self.path, json.loads)
+        except (ValueError, IOError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != ANALYSIS_CACHE_VERSION:
+            return {}
+        if data.get("rules") != get_pattern_scanner().signature:
+            return {}
+        entries = data.get("entries")
+        return entries if isinstance(entries, dict) else {}
+
+    def lookup(self, file_path: str, signature: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """파일이 그대로면 이전 분석 결과 반환"""
+        entry = self.entries.get(file_path)
+        if entry and (entry.get("mtime_ns"), entry.get("size")) == tuple(signature):
+            return entry.get("patterns") or {}
+        return None
+
+    def lookup_digest(self, file_path: str, digest: str) -> Optional[Dict[str, Any]]:
+        """mtime은 바뀌었어도 내용이 같으면 이전 분석 결과 반환"""
+        entry = self.entries.get(file_path)
+        if entry and entry.get("digest") == digest:
+            return entry.get("patterns") or {}
+        return None
+
+    def record(self, file_path: str, signature: Tuple[int, int], digest: str, patterns: Dict[str, Any]) -> None:
+        entries = self.entries
+        # 최근에 본 파일이 뒤로 가도록 다시 삽입
+        entries.pop(file_path, None)
+        entries[file_path] = {
+            "mtime_ns": signature[0],
+            "size": signature[1],
+            "digest": digest,
+            "patterns": patterns,
+        }
+        while len(entries) > MAX_ANALYSIS_CACHE_ENTRIES:
+            entries.pop(next(iter(entries)))
+        self._dirty = True
+
+    def save(self) -> bool:
+        if not self._dirty:
+            return True
+        data = {
+            "version": ANALYSIS_CACHE_VERSION,
+            "rules": get_pattern_scanner().signature,
+            "entries": self.entries,
+        }
+        try:
+            written = atomic_write_text(self.path, json.dumps(data, ensure_ascii=False))
+            memo_store(self.path, data, written)
+        except OSError:
+            return False
+        self._dirty = False
+        return True
+
+
+def analyze_read(file_path: str, tool_response: Any, cache: AnalysisCache) -> Optional[Dict[str, Any]]:
+    """
+    Read한 파일의 코드 패턴 분석 (캐시 사용)
+
+    Returns:
+        새로 분석한 패턴. 이미 분석한 파일이거나 읽을 수 없으면 None
+    """
+    signature = _file_signature(Path(file_path))
+    if signature is None:
+        return None
+    if cache.lookup(file_path, signature) is not None:
+        return None
+
+    content = content_from_tool_response(tool_response)
+    if content is None:
+        try:
+            content = Path(file_path).read_text(encoding="utf-8")
+        except (IOError, UnicodeDecodeError):
+            return None
+
+    digest = content_digest(content)
+    cached = cache.lookup_digest(file_path, digest)
+    if cached is not None:
+        cache.record(file_path, signature, digest, cached)
+        return None
+
+    patterns = detect_code_patterns(file_path, content)
+    cache.record(file_path, signature, digest, patterns)
+    return patterns
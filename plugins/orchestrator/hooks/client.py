@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Hook Client - 상주 데몬으로 훅 이벤트를 전달하는 얇은 진입점
+
+hooks.json의 모든 훅은 `client.py <hook>` 형태로 실행되어:
+1. 데몬이 켜져 있으면 stdin 페이로드와 훅 관련 환경변수를 프로젝트별 Unix 소켓으로 전달하고
+   응답을 그대로 출력 (데몬은 호출마다 그 환경변수를 적용했다가 되돌림)
+2. 데몬이 없으면 백그라운드로 기동시키고, 이번 호출은 기존처럼 프로세스 안에서 처리
+
+PyYAML, hooks.common 등 무거운 모듈은 데몬 경로에서 import하지 않는다.
+데몬 사용은 ORCHESTRATOR_HOOK_DAEMON=1 환경변수로 활성화한다.
+"""
+
+import hashlib
+import io
+import json
+import os
+import socket
+import sys
+
+# hooks 패키지 경로 추가
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 데몬 사용 여부 환경변수
+DAEMON_ENV_KEY = "ORCHESTRATOR_HOOK_DAEMON"
+
+# 플러그인 업데이트 후 이전 버전 데몬과 섞이지 않도록 소켓 이름에 포함
+DAEMON_PROTOCOL_VERSION = "2"
+
+# 데몬 응답 대기 시간 (초). 넘기면 프로세스 내 경로로 처리
+CONNECT_TIMEOUT = 0.2
+RESPONSE_TIMEOUT = 30.0
+
+# 호출마다 데몬에 전달하는 환경변수 (데몬을 띄운 훅이 아니라 이번 호출의 값을 따름)
+FORWARDED_ENV_PREFIXES = ("CLAUDE_", "ORCHESTRATOR_")
+FORWARDED_ENV_KEYS = ("HOME", "XDG_CACHE_HOME")
+
+HOOK_MODULES = (
+    "session_start",
+    "user_prompt_submit",
+    "pre_tool_use",
+    "post_tool_use",
+    "pre_compact",
+    "subagent_stop",
+    "stop",
+    "notification",
+)
+
+
+def is_daemon_enabled() -> bool:
+    """데몬 사용 여부"""
+    return os.environ.get(DAEMON_ENV_KEY, "").lower() in ("1", "true", "yes")
+
+
+def is_forwarded_env_key(key: str) -> bool:
+    """데몬에 전달하는 환경변수 여부"""
+    return key.startswith(FORWARDED_ENV_PREFIXES) or key in FORWARDED_ENV_KEYS
+
+
+def forwarded_environ() -> dict:
+    """이번 호출의 훅 관련 환경변수"""
+    return {key: value for key, value in os.environ.items() if is_forwarded_env_key(key)}
+
+
+def get_daemon_socket_path(cwd: str = None) -> str:
+    """
+    프로젝트별 데몬 소켓 경로
+
+    AF_UNIX 경로 길이 제한(약 100자) 때문에 프로젝트 디렉토리가 아닌
+    사용자별 임시 디렉토리 아래에 둔다.
+    """
+    cwd = cwd or os.getcwd()
+    project_hash = hashlib.md5(cwd.encode()).hexdigest()[:8]
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    run_dir = os.path.join(os.environ.get("TMPDIR") or "/tmp", f"orchestrator-{uid}")
+    return os.path.join(run_dir, f"{project_hash}-v{DAEMON_PROTOCOL_VERSION}.sock")
+
+
+def _recv_all(sock: socket.socket) -> bytes:
+    """소켓이 닫힐 때까지 읽기"""
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def request_daemon(hook: str, payload: bytes) -> dict:
+    """
+    데몬에 훅 실행 요청
+
+    Returns:
+        {"stdout": str, "stderr": str, "exit_code": int} 또는 데몬이 없으면 None
+    """
+    socket_path = get_daemon_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+
+    request = json.dumps({
+        "hook": hook,
+        "cwd": os.getcwd(),
+        "payload": payload.decode("utf-8", errors="replace"),
+        "env": forwarded_environ(),
+    }).encode("utf-8")
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(socket_path)
+            sock.settimeout(RESPONSE_TIMEOUT)
+            sock.sendall(request)
+            sock.shutdown(socket.SHUT_WR)
+            reply = json.loads(_recv_all(sock).decode("utf-8"))
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(reply, dict) or reply.get("error"):
+        return None
+    return reply
+
+
+def spawn_daemon() -> None:
+    """데몬을 백그라운드로 기동 (결과를 기다리지 않음)"""
+    import subprocess
+
+    try:
+        subprocess.Popen(
+            [sys.executable, os.path.join(PLUGIN_ROOT, "hooks", "daemon.py")],
+            cwd=os.getcwd(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def run_in_process(hook: str, payload: bytes) -> None:
+    """기존 방식: 현재 프로세스에서 훅 main() 실행"""
+    sys.path.insert(0, PLUGIN_ROOT)
+    import importlib
+
+    module = importlib.import_module(f"hooks.{hook}")
+    sys.stdin = io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8")
+    module.main()
+
+
+def main():
+    """Hook Client 메인 함수"""
+    if len(sys.argv) < 2 or sys.argv[1] not in HOOK_MODULES:
+        print(f"usage: client.py <{'|'.join(HOOK_MODULES)}>", file=sys.stderr)
+        sys.exit(2)
+
+    hook = sys.argv[1]
+    payload = sys.stdin.buffer.read()
+
+    if is_daemon_enabled():
+        reply = request_daemon(hook, payload)
+        if reply is not None:
+            sys.stdout.write(reply.get("stdout", ""))
+            sys.stderr.write(reply.get("stderr", ""))
+            sys.exit(reply.get("exit_code", 0))
+
+        # 첫 훅: 데몬을 띄워 두고 이번 호출은 직접 처리
+        spawn_daemon()
+
+    run_in_process(hook, payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,38 +7,279 @@ Claude DevKit Hooks - 공통 유틸리티
 
 import hashlib
 import json
+import marshal
+import math
 import os
 import re
 import sys
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-try:
-    import yaml
-except ImportError:
-    yaml = None
+from hooks import serializer
+from hooks.locking import file_lock
+from hooks.serializer import SerializationError, yaml_dumps, yaml_loads
+from hooks.stats import timed
 
 
 # =============================================================================
 # Orchestrator Config 관련 함수
 # =============================================================================
 
-def load_orchestrator_config() -> Dict[str, Any]:
-    """orchestrator-config.yaml 설정 로드"""
-    config_path = Path(__file__).parent / "orchestrator-config.yaml"
+# 기본 config 경로 (훅마다 여러 번 불리므로 한 번만 만듦)
+DEFAULT_CONFIG_PATH = Path(__file__).parent / "orchestrator-config.yaml"
+
+
+def get_config_path() -> Path:
+    """orchestrator-config.yaml 경로 (ORCHESTRATOR_CONFIG_PATH로 변경 가능)"""
+    override = os.environ.get("ORCHESTRATOR_CONFIG_PATH")
+    if override:
+        return Path(override)
+    return DEFAULT_CONFIG_PATH
+
 
-    # YAML 로드 시도
-    if yaml is not None and config_path.exists():
+def get_cache_dir() -> Path:
+    """프로젝트와 무관한 사용자별 캐시 디렉토리 (컴파일된 설정 등)"""
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "orchestrator"
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> os.stat_result:
+    """
+    임시 파일에 쓴 뒤 rename으로 교체.
+
+    동시에 실행된 다른 훅이 반쯤 쓰인 파일을 읽지 않도록 한다. 실패 시 OSError.
+
+    Returns:
+        쓴 파일의 stat (memo_store와 스냅샷 서명용)
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        # rename 뒤에 stat하면 그 사이 다른 프로세스가 쓴 파일을 볼 수 있음
+        stat = os.stat(tmp_path)
+        os.replace(tmp_path, path)
+        return stat
+    except OSError:
         try:
-            return yaml.safe_load(config_path.read_text(encoding="utf-8"))
-        except yaml.YAMLError:
+            tmp_path.unlink()
+        except OSError:
             pass
+        raise
+
+
+def atomic_write_text(path: Path, text: str) -> os.stat_result:
+    """atomic_write_bytes의 UTF-8 텍스트 버전"""
+    return atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def load_yaml_file(path: Path) -> Any:
+    """
+    YAML 파일 로드. 옆의 marshal 스냅샷이 원본 (mtime_ns, size)와 맞으면 YAML 파싱 생략.
+
+    스냅샷이 없거나 오래됐으면 파싱한 뒤 다시 만든다.
+    파일이 없으면 OSError, 파싱 실패 시 SerializationError.
+    """
+    snapshot_path = serializer.get_snapshot_path(path)
+    with open(path, "rb") as f:
+        # 읽은 내용과 같은 파일의 stat (rename으로 교체되는 중이어도 어긋나지 않음)
+        stat = os.fstat(f.fileno())
+        signature = (stat.st_mtime_ns, stat.st_size)
+        try:
+            found, data = serializer.load_snapshot(snapshot_path.read_bytes(), signature)
+        except OSError:
+            found = False
+        if found:
+            return data
+        data = yaml_loads(f.read().decode("utf-8"))
+
+    try:
+        atomic_write_bytes(snapshot_path, serializer.dump_snapshot(signature, data))
+    except (OSError, ValueError):
+        pass
+    return data
+
+
+def write_yaml_file(path: Path, data: Any) -> os.stat_result:
+    """YAML 파일을 원자적으로 쓰고 스냅샷도 갱신 (다음 로드에서 파싱 생략). 쓴 파일의 stat 반환, 실패 시 OSError"""
+    stat = atomic_write_text(path, yaml_dumps(data))
+    signature = (stat.st_mtime_ns, stat.st_size)
+    try:
+        atomic_write_bytes(serializer.get_snapshot_path(path), serializer.dump_snapshot(signature, data))
+    except (OSError, ValueError):
+        pass
+    return stat
+
+
+# =============================================================================
+# Config 스냅샷 캐시
+# =============================================================================
+
+# 스냅샷 형식이 바뀌면 올려서 이전 캐시를 무효화
+CONFIG_SNAPSHOT_VERSION = 4
+
+# 프롬프트 분류 카테고리 (우선순위 순) → config keywords 그룹 이름
+PROMPT_CATEGORIES = (
+    ("resume", "resume"),
+    ("new", "new_session"),
+    ("learn", "learn"),
+    ("stats", "stats"),
+    ("skip", "skip"),
+    ("trigger", "trigger"),
+)
+
+# 프로세스 내 메모: {"signature": (path, mtime_ns, size), "snapshot": {...}}
+_CONFIG_MEMO: Dict[str, Any] = {}
+
+
+def get_config_snapshot_path(config_path: Path) -> Path:
+    """config 경로별 컴파일된 스냅샷 파일 경로"""
+    key = hashlib.md5(str(config_path).encode()).hexdigest()[:12]
+    return get_cache_dir() / f"config-{key}.marshal"
+
+
+def compile_keyword_patterns(patterns: List[str], flags: int = re.IGNORECASE) -> List["re.Pattern"]:
+    """키워드 정규식 컴파일 (잘못된 패턴은 건너뜀)"""
+    compiled = []
+    for pattern in patterns or []:
+        try:
+            compiled.append(re.compile(pattern, flags))
+        except (re.error, TypeError):
+            continue
+    return compiled
+
+
+def build_prompt_classifier(keywords: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    모든 키워드 그룹을 PROMPT_CATEGORIES 우선순위 순서로 미리 컴파일한 프롬프트 분류기
+
+    모든 패턴이 소문자로만 쓰였으면 IGNORECASE 대신 소문자로 바꾼 프롬프트를 검사한다.
+    IGNORECASE에서는 sre가 리터럴 접두어로 위치를 건너뛰는 최적화를 쓰지 못해
+    수백 KB 프롬프트에서 몇 배 느려진다.
+
+    Returns:
+        {"lowered": bool, "patterns": [(순위, 정규식)]}
+    """
+    sources = []
+    for rank, (_, group) in enumerate(PROMPT_CATEGORIES):
+        for pattern in keywords.get(group, []) or []:
+            if compile_keyword_patterns([pattern]):
+                sources.append((rank, pattern))
+
+    lowered = all(source == source.lower() for _, source in sources)
+    flags = 0 if lowered else re.IGNORECASE
+    return {"lowered": lowered, "patterns": [(rank, re.compile(source, flags)) for rank, source in sources]}
+
+
+def _parse_orchestrator_config(config_path: Path) -> Dict[str, Any]:
+    """YAML 파싱 (실패 시 기본 설정)"""
+    try:
+        config = yaml_loads(config_path.read_text(encoding="utf-8"))
+        if isinstance(config, dict):
+            return config
+    except (SerializationError, IOError, UnicodeDecodeError):
+        pass
 
     # Fallback: 기본 설정 반환
     return get_default_orchestrator_config()
 
 
+def _build_config_snapshot(config: Dict[str, Any]) -> Dict[str, Any]:
+    """config와 미리 컴파일한 키워드 분류기를 묶은 스냅샷"""
+    return {
+        "config": config,
+        "classifier": build_prompt_classifier(config.get("keywords", {}) or {}),
+    }
+
+
+def _read_config_snapshot(snapshot_path: Path, signature: tuple) -> Optional[Dict[str, Any]]:
+    """디스크 스냅샷이 현재 config와 일치하면 로드"""
+    try:
+        data = marshal.loads(snapshot_path.read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != CONFIG_SNAPSHOT_VERSION or tuple(data.get("signature", ())) != signature:
+        return None
+
+    # 스냅샷에 저장된 정규식은 이미 검증된 것이므로 다시 컴파일만 함
+    try:
+        classifier = data["classifier"]
+        return {
+            "config": data["config"],
+            "classifier": {
+                "lowered": classifier["lowered"],
+                "patterns": [(rank, re.compile(source, flags)) for rank, source, flags in classifier["patterns"]],
+            },
+        }
+    except (KeyError, TypeError, ValueError, re.error):
+        return None
+
+
+def _write_config_snapshot(snapshot_path: Path, signature: tuple, snapshot: Dict[str, Any]) -> None:
+    """스냅샷을 원자적으로 저장 (실패해도 무시)"""
+    classifier = snapshot["classifier"]
+    data = {
+        "version": CONFIG_SNAPSHOT_VERSION,
+        "signature": signature,
+        "config": snapshot["config"],
+        "classifier": {
+            "lowered": classifier["lowered"],
+            "patterns": [(rank, p.pattern, p.flags) for rank, p in classifier["patterns"]],
+        },
+    }
+    try:
+        atomic_write_bytes(snapshot_path, marshal.dumps(data))
+    except (OSError, ValueError):
+        pass
+
+
+@timed("config")
+def load_config_snapshot() -> Dict[str, Any]:
+    """
+    config 스냅샷 로드
+
+    1. 프로세스 내 메모 (config 경로/mtime/size가 같을 때)
+    2. 디스크의 컴파일된 스냅샷 (YAML 파싱 생략)
+    3. YAML 파싱 후 스냅샷 갱신
+
+    Returns:
+        {"config": dict, "classifier": build_prompt_classifier() 결과} - 읽기 전용으로 사용
+    """
+    config_path = get_config_path()
+    try:
+        stat = config_path.stat()
+        signature = (str(config_path), stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = None
+
+    if signature is not None and _CONFIG_MEMO.get("signature") == signature:
+        return _CONFIG_MEMO["snapshot"]
+
+    snapshot = None
+    snapshot_path = get_config_snapshot_path(config_path)
+    if signature is not None:
+        snapshot = _read_config_snapshot(snapshot_path, signature)
+
+    if snapshot is None:
+        if signature is None:
+            snapshot = _build_config_snapshot(get_default_orchestrator_config())
+        else:
+            snapshot = _build_config_snapshot(_parse_orchestrator_config(config_path))
+            _write_config_snapshot(snapshot_path, signature, snapshot)
+
+    _CONFIG_MEMO["signature"] = signature
+    _CONFIG_MEMO["snapshot"] = snapshot
+    return snapshot
+
+
+def load_orchestrator_config() -> Dict[str, Any]:
+    """orchestrator-config.yaml 설정 로드 (스냅샷 캐시 사용, 읽기 전용)"""
+    return load_config_snapshot()["config"]
+
+
 def get_default_orchestrator_config() -> Dict[str, Any]:
     """PyYAML 없을 경우 기본 설정"""
     return {
@@ -47,6 +288,9 @@ def get_default_orchestrator_config() -> Dict[str, Any]:
             "enabled": True,
             "gate_enforcement": "block",
         },
+        "state": {
+            "backend": "json",
+        },
         "keywords": {
             "trigger": [
                 r"구현해\s*줘",
@@ -66,6 +310,27 @@ def get_default_orchestrator_config() -> Dict[str, Any]:
                 r"조사해\s*줘",
                 r"분석해\s*줘",
             ],
+            "resume": [
+                r"이어서\s*진행",
+                r"이어서\s*작업",
+                r"계속\s*진행",
+                r"resume",
+                r"/orchestrator\s+resume",
+            ],
+            "new_session": [
+                r"새\s*세션",
+                r"새로\s*시작",
+                r"처음부터",
+                r"reset",
+                r"/orchestrator\s+reset",
+            ],
+            "learn": [
+                r"/orchestrator\s+learn",
+                r"패턴\s*학습",
+            ],
+            "stats": [
+                r"/orchestrator\s+stats",
+            ],
         },
         "agents": {
             "code-explore": {"output": "explored.yaml", "next_phase": "merge", "level": "request"},
@@ -82,6 +347,27 @@ def get_default_orchestrator_config() -> Dict[str, Any]:
             "GATE-1": {"condition": "test-contract.yaml exists", "blocks": "implementation", "message": "테스트 Contract가 없습니다."},
             "GATE-2": {"condition": "test-result.yaml exists", "blocks": "complete", "message": "테스트 결과가 없습니다."},
         },
+        "policy": {
+            "enabled": True,
+            "protected_dirs": [],
+            "rules": [
+                {"id": "rm-rf", "tools": ["bash"], "action": "deny",
+                 "pattern": r"\brm\s+(?:-[a-z]*r[a-z]*f|-[a-z]*f[a-z]*r|-r\s+-f|-f\s+-r)",
+                 "message": "rm -rf 명령은 차단됩니다."},
+                {"id": "git-push-force", "tools": ["bash"], "action": "deny",
+                 "pattern": r"\bgit\s+push\b[^;&|\n]*\s(?:--force(?!-with-lease)|-f\b)",
+                 "message": "git push --force는 차단됩니다. --force-with-lease를 사용하세요."},
+                {"id": "git-reset-hard", "tools": ["bash"], "action": "ask",
+                 "pattern": r"\bgit\s+reset\s+--hard\b",
+                 "message": "git reset --hard는 커밋되지 않은 변경을 삭제합니다."},
+                {"id": "env-file", "tools": ["write", "read"], "action": "deny",
+                 "pattern": r"(?:^|/)\.env(?:\.(?!example$|sample$|template$)[^/]+)?$",
+                 "message": ".env 파일은 보호됩니다."},
+                {"id": "credentials", "tools": ["write", "read"], "action": "deny",
+                 "pattern": r"(?:^|/)(?:credentials(?:\.[^/]+)?|\.netrc|\.pgpass|id_(?:rsa|ecdsa|ed25519))$|\.(?:pem|key|p12|pfx)$",
+                 "message": "인증 정보 파일은 보호됩니다."},
+            ],
+        },
     }
 
 
@@ -91,28 +377,39 @@ def is_orchestration_enabled() -> bool:
     return config.get("orchestration", {}).get("enabled", True)
 
 
-def is_orchestration_keyword(prompt: str) -> bool:
-    """오케스트레이션 키워드 감지"""
-    config = load_orchestrator_config()
-    keywords = config.get("keywords", {})
+def classify_prompt(prompt: str) -> Optional[str]:
+    """
+    프롬프트 키워드 분류 (미리 컴파일한 패턴을 우선순위 순서로 검사, 처음 나타난 카테고리에서 멈춤)
 
-    # Skip 키워드 확인 (먼저 체크)
-    for pattern in keywords.get("skip", []):
-        try:
-            if re.search(pattern, prompt, re.IGNORECASE):
-                return False
-        except re.error:
-            continue
+    모든 패턴을 하나의 정규식으로 결합해 한 번만 스캔하면, 겹치는 매치 중 하나만 보게 되어
+    뒤에 시작하는 상위 카테고리 키워드를 놓치고 ("작업 계속 진행해줘"), 상위 키워드가 앞쪽에
+    있는 대용량 프롬프트에서는 끝까지 스캔해야 해서 오히려 느리다.
 
-    # Trigger 키워드 확인
-    for pattern in keywords.get("trigger", []):
-        try:
-            if re.search(pattern, prompt, re.IGNORECASE):
-                return True
-        except re.error:
-            continue
+    Returns:
+        "resume" | "new" | "learn" | "stats" | "skip" | "trigger" 중 프롬프트에 나타난 가장 우선순위 높은 카테고리,
+        해당 없으면 None
+    """
+    classifier = load_config_snapshot()["classifier"]
+    text = prompt.lower() if classifier["lowered"] else prompt
+    for rank, pattern in classifier["patterns"]:
+        if pattern.search(text):
+            return PROMPT_CATEGORIES[rank][0]
+    return None
 
-    return False
+
+def is_orchestration_keyword(prompt: str) -> bool:
+    """
+    오케스트레이션 키워드 감지 (skip 키워드가 없고 trigger 키워드가 있으면 True)
+
+    classify_prompt와 달리 resume/new 등 다른 카테고리 키워드가 함께 있어도 결과가 같다.
+    """
+    classifier = load_config_snapshot()["classifier"]
+    text = prompt.lower() if classifier["lowered"] else prompt
+    matched = {
+        PROMPT_CATEGORIES[rank][0] for rank, pattern in classifier["patterns"]
+        if PROMPT_CATEGORIES[rank][0] in ("skip", "trigger") and pattern.search(text)
+    }
+    return matched == {"trigger"}
 
 
 def get_gate_config(gate_id: str) -> Optional[Dict[str, Any]]:
@@ -154,34 +451,111 @@ def get_project_hash() -> str:
 # =============================================================================
 # Claude Code 세션 ID 관련 함수
 # =============================================================================
+#
+# 훅 입력(stdin JSON)의 session_id가 곧 현재 세션이다. read_stdin_json이 읽어 두므로
+# 훅은 파일을 더 읽지 않고 세션을 안다 (같은 머신의 여러 세션이 서로 덮어쓰지 않음).
+# SessionStart는 세션을 프로젝트별 레지스트리(sessions/{hash}/claude-sessions.json)에
+# 등록하고 session.ttl_hours가 지난 세션을 정리한다. 레지스트리는 입력에 session_id가
+# 없을 때(수동 실행 등)만 읽는다.
 
-def get_session_id_file() -> Path:
-    """현재 Claude Code 세션 ID 파일 경로"""
-    return Path.home() / ".orchestrator-session-id"
+DEFAULT_SESSION_TTL_HOURS = 72
 
+SESSION_REGISTRY_VERSION = 1
 
-def get_current_session_id() -> Optional[str]:
-    """현재 Claude Code 세션 ID 읽기"""
-    session_file = get_session_id_file()
-    if session_file.exists():
-        try:
-            return session_file.read_text(encoding="utf-8").strip()
-        except IOError:
-            pass
-    return None
+# 이번 훅 입력의 session_id (상주 데몬에서는 요청마다 read_stdin_json이 다시 설정)
+_HOOK_SESSION_ID: Optional[str] = None
+
+
+def set_hook_session_id(session_id: Optional[str]) -> None:
+    """이번 훅의 Claude Code 세션 ID 설정"""
+    global _HOOK_SESSION_ID
+    _HOOK_SESSION_ID = str(session_id) if session_id else None
+
+
+def get_session_registry_path(project_hash: str) -> Path:
+    """프로젝트의 Claude Code 세션 레지스트리 경로"""
+    return get_sessions_path(project_hash) / "claude-sessions.json"
+
+
+def get_session_ttl() -> float:
+    """세션 레지스트리 TTL (초)"""
+    session_config = load_orchestrator_config().get("session", {}) or {}
+    return float(session_config.get("ttl_hours", DEFAULT_SESSION_TTL_HOURS)) * 3600
 
 
-def save_current_session_id(session_id: str) -> None:
-    """현재 Claude Code 세션 ID 저장"""
+def load_session_registry(project_hash: str) -> Dict[str, Dict[str, Any]]:
+    """세션 ID -> {started_at, seen, source}"""
     try:
-        get_session_id_file().write_text(session_id, encoding="utf-8")
-    except IOError:
-        pass
+        registry = memo_load(get_session_registry_path(project_hash), json.loads)
+    except (ValueError, IOError):
+        return {}
+    if not isinstance(registry, dict) or registry.get("version") != SESSION_REGISTRY_VERSION:
+        return {}
+    return registry.get("sessions") or {}
+
+
+def register_session(project_hash: str, session_id: str, source: str = "") -> List[str]:
+    """
+    세션 등록 (SessionStart) 및 TTL이 지난 세션 정리
 
+    같은 세션의 resume/compact로 다시 불리면 seen만 갱신된다.
 
-def is_same_session(state: Dict[str, Any]) -> bool:
+    Returns:
+        정리한 세션 ID 목록
+    """
+    set_hook_session_id(session_id)
+    path = get_session_registry_path(project_hash)
+    now = time.time()
+    ttl = get_session_ttl()
+    try:
+        with file_lock(path):
+            try:
+                registry = json.loads(path.read_text(encoding="utf-8"))
+            except (ValueError, IOError):
+                registry = None
+            if not isinstance(registry, dict) or registry.get("version") != SESSION_REGISTRY_VERSION:
+                registry = {"version": SESSION_REGISTRY_VERSION, "sessions": {}}
+            sessions = registry["sessions"]
+
+            expired = [
+                sid for sid, entry in sessions.items()
+                if sid != session_id and now - float(entry.get("seen") or 0) > ttl
+            ]
+            for sid in expired:
+                del sessions[sid]
+            entry = sessions.pop(session_id, None) or {"started_at": get_timestamp()}
+            entry.update({"seen": now, "source": source or entry.get("source", "")})
+            sessions[session_id] = entry
+
+            written = atomic_write_text(path, json.dumps(registry, ensure_ascii=False, indent=2))
+            memo_store(path, registry, written)
+    except OSError:
+        return []
+    return expired
+
+
+def get_current_session_id(project_hash: Optional[str] = None) -> Optional[str]:
+    """
+    현재 Claude Code 세션 ID
+
+    훅 입력의 session_id. 없으면 이 프로젝트에서 가장 최근에 등록된 살아 있는 세션.
+    """
+    if _HOOK_SESSION_ID:
+        return _HOOK_SESSION_ID
+
+    now = time.time()
+    ttl = get_session_ttl()
+    live = [
+        (float(entry.get("seen") or 0), session_id)
+        for session_id, entry in load_session_registry(project_hash or get_project_hash()).items()
+        if now - float(entry.get("seen") or 0) <= ttl
+    ]
+    return max(live)[1] if live else None
+
+
+def is_same_session(state: Dict[str, Any], project_hash: Optional[str] = None) -> bool:
     """state의 세션 ID와 현재 세션 ID 비교"""
-    current_id = get_current_session_id()
+    current_id = get_current_session_id(project_hash)
     state_id = state.get("request", {}).get("claude_session_id")
     return bool(current_id and state_id and current_id == state_id)
 
@@ -201,29 +575,144 @@ def get_knowledge_path(project_hash: str) -> Path:
     return get_orchestrator_base_path() / "knowledge" / project_hash / "knowledge.yaml"
 
 
-def load_state(project_hash: str) -> Optional[Dict[str, Any]]:
-    """state.json 로드"""
-    state_path = get_sessions_path(project_hash) / "state.json"
-    if state_path.exists():
+# =============================================================================
+# 파일 메모 캐시 (상주 데몬에서 state/knowledge 재파싱 방지)
+# =============================================================================
+
+# path -> (inode, mtime_ns, size, marshal bytes). 파싱 결과를 직렬화해 보관하고
+# 조회 시마다 새 객체를 만들어 호출자가 자유롭게 수정할 수 있게 한다.
+# (marshal은 JSON보다 만들고 푸는 비용이 작아 콜드 훅에서 한 번 쓰고 버려도 부담이 적음)
+_FILE_MEMO: Dict[str, Tuple[int, int, int, bytes]] = {}
+
+
+def _memo_bytes(data: Any) -> bytes:
+    """메모용 사본. marshal이 못 다루는 값(date 등)은 JSON 규칙으로 문자열화"""
+    try:
+        return marshal.dumps(data)
+    except ValueError:
+        return marshal.dumps(json.loads(json.dumps(data, ensure_ascii=False, default=str)))
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    """파일의 (mtime_ns, size) 반환. 없으면 None"""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _memo_signature(path: Path, stat: Optional[os.stat_result] = None) -> Optional[Tuple[int, int, int]]:
+    """
+    메모 검증용 (inode, mtime_ns, size). stat이 없으면 path를 stat하고, 파일이 없으면 None
+
+    모든 쓰기가 새 파일을 rename해 넣으므로 inode도 비교한다. (mtime_ns, size)만 보면
+    mtime 해상도 안에서 같은 크기로 다시 쓴 파일을 구분하지 못해 이전 내용을 돌려준다.
+    """
+    if stat is None:
         try:
-            return json.loads(state_path.read_text(encoding="utf-8"))
-        except (json.JSONDecodeError, IOError):
-            pass
-    return None
+            stat = path.stat()
+        except OSError:
+            return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def memo_load(path: Path, parse) -> Optional[Any]:
+    """
+    inode/mtime/size가 그대로인 파일은 메모리에서 반환, 바뀌었으면 parse로 다시 로드.
+
+    parse는 파일 텍스트를 받아 JSON 직렬화 가능한 객체를 반환해야 한다.
+    """
+    return memo_load_file(path, lambda p: parse(p.read_text(encoding="utf-8")))
+
+
+def memo_load_file(path: Path, load) -> Optional[Any]:
+    """memo_load와 같지만 load가 텍스트 대신 경로를 받음 (스냅샷 등 다른 파일을 볼 때)"""
+    signature = _memo_signature(path)
+    if signature is None:
+        _FILE_MEMO.pop(str(path), None)
+        return None
+
+    cached = _FILE_MEMO.get(str(path))
+    if cached and cached[:3] == signature:
+        return marshal.loads(cached[3])
+
+    data = load(path)
+    _FILE_MEMO[str(path)] = (*signature, _memo_bytes(data))
+    return data
 
 
+def memo_store(path: Path, data: Any, written: Optional[os.stat_result] = None) -> None:
+    """
+    방금 저장한 내용을 메모에 반영 (자기 쓰기 직후 재파싱 방지)
+
+    written은 atomic_write_*가 돌려준 stat. 쓴 뒤에 경로를 다시 stat하면 그 사이 다른
+    프로세스가 rename해 넣은 파일의 서명이 자기 내용에 붙어, 그 파일 대신 자기 내용을
+    계속 돌려주게 된다. 잠금 안에서 디스크를 다시 읽었을 때처럼 쓰지 않았으면 생략한다.
+    """
+    signature = _memo_signature(path, written)
+    if signature is None:
+        return
+    _FILE_MEMO[str(path)] = (*signature, _memo_bytes(data))
+
+
+def get_state_backend() -> str:
+    """state 저장 방식 (json | sqlite). ORCHESTRATOR_STATE_BACKEND로 변경 가능"""
+    backend = os.environ.get("ORCHESTRATOR_STATE_BACKEND")
+    if not backend:
+        backend = (load_orchestrator_config().get("state", {}) or {}).get("backend", "json")
+    return backend if backend in ("json", "sqlite") else "json"
+
+
+# (sessions 경로, backend, 요청 ID) -> 저장소. 상주 데몬에서 db 연결 재사용
+_STATE_STORES: Dict[Tuple[str, str, Optional[str]], Any] = {}
+
+
+def get_state_store(project_hash: str, request_id: Optional[str] = None):
+    """
+    설정된 백엔드의 요청별 state 저장소 반환 (hooks/state_store.py)
+
+    request_id가 없으면 요청 인덱스의 현재 요청 (hooks/request_index.py)
+    """
+    from hooks.request_index import current_request_id
+    from hooks.state_store import open_state_store
+
+    if request_id is None:
+        request_id = current_request_id(project_hash)
+    key = (str(get_sessions_path(project_hash)), get_state_backend(), request_id)
+    store = _STATE_STORES.get(key)
+    if store is None:
+        store = open_state_store(project_hash, key[1], request_id)
+        _STATE_STORES[key] = store
+    return store
+
+
+@timed("state")
+def load_state(project_hash: str) -> Optional[Dict[str, Any]]:
+    """현재 요청의 state 로드 (state.json 형식의 dict)"""
+    from hooks.request_index import sync_request
+
+    state = get_state_store(project_hash).load()
+    if state:
+        # 훅 밖에서 고친 요청 상태(completed 등)를 인덱스에 반영 (같으면 쓰지 않음)
+        sync_request(project_hash, state)
+    return state
+
+
+@timed("state")
 def save_state(project_hash: str, state: Dict[str, Any]) -> bool:
-    """state.json 저장"""
-    state_path = get_sessions_path(project_hash) / "state.json"
-    try:
-        state_path.parent.mkdir(parents=True, exist_ok=True)
-        state_path.write_text(
-            json.dumps(state, ensure_ascii=False, indent=2),
-            encoding="utf-8"
-        )
-        return True
-    except IOError:
+    """state 전체 저장 (state의 요청 ID로 저장, 새 요청이면 인덱스에 등록하고 현재 요청으로)"""
+    from hooks.request_index import sync_request
+
+    request_id = state.get("request", {}).get("id") or None
+    if not get_state_store(project_hash, request_id).save(state):
         return False
+    return sync_request(project_hash, state)
+
+
+def sync_state_json(project_hash: str) -> bool:
+    """sqlite 백엔드의 변경분을 state.json으로 내보내기 (json 백엔드는 아무 일도 하지 않음)"""
+    return get_state_store(project_hash).sync_json()
 
 
 def load_session(project_hash: str) -> Optional[Dict[str, Any]]:
@@ -237,37 +726,673 @@ def load_session(project_hash: str) -> Optional[Dict[str, Any]]:
     return None
 
 
-def load_knowledge(project_hash: str) -> Optional[Dict[str, Any]]:
-    """knowledge.yaml 로드"""
-    if yaml is None:
+# =============================================================================
+# knowledge.yaml + delta 로그
+# =============================================================================
+#
+# 훅은 knowledge.yaml을 매번 다시 쓰지 않고 변경분을 knowledge.delta.jsonl에
+# 한 줄씩 추가한다. load_knowledge는 knowledge.yaml에 delta를 적용한 병합 결과를
+# 반환하고, compact_knowledge가 주기적으로 delta를 knowledge.yaml에 합친다.
+#
+# delta 형식 (at은 적용 시 updated_at으로 반영):
+#   {"op": "patterns", "values": {...}, "at": ...}   없는 키만 추가
+#   {"op": "decision", "item": {...}, "at": ...}     같은 id가 있으면 count/last_seen만 갱신
+#   {"op": "pitfall", "item": {...}, "at": ...}      같은 description이 있으면 count/last_seen만 갱신
+#   {"op": "retract_patterns", "keys": [...], "at": ...}  키 삭제
+#   {"op": "set", "key": ..., "value": ..., "at": ...}
+#
+# pitfall/decision 수는 knowledge.limits로 제한된다 (apply_knowledge_deltas).
+#
+# 로그 파일(세그먼트)의 첫 줄은 {"op": "segment", "id": ...}이고, knowledge.yaml의
+# delta_log에 세그먼트 id별로 어디까지(바이트) 합쳤는지 기록한다. 로드/압축은 그 뒤의
+# delta만 적용하므로, 압축이 knowledge.yaml을 쓴 뒤 로그를 지우기 전에 중단되거나
+# save_knowledge가 로그의 앞부분만 합쳤어도 같은 delta를 두 번 적용하지 않는다.
+
+# delta가 이 개수 이상 쌓이면 압축 (훅은 백그라운드 flush 프로세스에 맡김)
+DEFAULT_KNOWLEDGE_COMPACT_AFTER = 50
+
+# 압축 잠금이 이보다 오래되면 압축 프로세스가 죽은 것으로 보고 가져옴 (초)
+KNOWLEDGE_COMPACT_LOCK_STALE = 60
+
+# delta 로그 머리 줄의 op
+KNOWLEDGE_SEGMENT_OP = "segment"
+
+
+def get_knowledge_delta_path(project_hash: str) -> Path:
+    """knowledge delta 로그 경로"""
+    return get_knowledge_path(project_hash).with_name("knowledge.delta.jsonl")
+
+
+def get_knowledge_compacting_path(project_hash: str) -> Path:
+    """압축 중인 delta 로그 경로 (압축이 중단되면 다음 로드/압축에서 이어서 반영)"""
+    return get_knowledge_path(project_hash).with_name("knowledge.delta.jsonl.compacting")
+
+
+def get_knowledge_compact_lock_path(project_hash: str) -> Path:
+    """압축 잠금 파일 경로 (동시에 하나의 프로세스만 압축)"""
+    return get_knowledge_path(project_hash).with_name("knowledge.compact.lock")
+
+
+def _is_compact_locked(lock_path: Path) -> bool:
+    try:
+        return time.time() - lock_path.stat().st_mtime < KNOWLEDGE_COMPACT_LOCK_STALE
+    except OSError:
+        return False
+
+
+def _acquire_compact_lock(lock_path: Path) -> bool:
+    for _ in range(2):
+        try:
+            fd = os.open(str(lock_path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            if _is_compact_locked(lock_path):
+                return False
+            # 죽은 압축 프로세스의 잠금
+            try:
+                lock_path.unlink()
+            except OSError:
+                return False
+            continue
+        except OSError:
+            return False
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        return True
+    return False
+
+
+def _release_compact_lock(lock_path: Path) -> None:
+    try:
+        lock_path.unlink()
+    except OSError:
+        pass
+
+
+def spawn_knowledge_flush(project_hash: str) -> bool:
+    """
+    delta 로그 압축을 분리된 백그라운드 프로세스로 실행 (훅은 기다리지 않음)
+
+    잠금은 여기서 잡아 flush 프로세스에 넘긴다. 프로세스가 뜨는 동안 이어지는 훅이
+    flush를 또 띄우지 않도록 하기 위함이다. 이미 압축 중이면 띄우지 않는다.
+    """
+    lock_path = get_knowledge_compact_lock_path(project_hash)
+    if not _acquire_compact_lock(lock_path):
+        return False
+
+    import subprocess
+
+    script = Path(__file__).parent / "knowledge_flush.py"
+    try:
+        subprocess.Popen(
+            [sys.executable, str(script), "--project-hash", project_hash, "--lock-held"],
+            cwd=os.getcwd(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        _release_compact_lock(lock_path)
+        return False
+    return True
+
+
+def _parse_delta_segment(data: bytes) -> Dict[str, Any]:
+    """
+    delta 로그 파싱
+
+    Returns:
+        {"id": 세그먼트 id (머리 줄이 없으면 None), "size": 읽은 바이트 수,
+         "entries": [[그 줄이 끝나는 바이트 위치, delta]]}
+        마지막 줄이 쓰는 중이라 줄바꿈이 없으면 읽지 않은 것으로 둔다.
+    """
+    segment: Dict[str, Any] = {"id": None, "size": 0, "entries": []}
+    offset = 0
+    while True:
+        end = data.find(b"\n", offset)
+        if end < 0:
+            break
+        line = data[offset:end]
+        offset = end + 1
+        try:
+            delta = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(delta, dict):
+            continue
+        if delta.get("op") == KNOWLEDGE_SEGMENT_OP:
+            if segment["id"] is None and not segment["entries"]:
+                segment["id"] = str(delta.get("id") or "") or None
+            continue
+        segment["entries"].append([offset, delta])
+    segment["size"] = offset
+    return segment
+
+
+def _read_delta_segment(path: Path) -> Optional[Dict[str, Any]]:
+    """delta 로그 하나 (_parse_delta_segment 결과, 없으면 None)"""
+    try:
+        return memo_load_file(path, lambda p: _parse_delta_segment(p.read_bytes()))
+    except OSError:
         return None
 
-    knowledge_path = get_knowledge_path(project_hash)
-    if knowledge_path.exists():
+
+def _create_delta_segment(delta_path: Path) -> None:
+    """
+    머리 줄만 있는 새 delta 로그 생성
+
+    임시 파일을 link로 넣어 동시에 만든 훅 중 하나만 남고 머리 줄이 항상 첫 줄이 된다.
+    link를 못 쓰는 파일 시스템이면 머리 줄 없는 로그가 되어 이전처럼 전체를 적용한다.
+    """
+    segment_id = f"seg-{os.urandom(8).hex()}"
+    tmp_path = delta_path.with_name(f".{delta_path.name}.{segment_id}")
+    try:
+        tmp_path.write_text(json.dumps({"op": KNOWLEDGE_SEGMENT_OP, "id": segment_id}) + "\n", encoding="utf-8")
+        os.link(tmp_path, delta_path)
+    except OSError:
+        pass
+    finally:
         try:
-            return yaml.safe_load(knowledge_path.read_text(encoding="utf-8"))
-        except (yaml.YAMLError, IOError):
+            tmp_path.unlink()
+        except OSError:
             pass
-    return None
 
 
-def save_knowledge(project_hash: str, knowledge: Dict[str, Any]) -> bool:
-    """knowledge.yaml 저장"""
-    if yaml is None:
+def _delta_log_offsets(knowledge: Any) -> Dict[str, int]:
+    """knowledge에 이미 합쳐진 세그먼트 id -> 바이트 위치"""
+    offsets = knowledge.get("delta_log") if isinstance(knowledge, dict) else None
+    if not isinstance(offsets, dict):
+        return {}
+    return {str(key): value for key, value in offsets.items() if isinstance(value, int)}
+
+
+def _unapplied_deltas(segments: List[Dict[str, Any]], applied: Dict[str, int]) -> List[Dict[str, Any]]:
+    """세그먼트에서 applied 위치 뒤의 delta (머리 줄 없는 로그는 전체)"""
+    deltas = []
+    for segment in segments:
+        done = applied.get(segment["id"], 0) if segment["id"] else 0
+        deltas.extend(delta for end, delta in segment["entries"] if end > done)
+    return deltas
+
+
+def _folded_offsets(segments: List[Dict[str, Any]], applied: Dict[str, int]) -> Dict[str, int]:
+    """세그먼트를 끝까지 합친 뒤의 위치 (머리 줄이 있는 세그먼트만)"""
+    return {
+        segment["id"]: max(applied.get(segment["id"], 0), segment["size"])
+        for segment in segments if segment["id"]
+    }
+
+
+DEFAULT_KNOWLEDGE_LIMITS = {"max_pitfalls": 100, "max_decisions": 300, "half_life_days": 14}
+
+# 합쳐진 항목이 기억하는 refs 개수 (최근 것 우선)
+MAX_KNOWLEDGE_ITEM_REFS = 5
+
+
+def get_knowledge_limits() -> Dict[str, Any]:
+    """knowledge.limits 설정 (0이면 무제한)"""
+    limits = (load_orchestrator_config().get("knowledge", {}) or {}).get("limits", {}) or {}
+    return {**DEFAULT_KNOWLEDGE_LIMITS, **limits}
+
+
+def pitfall_key(item: Dict[str, Any]) -> str:
+    """같은 pitfall 판정 키 (같은 테스트가 같은 이유로 실패하면 하나로 합침)"""
+    return str(item.get("description") or item.get("id") or "")
+
+
+def decision_key(item: Dict[str, Any]) -> str:
+    """같은 decision 판정 키 (id)"""
+    return str(item.get("id") or "")
+
+
+# delta op -> (knowledge 섹션, 키 함수, knowledge.limits 키)
+_AGGREGATED_SECTIONS = {
+    "pitfall": ("pitfalls", pitfall_key, "max_pitfalls"),
+    "decision": ("decisions", decision_key, "max_decisions"),
+}
+
+
+def _timestamp_days(value: Any) -> float:
+    """ISO 8601 시각/날짜 → 1970-01-01(UTC) 기준 일 수 (없거나 형식이 다르면 0)"""
+    if not value:
+        return 0.0
+    try:
+        moment = datetime.fromisoformat(str(value).rstrip("Z"))
+    except ValueError:
+        return 0.0
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - datetime(1970, 1, 1)).total_seconds() / 86400
+
+
+def knowledge_item_score(item: Dict[str, Any], half_life_days: float) -> float:
+    """
+    보존 우선순위 (클수록 남김): count × 2^(last_seen / half_life_days)의 log2.
+
+    half_life_days만큼 지난 항목은 두 배 자주 나와야 새 항목과 같은 점수가 된다.
+    기준 시각이 고정이라 언제 압축하든 같은 항목끼리의 순위가 바뀌지 않는다.
+    (제거된 항목의 count는 남지 않으므로 다시 나오면 1부터 센다)
+    """
+    count = max(int(item.get("count") or 1), 1)
+    seen = _timestamp_days(item.get("last_seen") or item.get("created_at"))
+    return math.log2(count) + seen / max(float(half_life_days or 0), 1e-9)
+
+
+def top_knowledge_items(items: List[Dict[str, Any]], limit: int, half_life_days: Optional[float] = None) -> List[Dict[str, Any]]:
+    """점수 순 상위 limit개 (요약 출력용)"""
+    if half_life_days is None:
+        half_life_days = get_knowledge_limits()["half_life_days"]
+    ranked = sorted(
+        range(len(items)),
+        key=lambda i: (knowledge_item_score(items[i], half_life_days), i),
+        reverse=True,
+    )
+    return [items[i] for i in ranked[:limit]]
+
+
+def _merge_knowledge_item(existing: Dict[str, Any], item: Dict[str, Any], at: str) -> None:
+    """같은 키의 항목을 existing에 합침 (내용은 처음 것 유지, count/last_seen/refs 갱신)"""
+    existing["count"] = int(existing.get("count") or 1) + int(item.get("count") or 1)
+    first_seen = item.get("first_seen") or at
+    if first_seen and (not existing.get("first_seen") or str(first_seen) < str(existing["first_seen"])):
+        existing["first_seen"] = first_seen
+    last_seen = item.get("last_seen") or at
+    if last_seen and str(last_seen) >= str(existing.get("last_seen") or ""):
+        existing["last_seen"] = last_seen
+        if item.get("learned_from"):
+            existing["learned_from"] = item["learned_from"]
+    if item.get("refs"):
+        refs = [ref for ref in existing.get("refs") or [] if ref not in item["refs"]] + list(item["refs"])
+        existing["refs"] = refs[-MAX_KNOWLEDGE_ITEM_REFS:]
+
+
+def _index_knowledge_section(knowledge: Dict[str, Any], section: str, key_fn) -> Dict[str, Dict[str, Any]]:
+    """섹션의 키 → 항목 색인. 이전 형식에서 쌓인 중복 항목은 여기서 합침"""
+    index: Dict[str, Dict[str, Any]] = {}
+    items = []
+    for item in knowledge.get(section) or []:
+        if not isinstance(item, dict):
+            continue
+        key = key_fn(item)
+        if key and key in index:
+            _merge_knowledge_item(index[key], item, "")
+            continue
+        if key:
+            index[key] = item
+        items.append(item)
+    knowledge[section] = items
+    return index
+
+
+def _evict_knowledge_section(knowledge: Dict[str, Any], section: str, limit: int, half_life_days: float) -> int:
+    """상한을 넘은 섹션에서 점수가 낮은 항목 제거 (남은 항목은 원래 순서 유지). 제거한 개수 반환"""
+    items = knowledge.get(section) or []
+    if not limit or len(items) <= limit:
+        return 0
+    kept = sorted(i for _, i in sorted(
+        ((knowledge_item_score(item, half_life_days), i) for i, item in enumerate(items)),
+        reverse=True,
+    )[:limit])
+    knowledge[section] = [items[i] for i in kept]
+    return len(items) - limit
+
+
+def apply_knowledge_deltas(knowledge: Dict[str, Any], deltas: List[Dict[str, Any]]) -> None:
+    """
+    delta 목록을 knowledge에 적용 (제자리 수정)
+
+    pitfall/decision은 키별 색인을 한 번만 만들어 같은 항목을 count/first_seen/last_seen으로
+    합치고, knowledge.limits 상한을 넘으면 knowledge_item_score가 낮은 것부터 제거한다.
+    """
+    indexes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for delta in deltas:
+        op = delta.get("op")
+        at = delta.get("at") or ""
+        if op == "patterns":
+            patterns = knowledge.get("patterns") or {}
+            for key, value in (delta.get("values") or {}).items():
+                patterns.setdefault(key, value)
+            knowledge["patterns"] = patterns
+        elif op == "retract_patterns":
+            patterns = knowledge.get("patterns") or {}
+            for key in delta.get("keys") or []:
+                patterns.pop(key, None)
+            knowledge["patterns"] = patterns
+        elif op in _AGGREGATED_SECTIONS:
+            section, key_fn, _ = _AGGREGATED_SECTIONS[op]
+            if section not in indexes:
+                indexes[section] = _index_knowledge_section(knowledge, section, key_fn)
+            item = delta.get("item") or {}
+            key = key_fn(item)
+            if key in indexes[section]:
+                _merge_knowledge_item(indexes[section][key], item, at)
+            elif key:
+                added = {**item, "count": int(item.get("count") or 1)}
+                if at:
+                    added.setdefault("first_seen", at)
+                    added.setdefault("last_seen", at)
+                knowledge[section].append(added)
+                indexes[section][key] = added
+        elif op == "set" and delta.get("key"):
+            knowledge[delta["key"]] = delta.get("value")
+            indexes.pop(delta["key"], None)
+
+        if at:
+            knowledge["updated_at"] = at
+
+    if indexes:
+        limits = get_knowledge_limits()
+        for section, _, limit_key in _AGGREGATED_SECTIONS.values():
+            if section in indexes:
+                _evict_knowledge_section(knowledge, section, int(limits.get(limit_key) or 0), limits["half_life_days"])
+
+
+def apply_knowledge_delta(knowledge: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    """delta 하나를 knowledge에 적용 (제자리 수정)"""
+    apply_knowledge_deltas(knowledge, [delta])
+
+
+def _load_knowledge_base(project_hash: str) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[int, int, int]]]:
+    """knowledge.yaml 자체와 그 (inode, mtime_ns, size)"""
+    knowledge_path = get_knowledge_path(project_hash)
+    try:
+        return memo_load_file(knowledge_path, load_yaml_file), _memo_signature(knowledge_path)
+    except (SerializationError, OSError, UnicodeDecodeError):
+        return None, None
+
+
+def _load_delta_segments(project_hash: str) -> List[Dict[str, Any]]:
+    """
+    delta 로그와 압축 중(또는 중단된) 로그
+
+    로그 → 압축 중 로그 순서로 읽어, 그 사이 압축이 로그를 rename해도 놓치지 않는다
+    (같은 세그먼트를 두 번 보면 더 많이 읽은 쪽). knowledge.yaml은 이 뒤에 읽어야
+    그 사이 끝난 압축이 합친 delta를 다시 적용하지 않는다.
+    """
+    segments: List[Dict[str, Any]] = []
+    for path in (get_knowledge_delta_path(project_hash), get_knowledge_compacting_path(project_hash)):
+        segment = _read_delta_segment(path)
+        if segment is None:
+            continue
+        same = [s for s in segments if segment["id"] and s["id"] == segment["id"]]
+        if same:
+            if segment["size"] > same[0]["size"]:
+                segments[segments.index(same[0])] = segment
+        else:
+            segments.append(segment)
+    return segments
+
+
+@timed("knowledge")
+def load_knowledge(project_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    knowledge 로드 (knowledge.yaml + 아직 압축되지 않은 delta 병합)
+
+    결과의 delta_log는 어느 세그먼트를 어디까지 반영했는지로, save_knowledge가
+    그 뒤에 추가된 delta를 지우지 않는 데 쓴다.
+    """
+    segments = _load_delta_segments(project_hash)
+    knowledge, _ = _load_knowledge_base(project_hash)
+    applied = _delta_log_offsets(knowledge)
+    deltas = _unapplied_deltas(segments, applied)
+
+    if deltas and not isinstance(knowledge, dict):
+        knowledge = create_initial_knowledge(project_hash)
+    if isinstance(knowledge, dict):
+        apply_knowledge_deltas(knowledge, deltas)
+        knowledge["delta_log"] = {**applied, **_folded_offsets(segments, applied)}
+    return knowledge
+
+
+def get_knowledge_keys_path(project_hash: str) -> Path:
+    """knowledge 키 색인 경로 (knowledge.yaml 옆 숨김 파일)"""
+    return get_knowledge_path(project_hash).with_name(".knowledge.keys.marshal")
+
+
+def _knowledge_keys(knowledge: Any) -> Dict[str, Any]:
+    """knowledge의 패턴 key, decision id와 반영된 delta 위치"""
+    if not isinstance(knowledge, dict):
+        knowledge = {}
+    return {
+        "patterns": sorted(str(key) for key in knowledge.get("patterns") or {}),
+        "decisions": sorted(str(item["id"]) for item in knowledge.get("decisions") or []
+                            if isinstance(item, dict) and item.get("id")),
+        "delta_log": _delta_log_offsets(knowledge),
+    }
+
+
+def _write_knowledge_keys(project_hash: str, signature: Tuple[int, int], knowledge: Any) -> None:
+    try:
+        atomic_write_bytes(get_knowledge_keys_path(project_hash),
+                           serializer.dump_snapshot(signature, _knowledge_keys(knowledge)))
+    except (OSError, ValueError):
+        pass
+
+
+def load_knowledge_keys(project_hash: str) -> Dict[str, Set[str]]:
+    """
+    knowledge에 이미 있는 패턴 key와 decision id (아직 압축되지 않은 delta 포함)
+
+    도구 호출 경로의 훅이 새 항목만 기록/보고하는 데 쓴다. knowledge.yaml을 쓸 때 옆에 남긴
+    색인을 읽으므로 knowledge 전체를 로드하지 않는다. 색인이 없거나 knowledge.yaml이 직접
+    수정되어 맞지 않으면 knowledge.yaml을 읽어 다시 만든다.
+
+    Returns:
+        {"patterns": 패턴 key 집합, "decisions": decision id 집합}
+    """
+    # load_knowledge와 같은 순서: delta 로그를 먼저 읽어야 그 사이 압축된 delta를 놓치지 않음
+    segments = _load_delta_segments(project_hash)
+    keys_path = get_knowledge_keys_path(project_hash)
+    index = None
+    try:
+        stat = os.stat(get_knowledge_path(project_hash))
+        found, index = serializer.load_snapshot(keys_path.read_bytes(), (stat.st_mtime_ns, stat.st_size))
+        if not found:
+            index = None
+    except OSError:
+        pass
+    if index is None:
+        knowledge, signature = _load_knowledge_base(project_hash)
+        index = _knowledge_keys(knowledge)
+        if signature is not None:
+            _write_knowledge_keys(project_hash, signature[1:], knowledge)
+
+    patterns = set(index["patterns"])
+    decisions = set(index["decisions"])
+    for delta in _unapplied_deltas(segments, index["delta_log"]):
+        op = delta.get("op")
+        if op == "patterns" and isinstance(delta.get("values"), dict):
+            patterns.update(str(key) for key in delta["values"])
+        elif op == "retract_patterns":
+            patterns.difference_update(str(key) for key in delta.get("keys") or [])
+        elif op == "decision" and isinstance(delta.get("item"), dict) and delta["item"].get("id"):
+            decisions.add(str(delta["item"]["id"]))
+    return {"patterns": patterns, "decisions": decisions}
+
+
+@timed("knowledge")
+def append_knowledge_deltas(project_hash: str, deltas: List[Dict[str, Any]], background: bool = False) -> bool:
+    """
+    knowledge 변경을 delta 로그에 추가.
+
+    한 번의 append 쓰기로 기록하므로 동시에 실행된 훅의 줄이 섞이지 않는다.
+    쓰는 동안 delta 로그의 공유 잠금을 잡아, 압축이 로그를 rename하는 순간
+    열려 있던 파일에 쓴 줄이 사라지지 않게 한다.
+    로그가 knowledge.compact_after 개를 넘으면 압축한다. background=True면
+    (도구 호출 경로의 훅) 압축을 분리된 프로세스에 맡기고 바로 반환한다.
+    """
+    if not deltas:
+        return True
+
+    delta_path = get_knowledge_delta_path(project_hash)
+    timestamp = get_timestamp()
+    payload = "".join(
+        json.dumps({"at": timestamp, **delta}, ensure_ascii=False, default=str) + "\n"
+        for delta in deltas
+    ).encode("utf-8")
+
+    try:
+        delta_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(delta_path, shared=True):
+            if not delta_path.exists():
+                _create_delta_segment(delta_path)
+            fd = os.open(str(delta_path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, payload)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+    except OSError:
         return False
 
+    compact_after = (load_orchestrator_config().get("knowledge", {}) or {}).get(
+        "compact_after", DEFAULT_KNOWLEDGE_COMPACT_AFTER
+    )
+    # 줄 수는 크기가 어느 정도 쌓였을 때만 센다 (세그먼트 머리 줄 제외)
+    if compact_after and size >= compact_after * 64:
+        try:
+            line_count = delta_path.read_bytes().count(b"\n") - 1
+        except OSError:
+            line_count = 0
+        if line_count >= compact_after:
+            if background:
+                spawn_knowledge_flush(project_hash)
+            else:
+                compact_knowledge(project_hash)
+    return True
+
+
+@timed("knowledge")
+def compact_knowledge(project_hash: str, lock_held: bool = False) -> int:
+    """
+    delta 로그를 knowledge.yaml에 합치고 로그 비우기.
+
+    로그를 먼저 .compacting으로 rename한 뒤 합치므로, 압축 중 다른 훅이 추가한
+    delta는 새 로그 파일에 남는다. 다른 프로세스가 압축 중이면 바로 0을 반환한다.
+    knowledge.yaml에 그 세그먼트를 어디까지 합쳤는지 함께 기록하므로, 쓰고 나서
+    .compacting을 지우기 전에 중단돼도 다음 압축/로드는 같은 delta를 다시 적용하지 않는다.
+    lock_held=True는 spawn_knowledge_flush가 잡아 넘긴 잠금을 쓴다는 뜻이다.
+
+    Returns:
+        합쳐진 delta 개수
+    """
+    lock_path = get_knowledge_compact_lock_path(project_hash)
+    if not lock_held and not _acquire_compact_lock(lock_path):
+        return 0
+    try:
+        return _compact_knowledge_locked(project_hash)
+    finally:
+        _release_compact_lock(lock_path)
+
+
+def _compact_knowledge_locked(project_hash: str) -> int:
+    delta_path = get_knowledge_delta_path(project_hash)
+    compacting_path = get_knowledge_compacting_path(project_hash)
+    if not compacting_path.exists():
+        try:
+            # 쓰는 중인 append가 끝난 뒤에 rename (잠금은 rename 동안만)
+            with file_lock(delta_path):
+                os.rename(delta_path, compacting_path)
+        except OSError:
+            # 로그 없음 - 합칠 것이 없음
+            return 0
+
+    segment = _read_delta_segment(compacting_path)
+    if segment is None:
+        return 0
+
+    def fold() -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[int, int, int]], int]:
+        knowledge, base_signature = _load_knowledge_base(project_hash)
+        applied = _delta_log_offsets(knowledge)
+        deltas = _unapplied_deltas([segment], applied)
+        if deltas:
+            if not isinstance(knowledge, dict):
+                knowledge = create_initial_knowledge(project_hash)
+            apply_knowledge_deltas(knowledge, deltas)
+            active = _read_delta_segment(delta_path)
+            knowledge["delta_log"] = {
+                **{key: value for key, value in applied.items() if active and key == active["id"]},
+                **_folded_offsets([segment], applied),
+            }
+        return knowledge, base_signature, len(deltas)
+
+    # 합치는 동안은 잠그지 않고, 쓰기 직전에 잠금 안에서 knowledge.yaml이 그대로인지 확인
+    # (그 사이 save_knowledge가 썼으면 그 결과에 다시 합침)
+    knowledge, base_signature, count = fold()
+    try:
+        with file_lock(delta_path):
+            if _memo_signature(get_knowledge_path(project_hash)) != base_signature:
+                knowledge, base_signature, count = fold()
+            if count and not _write_knowledge_yaml(project_hash, knowledge):
+                return 0
+            try:
+                compacting_path.unlink()
+            except OSError:
+                pass
+    except OSError:
+        return 0
+    return count
+
+
+def _write_knowledge_yaml(project_hash: str, knowledge: Dict[str, Any]) -> bool:
     knowledge_path = get_knowledge_path(project_hash)
     try:
-        knowledge_path.parent.mkdir(parents=True, exist_ok=True)
-        knowledge_path.write_text(
-            yaml.dump(knowledge, allow_unicode=True, default_flow_style=False, sort_keys=False),
-            encoding="utf-8"
-        )
+        written = write_yaml_file(knowledge_path, knowledge)
+        memo_store(knowledge_path, knowledge, written)
+        _write_knowledge_keys(project_hash, (written.st_mtime_ns, written.st_size), knowledge)
         return True
     except IOError:
         return False
 
 
+@timed("knowledge")
+def save_knowledge(project_hash: str, knowledge: Dict[str, Any]) -> bool:
+    """
+    knowledge.yaml 전체 교체.
+
+    knowledge는 load_knowledge의 병합 결과를 바탕으로 해야 한다. 그 delta_log까지
+    반영된 것으로 보고, 끝까지 반영된 delta 로그만 지운다. 로드한 뒤 다른 훅이 추가한
+    delta는 로그에 남아 다음 로드/압축에서 적용된다. delta_log가 없는 knowledge
+    (create_initial_knowledge 등)는 쌓여 있던 delta를 모두 대체한다.
+    훅에서 값 몇 개를 바꿀 때는 delta를 쓴다 (append_knowledge_deltas).
+    """
+    delta_path = get_knowledge_delta_path(project_hash)
+    try:
+        # 배타 잠금 동안은 delta 추가와 압축의 rename/쓰기가 끼어들지 않음
+        with file_lock(delta_path):
+            segments = _load_delta_segments(project_hash)
+            if "delta_log" not in knowledge:
+                knowledge = {**knowledge, "delta_log": _folded_offsets(segments, {})}
+            applied = _delta_log_offsets(knowledge)
+            if not _write_knowledge_yaml(project_hash, knowledge):
+                return False
+            for path in (delta_path, get_knowledge_compacting_path(project_hash)):
+                segment = _read_delta_segment(path)
+                if segment is not None and (segment["id"] is None or applied.get(segment["id"], 0) >= segment["size"]):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+    except OSError:
+        return False
+    return True
+
+
+def create_initial_knowledge(project_hash: str) -> Dict[str, Any]:
+    """knowledge.yaml이 없을 때 사용할 빈 지식"""
+    return {
+        "version": 1,
+        "project": {
+            "path": os.getcwd(),
+            "hash": project_hash,
+        },
+        "patterns": {},
+        "decisions": [],
+        "pitfalls": [],
+    }
+
+
 def count_pending_subtasks(state: Dict[str, Any]) -> int:
     """미완료 Subtask 개수 계산"""
     count = 0
@@ -291,39 +1416,47 @@ def count_pending_tasks(state: Dict[str, Any]) -> int:
 
 def get_current_work(state: Dict[str, Any]) -> Dict[str, str]:
     """현재 진행 중인 작업 정보 추출"""
-    request = state.get("request", {})
-    current_task_id = request.get("current_task")
+    current_task_id = state.get("request", {}).get("current_task")
 
     if not current_task_id:
         return {}
 
     task = state.get("tasks", {}).get(current_task_id, {})
-    current_subtask_id = task.get("current_subtask")
-    subtask = task.get("subtasks", {}).get(current_subtask_id, {}) if current_subtask_id else {}
+    return get_subtask_work(state, current_task_id, task.get("current_subtask"))
+
+
+def get_subtask_work(state: Dict[str, Any], task_id: str, subtask_id: Optional[str]) -> Dict[str, str]:
+    """지정한 Subtask의 작업 정보 (get_current_work와 같은 형식, 병렬 진행 중인 Subtask용)"""
+    request = state.get("request", {})
+    task = state.get("tasks", {}).get(task_id, {})
+    subtask = task.get("subtasks", {}).get(subtask_id, {}) if subtask_id else {}
 
     return {
         "request": request.get("original_request", ""),
         "request_id": request.get("id", ""),
         "global_phase": request.get("global_phase", ""),
-        "task_id": current_task_id,
+        "task_id": task_id,
         "task_name": task.get("name", ""),
-        "subtask_id": current_subtask_id or "",
+        "subtask_id": subtask_id or "",
         "subtask_name": subtask.get("name", ""),
         "phase": subtask.get("phase", ""),
     }
 
 
+# Contract 파일 이름 (세션 디렉토리의 contracts/{request}/{task}/{subtask}/ 아래)
+CONTRACT_FILE_NAMES = (
+    "explored.yaml",
+    "task-breakdown.yaml",
+    "design-brief.yaml",
+    "design-contract.yaml",
+    "test-contract.yaml",
+    "test-result.yaml",
+)
+
+
 def is_contract_file(file_path: str) -> bool:
     """Contract 파일 여부 확인"""
-    contract_patterns = [
-        "explored.yaml",
-        "task-breakdown.yaml",
-        "design-brief.yaml",
-        "design-contract.yaml",
-        "test-contract.yaml",
-        "test-result.yaml",
-    ]
-    return any(pattern in file_path for pattern in contract_patterns)
+    return any(pattern in file_path for pattern in CONTRACT_FILE_NAMES)
 
 
 def get_status_icon(status: str) -> str:
@@ -338,27 +1471,52 @@ def get_status_icon(status: str) -> str:
     return icons.get(status, "[ ]")
 
 
-def format_progress_tree(state: Dict[str, Any]) -> str:
-    """진행 상황 트리 형식으로 포맷"""
+def format_progress_tree(state: Dict[str, Any], collapse_completed: bool = False, current_only: bool = False,
+                         estimates: Optional[Dict[str, str]] = None) -> str:
+    """
+    진행 상황 트리 형식으로 포맷
+
+    Args:
+        collapse_completed: 완료된 Task는 Subtask 없이 한 줄 (완료 수 표시)
+        current_only: 현재 Task만 Subtask까지 펼치고, 완료된 Task는 개수 한 줄로 생략
+        estimates: Task/Subtask ID -> 남은 시간 표시 (scheduler.progress_estimates)
+    """
+    estimates = estimates or {}
     lines = []
     task_order = state.get("task_order", [])
     tasks = state.get("tasks", {})
     current_task_id = state.get("request", {}).get("current_task")
 
+    if current_only:
+        completed = [t for t in task_order if t != current_task_id and tasks.get(t, {}).get("status") == "completed"]
+        if completed:
+            lines.append(f"(완료된 Task {len(completed)}개 생략)")
+            hidden = set(completed)
+            task_order = [t for t in task_order if t not in hidden]
+
     for i, task_id in enumerate(task_order):
         task = tasks.get(task_id, {})
         is_last_task = i == len(task_order) - 1
         prefix = "`-" if is_last_task else "|-"
 
-        status_icon = get_status_icon(task.get("status"))
-        current_marker = " <- current" if task_id == current_task_id else ""
-        lines.append(f"{prefix} {task_id} {task.get('name', '')} {status_icon}{current_marker}")
-
         # Subtasks
         subtask_order = task.get("subtask_order", [])
         subtasks = task.get("subtasks", {})
         current_subtask_id = task.get("current_subtask")
 
+        status_icon = get_status_icon(task.get("status"))
+        current_marker = " <- current" if task_id == current_task_id else ""
+        folded = task_id != current_task_id and (
+            current_only or (collapse_completed and task.get("status") == "completed")
+        )
+        if folded and subtask_order:
+            done = sum(1 for s in subtask_order if subtasks.get(s, {}).get("status") == "completed")
+            status_icon += f" ({done}/{len(subtask_order)})"
+        estimate = f" {estimates[task_id]}" if task_id in estimates else ""
+        lines.append(f"{prefix} {task_id} {task.get('name', '')} {status_icon}{estimate}{current_marker}")
+        if folded:
+            continue
+
         for j, subtask_id in enumerate(subtask_order):
             subtask = subtasks.get(subtask_id, {})
             is_last_subtask = j == len(subtask_order) - 1
@@ -371,11 +1529,20 @@ def format_progress_tree(state: Dict[str, Any]) -> str:
             sub_status = get_status_icon(subtask.get("status"))
             sub_current = " <- current" if subtask_id == current_subtask_id else ""
             phase_info = f" ({subtask.get('phase', '')})" if subtask.get("phase") else ""
-            lines.append(f"{sub_prefix} {subtask_id} {subtask.get('name', '')} {sub_status}{phase_info}{sub_current}")
+            estimate = f" {estimates[subtask_id]}" if subtask_id in estimates else ""
+            lines.append(f"{sub_prefix} {subtask_id} {subtask.get('name', '')} {sub_status}{phase_info}"
+                         f"{estimate}{sub_current}")
 
     return "\n".join(lines)
 
 
+def format_pitfall(pitfall: Dict[str, Any], width: int) -> str:
+    """pitfall 한 줄 (여러 번 나온 것은 횟수 표시)"""
+    desc = str(pitfall.get("description", ""))[:width]
+    count = int(pitfall.get("count") or 1)
+    return f"{desc} (x{count})" if count > 1 else desc
+
+
 def format_knowledge_summary(knowledge: Dict[str, Any], max_items: int = 3) -> str:
     """knowledge.yaml 요약 포맷"""
     lines = []
@@ -392,9 +1559,8 @@ def format_knowledge_summary(knowledge: Dict[str, Any], max_items: int = 3) -> s
     pitfalls = knowledge.get("pitfalls", [])
     if pitfalls:
         lines.append(f"- Pitfalls: {len(pitfalls)} items")
-        for p in pitfalls[:max_items]:
-            desc = p.get("description", "")[:50]
-            lines.append(f"  * {desc}")
+        for p in top_knowledge_items(pitfalls, max_items):
+            lines.append(f"  * {format_pitfall(p, 50)}")
 
     decisions = knowledge.get("decisions", [])
     if decisions:
@@ -403,22 +1569,25 @@ def format_knowledge_summary(knowledge: Dict[str, Any], max_items: int = 3) -> s
     return "\n".join(lines) if lines else "No knowledge recorded yet"
 
 
+@timed("stdin")
 def read_stdin_json() -> Dict[str, Any]:
-    """stdin에서 JSON 입력 읽기"""
+    """stdin에서 JSON 입력 읽기 (입력의 session_id를 이번 훅의 세션으로 설정)"""
     try:
         input_text = sys.stdin.read()
-        if not input_text.strip():
-            return {}
-        return json.loads(input_text)
+        data = json.loads(input_text) if input_text.strip() else {}
     except (json.JSONDecodeError, IOError):
-        return {}
+        data = {}
+    set_hook_session_id(data.get("session_id") if isinstance(data, dict) else None)
+    return data
 
 
+@timed("output")
 def output_json(data: Dict[str, Any]) -> None:
     """JSON 출력"""
     print(json.dumps(data, ensure_ascii=False))
 
 
+@timed("output")
 def output_result(message: str, hook_event: str = "UserPromptSubmit") -> None:
     """Claude 컨텍스트에 메시지 주입 (Claude Code 공식 형식)"""
     output = {
@@ -430,6 +1599,19 @@ def output_result(message: str, hook_event: str = "UserPromptSubmit") -> None:
     print(json.dumps(output, ensure_ascii=False))
 
 
+@timed("output")
+def output_permission_decision(decision: str, reason: str) -> None:
+    """PreToolUse 권한 결정 출력 (allow/deny/ask)"""
+    output = {
+        "hookSpecificOutput": {
+            "hookEventName": "PreToolUse",
+            "permissionDecision": decision,
+            "permissionDecisionReason": reason,
+        }
+    }
+    print(json.dumps(output, ensure_ascii=False))
+
+
 def log_orchestrator(message: str) -> None:
     """오케스트레이션 진행 상황을 stderr로 출력 (사용자에게 보임)"""
     print(f"[Orchestrator] {message}", file=sys.stderr)
@@ -441,18 +1623,25 @@ def get_timestamp() -> str:
 
 
 def check_yaml_available() -> bool:
-    """PyYAML 사용 가능 여부"""
-    return yaml is not None
+    """
+    PyYAML 사용 가능 여부.
+
+    없어도 knowledge/Contract는 serializer의 표준 라이브러리 파서로 읽고 쓴다.
+    """
+    return serializer.yaml is not None
 
 
 # =============================================================================
 # 게이트 검증 함수
 # =============================================================================
 
-def check_gate(gate_id: str, project_hash: str, current_work: Dict[str, Any]) -> Tuple[bool, str]:
+def check_gate(gate_id: str, project_hash: str, current_work: Dict[str, Any],
+               registry: Optional[Dict[str, Any]] = None) -> Tuple[bool, str]:
     """
     게이트 검증 수행.
 
+    registry: 아직 저장하지 않은 Contract 레지스트리 (StateSession 안에서 검사할 때)
+
     Returns:
         (passed, message) - 통과 여부와 메시지
     """
@@ -466,34 +1655,56 @@ def check_gate(gate_id: str, project_hash: str, current_work: Dict[str, Any]) ->
     # Contract 파일 존재 여부 확인
     if "exists" in condition:
         contract_name = condition.replace(" exists", "").strip()
-        if not check_contract_exists_for_gate(project_hash, current_work, contract_name):
+        if not check_contract_exists_for_gate(project_hash, current_work, contract_name, registry):
             return False, message
 
-    # GATE-3, GATE-4는 별도 로직 필요 (현재는 통과 처리)
-    # TODO: 스코프 변경, 설계 불변 조건 검증 로직 구현
+    # GATE-3(스코프), GATE-4(설계 불변 조건)는 implementation phase에서 파일을 쓸 때
+    # PostToolUse가 hooks/gates.py로 검사한다 (StateSession과 검사 결과 캐시 필요)
 
     return True, ""
 
 
-def check_contract_exists_for_gate(project_hash: str, current_work: Dict[str, Any], contract_name: str) -> bool:
-    """게이트 검증용 Contract 파일 존재 확인"""
-    sessions_path = get_sessions_path(project_hash)
-    request_id = current_work.get("request_id", "R1")
+def contract_keys(current_work: Dict[str, Any], contract_name: str, level: Optional[str] = None) -> List[str]:
+    """
+    Contract 레지스트리 키 (contracts 디렉토리 기준 상대 경로) 후보
+
+    level(request/task/subtask)을 주면 그 위치 하나, 없으면 현재 작업의 가능한 위치 전부.
+    """
+    request_id = current_work.get("request_id") or "R1"
     task_id = current_work.get("task_id", "")
     subtask_id = current_work.get("subtask_id", "")
 
-    # 가능한 경로들 확인
-    possible_paths = [
-        sessions_path / "contracts" / request_id / contract_name,
-    ]
+    keys = {
+        "request": f"{request_id}/{contract_name}",
+        "task": f"{request_id}/{task_id}/{contract_name}" if task_id else None,
+        "subtask": f"{request_id}/{task_id}/{subtask_id}/{contract_name}" if task_id and subtask_id else None,
+    }
+    if level is not None:
+        return [keys[level]] if keys.get(level) else []
+    return [key for key in keys.values() if key]
 
-    if task_id:
-        possible_paths.append(sessions_path / "contracts" / request_id / task_id / contract_name)
 
-    if task_id and subtask_id:
-        possible_paths.append(sessions_path / "contracts" / request_id / task_id / subtask_id / contract_name)
+def contract_exists(project_hash: str, current_work: Dict[str, Any], contract_name: str,
+                    level: Optional[str] = None, registry: Optional[Dict[str, Any]] = None) -> bool:
+    """
+    Contract 존재 확인. state의 Contract 레지스트리(PostToolUse가 기록)에서 찾고 파일은 stat하지 않는다.
+
+    registry를 주지 않으면 저장된 state에서 읽는다. 레지스트리가 없는 이전 state만 파일을 확인한다.
+    """
+    if registry is None:
+        registry = (load_state(project_hash) or {}).get("contracts")
+    keys = contract_keys(current_work, contract_name, level)
+    if registry is not None:
+        return any(key in registry for key in keys)
 
-    return any(p.exists() for p in possible_paths)
+    contracts_path = get_sessions_path(project_hash) / "contracts"
+    return any((contracts_path / key).exists() for key in keys)
+
+
+def check_contract_exists_for_gate(project_hash: str, current_work: Dict[str, Any], contract_name: str,
+                                   registry: Optional[Dict[str, Any]] = None) -> bool:
+    """게이트 검증용 Contract 파일 존재 확인 (request/task/subtask 중 어디든)"""
+    return contract_exists(project_hash, current_work, contract_name, registry=registry)
 
 
 def get_next_phase(current_phase: str, current_work: Dict[str, Any]) -> Optional[str]:
@@ -506,122 +1717,66 @@ def get_next_phase(current_phase: str, current_work: Dict[str, Any]) -> Optional
 
 
 def update_state_phase(project_hash: str, new_phase: str, level: str = "subtask") -> bool:
-    """state.json의 phase 업데이트"""
-    state = load_state(project_hash)
-    if not state:
-        return False
+    """state의 phase 업데이트 (sqlite 백엔드는 해당 행만 갱신)"""
+    store = get_state_store(project_hash)
 
     if level == "global":
-        state["request"]["global_phase"] = new_phase
-    elif level == "subtask":
-        current_task_id = state.get("request", {}).get("current_task")
-        if current_task_id:
-            task = state.get("tasks", {}).get(current_task_id, {})
-            current_subtask_id = task.get("current_subtask")
-            if current_subtask_id:
-                state["tasks"][current_task_id]["subtasks"][current_subtask_id]["phase"] = new_phase
+        return store.update(("request", "global_phase"), new_phase)
 
-    return save_state(project_hash, state)
+    if level == "subtask":
+        current_task_id = store.get(("request", "current_task"))
+        if not current_task_id:
+            return False
+        current_subtask_id = store.get(("tasks", current_task_id, "current_subtask"))
+        if not current_subtask_id:
+            return False
+        return store.update(("tasks", current_task_id, "subtasks", current_subtask_id, "phase"), new_phase)
+
+    return False
 
 
 # =============================================================================
 # 세션 초기화 함수
 # =============================================================================
 
-def create_initial_state(project_hash: str, request: str) -> Dict[str, Any]:
-    """새 오케스트레이션 세션 초기 상태 생성"""
+def create_initial_state(project_hash: str, request: str, request_id: Optional[str] = None) -> Dict[str, Any]:
+    """새 오케스트레이션 요청 초기 상태 생성 (request_id가 없으면 인덱스의 다음 ID)"""
+    from hooks.request_index import next_request_id
+
     return {
         "version": 1,
         "request": {
-            "id": "R1",
+            "id": request_id or next_request_id(project_hash),
             "original_request": request,
             "status": "active",
             "global_phase": "global_discovery",
             "current_task": None,
             "created_at": get_timestamp(),
-            "claude_session_id": get_current_session_id(),
+            "claude_session_id": get_current_session_id(project_hash),
         },
         "task_order": [],
         "tasks": {},
+        # Contract 레지스트리: contracts 기준 상대 경로 -> {size, mtime_ns, digest, recorded_at}
+        "contracts": {},
     }
 
 
 def initialize_session(project_hash: str, request: str) -> bool:
-    """새 세션 초기화"""
+    """새 요청 시작 (진행 중인 다른 요청은 그대로 두고 새 요청이 현재 요청이 됨)"""
     state = create_initial_state(project_hash, request)
     return save_state(project_hash, state)
 
 
 def detect_code_patterns(file_path: str, content: str) -> Dict[str, Any]:
     """
-    파일 내용에서 코드 패턴 감지
+    파일 내용에서 코드 패턴 감지 (hooks/patterns.py 규칙 팩)
 
     Returns:
         감지된 패턴 딕셔너리 또는 빈 딕셔너리
     """
-    patterns = {}
-    file_name = os.path.basename(file_path)
-
-    # 빌드 도구 감지
-    if file_name == "build.gradle" or file_name == "build.gradle.kts":
-        patterns["build_tool"] = "Gradle"
-        if "spring" in content.lower():
-            patterns["framework"] = "Spring"
-    elif file_name == "pom.xml":
-        patterns["build_tool"] = "Maven"
-        if "spring" in content.lower():
-            patterns["framework"] = "Spring"
-    elif file_name == "package.json":
-        patterns["build_tool"] = "npm"
-        if '"react"' in content:
-            patterns["framework"] = "React"
-        elif '"vue"' in content:
-            patterns["framework"] = "Vue"
-        elif '"@angular' in content:
-            patterns["framework"] = "Angular"
-
-    # 테스팅 프레임워크 감지
-    if "Test" in file_name or ".spec." in file_name or ".test." in file_name:
-        if "@Test" in content or "org.junit" in content:
-            if "jupiter" in content or "junit5" in content.lower():
-                patterns["testing"] = "JUnit 5"
-            else:
-                patterns["testing"] = "JUnit 4"
-        if "mockito" in content.lower():
-            patterns["mocking"] = "Mockito"
-        if "describe(" in content or "it(" in content:
-            if "jest" in content.lower():
-                patterns["testing"] = "Jest"
-            elif "vitest" in content.lower():
-                patterns["testing"] = "Vitest"
-            elif "mocha" in content.lower():
-                patterns["testing"] = "Mocha"
-        if "pytest" in content or "@pytest" in content:
-            patterns["testing"] = "pytest"
-
-    # 아키텍처 패턴 감지
-    if "Controller" in file_name or "@Controller" in content or "@RestController" in content:
-        patterns["architecture_hint"] = "MVC/Layered"
-    if "Repository" in file_name or "@Repository" in content:
-        patterns["data_layer"] = "Repository Pattern"
-    if "Service" in file_name or "@Service" in content:
-        patterns["service_layer"] = "Service Layer"
-
-    # 언어 감지
-    if file_path.endswith(".java"):
-        patterns["language"] = "Java"
-    elif file_path.endswith(".py"):
-        patterns["language"] = "Python"
-    elif file_path.endswith((".ts", ".tsx")):
-        patterns["language"] = "TypeScript"
-    elif file_path.endswith((".js", ".jsx")):
-        patterns["language"] = "JavaScript"
-    elif file_path.endswith(".go"):
-        patterns["language"] = "Go"
-    elif file_path.endswith(".rs"):
-        patterns["language"] = "Rust"
-
-    return patterns
+    from hooks.patterns import get_pattern_scanner
+
+    return get_pattern_scanner().scan(file_path, content)
 
 
 def merge_patterns(existing: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
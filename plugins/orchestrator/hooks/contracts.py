@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - Contract 레지스트리
+
+게이트(GATE-1/2)와 SubagentStop은 Contract가 있는지 확인할 때마다
+contracts/{request}/{task}/{subtask} 아래 후보 경로를 stat했다.
+PostToolUse가 Contract 파일을 쓸 때마다 state의 `contracts` 레지스트리에
+contracts 기준 상대 경로 → {size, mtime_ns, digest, recorded_at}을 기록하고,
+존재 확인은 레지스트리에서 한다 (common.contract_exists).
+
+- 레지스트리는 요청 state마다 있고 그 요청의 Contract(contracts/{request_id}/ 아래)만 담는다
+- 레지스트리가 없는 이전 state는 처음 Contract를 기록할 때 디스크에서 한 번 만든다
+- 훅을 거치지 않고 (Bash 등으로) 만들거나 지운 Contract는 반영되지 않으므로
+  verify 명령으로 디스크에서 다시 만든다
+
+명령줄에서 레지스트리 확인/재구성:
+    python3 hooks/contracts.py verify [--project-hash HASH]   # 인덱스의 모든 요청
+"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# hooks 패키지 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks.common import (
+    CONTRACT_FILE_NAMES,
+    get_project_hash,
+    get_sessions_path,
+    get_state_store,
+    get_timestamp,
+)
+from hooks.request_index import load_index
+
+
+def get_contracts_path(project_hash: str) -> Path:
+    """Contract 디렉토리 경로"""
+    return get_sessions_path(project_hash) / "contracts"
+
+
+def contract_registry_key(project_hash: str, file_path: str) -> Optional[str]:
+    """레지스트리 키 (contracts 기준 상대 경로). contracts 밖이거나 Contract가 아니면 None"""
+    path = Path(os.path.abspath(file_path))
+    if path.name not in CONTRACT_FILE_NAMES:
+        return None
+    try:
+        return path.relative_to(get_contracts_path(project_hash)).as_posix()
+    except ValueError:
+        return None
+
+
+def describe_contract(path: Path) -> Optional[Dict[str, Any]]:
+    """레지스트리 항목 (파일이 없으면 None)"""
+    try:
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": digest,
+        "recorded_at": get_timestamp(),
+    }
+
+
+def scan_contracts(project_hash: str, request_id: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """디스크의 Contract 파일로 레지스트리 생성 (request_id가 있으면 그 요청의 Contract만)"""
+    root = get_contracts_path(project_hash)
+    registry = {}
+    for dirpath, dirnames, filenames in os.walk(root / request_id if request_id else root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name not in CONTRACT_FILE_NAMES:
+                continue
+            path = Path(dirpath) / name
+            entry = describe_contract(path)
+            if entry:
+                registry[path.relative_to(root).as_posix()] = entry
+    return registry
+
+
+def register_contract(session, file_path: str) -> bool:
+    """
+    방금 쓴 Contract를 StateSession의 레지스트리에 기록 (commit 때 저장)
+
+    같은 훅 안의 게이트 검사는 session.state["contracts"]로 이 기록을 바로 본다.
+    """
+    state = session.state
+    key = contract_registry_key(session.project_hash, file_path)
+    if not state or key is None:
+        return False
+    request_id = state.get("request", {}).get("id")
+    if request_id and not key.startswith(f"{request_id}/"):
+        # 다른 요청의 Contract
+        return False
+
+    if state.get("contracts") is None:
+        # 레지스트리가 없는 이전 state: 디스크에서 한 번 만듦 (방금 쓴 파일 포함)
+        return session.set(("contracts",), scan_contracts(session.project_hash, request_id))
+
+    entry = describe_contract(Path(file_path))
+    if entry is None:
+        return False
+    return session.set(("contracts", key), entry)
+
+
+def verify_contracts(project_hash: str) -> Optional[Dict[str, List[str]]]:
+    """
+    인덱스의 요청마다 디스크에서 레지스트리를 다시 만들어 state에 저장
+
+    Returns:
+        {"added", "removed", "changed", "total"} (요청 state가 하나도 없으면 None)
+        added/removed/changed는 키 목록, changed는 내용 해시가 다른 항목
+    """
+    report: Optional[Dict[str, List[str]]] = None
+    for request_id in load_index(project_hash)["requests"]:
+        store = get_state_store(project_hash, request_id)
+        state = store.load()
+        if not state:
+            continue
+
+        old = state.get("contracts") or {}
+        new = scan_contracts(project_hash, request_id)
+        changes = {
+            "added": sorted(key for key in new if key not in old),
+            "removed": sorted(key for key in old if key not in new),
+            "changed": sorted(key for key in new if key in old and old[key].get("digest") != new[key]["digest"]),
+        }
+        if state.get("contracts") is None or any(changes.values()):
+            store.update(("contracts",), new)
+
+        report = report or {"added": [], "removed": [], "changed": [], "total": []}
+        for label, keys in changes.items():
+            report[label] += keys
+        report["total"] += sorted(new)
+    return report
+
+
+def main():
+    """Contract 레지스트리 확인/재구성"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="orchestrator Contract 레지스트리 재구성")
+    parser.add_argument("command", choices=["verify"])
+    parser.add_argument("--project-hash", default=None, help="기본값: 현재 디렉토리의 프로젝트 해시")
+    args = parser.parse_args()
+
+    report = verify_contracts(args.project_hash or get_project_hash())
+    if report is None:
+        print("[Orchestrator] verify 실패: 세션 state가 없습니다")
+        sys.exit(1)
+
+    print(f"[Orchestrator] verify 완료: Contract {len(report['total'])}개")
+    for label in ("added", "removed", "changed"):
+        for key in report[label]:
+            print(f"  {label:<8} {key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Hook Daemon - 프로젝트별 상주 오케스트레이터 프로세스
+
+client.py가 처음 호출될 때 백그라운드로 기동되어:
+1. 프로젝트별 Unix 소켓에서 훅 요청을 순차 처리
+2. config, state.json, knowledge.yaml을 메모리에 유지 (mtime 변경 시에만 재로드)
+3. 일정 시간 요청이 없거나 훅 코드가 바뀌면 스스로 종료
+
+요청/응답은 한 연결당 JSON 하나이며, 요청은 클라이언트가 쓰기를 닫으면 끝난다.
+"""
+
+import contextlib
+import importlib
+import io
+import json
+import os
+import socket
+import sys
+import traceback
+from pathlib import Path
+from typing import Dict, Optional
+
+# hooks 패키지 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from hooks.client import HOOK_MODULES, get_daemon_socket_path, is_forwarded_env_key
+
+# 요청이 없을 때 종료까지 대기 시간 (초)
+IDLE_TIMEOUT_ENV_KEY = "ORCHESTRATOR_HOOK_DAEMON_IDLE"
+DEFAULT_IDLE_TIMEOUT = 900
+
+
+def get_code_signature() -> tuple:
+    """훅 코드 변경 감지용 서명 (hooks/*.py, config의 mtime)"""
+    hooks_dir = Path(__file__).parent
+    signature = []
+    for path in sorted(hooks_dir.glob("*.py")):
+        try:
+            signature.append((path.name, path.stat().st_mtime_ns))
+        except OSError:
+            continue
+    return tuple(signature)
+
+
+def apply_environ(environ: Dict[str, str]) -> None:
+    """클라이언트가 보낸 훅 관련 환경변수 적용 (클라이언트에 없는 키는 지움)"""
+    for key in [key for key in os.environ if is_forwarded_env_key(key) and key not in environ]:
+        del os.environ[key]
+    os.environ.update({key: str(value) for key, value in environ.items() if is_forwarded_env_key(key)})
+
+
+def run_hook(hook: str, payload: str, environ: Optional[Dict[str, str]] = None) -> dict:
+    """
+    stdin/stdout/stderr를 바꿔 끼우고 훅 main() 실행
+
+    Args:
+        environ: 이번 호출의 훅 관련 환경변수 (None이면 데몬의 환경 그대로)
+    """
+    module = importlib.import_module(f"hooks.{hook}")
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    saved_stdin = sys.stdin
+    saved_environ = dict(os.environ)
+    exit_code = 0
+
+    if environ is not None:
+        apply_environ(environ)
+    sys.stdin = io.StringIO(payload)
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                module.main()
+            except SystemExit as e:
+                exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        sys.stdin = saved_stdin
+        # 적용한 환경변수와 훅이 바꾼 환경변수(Stop 훅 재진입 방지 키 등)가 다음 요청에 새지 않도록 복원
+        os.environ.clear()
+        os.environ.update(saved_environ)
+
+    return {
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "exit_code": exit_code,
+    }
+
+
+class HookDaemon:
+    """프로젝트별 훅 데몬"""
+
+    def __init__(self, socket_path: str, idle_timeout: float):
+        self.socket_path = socket_path
+        self.idle_timeout = idle_timeout
+        self.cwd = os.getcwd()
+        self.code_signature = get_code_signature()
+        self.running = True
+
+    def handle(self, conn: socket.socket) -> None:
+        """연결 하나 처리"""
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        try:
+            request = json.loads(b"".join(chunks).decode("utf-8"))
+        except ValueError:
+            conn.sendall(json.dumps({"error": "invalid request"}).encode("utf-8"))
+            return
+
+        hook = request.get("hook")
+        if hook not in HOOK_MODULES:
+            reply = {"error": f"unknown hook: {hook}"}
+        elif request.get("cwd") != self.cwd:
+            reply = {"error": "project mismatch"}
+        elif get_code_signature() != self.code_signature:
+            # 플러그인 코드가 바뀌었으면 클라이언트가 직접 처리하게 하고 종료
+            reply = {"error": "stale daemon"}
+            self.running = False
+        else:
+            environ = request.get("env")
+            reply = run_hook(hook, request.get("payload", ""), environ if isinstance(environ, dict) else None)
+
+        conn.sendall(json.dumps(reply, ensure_ascii=False).encode("utf-8"))
+
+    def serve_forever(self) -> None:
+        """idle_timeout 동안 요청이 없을 때까지 순차 처리"""
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        server.listen(64)
+        server.settimeout(self.idle_timeout)
+
+        try:
+            while self.running:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    break
+                with conn:
+                    conn.settimeout(None)
+                    try:
+                        self.handle(conn)
+                    except OSError:
+                        continue
+        finally:
+            server.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+
+
+def main():
+    """Hook Daemon 메인 함수"""
+    socket_path = get_daemon_socket_path()
+    run_dir = os.path.dirname(socket_path)
+    os.makedirs(run_dir, mode=0o700, exist_ok=True)
+
+    # 동시에 여러 훅이 기동을 시도해도 데몬은 하나만 뜨도록 잠금
+    lock_file = open(socket_path + ".lock", "w")
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return
+
+    # 미리 import해 두어 첫 요청부터 import 비용 없이 처리
+    for hook in HOOK_MODULES:
+        importlib.import_module(f"hooks.{hook}")
+
+    try:
+        idle_timeout = float(os.environ.get(IDLE_TIMEOUT_ENV_KEY, DEFAULT_IDLE_TIMEOUT))
+    except ValueError:
+        idle_timeout = DEFAULT_IDLE_TIMEOUT
+
+    HookDaemon(socket_path, idle_timeout).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
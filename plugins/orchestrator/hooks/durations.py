@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - Subtask phase 소요 시간 기록과 추정
+
+StateSession.set_phase가 Subtask phase를 바꿀 때 이전 phase의 시작 시각
+(subtask.phase_started_at)부터 걸린 시간을 모아 두었다가, commit 때 프로젝트별
+기록(세션 디렉토리의 durations.json)에 추가한다.
+
+    {"version": 1, "phases": {"implementation": [초, ...], ...}}   # phase별 최근 MAX_SAMPLES개
+
+- design: Subtask를 시작할 수 있게 된 때(ready)부터 test_first까지 (phase 없음)
+- test_first / implementation / verification: 그 phase로 바뀐 때부터 다음 phase까지
+
+phase별 추정값은 최근 기록의 중앙값(자리를 비운 시간 같은 이상값에 덜 흔들림)이고,
+기록이 없으면 DEFAULT_PHASE_SECONDS. 스케줄러는 이 추정값으로 남은 임계 경로가
+긴 Subtask부터 안내한다 (hooks/scheduler.py).
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# hooks 패키지 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks.common import (
+    atomic_write_text,
+    get_sessions_path,
+    memo_load,
+    memo_store,
+)
+from hooks.locking import file_lock
+
+
+# Subtask phase 순서 (phase가 없으면 아직 설계 전)
+PHASE_SEQUENCE = ("design", "test_first", "implementation", "verification")
+
+# 기록이 없을 때의 phase별 추정 소요 시간 (초)
+DEFAULT_PHASE_SECONDS = {
+    "design": 600,
+    "test_first": 900,
+    "implementation": 1800,
+    "verification": 600,
+}
+
+# phase별로 보관할 최근 기록 수
+MAX_SAMPLES = 50
+
+# 기록 형식이 바뀌면 올려서 이전 기록을 무시
+DURATIONS_VERSION = 1
+
+
+def phase_name(phase: Optional[str]) -> str:
+    """state의 Subtask phase -> 기록에 쓰는 이름 (phase 없음은 design)"""
+    return phase or "design"
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """get_timestamp() 형식 -> epoch 초"""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(str(value).rstrip("Z"))
+    except ValueError:
+        return None
+    return (moment - datetime(1970, 1, 1)).total_seconds()
+
+
+def get_durations_path(project_hash: str) -> Path:
+    """프로젝트의 phase 소요 시간 기록 경로"""
+    return get_sessions_path(project_hash) / "durations.json"
+
+
+def load_duration_history(project_hash: str) -> Dict[str, List[float]]:
+    """phase -> 최근 소요 시간 목록 (초, 오래된 것부터)"""
+    try:
+        history = memo_load(get_durations_path(project_hash), json.loads)
+    except (ValueError, IOError):
+        return {}
+    if not isinstance(history, dict) or history.get("version") != DURATIONS_VERSION:
+        return {}
+    return history.get("phases") or {}
+
+
+def record_phase_durations(project_hash: str, samples: List[Tuple[str, float]]) -> bool:
+    """(phase, 초) 기록 추가 (phase별 최근 MAX_SAMPLES개만 유지)"""
+    samples = [(phase, seconds) for phase, seconds in samples if phase in PHASE_SEQUENCE and seconds > 0]
+    if not samples:
+        return True
+    path = get_durations_path(project_hash)
+    try:
+        with file_lock(path):
+            try:
+                history = json.loads(path.read_text(encoding="utf-8"))
+            except (ValueError, IOError):
+                history = None
+            if not isinstance(history, dict) or history.get("version") != DURATIONS_VERSION:
+                history = {"version": DURATIONS_VERSION, "phases": {}}
+            phases = history["phases"]
+            for phase, seconds in samples:
+                phases.setdefault(phase, []).append(round(seconds, 1))
+            for phase in phases:
+                del phases[phase][:-MAX_SAMPLES]
+
+            written = atomic_write_text(path, json.dumps(history, ensure_ascii=False))
+            memo_store(path, history, written)
+    except OSError:
+        return False
+    return True
+
+
+def phase_estimates(project_hash: str) -> Dict[str, float]:
+    """phase -> 추정 소요 시간 (초, 기록의 중앙값)"""
+    history = load_duration_history(project_hash)
+    estimates = dict(DEFAULT_PHASE_SECONDS)
+    for phase in PHASE_SEQUENCE:
+        samples = sorted(history.get(phase) or [])
+        if samples:
+            middle = len(samples) // 2
+            estimates[phase] = samples[middle] if len(samples) % 2 else (samples[middle - 1] + samples[middle]) / 2
+    return estimates
+
+
+def remaining_seconds(subtask: Dict[str, Any], estimates: Dict[str, float], now: Optional[float] = None) -> float:
+    """
+    Subtask를 끝내기까지 남은 추정 시간 (초)
+
+    현재 phase부터 verification까지의 추정값 합에서 현재 phase에 이미 쓴 시간을 뺀다
+    (현재 phase의 추정값보다 오래 걸리고 있으면 그 phase는 0).
+    """
+    phase = subtask.get("phase") or ""
+    if subtask.get("status") == "completed" or phase == "complete":
+        return 0.0
+    name = phase_name(phase)
+    if name not in PHASE_SEQUENCE:
+        return 0.0
+    index = PHASE_SEQUENCE.index(name)
+    remaining = sum(estimates[p] for p in PHASE_SEQUENCE[index:])
+
+    started = parse_timestamp(subtask.get("phase_started_at"))
+    if started is not None:
+        elapsed = (time.time() if now is None else now) - started
+        remaining -= min(max(elapsed, 0.0), estimates[name])
+    return remaining
+
+
+def format_duration(seconds: float) -> str:
+    """사람이 읽는 소요 시간 (~25분, ~1시간 20분)"""
+    minutes = int(round(seconds / 60))
+    if minutes < 1:
+        return "<1분"
+    if minutes < 60:
+        return f"~{minutes}분"
+    hours, minutes = divmod(minutes, 60)
+    return f"~{hours}시간 {minutes}분" if minutes else f"~{hours}시간"
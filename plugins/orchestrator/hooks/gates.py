@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - GATE-3 (스코프 유지) / GATE-4 (설계 불변 조건) 검증
+
+implementation phase에서 파일을 쓸 때마다 PostToolUse가 검사하므로,
+매번 Contract를 다시 파싱하거나 프로젝트 파일을 전부 다시 읽지 않는다.
+
+GATE-3: task-breakdown.yaml의 스코프 구조(Task/Subtask id, task_order, scope)를 해시해
+  Planning(global_discovery) 중에 저장한 기준값(state의 gates.scope)과 비교한다.
+  Contract 레지스트리의 내용 해시가 기준값을 만들 때와 같으면 파싱하지 않는다.
+
+GATE-4: design-contract.yaml invariants 중 검사 규칙이 있는 것만 확인한다.
+  (rule만 있는 invariant는 기계적으로 검증할 수 없으므로 통과)
+
+    invariants:
+      - id: INV-1
+        rule: "도메인 레이어는 인프라에 의존하지 않는다"
+        files: ["src/domain/**/*.py"]              # 생략하면 file_refs의 path
+        forbid: ["^from app\\.infrastructure"]    # 한 파일이라도 매치하면 위반
+        require: []                                # 어느 파일에도 없으면 위반
+
+  Subtask별로 gate-cache.json에 invariant별 파일 (mtime_ns, size)와 매치 결과를 기록해,
+  바뀐 파일과 방금 쓴 파일만 다시 읽는다. design-contract.yaml은 레지스트리의 내용 해시가
+  바뀌었을 때만 다시 파싱한다. 여러 Subtask가 병렬로 구현 중이면 모두의 invariant를 검사한다.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from hooks.common import (
+    atomic_write_text,
+    contract_keys,
+    get_current_work,
+    get_gate_config,
+    get_sessions_path,
+    get_subtask_work,
+    memo_load,
+    memo_store,
+)
+from hooks.contracts import contract_registry_key, describe_contract, get_contracts_path
+from hooks.scheduler import in_flight_subtasks
+
+
+# 캐시 형식이 바뀌면 올려서 이전 캐시를 무효화
+GATE_CACHE_VERSION = 1
+
+
+def get_gate_cache_path(project_hash: str) -> Path:
+    """GATE-4 검사 결과 캐시 경로 (state.json 옆)"""
+    return get_sessions_path(project_hash) / "gate-cache.json"
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _contract_digest(session, key: str) -> Optional[str]:
+    """Contract 내용 해시 (레지스트리에서, 레지스트리가 없는 이전 state만 파일을 읽음)"""
+    registry = session.state.get("contracts")
+    if registry is not None:
+        entry = registry.get(key)
+    else:
+        entry = describe_contract(get_contracts_path(session.project_hash) / key)
+    return entry.get("digest") if entry else None
+
+
+# =============================================================================
+# GATE-3: 스코프
+# =============================================================================
+
+def scope_fingerprint(breakdown: Dict[str, Any]) -> str:
+    """task-breakdown.yaml의 스코프 구조 해시 (이름/설명 수정은 스코프 변경이 아님)"""
+    root = breakdown.get("task_breakdown", breakdown) if isinstance(breakdown, dict) else {}
+    if not isinstance(root, dict):
+        root = {}
+    tasks = []
+    for task in root.get("tasks") or []:
+        if isinstance(task, dict):
+            subtasks = [s.get("id") for s in task.get("subtasks") or [] if isinstance(s, dict)]
+            tasks.append([task.get("id"), subtasks])
+    return _digest([tasks, root.get("task_order"), root.get("scope")])
+
+
+def record_scope_baseline(session, file_path: str) -> bool:
+    """Planning 중 저장된 task-breakdown.yaml을 GATE-3 기준값으로 기록"""
+    state = session.state
+    content = session.contract(file_path)
+    key = contract_registry_key(session.project_hash, file_path)
+    if not state or content is None or key is None:
+        return False
+    gates = dict(state.get("gates") or {})
+    gates["scope"] = {"digest": _contract_digest(session, key), "fingerprint": scope_fingerprint(content)}
+    return session.set(("gates",), gates)
+
+
+def check_scope(session, current_work: Dict[str, Any]) -> bool:
+    """GATE-3: 기준값 이후 스코프 구조가 그대로인지"""
+    key = contract_keys(current_work, "task-breakdown.yaml", "request")[0]
+    digest = _contract_digest(session, key)
+    if digest is None:
+        return True
+
+    baseline = (session.state.get("gates") or {}).get("scope")
+    if baseline and baseline.get("digest") == digest:
+        return True
+
+    content = session.contract(str(get_contracts_path(session.project_hash) / key))
+    if content is None:
+        return True
+    fingerprint = scope_fingerprint(content)
+    if baseline and baseline.get("fingerprint") != fingerprint:
+        return False
+
+    # 기준값이 없는 이전 세션이거나 스코프 밖 내용만 바뀜: 다음 검사는 파싱 없이 통과하도록 갱신
+    gates = dict(session.state.get("gates") or {})
+    gates["scope"] = {"digest": digest, "fingerprint": fingerprint}
+    session.set(("gates",), gates)
+    return True
+
+
+# =============================================================================
+# GATE-4: 설계 불변 조건
+# =============================================================================
+
+def glob_to_regex(pattern: str) -> "re.Pattern":
+    """프로젝트 기준 glob (`**` 지원)을 상대 경로 정규식으로"""
+    parts = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            parts.append("[^/]")
+            i += 1
+        else:
+            parts.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(parts) + r"\Z")
+
+
+def project_relative(file_path: str) -> Optional[str]:
+    """프로젝트 기준 상대 경로 (프로젝트 밖이면 None)"""
+    try:
+        return Path(os.path.abspath(file_path)).relative_to(os.getcwd()).as_posix()
+    except ValueError:
+        return None
+
+
+def checkable_invariants(content: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """검사 규칙(forbid/require)이 있는 invariant만 정규화"""
+    root = content.get("design_contract", content)
+    if not isinstance(root, dict):
+        return []
+    default_files = [ref.get("path") for ref in root.get("file_refs") or [] if isinstance(ref, dict) and ref.get("path")]
+
+    invariants = []
+    for inv in root.get("invariants") or []:
+        if not isinstance(inv, dict) or not (inv.get("forbid") or inv.get("require")):
+            continue
+        forbid = [str(p) for p in inv.get("forbid") or []]
+        require = [str(p) for p in inv.get("require") or []]
+        try:
+            for pattern in forbid + require:
+                re.compile(pattern, re.MULTILINE)
+        except re.error:
+            continue
+        invariants.append({
+            "id": str(inv.get("id", "")),
+            "files": [str(f) for f in inv.get("files") or default_files],
+            "forbid": forbid,
+            "require": require,
+        })
+    return invariants
+
+
+def resolve_files(globs: List[str]) -> List[str]:
+    """glob을 프로젝트의 파일 목록으로 (와일드카드 없는 경로는 아직 없어도 포함)"""
+    root = Path(os.getcwd())
+    files = set()
+    for pattern in globs:
+        if not any(ch in pattern for ch in "*?["):
+            files.add(pattern)
+            continue
+        for path in root.glob(pattern):
+            if path.is_file():
+                files.add(path.relative_to(root).as_posix())
+    return sorted(files)
+
+
+def scan_file(path: str, invariant: Dict[str, Any]) -> Optional[List[List[int]]]:
+    """파일에서 매치된 [forbid 인덱스 목록, require 인덱스 목록] (읽을 수 없으면 None)"""
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    return [
+        [i for i, p in enumerate(invariant["forbid"]) if re.search(p, text, re.MULTILINE)],
+        [i for i, p in enumerate(invariant["require"]) if re.search(p, text, re.MULTILINE)],
+    ]
+
+
+class GateCache:
+    """요청/Subtask ID → {design, design_digest, invariants: [{spec, files: {path: [mtime_ns, size, hits]}}]}"""
+
+    def __init__(self, project_hash: str):
+        self.path = get_gate_cache_path(project_hash)
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self.scanned = 0
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                data = memo_load(self.path, json.loads)
+            except (ValueError, IOError):
+                data = None
+            valid = isinstance(data, dict) and data.get("version") == GATE_CACHE_VERSION
+            self._entries = data.get("subtasks", {}) if valid else {}
+        return self._entries
+
+    def get(self, subtask_id: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(subtask_id)
+
+    def put(self, subtask_id: str, entry: Dict[str, Any]) -> None:
+        self.entries[subtask_id] = entry
+        self._dirty = True
+
+    def touch(self) -> None:
+        self._dirty = True
+
+    def save(self) -> bool:
+        if not self._dirty:
+            return True
+        data = {"version": GATE_CACHE_VERSION, "subtasks": self.entries}
+        try:
+            written = atomic_write_text(self.path, json.dumps(data, ensure_ascii=False))
+            memo_store(self.path, data, written)
+        except OSError:
+            return False
+        self._dirty = False
+        return True
+
+
+def _design_contract_key(session, current_work: Dict[str, Any]) -> Optional[str]:
+    """현재 작업에 해당하는 가장 구체적인 design-contract.yaml 키"""
+    registry = session.state.get("contracts")
+    root = get_contracts_path(session.project_hash)
+    for key in reversed(contract_keys(current_work, "design-contract.yaml")):
+        if (key in registry) if registry is not None else (root / key).exists():
+            return key
+    return None
+
+
+def _stat(path: str, signatures: Dict[str, Optional[Tuple[int, int]]]) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size), 한 번의 검사 안에서는 invariant끼리 공유"""
+    if path not in signatures:
+        try:
+            stat = os.stat(path)
+            signatures[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signatures[path] = None
+    return signatures[path]
+
+
+def _refresh_files(invariant: Dict[str, Any], written: Optional[str], cache: GateCache,
+                   signatures: Dict[str, Optional[Tuple[int, int]]]) -> None:
+    """바뀐 파일과 새로 매치된 방금 쓴 파일만 다시 읽음"""
+    files = invariant["files"]
+    if written and written not in files and any(glob_to_regex(g).match(written) for g in invariant["spec"]["files"]):
+        files[written] = None
+
+    for path in list(files):
+        signature = _stat(path, signatures)
+        cached = files[path]
+        if signature is None:
+            if cached is not None:
+                files[path] = None
+                cache.touch()
+            continue
+        if cached is not None and tuple(cached[:2]) == signature:
+            continue
+        files[path] = [*signature, scan_file(path, invariant["spec"])]
+        cache.scanned += 1
+        cache.touch()
+
+
+def _invariant_violation(invariant: Dict[str, Any]) -> Optional[str]:
+    """위반 사유 (없으면 None)"""
+    spec = invariant["spec"]
+    required = set()
+    for path, cached in invariant["files"].items():
+        if not cached or cached[2] is None:
+            continue
+        forbid_hits, require_hits = cached[2]
+        if forbid_hits:
+            return f"{spec['id']}: {path}에서 금지 패턴 '{spec['forbid'][forbid_hits[0]]}' 발견"
+        required.update(require_hits)
+    missing = [p for i, p in enumerate(spec["require"]) if i not in required]
+    if missing and any(cached for cached in invariant["files"].values()):
+        return f"{spec['id']}: 필수 패턴 '{missing[0]}'이 어느 파일에도 없음"
+    return None
+
+
+def check_invariants(session, current_work: Dict[str, Any], written: Optional[str],
+                     cache: GateCache) -> Optional[str]:
+    """GATE-4: 위반 사유 (통과면 None)"""
+    key = _design_contract_key(session, current_work)
+    if key is None:
+        return None
+    digest = _contract_digest(session, key)
+    # 요청마다 Subtask ID가 겹치므로 요청 ID까지 키로
+    subtask_id = f"{current_work.get('request_id', '')}/{current_work.get('subtask_id') or current_work.get('task_id', '')}"
+
+    entry = cache.get(subtask_id)
+    if not entry or entry.get("design") != key or entry.get("design_digest") != digest:
+        content = session.contract(str(get_contracts_path(session.project_hash) / key)) or {}
+        entry = {
+            "design": key,
+            "design_digest": digest,
+            "invariants": [
+                {"spec": spec, "files": {path: None for path in resolve_files(spec["files"])}}
+                for spec in checkable_invariants(content)
+            ],
+        }
+        cache.put(subtask_id, entry)
+
+    violation = None
+    signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+    for invariant in entry["invariants"]:
+        _refresh_files(invariant, written, cache, signatures)
+        violation = violation or _invariant_violation(invariant)
+    return violation
+
+
+def check_implementation_gates(session, file_path: str) -> Tuple[str, bool, str]:
+    """
+    implementation phase에서 쓴 파일에 대해 GATE-3, GATE-4 검사
+
+    여러 Subtask가 병렬로 구현 중이면 어느 Subtask의 파일인지 알 수 없으므로
+    구현 중인 Subtask 모두의 불변 조건을 검사한다.
+
+    Returns:
+        (gate_id, passed, message)
+    """
+    state = session.state
+    if not state or state.get("request", {}).get("status") != "active":
+        return "", True, ""
+    works = implementation_works(state)
+    if not works:
+        return "", True, ""
+
+    gate = get_gate_config("GATE-3")
+    if gate and not check_scope(session, works[0]):
+        return "GATE-3", False, gate.get("message", "Gate GATE-3 blocked")
+
+    gate = get_gate_config("GATE-4")
+    if gate:
+        cache = GateCache(session.project_hash)
+        written = project_relative(file_path)
+        violation = None
+        for work in works:
+            violation = check_invariants(session, work, written, cache)
+            if violation:
+                if len(works) > 1:
+                    violation = f"{work['subtask_id']}: {violation}"
+                break
+        cache.save()
+        if violation:
+            return "GATE-4", False, f"{gate.get('message', 'Gate GATE-4 blocked')} ({violation})"
+
+    return "", True, ""
+
+
+def implementation_works(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """implementation phase인 Subtask의 작업 정보 (현재 Subtask 먼저, 병렬 진행 중인 Subtask 포함)"""
+    works = []
+    current = get_current_work(state)
+    if current.get("phase") == "implementation":
+        works.append(current)
+    for task_id, subtask_id in in_flight_subtasks(state):
+        work = get_subtask_work(state, task_id, subtask_id)
+        if work["phase"] == "implementation" and work["subtask_id"] != current.get("subtask_id"):
+            works.append(work)
+    return works
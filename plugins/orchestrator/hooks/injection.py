@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - UserPromptSubmit 컨텍스트 주입 기록
+
+active 세션이 있으면 UserPromptSubmit은 키워드가 없는 프롬프트마다 세션 컨텍스트를 주입한다.
+매번 전체 재개 메시지(상태 표, 진행 트리, 다음 행동)를 보내면 큰 계획에서는
+턴마다 수 KB가 반복되므로, 마지막으로 주입한 상태를 Claude Code 세션별 기록
+(세션 디렉토리의 injection/{세션 ID}.json)에 남기고
+
+- 구조(요청, global phase, Task/Subtask 목록)가 같으면 바뀐 Subtask와 현재 위치만 주입
+- 구조가 바뀌었거나, 다른 Claude Code 세션이거나, 컨텍스트 압축 뒤라면 전체 주입
+- 전체 주입은 injection.max_tokens/max_bytes 예산을 넘으면 완료된 Task부터 접음
+
+상태 버전은 state에서 주입에 쓰이는 값만 뽑은 스냅샷의 해시다.
+(state 저장 방식(json/sqlite)과 무관하고, 주입과 상관없는 필드가 바뀌어도 그대로)
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from hooks.common import (
+    atomic_write_text,
+    format_progress_tree,
+    get_current_session_id,
+    get_sessions_path,
+    get_status_icon,
+    load_orchestrator_config,
+    memo_load,
+    memo_store,
+)
+
+
+# 기록 형식이 바뀌면 올려서 이전 기록을 무효화 (다음 주입은 전체)
+INJECTION_RECORD_VERSION = 1
+
+DEFAULT_INJECTION_CONFIG = {"mode": "diff", "max_tokens": 1500, "max_bytes": 0, "full_every": 20}
+
+
+def get_injection_config() -> Dict[str, Any]:
+    """injection 설정 (예산 0이면 무제한)"""
+    config = (load_orchestrator_config().get("injection", {}) or {})
+    return {**DEFAULT_INJECTION_CONFIG, **config}
+
+
+def get_injection_record_path(project_hash: str, session_id: Optional[str] = None) -> Path:
+    """
+    마지막 주입 기록 경로 (Claude Code 세션별)
+
+    같은 프로젝트의 세션 두 개가 기록을 번갈아 덮어써 매번 전체 주입이 되지 않도록 세션마다 둔다.
+    """
+    session_id = session_id or get_current_session_id(project_hash) or "default"
+    return get_sessions_path(project_hash) / "injection" / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', session_id)}.json"
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (ASCII는 4자당 1토큰, 한글 등은 글자당 1토큰)"""
+    ascii_chars = len(text.encode("ascii", errors="ignore"))
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+def within_budget(text: str, config: Dict[str, Any]) -> bool:
+    """max_tokens/max_bytes 예산 안인지"""
+    max_tokens = int(config.get("max_tokens") or 0)
+    max_bytes = int(config.get("max_bytes") or 0)
+    if max_bytes and len(text.encode("utf-8")) > max_bytes:
+        return False
+    return not (max_tokens and estimate_tokens(text) > max_tokens)
+
+
+def fit_to_budget(render: Callable[[str], str], state: Dict[str, Any], config: Dict[str, Any],
+                  estimates: Optional[Dict[str, str]] = None) -> str:
+    """
+    진행 트리를 예산 안에 들도록 점점 접어 가며 render(progress_tree)를 만든다.
+
+    1. 전체 트리
+    2. 완료된 Task를 한 줄로
+    3. 현재 Task만 펼치고 완료된 Task는 개수만
+    4. 그래도 넘으면 트리 뒤쪽 줄을 잘라냄
+    """
+    for options in ({}, {"collapse_completed": True}, {"collapse_completed": True, "current_only": True}):
+        tree = format_progress_tree(state, estimates=estimates, **options)
+        message = render(tree)
+        if within_budget(message, config):
+            return message
+
+    lines = tree.split("\n")
+    while len(lines) > 1:
+        lines.pop()
+        message = render("\n".join(lines + [f"... (Task {len(state.get('task_order', []))}개 중 일부 생략)"]))
+        if within_budget(message, config):
+            break
+    return message
+
+
+def state_snapshot(state: Dict[str, Any]) -> Dict[str, Any]:
+    """주입 내용에 영향을 주는 값만 뽑은 스냅샷"""
+    request = state.get("request", {})
+    tasks = state.get("tasks", {})
+    structure = []
+    items = {}
+    for task_id in state.get("task_order", []):
+        task = tasks.get(task_id, {})
+        subtask_order = list(task.get("subtask_order", []))
+        structure.append([task_id, subtask_order])
+        items[task_id] = [task.get("name", ""), task.get("status", ""), ""]
+        for subtask_id in subtask_order:
+            subtask = task.get("subtasks", {}).get(subtask_id, {})
+            items[subtask_id] = [subtask.get("name", ""), subtask.get("status", ""), subtask.get("phase", "")]
+
+    current_task = request.get("current_task") or ""
+    return {
+        "request_id": request.get("id", ""),
+        "global_phase": request.get("global_phase", ""),
+        "structure": structure,
+        "items": items,
+        "current": [current_task, tasks.get(current_task, {}).get("current_subtask") or ""],
+    }
+
+
+def _digest(value: Any) -> str:
+    encoded = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def structure_version(snapshot: Dict[str, Any]) -> str:
+    """구조 버전: 요청, global phase, Task/Subtask 목록 (바뀌면 전체 주입)"""
+    return _digest([snapshot["request_id"], snapshot["global_phase"], snapshot["structure"]])
+
+
+def state_version(snapshot: Dict[str, Any]) -> str:
+    """상태 버전: 스냅샷 전체 (같으면 변경 없음)"""
+    return _digest(snapshot)
+
+
+def load_injection_record(project_hash: str) -> Optional[Dict[str, Any]]:
+    """마지막 주입 기록 (없거나 형식이 다르면 None)"""
+    try:
+        record = memo_load(get_injection_record_path(project_hash), json.loads)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(record, dict) or record.get("version") != INJECTION_RECORD_VERSION:
+        return None
+    return record
+
+
+def save_injection_record(project_hash: str, record: Dict[str, Any]) -> None:
+    """주입 기록 저장 (실패해도 다음 주입이 전체가 될 뿐)"""
+    path = get_injection_record_path(project_hash)
+    record = {"version": INJECTION_RECORD_VERSION, **record}
+    try:
+        written = atomic_write_text(path, json.dumps(record, ensure_ascii=False))
+    except OSError:
+        return
+    memo_store(path, record, written)
+
+
+def reset_injection_record(project_hash: str) -> None:
+    """다음 주입을 전체로 (컨텍스트 압축 등으로 이전 주입이 사라졌을 때)"""
+    try:
+        get_injection_record_path(project_hash).unlink()
+    except OSError:
+        pass
+
+
+def remove_injection_records(project_hash: str, session_ids: List[str]) -> None:
+    """끝난 세션들의 주입 기록 삭제 (세션 레지스트리 TTL 정리)"""
+    for session_id in session_ids:
+        try:
+            get_injection_record_path(project_hash, session_id).unlink()
+        except OSError:
+            pass
+
+
+def _describe_item(item: List[str]) -> str:
+    _, status, phase = item
+    return f"{get_status_icon(status)}{f' {phase}' if phase else ''}"
+
+
+def diff_snapshots(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """구조가 같은 두 스냅샷의 상태/phase 변경 줄 (Task/Subtask 순서대로)"""
+    lines = []
+    old_items = old.get("items", {})
+    for item_id, item in new["items"].items():
+        before = old_items.get(item_id)
+        if before is None or list(before) == list(item):
+            continue
+        lines.append(f"- {item_id} {item[0]}: {_describe_item(before)} -> {_describe_item(item)}")
+    return lines
+
+
+def plan_injection(project_hash: str, state: Dict[str, Any],
+                   force_full: bool = False) -> Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]:
+    """
+    이번 주입 방식을 결정한다.
+
+    Returns:
+        (kind, snapshot, previous record)
+        kind: "full" | "diff" | "unchanged"
+    """
+    config = get_injection_config()
+    snapshot = state_snapshot(state)
+    record = None if force_full or config.get("mode") == "full" else load_injection_record(project_hash)
+
+    full_every = int(config.get("full_every") or 0)
+    if (
+        record is None
+        or record.get("session_id") != get_current_session_id(project_hash)
+        or record.get("structure_version") != structure_version(snapshot)
+        or (full_every and record.get("diffs_since_full", 0) >= full_every)
+    ):
+        return "full", snapshot, record
+    if record.get("state_version") == state_version(snapshot):
+        return "unchanged", snapshot, record
+    return "diff", snapshot, record
+
+
+def record_injection(project_hash: str, kind: str, snapshot: Dict[str, Any],
+                     previous: Optional[Dict[str, Any]]) -> None:
+    """주입한 스냅샷 기록"""
+    diffs = 0 if kind == "full" or previous is None else previous.get("diffs_since_full", 0) + 1
+    save_injection_record(project_hash, {
+        "session_id": get_current_session_id(project_hash),
+        "structure_version": structure_version(snapshot),
+        "state_version": state_version(snapshot),
+        "diffs_since_full": diffs,
+        "snapshot": snapshot,
+    })
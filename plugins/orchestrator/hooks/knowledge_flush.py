@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - knowledge delta 로그 백그라운드 flush
+
+PostToolUse는 도구 호출 경로에서 실행되므로 knowledge.yaml을 읽거나 쓰지 않고
+delta 로그(spool)에 한 줄 추가만 한다. 로그가 knowledge.compact_after 개를 넘으면
+이 스크립트를 분리된 프로세스로 띄워 knowledge.yaml에 합친다.
+(Stop/PreCompact/SessionStart 훅도 같은 압축을 실행한다.)
+
+사용법:
+    python3 hooks/knowledge_flush.py [--project-hash HASH]
+"""
+
+import os
+import sys
+
+# hooks 패키지 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks.common import compact_knowledge, get_project_hash
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="knowledge delta 로그를 knowledge.yaml에 합침")
+    parser.add_argument("--project-hash", default=None, help="기본값: 현재 디렉토리의 프로젝트 해시")
+    parser.add_argument("--lock-held", action="store_true", help="띄운 훅이 이미 압축 잠금을 잡았음")
+    args = parser.parse_args()
+
+    # 도구 호출 경로의 훅보다 CPU를 양보
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+    compact_knowledge(args.project_hash or get_project_hash(), lock_held=args.lock_held)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,635 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - 프로젝트 전체 패턴 학습 (/orchestrator learn)
+
+Read 훅은 에이전트가 우연히 읽은 파일에서만 패턴을 배운다. 이 모듈은
+프로젝트 전체 파일을 한 번에 훑어 같은 규칙 팩(detect_code_patterns)으로
+패턴을 감지하고 knowledge에 반영한다.
+
+- 파일 목록은 git ls-files (.gitignore 반영), git 저장소가 아니면 디렉토리 순회
+  (루트 .gitignore와 기본 제외 디렉토리 반영)
+- 파일을 묶음 단위로 프로세스 풀에 나눠 스캔하고, 결과는 파일 목록 순서대로
+  merge_patterns로 병합 (먼저 나온 값 우선, 기존 knowledge 값 유지)
+- 새로 알게 된 패턴은 묶음 결과가 도착할 때마다 delta 로그에 추가하고, 끝에서 압축
+- knowledge.yaml 옆 learn-manifest.json에 파일별 (mtime, size, 내용 해시, 패턴)을 기록해
+  다시 실행하면 추가/변경된 파일만 분석하고, 삭제된 파일에서 온 패턴은 철회
+- /orchestrator learn은 이 스크립트를 분리된 프로세스로 띄우고 기다리지 않음
+  (learn.lock으로 한 번에 하나만 실행, 요약은 learn-summary.txt에 남김)
+
+사용법:
+    python3 hooks/learn.py [프로젝트 경로] [--workers N] [--quiet]
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# hooks 패키지 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks.common import (
+    append_knowledge_deltas,
+    atomic_write_text,
+    compact_knowledge,
+    get_knowledge_path,
+    get_project_hash,
+    load_knowledge,
+    load_orchestrator_config,
+    merge_patterns,
+)
+from hooks.patterns import get_pattern_scanner
+
+
+# 프로세스 하나가 한 번에 스캔하는 파일 수
+LEARN_CHUNK_SIZE = 256
+
+# 이보다 큰 파일은 생성물/데이터로 보고 건너뜀
+DEFAULT_LEARN_MAX_FILE_BYTES = 1024 * 1024
+
+# git 저장소가 아닐 때 항상 건너뛰는 디렉토리
+DEFAULT_IGNORED_DIRS = {
+    ".git", ".hg", ".svn", "node_modules", ".venv", "venv", "__pycache__",
+    "build", "dist", "target", ".gradle", ".idea", ".claude",
+}
+
+# 진행 상황 출력 간격 (초)
+PROGRESS_INTERVAL = 0.2
+
+# 백그라운드 learn이 pid를 기록하기 전의 잠금을 유효하다고 보는 시간 (초)
+LEARN_LOCK_SPAWN_GRACE = 30
+
+
+def get_learn_config() -> Dict[str, Any]:
+    """config의 knowledge.learn 섹션"""
+    config = load_orchestrator_config()
+    learn = (config.get("knowledge", {}) or {}).get("learn") or {}
+    return learn if isinstance(learn, dict) else {}
+
+
+# =============================================================================
+# 파일 목록
+# =============================================================================
+
+def list_git_files(root: Path) -> Optional[List[str]]:
+    """git이 추적하거나 무시되지 않은 파일 목록 (루트 기준 상대 경로). git 저장소가 아니면 None"""
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(root), "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            capture_output=True,
+            timeout=60,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0:
+        return None
+
+    files = []
+    for raw in result.stdout.split(b"\0"):
+        # 오케스트레이터 자신의 상태 파일(.claude/)은 커밋하지 않은 채 남아 있으므로 제외
+        if raw and not raw.startswith(b".claude/"):
+            files.append(os.fsdecode(raw))
+    # 삭제 후 커밋하지 않은 파일은 --cached에 남아 있으므로 순회 중 열기 실패로 건너뜀
+    return list(dict.fromkeys(files))
+
+
+def load_gitignore(root: Path) -> List[Tuple[str, bool, bool]]:
+    """루트 .gitignore를 (패턴, 디렉토리 전용, 루트 고정) 목록으로 (부정 패턴은 지원하지 않음)"""
+    try:
+        lines = (root / ".gitignore").read_text(encoding="utf-8").splitlines()
+    except (IOError, UnicodeDecodeError):
+        return []
+
+    rules = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith(("#", "!")):
+            continue
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        anchored = line.startswith("/") or "/" in line
+        rules.append((line.lstrip("/"), dir_only, anchored))
+    return rules
+
+
+def is_ignored(rel_path: str, is_dir: bool, rules: List[Tuple[str, bool, bool]]) -> bool:
+    name = rel_path.rsplit("/", 1)[-1]
+    for pattern, dir_only, anchored in rules:
+        if dir_only and not is_dir:
+            continue
+        target = rel_path if anchored else name
+        if fnmatch.fnmatchcase(target, pattern):
+            return True
+    return False
+
+
+def walk_files(root: Path) -> List[str]:
+    """git 없이 디렉토리 순회 (기본 제외 디렉토리 + 루트 .gitignore)"""
+    rules = load_gitignore(root)
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        rel_dir = "" if rel_dir == "." else rel_dir.replace(os.sep, "/") + "/"
+        dirnames[:] = sorted(
+            d for d in dirnames
+            if d not in DEFAULT_IGNORED_DIRS and not is_ignored(rel_dir + d, True, rules)
+        )
+        for name in sorted(filenames):
+            rel_path = rel_dir + name
+            if not is_ignored(rel_path, False, rules):
+                files.append(rel_path)
+    return files
+
+
+def list_project_files(root: Path) -> List[str]:
+    files = list_git_files(root)
+    return files if files is not None else walk_files(root)
+
+
+# =============================================================================
+# 매니페스트
+# =============================================================================
+
+# 매니페스트 형식이 바뀌면 올려서 이전 매니페스트를 무효화 (전체 재스캔)
+LEARN_MANIFEST_VERSION = 1
+
+
+def get_learn_manifest_path(project_hash: str) -> Path:
+    """프로젝트별 learn 매니페스트 경로 (knowledge.yaml 옆)"""
+    return get_knowledge_path(project_hash).with_name("learn-manifest.json")
+
+
+def load_learn_manifest(project_hash: str) -> Dict[str, Any]:
+    """
+    learn 매니페스트 로드
+
+    형식:
+        {"version", "rules": 규칙 팩 서명,
+         "pattern_sets": [패턴 dict, ...]  (같은 패턴 조합은 한 번만 저장),
+         "files": {상대 경로: [mtime_ns, size, 내용 해시, pattern_sets 인덱스]},
+         "contributed": {key: value}  (learn이 knowledge에 추가한 패턴)}
+
+    규칙 팩이 바뀌었으면 파일 목록은 버리고 contributed만 유지한다.
+    """
+    empty = {"pattern_sets": [], "files": {}, "contributed": {}}
+    try:
+        data = json.loads(get_learn_manifest_path(project_hash).read_text(encoding="utf-8"))
+    except (IOError, ValueError):
+        return empty
+    if not isinstance(data, dict) or data.get("version") != LEARN_MANIFEST_VERSION:
+        return empty
+
+    contributed = data.get("contributed")
+    empty["contributed"] = contributed if isinstance(contributed, dict) else {}
+    if data.get("rules") != get_pattern_scanner().signature:
+        return empty
+    if not isinstance(data.get("files"), dict) or not isinstance(data.get("pattern_sets"), list):
+        return empty
+    return data
+
+
+def save_learn_manifest(project_hash: str, files: Dict[str, Tuple[int, int, str, Dict[str, Any]]],
+                        contributed: Dict[str, Any]) -> bool:
+    pattern_sets: List[Dict[str, Any]] = []
+    set_index: Dict[str, int] = {}
+    encoded = {}
+    for rel_path, (mtime_ns, size, digest, patterns) in files.items():
+        key = json.dumps(patterns, sort_keys=True, ensure_ascii=False, default=str)
+        index = set_index.get(key)
+        if index is None:
+            index = set_index[key] = len(pattern_sets)
+            pattern_sets.append(patterns)
+        encoded[rel_path] = [mtime_ns, size, digest, index]
+
+    data = {
+        "version": LEARN_MANIFEST_VERSION,
+        "rules": get_pattern_scanner().signature,
+        "pattern_sets": pattern_sets,
+        "files": encoded,
+        "contributed": contributed,
+    }
+    try:
+        atomic_write_text(get_learn_manifest_path(project_hash),
+                          json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+    except OSError:
+        return False
+    return True
+
+
+# =============================================================================
+# 스캔
+# =============================================================================
+
+def analyze_files(root: str, rel_paths: List[str], max_bytes: int,
+                  previous: Dict[str, Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Optional[tuple]]]:
+    """
+    추가/변경된 파일 묶음 분석 (워커 프로세스에서 실행)
+
+    매니페스트가 파일별 패턴을 기억해야 하므로 이미 아는 key도 건너뛰지 않는다.
+    previous(상대 경로 → (이전 내용 해시, 이전 패턴))와 내용이 같으면 스캔하지 않는다.
+
+    Returns:
+        [(상대 경로, (mtime_ns, size, 내용 해시, 패턴, 스캔 여부) 또는 사라졌으면 None)]
+    """
+    scanner = get_pattern_scanner()
+    results = []
+    for rel_path in rel_paths:
+        path = os.path.join(root, rel_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            results.append((rel_path, None))
+            continue
+
+        digest = ""
+        content = ""
+        if stat.st_size <= max_bytes and scanner.needs_content(path):
+            try:
+                with open(path, "rb") as f:
+                    raw = f.read()
+                digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+                prior = previous.get(rel_path)
+                if prior and prior[0] == digest:
+                    # touch, checkout 등으로 mtime만 바뀐 경우
+                    results.append((rel_path, (stat.st_mtime_ns, stat.st_size, digest, prior[1], False)))
+                    continue
+                content = raw.decode("utf-8")
+            except (OSError, UnicodeDecodeError):
+                results.append((rel_path, (stat.st_mtime_ns, stat.st_size, digest, {}, False)))
+                continue
+        elif stat.st_size > max_bytes:
+            results.append((rel_path, (stat.st_mtime_ns, stat.st_size, digest, {}, False)))
+            continue
+
+        patterns = scanner.scan(path, content)
+        results.append((rel_path, (stat.st_mtime_ns, stat.st_size, digest, patterns, True)))
+    return results
+
+
+def _chunks(items: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def learn_project(
+    root: Path,
+    project_hash: str,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    프로젝트 전체 파일에서 패턴 학습 (매니페스트 기준 증분)
+
+    1. 파일 목록을 stat해서 매니페스트와 (mtime_ns, size)가 다른 파일만 워커에 보냄
+    2. 파일 순서대로 파일별 패턴을 병합 (먼저 나온 값 우선)
+    3. knowledge에 없던 key는 묶음이 끝날 때마다 delta로 기록
+    4. 끝에서 learn이 추가했던 패턴 중 더 이상 근거 파일이 없거나 값이 바뀐 것은 철회/교체
+
+    Returns:
+        {"files": 전체 파일 수, "scanned": 새로 스캔한 파일 수, "added": 추가된 패턴 목록,
+         "retracted": 철회된 패턴 목록, "patterns": knowledge 패턴, "elapsed": 초}
+    """
+    started = time.perf_counter()
+    learn_config = get_learn_config()
+    max_bytes = int(learn_config.get("max_file_bytes", DEFAULT_LEARN_MAX_FILE_BYTES))
+    if workers is None:
+        workers = int(learn_config.get("workers", 0) or 0) or os.cpu_count() or 1
+
+    manifest = load_learn_manifest(project_hash)
+    pattern_sets = manifest["pattern_sets"]
+    old_files = manifest["files"]
+    contributed = dict(manifest["contributed"])
+
+    files = list_project_files(root)
+    chunks = list(_chunks(files, LEARN_CHUNK_SIZE))
+
+    # 1. 매니페스트와 비교해 다시 분석할 파일 고르기
+    root_str = str(root)
+    changed_by_chunk: List[List[str]] = []
+    for chunk in chunks:
+        changed = []
+        for rel_path in chunk:
+            entry = old_files.get(rel_path)
+            if entry is None:
+                changed.append(rel_path)
+                continue
+            try:
+                stat = os.stat(os.path.join(root_str, rel_path))
+            except OSError:
+                changed.append(rel_path)
+                continue
+            if (stat.st_mtime_ns, stat.st_size) != (entry[0], entry[1]):
+                changed.append(rel_path)
+        changed_by_chunk.append(changed)
+
+    def previous_of(rel_paths: List[str]) -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        previous = {}
+        for rel_path in rel_paths:
+            entry = old_files.get(rel_path)
+            if entry and entry[2]:
+                previous[rel_path] = (entry[2], pattern_sets[entry[3]])
+        return previous
+
+    knowledge = load_knowledge(project_hash) or {}
+    knowledge_patterns = dict(knowledge.get("patterns") or {})
+    merged: Dict[str, Any] = {}
+    new_files: Dict[str, Tuple[int, int, str, Dict[str, Any]]] = {}
+    all_added: List[str] = []
+    done = 0
+    scanned = 0
+
+    def consume(chunk: List[str], results: List[Tuple[str, Optional[tuple]]]) -> None:
+        nonlocal done, scanned
+        analyzed = dict(results)
+        chunk_new = {}
+        for rel_path in chunk:
+            if rel_path in analyzed:
+                result = analyzed[rel_path]
+                if result is None:
+                    continue
+                mtime_ns, size, digest, patterns, was_scanned = result
+                scanned += was_scanned
+                new_files[rel_path] = (mtime_ns, size, digest, patterns)
+            else:
+                entry = old_files[rel_path]
+                patterns = pattern_sets[entry[3]]
+                new_files[rel_path] = (entry[0], entry[1], entry[2], patterns)
+            for key, value in patterns.items():
+                if key not in merged:
+                    merged[key] = value
+                    if key not in knowledge_patterns and key not in contributed:
+                        chunk_new[key] = value
+
+        if chunk_new:
+            # 파일 순서대로 병합하므로 여기서 정해진 값은 끝까지 바뀌지 않음 → 바로 기록
+            _, added = merge_patterns(knowledge_patterns, chunk_new)
+            knowledge_patterns.update(chunk_new)
+            contributed.update(chunk_new)
+            append_knowledge_deltas(project_hash, [{"op": "patterns", "values": chunk_new}])
+            all_added.extend(added)
+        done += len(chunk)
+        if progress:
+            progress(done, len(files))
+
+    # 2. 변경된 파일이 있는 묶음만 워커에 보내고, 결과는 파일 순서대로 소비
+    pending = [i for i, changed in enumerate(changed_by_chunk) if changed]
+    if workers <= 1 or len(pending) <= 1:
+        for chunk, changed in zip(chunks, changed_by_chunk):
+            consume(chunk, analyze_files(root_str, changed, max_bytes, previous_of(changed)) if changed else [])
+    else:
+        # SessionStart에서도 import되므로 프로세스 풀은 필요할 때만 import
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+            futures = {
+                i: executor.submit(analyze_files, root_str, changed_by_chunk[i], max_bytes,
+                                   previous_of(changed_by_chunk[i]))
+                for i in pending
+            }
+            for i, chunk in enumerate(chunks):
+                consume(chunk, futures[i].result() if i in futures else [])
+
+    # 3. learn이 추가했던 패턴 중 근거가 사라졌거나 값이 바뀐 것 철회/교체
+    retract = []
+    replace = {}
+    for key, value in list(contributed.items()):
+        if merged.get(key) == value:
+            continue
+        del contributed[key]
+        if knowledge_patterns.get(key) != value:
+            # 그 사이 다른 경로(Read 훅, 수동 편집)로 바뀐 값은 learn 소유가 아님
+            continue
+        retract.append(key)
+        if key in merged:
+            replace[key] = merged[key]
+
+    deltas = []
+    if retract:
+        deltas.append({"op": "retract_patterns", "keys": retract})
+        for key in retract:
+            knowledge_patterns.pop(key, None)
+    if replace:
+        deltas.append({"op": "patterns", "values": replace})
+        knowledge_patterns.update(replace)
+        contributed.update(replace)
+        all_added.extend(f"{key}: {value}" for key, value in replace.items())
+    if deltas:
+        append_knowledge_deltas(project_hash, deltas)
+
+    if all_added or retract:
+        compact_knowledge(project_hash)
+    if any(changed_by_chunk) or new_files.keys() != old_files.keys() or contributed != manifest["contributed"]:
+        save_learn_manifest(project_hash, new_files, contributed)
+
+    return {
+        "files": len(files),
+        "scanned": scanned,
+        "added": all_added,
+        "retracted": [key for key in retract if key not in replace],
+        "patterns": knowledge_patterns,
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+def refresh_learned_patterns(root: Path, project_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    한 번이라도 learn한 프로젝트면 증분 learn 실행 (SessionStart용)
+
+    첫 전체 스캔은 사용자가 /orchestrator learn으로 직접 시작해야 한다.
+    """
+    if not get_learn_config().get("on_session_start", True):
+        return None
+    if not get_learn_manifest_path(project_hash).exists():
+        return None
+    return learn_project(root, project_hash)
+
+
+# =============================================================================
+# 백그라운드 실행 (/orchestrator learn)
+# =============================================================================
+
+def get_learn_lock_path(project_hash: str) -> Path:
+    """백그라운드 learn 잠금 경로 (내용은 learn 프로세스 pid)"""
+    return get_knowledge_path(project_hash).with_name("learn.lock")
+
+
+def get_learn_summary_path(project_hash: str) -> Path:
+    """백그라운드 learn이 끝나고 남기는 요약 경로"""
+    return get_knowledge_path(project_hash).with_name("learn-summary.txt")
+
+
+def is_learn_running(project_hash: str) -> bool:
+    """
+    백그라운드 learn이 실행 중인지 확인
+
+    대형 저장소의 전체 스캔은 몇 분씩 걸리므로 잠금 나이가 아니라 pid가 살아 있는지로 판단한다.
+    pid를 쓰기 전(프로세스를 띄우는 중)이면 LEARN_LOCK_SPAWN_GRACE 동안만 실행 중으로 본다.
+    """
+    lock_path = get_learn_lock_path(project_hash)
+    try:
+        content = lock_path.read_text(encoding="utf-8").strip()
+        age = time.time() - lock_path.stat().st_mtime
+    except (IOError, OSError):
+        return False
+    if not content.isdigit():
+        return age < LEARN_LOCK_SPAWN_GRACE
+    pid = int(content)
+    try:
+        # 이 프로세스(상주 데몬)가 띄운 learn이 끝났으면 좀비를 거둠
+        if os.waitpid(pid, os.WNOHANG)[0] == pid:
+            return False
+    except (AttributeError, OSError):
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # 권한 없음 등: 프로세스는 있음
+        pass
+    return True
+
+
+def spawn_learn(root: Path, project_hash: str) -> bool:
+    """
+    learn을 분리된 백그라운드 프로세스로 실행 (훅은 기다리지 않음)
+
+    잠금은 여기서 잡고 띄운 프로세스의 pid를 기록한다. 새 패턴은 묶음마다 delta로
+    바로 기록되므로 끝나기 전에도 knowledge에 반영된다.
+
+    Returns:
+        띄웠으면 True, 이미 실행 중이거나 띄우지 못했으면 False
+    """
+    lock_path = get_learn_lock_path(project_hash)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    for _ in range(2):
+        try:
+            fd = os.open(str(lock_path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            break
+        except FileExistsError:
+            if is_learn_running(project_hash):
+                return False
+            # 죽은 learn 프로세스의 잠금
+            try:
+                lock_path.unlink()
+            except OSError:
+                return False
+        except OSError:
+            return False
+    else:
+        return False
+
+    try:
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), str(root), "--project-hash", project_hash,
+             "--lock-held"],
+            # knowledge 경로가 현재 디렉토리 기준이므로 훅과 같은 디렉토리에서 실행
+            cwd=os.getcwd(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        os.close(fd)
+        _release_learn_lock(project_hash)
+        return False
+    os.write(fd, str(process.pid).encode())
+    os.close(fd)
+    return True
+
+
+def _release_learn_lock(project_hash: str) -> None:
+    try:
+        get_learn_lock_path(project_hash).unlink()
+    except OSError:
+        pass
+
+
+def run_background(root: Path, project_hash: str, workers: Optional[int] = None) -> None:
+    """spawn_learn이 띄운 프로세스에서 실행: learn 후 요약을 남기고 잠금 해제"""
+    # 도구 호출 경로의 훅보다 CPU를 양보
+    try:
+        os.nice(10)
+    except (AttributeError, OSError):
+        pass
+    try:
+        result = learn_project(root, project_hash, workers)
+        atomic_write_text(get_learn_summary_path(project_hash), format_learn_summary(result))
+    finally:
+        _release_learn_lock(project_hash)
+
+
+def pop_learn_summary(project_hash: str) -> Optional[str]:
+    """지난 백그라운드 learn의 요약 (한 번 읽으면 지움)"""
+    summary_path = get_learn_summary_path(project_hash)
+    try:
+        summary = summary_path.read_text(encoding="utf-8")
+        summary_path.unlink()
+    except (IOError, OSError):
+        return None
+    return summary
+
+
+def format_learn_summary(result: Dict[str, Any]) -> str:
+    """learn 결과 요약 메시지"""
+    lines = [
+        f"[Orchestrator] 프로젝트 패턴 학습 완료: 파일 {result['files']}개 중 {result['scanned']}개 새로 스캔 "
+        f"({result['elapsed']:.1f}s)",
+    ]
+    if result["added"]:
+        lines.append(f"새로 추가된 패턴: {', '.join(result['added'])}")
+    else:
+        lines.append("새로 추가된 패턴 없음")
+    if result["retracted"]:
+        lines.append(f"근거 파일이 없어 철회된 패턴: {', '.join(result['retracted'])}")
+    if result["patterns"]:
+        lines.append("")
+        lines.append("## 현재 패턴")
+        for key, value in result["patterns"].items():
+            lines.append(f"- {key}: {value}")
+    return "\n".join(lines)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", nargs="?", default=".")
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--quiet", action="store_true", help="진행 상황을 출력하지 않음")
+    parser.add_argument("--project-hash", default=None, help="기본값: 프로젝트 경로의 프로젝트 해시")
+    parser.add_argument("--lock-held", action="store_true",
+                        help="/orchestrator learn이 띄운 백그라운드 실행 (끝나면 잠금 해제, 요약은 파일로)")
+    args = parser.parse_args()
+
+    root = Path(args.root).resolve()
+    if args.lock_held:
+        run_background(root, args.project_hash or get_project_hash(), args.workers)
+        return
+    last_report = [0.0]
+
+    def report(done: int, total: int) -> None:
+        now = time.monotonic()
+        if done == total or now - last_report[0] >= PROGRESS_INTERVAL:
+            last_report[0] = now
+            sys.stderr.write(f"\r[learn] {done}/{total} files")
+            if done == total:
+                sys.stderr.write("\n")
+            sys.stderr.flush()
+
+    # 프로젝트 해시는 훅과 같게 현재 디렉토리 기준
+    os.chdir(root)
+    result = learn_project(root, args.project_hash or get_project_hash(), args.workers,
+                           None if args.quiet else report)
+    print(format_learn_summary(result))
+
+
+if __name__ == "__main__":
+    main()
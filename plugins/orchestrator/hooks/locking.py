@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - 프로세스 간 파일 잠금
+
+병렬로 실행되는 서브에이전트(code-explore, planner 등)의 훅이 같은 파일을
+동시에 읽고-고치고-쓰면 한쪽 변경이 사라진다. 읽기-수정-쓰기 구간을
+fcntl advisory lock(flock)으로 감싼다.
+
+- 잠금 파일은 대상 옆의 `.{이름}.lock` (대상 파일은 계속 원자적 rename으로 교체되므로 따로 둠)
+- 잠금은 짧게: 디스크에서 다시 읽고, 고치고, 쓰는 동안만
+- 기다리는 시간은 DEFAULT_LOCK_TIMEOUT까지, 넘으면 LockTimeout (OSError라 기존 저장 실패 처리로 이어짐)
+- 같은 프로세스 안에서도 잠금마다 파일을 새로 열므로 같은 대상을 중첩해서 잠그면 안 된다
+- fcntl이 없는 플랫폼(Windows)에서는 잠그지 않고 원자적 rename에만 의존한다
+
+    with file_lock(state_path):
+        state = read(state_path)
+        ...
+        write(state_path, state)
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# 잠금을 기다리는 최대 시간 (초, sqlite 저장소의 busy timeout과 같음)
+DEFAULT_LOCK_TIMEOUT = 5.0
+
+# 재시도 간격 (초): 짧게 시작해 두 배씩, 최대 50ms
+_RETRY_START = 0.0005
+_RETRY_MAX = 0.05
+
+
+class LockTimeout(OSError):
+    """잠금을 제한 시간 안에 얻지 못함"""
+
+
+def get_lock_path(path: Path) -> Path:
+    """대상 파일의 잠금 파일 경로"""
+    return path.with_name(f".{path.name}.lock")
+
+
+@contextmanager
+def file_lock(path: Path, shared: bool = False, timeout: float = DEFAULT_LOCK_TIMEOUT) -> Iterator[None]:
+    """
+    path에 대한 advisory lock
+
+    Args:
+        path: 잠글 대상 파일 (없어도 됨)
+        shared: True면 공유 잠금 (여러 프로세스가 함께 잡을 수 있고 배타 잠금만 막음)
+        timeout: 기다릴 최대 시간 (초)
+    """
+    if fcntl is None:
+        yield
+        return
+
+    lock_path = get_lock_path(path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(lock_path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        operation = (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | fcntl.LOCK_NB
+        deadline = time.monotonic() + timeout
+        delay = _RETRY_START
+        while True:
+            try:
+                fcntl.flock(fd, operation)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise LockTimeout(f"lock timeout: {lock_path}")
+                time.sleep(delay)
+                delay = min(delay * 2, _RETRY_MAX)
+        yield
+    finally:
+        # 닫으면 잠금도 풀림
+        os.close(fd)
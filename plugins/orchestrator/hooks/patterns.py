@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - 코드 패턴 규칙 엔진
+
+detect_code_patterns가 사용하는 선언적 규칙 팩.
+
+규칙 하나는 "조건이 모두 맞으면 key = value"이며, 조건은
+- files: 파일 이름 glob 중 하나와 일치 (대소문자 구분)
+- extensions: 파일 이름이 확장자 중 하나로 끝남
+- tokens: 각 항목이 내용에 있어야 함. 항목이 리스트면 그중 하나만 있으면 됨
+  (소문자로 비교)
+이다. 같은 key에 대해서는 먼저 나온 규칙이 이긴다.
+
+config의 knowledge.pattern_packs에 규칙 팩을 추가할 수 있으며,
+사용자 팩은 기본 팩보다 먼저 평가된다.
+
+평가는
+1. 파일 이름/확장자로 후보 규칙을 추리고 (파일 이름만으로 정해진 key의 이후 규칙 제외)
+2. 토큰이 필요하면 소문자 내용을 한 번만 만들어
+3. key별로 규칙 순서대로 평가하며, 처음 보는 토큰은 후보 규칙의 토큰 중
+   첫 글자가 같은 것들과 함께 결합 정규식 하나로 찾음
+하는 방식이다. 이긴 규칙이 나오면 그 key의 나머지 토큰은 찾지 않는다.
+
+전체 토큰을 하나의 정규식으로 묶으면 CPython 정규식이 위치마다 모든 선택지를
+시도해 토큰별 str 검색보다 느려지므로, 고정 첫 글자로 빠르게 건너뛸 수 있는
+단위로 묶는다.
+"""
+
+import hashlib
+import json
+import os
+import re
+from fnmatch import fnmatchcase
+from typing import Any, Collection, Dict, FrozenSet, List, Optional, Tuple
+
+from hooks.common import load_orchestrator_config
+
+
+# 결합 정규식 캐시 크기 (토큰 조합별)
+MAX_COMPILED_GROUPS = 256
+
+TEST_FILES = ["*Test*", "*.spec.*", "*.test.*"]
+
+DEFAULT_PATTERN_PACK = {
+    "name": "default",
+    "rules": [
+        # 빌드 도구
+        {"key": "build_tool", "value": "Gradle", "files": ["build.gradle", "build.gradle.kts"]},
+        {"key": "build_tool", "value": "Maven", "files": ["pom.xml"]},
+        {"key": "build_tool", "value": "npm", "files": ["package.json"]},
+        {"key": "framework", "value": "Spring", "files": ["build.gradle", "build.gradle.kts", "pom.xml"],
+         "tokens": ["spring"]},
+        {"key": "framework", "value": "React", "files": ["package.json"], "tokens": ['"react"']},
+        {"key": "framework", "value": "Vue", "files": ["package.json"], "tokens": ['"vue"']},
+        {"key": "framework", "value": "Angular", "files": ["package.json"], "tokens": ['"@angular']},
+
+        # 테스팅 프레임워크 (앞쪽이 우선)
+        {"key": "testing", "value": "pytest", "files": TEST_FILES, "tokens": ["pytest"]},
+        {"key": "testing", "value": "Jest", "files": TEST_FILES, "tokens": [["describe(", "it("], "jest"]},
+        {"key": "testing", "value": "Vitest", "files": TEST_FILES, "tokens": [["describe(", "it("], "vitest"]},
+        {"key": "testing", "value": "Mocha", "files": TEST_FILES, "tokens": [["describe(", "it("], "mocha"]},
+        {"key": "testing", "value": "JUnit 5", "files": TEST_FILES,
+         "tokens": [["@test", "org.junit"], ["jupiter", "junit5"]]},
+        {"key": "testing", "value": "JUnit 4", "files": TEST_FILES, "tokens": [["@test", "org.junit"]]},
+        {"key": "mocking", "value": "Mockito", "files": TEST_FILES, "tokens": ["mockito"]},
+
+        # 아키텍처
+        {"key": "architecture_hint", "value": "MVC/Layered", "files": ["*Controller*"]},
+        {"key": "architecture_hint", "value": "MVC/Layered", "tokens": [["@controller", "@restcontroller"]]},
+        {"key": "data_layer", "value": "Repository Pattern", "files": ["*Repository*"]},
+        {"key": "data_layer", "value": "Repository Pattern", "tokens": ["@repository"]},
+        {"key": "service_layer", "value": "Service Layer", "files": ["*Service*"]},
+        {"key": "service_layer", "value": "Service Layer", "tokens": ["@service"]},
+
+        # 언어
+        {"key": "language", "value": "Java", "extensions": [".java"]},
+        {"key": "language", "value": "Python", "extensions": [".py"]},
+        {"key": "language", "value": "TypeScript", "extensions": [".ts", ".tsx"]},
+        {"key": "language", "value": "JavaScript", "extensions": [".js", ".jsx"]},
+        {"key": "language", "value": "Go", "extensions": [".go"]},
+        {"key": "language", "value": "Rust", "extensions": [".rs"]},
+    ],
+}
+
+
+def _normalize_rule(rule: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """config 규칙을 내부 형식으로 변환. 잘못된 규칙은 None"""
+    if not isinstance(rule, dict) or not rule.get("key") or "value" not in rule:
+        return None
+
+    files = [str(f) for f in rule.get("files") or []]
+    extensions = [str(e).lower() for e in rule.get("extensions") or []]
+    tokens = []
+    for item in rule.get("tokens") or []:
+        alternatives = item if isinstance(item, list) else [item]
+        alternatives = tuple(sorted({str(a).lower() for a in alternatives if str(a)}))
+        if alternatives:
+            tokens.append(alternatives)
+
+    if not files and not extensions and not tokens:
+        return None
+    return {
+        "key": str(rule["key"]),
+        "value": rule["value"],
+        "files": files,
+        "extensions": tuple(extensions),
+        "tokens": tokens,
+    }
+
+
+class PatternScanner:
+    """컴파일된 규칙 팩"""
+
+    def __init__(self, packs: List[Dict[str, Any]]):
+        self.rules: List[Dict[str, Any]] = []
+        for pack in packs:
+            for rule in (pack or {}).get("rules") or []:
+                normalized = _normalize_rule(rule)
+                if normalized:
+                    self.rules.append(normalized)
+
+        # key 등장 순서 (결과 dict 순서)
+        self.keys: List[str] = list(dict.fromkeys(rule["key"] for rule in self.rules))
+        self.rules_by_key = {key: [r for r in self.rules if r["key"] == key] for key in self.keys}
+
+        self.signature = hashlib.md5(
+            json.dumps(self.rules, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        ).hexdigest()[:12]
+        self._compiled: Dict[FrozenSet[str], "re.Pattern"] = {}
+
+    def _file_matches(self, rule: Dict[str, Any], file_name: str, lowered_name: str) -> bool:
+        if rule["files"] and not any(fnmatchcase(file_name, glob) for glob in rule["files"]):
+            return False
+        if rule["extensions"] and not lowered_name.endswith(rule["extensions"]):
+            return False
+        return True
+
+    def _candidates(self, file_name: str, skip_keys: Collection[str] = ()) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """파일 이름 조건을 통과한 규칙 (key별, 파일 이름만으로 확정되는 규칙에서 끊음)"""
+        lowered_name = file_name.lower()
+        candidates = []
+        for key in self.keys:
+            if key in skip_keys:
+                continue
+            rules = []
+            for rule in self.rules_by_key[key]:
+                if not self._file_matches(rule, file_name, lowered_name):
+                    continue
+                rules.append(rule)
+                if not rule["tokens"]:
+                    break
+            if rules:
+                candidates.append((key, rules))
+        return candidates
+
+    def needs_content(self, file_path: str, skip_keys: Collection[str] = ()) -> bool:
+        """내용 토큰이 필요한 후보 규칙이 있는지 (없으면 파일을 읽지 않고 빈 내용으로 scan 가능)"""
+        return any(
+            rule["tokens"]
+            for _, rules in self._candidates(os.path.basename(file_path), skip_keys)
+            for rule in rules
+        )
+
+    def _regex(self, tokens: FrozenSet[str]) -> "re.Pattern":
+        compiled = self._compiled.get(tokens)
+        if compiled is None:
+            if len(self._compiled) >= MAX_COMPILED_GROUPS:
+                self._compiled.clear()
+            # 같은 위치면 긴 토큰을 먼저 시도
+            alternatives = sorted(tokens, key=lambda t: (-len(t), t))
+            compiled = re.compile("|".join(re.escape(t) for t in alternatives))
+            self._compiled[tokens] = compiled
+        return compiled
+
+    def find_tokens(self, lowered: str, tokens: FrozenSet[str]) -> set:
+        """lowered에 나타나는 토큰 집합 (모두 찾으면 중단)"""
+        if len(tokens) == 1:
+            return {token for token in tokens if token in lowered}
+
+        found = set()
+        remaining = set(tokens)
+        pos = 0
+        while remaining:
+            match = self._regex(frozenset(remaining)).search(lowered, pos)
+            if match is None:
+                break
+            # 같은 위치에서 시작하는 짧은 토큰도 함께 찾은 것으로 처리
+            pos = match.start()
+            hits = {token for token in remaining if lowered.startswith(token, pos)}
+            found.update(hits)
+            remaining.difference_update(hits)
+        return found
+
+    def match_rules(self, file_path: str, content: str, skip_keys: Collection[str] = ()) -> List[Dict[str, Any]]:
+        """key별로 이긴 규칙 목록 (key 순서, skip_keys의 key는 평가하지 않음)"""
+        file_name = os.path.basename(file_path)
+        candidates = self._candidates(file_name, skip_keys)
+        if not candidates:
+            return []
+
+        # 첫 글자별 후보 토큰
+        groups: Dict[str, set] = {}
+        for _, rules in candidates:
+            for rule in rules:
+                for group in rule["tokens"]:
+                    for token in group:
+                        groups.setdefault(token[0], set()).add(token)
+
+        lowered: Optional[str] = None
+        seen: Dict[str, bool] = {}
+
+        def has(token: str) -> bool:
+            nonlocal lowered
+            if token not in seen:
+                if lowered is None:
+                    lowered = content.lower() if content else ""
+                group = frozenset(t for t in groups[token[0]] if t not in seen)
+                found = self.find_tokens(lowered, group)
+                for t in group:
+                    seen[t] = t in found
+            return seen[token]
+
+        matched = []
+        for _, rules in candidates:
+            for rule in rules:
+                if all(any(has(token) for token in group) for group in rule["tokens"]):
+                    matched.append(rule)
+                    break
+        return matched
+
+    def scan(self, file_path: str, content: str, skip_keys: Collection[str] = ()) -> Dict[str, Any]:
+        """파일 이름 + 내용에서 패턴 감지 (이미 아는 key는 skip_keys로 제외)"""
+        return {rule["key"]: rule["value"] for rule in self.match_rules(file_path, content, skip_keys)}
+
+
+# config 객체별 컴파일 결과 (config가 바뀌면 새 객체가 되므로 재컴파일)
+_SCANNER_CACHE: Dict[str, Any] = {}
+
+
+def get_pattern_scanner() -> PatternScanner:
+    """config의 사용자 팩 + 기본 팩으로 컴파일된 스캐너"""
+    config = load_orchestrator_config()
+    if _SCANNER_CACHE.get("config") is not config or "scanner" not in _SCANNER_CACHE:
+        packs = (config.get("knowledge", {}) or {}).get("pattern_packs") or []
+        if not isinstance(packs, list):
+            packs = []
+        _SCANNER_CACHE["scanner"] = PatternScanner([*packs, DEFAULT_PATTERN_PACK])
+        _SCANNER_CACHE["config"] = config
+    return _SCANNER_CACHE["scanner"]
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - PreToolUse 정책 엔진
+
+orchestrator-config.yaml의 policy 규칙을 도구 종류(bash/write/read)별 테이블로 컴파일한다.
+
+- 반드시 포함되어야 하는 리터럴(예: "rm", ".env")이 있는 규칙은 리터럴 사전 검사를
+  통과했을 때만 개별 정규식을 실행
+- 리터럴을 뽑을 수 없는 규칙은 조치(deny/ask)별로 하나의 결합 정규식으로 검사
+
+검사 전에 입력을 정규화한다.
+- 파일 경로: 프로젝트 루트 기준으로 ./와 ..를 풀어 상대 경로로 (`./.env` → `.env`)
+- Bash 명령: 원문과 함께 긴 옵션을 짧은 옵션으로 바꾸고 이어진 짧은 옵션을 합친 형태도 검사
+  (`rm --recursive --force` → `rm -rf`), 명령의 인자는 파일 경로로 보고 read/write 규칙도 검사
+  (`cat .env`)
+
+컴파일된 테이블은 config의 mtime/size를 키로 디스크에 캐시되어,
+다음 프로세스는 규칙 목록을 다시 해석하지 않는다.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import re._parser as sre_parse
+    import re._constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from hooks.common import (
+    atomic_write_text,
+    get_cache_dir,
+    get_config_path,
+    load_orchestrator_config,
+)
+
+
+# 캐시 형식이 바뀌면 올려서 이전 캐시를 무효화
+POLICY_CACHE_VERSION = 2
+
+# 조치 우선순위 (앞쪽이 먼저 평가됨)
+POLICY_ACTIONS = ("deny", "ask")
+
+# 도구 이름 → (도구 종류, 검사할 입력 필드)
+TOOL_KINDS = {
+    "Bash": ("bash", "command"),
+    "Write": ("write", "file_path"),
+    "Edit": ("write", "file_path"),
+    "MultiEdit": ("write", "file_path"),
+    "NotebookEdit": ("write", "notebook_path"),
+    "Read": ("read", "file_path"),
+}
+
+# 이보다 짧은 리터럴은 사전 검사 효과가 없어 결합 정규식으로 보냄
+MIN_LITERAL_LENGTH = 2
+
+# Bash 명령의 긴 옵션 → 짧은 옵션 (기본 규칙은 짧은 옵션 기준)
+LONG_FLAG_ALIASES = {
+    "--recursive": "-r",
+    "--force": "-f",
+}
+LONG_FLAG_PATTERN = re.compile(r"(?<!\S)(?:%s)(?![\w=-])" % "|".join(map(re.escape, LONG_FLAG_ALIASES)))
+SHORT_FLAG_RUN_PATTERN = re.compile(r"(?<!\S)-[A-Za-z]+(?:\s+-[A-Za-z]+)+(?!\S)")
+
+# Bash 명령의 인자 (따옴표 구간은 하나의 인자, 연산자/리다이렉션에서 끊음)
+COMMAND_ARG_PATTERN = re.compile(r"\"([^\"]*)\"|'([^']*)'|([^\s;&|<>()`'\"]+)")
+
+
+def protected_dir_rule(index: int, directory: str) -> Dict[str, Any]:
+    """보호 디렉토리 설정을 write 규칙으로 변환 (프로젝트 루트 기준 상대 경로)"""
+    directory = directory.strip("/")
+    return {
+        "id": f"protected-dir-{index + 1}",
+        "tools": ["write"],
+        "pattern": rf"^{re.escape(directory)}(?:/|$)",
+        "action": "deny",
+        "message": f"보호된 디렉토리입니다: {directory}",
+    }
+
+
+def collect_policy_rules(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """config의 policy 섹션에서 유효한 규칙 목록 추출"""
+    policy = config.get("policy", {}) or {}
+    if not policy.get("enabled", True):
+        return []
+
+    rules = list(policy.get("rules", []) or [])
+    for i, directory in enumerate(policy.get("protected_dirs", []) or []):
+        rules.append(protected_dir_rule(i, directory))
+
+    valid = []
+    for rule in rules:
+        pattern = rule.get("pattern")
+        if not pattern or rule.get("action", "deny") not in POLICY_ACTIONS:
+            continue
+        try:
+            # 결합 정규식 안에서도 유효한지 확인 (중간 위치의 전역 플래그 등)
+            re.compile(f"(?P<r0>{pattern})")
+        except re.error:
+            continue
+        valid.append(rule)
+    return valid
+
+
+def _literal_runs(items) -> List[str]:
+    """파싱된 정규식 시퀀스에서 반드시 연속으로 나타나는 리터럴 구간 수집"""
+    runs, current = [], []
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            current.append(chr(av))
+        elif op is sre_constants.AT:
+            # \b, ^ 등 폭이 없는 단언은 리터럴 연속성을 깨지 않음
+            continue
+        else:
+            runs.append("".join(current))
+            current = []
+            if op is sre_constants.SUBPATTERN:
+                runs.extend(_literal_runs(av[-1]))
+    runs.append("".join(current))
+    return runs
+
+
+def required_literal(pattern: str) -> str:
+    """매치되려면 반드시 포함되어야 하는 가장 긴 리터럴 (소문자). 없으면 빈 문자열"""
+    try:
+        runs = _literal_runs(sre_parse.parse(pattern))
+    except (re.error, TypeError, ValueError):
+        return ""
+    literal = max(runs, key=len, default="").lower()
+    return literal if len(literal) >= MIN_LITERAL_LENGTH else ""
+
+
+def literal_scan_pattern(literals: List[str]) -> str:
+    """
+    리터럴 중 하나라도 있으면 매치되는 정규식 (접두사 트라이로 묶어 위치마다 첫 글자만 비교)
+
+    리터럴을 그대로 |로 이으면 re는 위치마다 모든 리터럴을 하나씩 시도한다.
+    """
+    trie: Dict[str, Any] = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        if "" in node:
+            # 더 긴 리터럴이 있어도 여기까지 나타났으면 충분
+            return ""
+        alternatives = [re.escape(char) + build(child) for char, child in sorted(node.items())]
+        return alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+
+    return build(trie) if literals else "(?!)"
+
+
+def build_policy_table(rules: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    규칙 목록을 도구 종류별 정책 테이블로 변환
+
+    리터럴이 없는 규칙은 이름 있는 그룹 r{번호}로 감싸 조치별 결합 정규식으로 합치고,
+    매치된 그룹 이름으로 규칙을 찾는다.
+    """
+    kinds: Dict[str, Dict[str, Any]] = {}
+    for index, rule in enumerate(rules):
+        action = rule.get("action", "deny")
+        literal = required_literal(rule["pattern"])
+        for kind in rule.get("tools", []):
+            table = kinds.setdefault(kind, {"keyed": {}, "matchers": {}})
+            if literal:
+                table["keyed"].setdefault(literal, []).append(index)
+            else:
+                table["matchers"].setdefault(action, []).append(f"(?P<r{index}>{rule['pattern']})")
+
+    return {
+        "version": POLICY_CACHE_VERSION,
+        "rules": [
+            {
+                "id": r.get("id", f"rule-{i + 1}"),
+                "action": r.get("action", "deny"),
+                "pattern": r["pattern"],
+                "message": r.get("message", ""),
+            }
+            for i, r in enumerate(rules)
+        ],
+        "kinds": {
+            kind: {
+                "keyed": sorted(table["keyed"].items()),
+                "matchers": {action: "|".join(parts) for action, parts in table["matchers"].items()},
+            }
+            for kind, table in kinds.items()
+        },
+    }
+
+
+class PolicyEngine:
+    """리터럴 사전 검사 + 결합 정규식 기반 PreToolUse 정책 평가기"""
+
+    def __init__(self, table: Dict[str, Any]):
+        self.rules = table.get("rules", [])
+        self.keyed: Dict[str, List] = {}
+        self.matchers: Dict[str, Dict[str, Any]] = {}
+        self._compiled: Dict[int, Any] = {}
+        self._literal_scanners: Dict[str, Any] = {}
+
+        for kind, kind_table in table.get("kinds", {}).items():
+            self.keyed[kind] = [(literal, indices) for literal, indices in kind_table.get("keyed", [])]
+            self.matchers[kind] = {
+                action: re.compile(source, re.IGNORECASE)
+                for action, source in kind_table.get("matchers", {}).items()
+                if source
+            }
+
+    def _rule_pattern(self, index: int):
+        """리터럴 규칙의 정규식은 처음 후보가 될 때 컴파일"""
+        compiled = self._compiled.get(index)
+        if compiled is None:
+            compiled = re.compile(self.rules[index]["pattern"], re.IGNORECASE)
+            self._compiled[index] = compiled
+        return compiled
+
+    def _literal_scanner(self, kind: str):
+        """kind의 리터럴 중 하나라도 있는지 한 번에 보는 정규식 (처음 쓸 때 컴파일)"""
+        scanner = self._literal_scanners.get(kind)
+        if scanner is None:
+            scanner = re.compile(literal_scan_pattern([literal for literal, _ in self.keyed[kind]]))
+            self._literal_scanners[kind] = scanner
+        return scanner
+
+    def _verdict(self, index: int) -> Dict[str, Any]:
+        rule = self.rules[index]
+        return {
+            "action": rule["action"],
+            "rule_id": rule["id"],
+            "message": rule["message"],
+        }
+
+    def _collect(self, kind: str, subjects: List[str], hits: Dict[str, int]) -> None:
+        """subjects 중 하나라도 매치된 kind 규칙을 조치별로 hits에 기록 (조치마다 먼저 찾은 규칙)"""
+        keyed = self.keyed.get(kind)
+        if keyed is None:
+            return
+
+        # 리터럴이 포함된 규칙만 개별 정규식으로 확인 (리터럴이 하나도 없으면 건너뜀)
+        lowered = "\n".join(subjects).lower()
+        if not self._literal_scanner(kind).search(lowered):
+            keyed = ()
+        for literal, indices in keyed:
+            if literal in lowered:
+                for index in indices:
+                    action = self.rules[index]["action"]
+                    if action not in hits:
+                        pattern = self._rule_pattern(index)
+                        if any(pattern.search(subject) for subject in subjects):
+                            hits[action] = index
+
+        for action, matcher in self.matchers[kind].items():
+            if action in hits:
+                continue
+            for subject in subjects:
+                match = matcher.search(subject)
+                if match:
+                    hits[action] = int(match.lastgroup[1:])
+                    break
+
+    def evaluate(self, tool_name: str, tool_input: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        도구 호출 평가
+
+        Returns:
+            매치된 경우 {"action", "rule_id", "message"}, 아니면 None
+        """
+        kind_field = TOOL_KINDS.get(tool_name)
+        if not kind_field:
+            return None
+
+        kind, field = kind_field
+        subject = tool_input.get(field) or ""
+        if not isinstance(subject, str) or not subject:
+            return None
+
+        hits: Dict[str, int] = {}
+        if kind == "bash":
+            normalized = normalize_command(subject)
+            self._collect("bash", [subject] if normalized == subject else [subject, normalized], hits)
+            paths = command_paths(subject)
+            if paths:
+                for path_kind in ("write", "read"):
+                    self._collect(path_kind, paths, hits)
+        else:
+            self._collect(kind, [relative_to_project(subject)], hits)
+
+        for action in POLICY_ACTIONS:
+            if action in hits:
+                return self._verdict(hits[action])
+        return None
+
+
+def relative_to_project(file_path: str, root: Optional[str] = None) -> str:
+    """
+    경로를 프로젝트 루트 기준으로 정규화 (./와 ..를 풀고 구분자는 /)
+
+    프로젝트 안의 경로는 루트 기준 상대 경로, 밖의 경로는 절대 경로로 반환한다.
+    """
+    if "." not in file_path and "//" not in file_path and not os.path.isabs(file_path):
+        # ./, .. 없는 상대 경로는 이미 정규화된 형태 (cwd를 읽지 않음)
+        return file_path
+    root = root or os.getcwd()
+    path = os.path.normpath(os.path.join(root, file_path))
+    prefix = root.rstrip(os.sep) + os.sep
+    if path == root:
+        path = "."
+    elif path.startswith(prefix):
+        path = path[len(prefix):]
+    return path.replace(os.sep, "/") if os.sep != "/" else path
+
+
+def normalize_command(command: str) -> str:
+    """긴 옵션을 짧은 옵션으로 바꾸고 이어진 짧은 옵션을 합침 (`rm -r --force` → `rm -rf`)"""
+    command = LONG_FLAG_PATTERN.sub(lambda m: LONG_FLAG_ALIASES[m.group(0)], command)
+    return SHORT_FLAG_RUN_PATTERN.sub(lambda m: "-" + "".join(flag[1:] for flag in m.group(0).split()), command)
+
+
+def command_paths(command: str) -> List[str]:
+    """Bash 명령에서 파일 경로로 볼 인자 (옵션 제외, `--file=PATH`는 값만), 프로젝트 기준 정규화"""
+    root = None
+    paths = []
+    for match in COMMAND_ARG_PATTERN.finditer(command):
+        arg = match.group(1) or match.group(2) or match.group(3) or ""
+        if arg.startswith("-"):
+            if "=" not in arg:
+                continue
+            arg = arg.split("=", 1)[1]
+        if arg:
+            if root is None and ("." in arg or "/" in arg):
+                root = os.getcwd()
+            path = relative_to_project(arg, root)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def get_policy_cache_path(config_path: Path) -> Path:
+    """config 경로별 정책 캐시 파일 경로"""
+    key = hashlib.md5(str(config_path).encode()).hexdigest()[:12]
+    return get_cache_dir() / f"policy-{key}.json"
+
+
+def load_policy_engine() -> PolicyEngine:
+    """
+    정책 엔진 로드
+
+    config 파일의 mtime/size가 캐시와 같으면 디스크 캐시의 테이블을 그대로 쓰고,
+    다르면 규칙을 다시 모아 캐시를 갱신한다.
+    """
+    config_path = get_config_path()
+    try:
+        stat = config_path.stat()
+        signature = [str(config_path), stat.st_mtime_ns, stat.st_size]
+    except OSError:
+        signature = None
+
+    cache_path = get_policy_cache_path(config_path)
+    if signature is not None:
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            if cached.get("signature") == signature and cached.get("version") == POLICY_CACHE_VERSION:
+                return PolicyEngine(cached)
+        except (OSError, ValueError):
+            pass
+
+    table = build_policy_table(collect_policy_rules(load_orchestrator_config()))
+
+    if signature is not None:
+        try:
+            atomic_write_text(cache_path, json.dumps({**table, "signature": signature}))
+        except OSError:
+            pass
+
+    return PolicyEngine(table)
+
+
+# 상주 데몬에서는 config가 바뀌지 않는 한 엔진을 재사용
+_ENGINE_CACHE: Dict[str, Any] = {}
+
+
+def get_policy_engine() -> PolicyEngine:
+    """프로세스 내 정책 엔진 (config 변경 시 재로드)"""
+    config_path = get_config_path()
+    try:
+        stat = config_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = None
+
+    if _ENGINE_CACHE.get("signature") != signature or "engine" not in _ENGINE_CACHE:
+        _ENGINE_CACHE["engine"] = load_policy_engine()
+        _ENGINE_CACHE["signature"] = signature
+    return _ENGINE_CACHE["engine"]
@@ -4,55 +4,57 @@ PostToolUse Hook - knowledge.yaml 자동 업데이트 및 코드 패턴 분석
 
 도구 실행 완료 후 실행되어:
 1. Contract 파일 변경 시 knowledge.yaml 자동 업데이트
-2. 코드 파일 탐색(Read) 시 패턴 분석 및 지식 축적
+2. 코드 파일 탐색(Read) 시 패턴 분석 및 지식 축적 (analysis-cache.json으로 같은 파일 재분석 방지)
+3. implementation phase에서 파일 작성 시 GATE-3(스코프)/GATE-4(설계 불변 조건) 검사
+4. Contract 경로의 Subtask별 phase 전환, 병렬로 진행할 수 있는 Subtask 안내 (hooks/scheduler.py)
+
+도구 호출 경로에서 실행되므로 knowledge.yaml은 읽지도 쓰지도 않는다. 변경은
+delta 로그(spool)에 한 줄씩 추가만 하고, knowledge.yaml에 합치는 것은
+백그라운드 flush와 Stop/PreCompact/SessionStart 훅이 한다. 새 패턴/decision인지는
+knowledge.yaml 옆 키 색인과 delta 로그로 판단한다 (load_knowledge_keys).
 """
 
 import sys
 import os
-from pathlib import Path
 
 # hooks 패키지 경로 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-try:
-    import yaml
-except ImportError:
-    yaml = None
-
 from hooks.common import (
     read_stdin_json,
     output_result,
     output_json,
     log_orchestrator,
     get_project_hash,
-    load_knowledge,
-    save_knowledge,
-    load_state,
-    save_state,
     is_contract_file,
-    detect_code_patterns,
-    merge_patterns,
+    load_knowledge_keys,
     get_timestamp,
-    check_yaml_available,
-    get_current_work,
     check_gate,
     get_gate_enforcement,
     get_phase_transition,
-    update_state_phase,
+    get_subtask_work,
     get_template,
     initialize_session,
 )
+from hooks.state_store import StateSession
+from hooks.analysis_cache import AnalysisCache, analyze_read
+from hooks.contracts import contract_registry_key, register_contract
+from hooks.gates import check_implementation_gates, record_scope_baseline
+from hooks.scheduler import (
+    complete_subtask,
+    format_dispatch_block,
+    import_breakdown,
+    refresh_schedule,
+    start_subtask,
+    target_subtasks,
+)
+from hooks.stats import instrument_hook
 
 
-def extract_decisions_from_design_contract(file_path: str) -> list:
+def extract_decisions_from_design_contract(file_path: str, content: dict) -> list:
     """design-contract.yaml에서 설계 결정 추출"""
-    if not check_yaml_available():
-        return []
-
     decisions = []
     try:
-        content = yaml.safe_load(Path(file_path).read_text(encoding="utf-8"))
-
         # invariants를 decisions로 변환
         for inv in content.get("invariants", []):
             decisions.append({
@@ -69,15 +71,10 @@ def extract_decisions_from_design_contract(file_path: str) -> list:
     return decisions
 
 
-def extract_pitfalls_from_test_result(file_path: str) -> list:
+def extract_pitfalls_from_test_result(content: dict) -> list:
     """test-result.yaml 실패 케이스에서 pitfalls 추출"""
-    if not check_yaml_available():
-        return []
-
     pitfalls = []
     try:
-        content = yaml.safe_load(Path(file_path).read_text(encoding="utf-8"))
-
         if content.get("execution", {}).get("result") == "fail":
             subtask_id = content.get("subtask_id", "")
             for failed in content.get("failed_tests", []):
@@ -93,63 +90,59 @@ def extract_pitfalls_from_test_result(file_path: str) -> list:
     return pitfalls
 
 
-def process_contract_file(file_path: str, project_hash: str) -> list:
+def process_contract_file(file_path: str, session: StateSession) -> list:
     """Contract 파일 처리"""
     updates = []
 
-    knowledge = load_knowledge(project_hash)
-    if not knowledge:
-        knowledge = {
-            "version": 1,
-            "project": {
-                "path": os.getcwd(),
-                "hash": project_hash,
-            },
-            "patterns": {},
-            "decisions": [],
-            "pitfalls": [],
-        }
+    content = session.contract(file_path)
+    if not content:
+        return updates
 
     # design-contract.yaml 처리
     if "design-contract.yaml" in file_path:
-        new_decisions = extract_decisions_from_design_contract(file_path)
-        for dec in new_decisions:
-            # 중복 체크 (같은 id면 스킵)
-            existing_ids = [d.get("id") for d in knowledge.get("decisions", [])]
-            if dec.get("id") and dec.get("id") not in existing_ids:
-                knowledge["decisions"].append(dec)
-                updates.append(f"Decision added: {dec.get('id')}")
+        new_decisions = extract_decisions_from_design_contract(file_path, content)
+        if new_decisions:
+            # 중복 체크 (knowledge나 아직 압축되지 않은 delta에 같은 id가 있으면 스킵)
+            existing_ids = load_knowledge_keys(session.project_hash)["decisions"]
+            for dec in new_decisions:
+                if dec.get("id") and dec.get("id") not in existing_ids:
+                    session.record_knowledge({"op": "decision", "item": dec})
+                    existing_ids.add(dec.get("id"))
+                    updates.append(f"Decision added: {dec.get('id')}")
 
     # test-result.yaml 처리
     elif "test-result.yaml" in file_path:
-        new_pitfalls = extract_pitfalls_from_test_result(file_path)
-        for pit in new_pitfalls:
-            knowledge["pitfalls"].append(pit)
-            desc = pit.get("description", "")[:30]
-            updates.append(f"Pitfall added: {desc}...")
-
-    # 변경사항 저장
-    if updates:
-        knowledge["updated_at"] = get_timestamp()
-        save_knowledge(project_hash, knowledge)
-
+        # 같은 실패가 반복되면 delta를 합칠 때 기존 항목의 count로 합쳐짐
+        new_pitfalls = extract_pitfalls_from_test_result(content)
+        if new_pitfalls:
+            for pit in new_pitfalls:
+                session.record_knowledge({"op": "pitfall", "item": pit})
+                desc = pit.get("description", "")[:30]
+                updates.append(f"Pitfall recorded: {desc}...")
+
+    # 변경사항은 세션 commit 때 delta 로그에 추가됨
     return updates
 
 
-def process_state_transition(file_path: str, project_hash: str) -> dict:
+def process_state_transition(file_path: str, session: StateSession) -> dict:
     """
     Contract 파일 저장에 따른 상태 전환 처리
 
+    Subtask 레벨 전환은 Contract 경로(contracts/{요청}/{Task}/{Subtask}/)의 Subtask에 적용하므로
+    병렬로 진행 중인 Subtask가 각자의 phase로 진행된다 (경로로 알 수 없으면 현재 Subtask).
+
     Returns:
-        {"transition": str, "gate_result": (bool, str), "next_action": str}
+        {"transition": str, "gate_result": (bool, str), "next_action": str, "dispatch": str}
     """
     result = {
         "transition": None,
+        "gate_id": "GATE",
         "gate_result": (True, ""),
         "next_action": None,
+        "dispatch": "",
     }
 
-    state = load_state(project_hash)
+    state = session.state
     if not state:
         return result
 
@@ -157,49 +150,87 @@ def process_state_transition(file_path: str, project_hash: str) -> dict:
     if request.get("status") != "active":
         return result
 
-    current_work = get_current_work(state)
-    current_phase = current_work.get("phase", "")
-    global_phase = current_work.get("global_phase", "")
+    project_hash = session.project_hash
+    # 게이트는 파일 대신 Contract 레지스트리를 봄 (방금 쓴 Contract는 main에서 등록됨)
+    registry = state.get("contracts")
+    global_phase = request.get("global_phase", "")
+    targets = target_subtasks(project_hash, state, file_path)
+    labels = f" ({', '.join(subtask_id for _, subtask_id in targets)})" if len(targets) > 1 else ""
+    scheduled = False
 
     # Contract별 상태 전환 처리
     if "explored.yaml" in file_path or "task-breakdown.yaml" in file_path:
-        # Global Discovery 단계
+        # Global Discovery 단계 (Planning 중 저장된 스코프가 GATE-3 기준값)
+        if "task-breakdown.yaml" in file_path and global_phase == "global_discovery":
+            record_scope_baseline(session, file_path)
+            # Task/Subtask와 의존성(depends_on)을 state에 반영
+            content = session.contract(file_path)
+            if content is not None:
+                scheduled, problem = import_breakdown(session, content)
+                if problem:
+                    result["gate_id"] = "TASK-BREAKDOWN"
+                    result["gate_result"] = (False, problem)
+            targets = []
         result["transition"] = "Global Discovery progress"
         result["next_action"] = "Complete Global Discovery, then proceed to Task Loop"
+        if not result["gate_result"][0]:
+            result["next_action"] = "Planner로 depends_on을 고쳐 task-breakdown.yaml을 다시 저장하세요"
 
     elif "design-contract.yaml" in file_path:
-        # Task Design 완료 → test_first로 전환
-        result["transition"] = "Task Design completed"
-        update_state_phase(project_hash, "test_first", "subtask")
+        # Task Design 완료 → test_first로 전환 (Task 레벨 설계면 그 Task에서 시작할 수 있는 Subtask 모두)
+        result["transition"] = f"Task Design completed{labels}"
+        for task_id, subtask_id in targets:
+            start_subtask(session, task_id, subtask_id)
+            session.set_phase("test_first", "subtask", task_id, subtask_id)
+        scheduled = bool(targets)
         result["next_action"] = "QA Engineer로 테스트 먼저 작성하세요 (test-contract.yaml)"
 
     elif "test-contract.yaml" in file_path:
-        # GATE-1 검증
-        passed, message = check_gate("GATE-1", project_hash, current_work)
-        result["gate_result"] = (passed, message)
+        # GATE-1 검증 (대상 Subtask마다)
+        blocked = []
+        for task_id, subtask_id in targets:
+            passed, message = check_gate("GATE-1", project_hash, get_subtask_work(state, task_id, subtask_id), registry)
+            if passed:
+                start_subtask(session, task_id, subtask_id)
+                session.set_phase("implementation", "subtask", task_id, subtask_id)
+            else:
+                blocked.append(message)
+        scheduled = bool(targets)
 
-        if passed:
-            result["transition"] = "GATE-1 passed: test_first → implementation"
-            update_state_phase(project_hash, "implementation", "subtask")
+        if not blocked:
+            result["transition"] = f"GATE-1 passed: test_first → implementation{labels}"
             result["next_action"] = "Implementer로 구현을 진행하세요"
         else:
+            result["gate_result"] = (False, blocked[0])
             result["transition"] = "GATE-1 blocked"
-            result["next_action"] = message
+            result["next_action"] = blocked[0]
 
     elif "test-result.yaml" in file_path:
         # 테스트 결과 분석
-        try:
-            content = yaml.safe_load(Path(file_path).read_text(encoding="utf-8"))
+        content = session.contract(file_path)
+        if content is not None:
             test_passed = content.get("execution", {}).get("result") == "pass"
-
-            if current_phase == "verification":
+            # 구현 중인 Subtask가 여럿이면 Implementer 종료(SubagentStop)로는 어느 것이 끝났는지
+            # 알 수 없으므로, Subtask 경로에 검증 결과가 저장되면 그 Subtask는 구현을 마친 것으로 봄
+            if len((contract_registry_key(project_hash, file_path) or "").split("/")) == 4:
+                for task_id, subtask_id in targets:
+                    if get_subtask_work(state, task_id, subtask_id)["phase"] == "implementation":
+                        session.set_phase("verification", "subtask", task_id, subtask_id)
+            works = [get_subtask_work(state, task_id, subtask_id) for task_id, subtask_id in targets]
+
+            if any(work["phase"] == "verification" for work in works):
                 # GATE-2 검증
-                passed, message = check_gate("GATE-2", project_hash, current_work)
+                verifying = [work for work in works if work["phase"] == "verification"]
+                passed, message = check_gate("GATE-2", project_hash, verifying[0], registry)
                 result["gate_result"] = (passed, message)
 
                 if passed and test_passed:
-                    result["transition"] = "GATE-2 passed: verification → complete"
-                    update_state_phase(project_hash, "complete", "subtask")
+                    result["transition"] = "GATE-2 passed: verification → complete" + (
+                        f" ({', '.join(work['subtask_id'] for work in verifying)})" if len(verifying) > 1 else ""
+                    )
+                    for work in verifying:
+                        complete_subtask(session, work["task_id"], work["subtask_id"])
+                    scheduled = True
                     result["next_action"] = "Subtask 완료. 다음 Subtask로 진행하세요."
                 elif not test_passed:
                     result["transition"] = "Verification failed"
@@ -209,8 +240,10 @@ def process_state_transition(file_path: str, project_hash: str) -> dict:
                 result["transition"] = "Test first result recorded"
                 result["next_action"] = "테스트 결과가 기록되었습니다."
 
-        except Exception:
-            pass
+    if scheduled:
+        # ready 집합과 현재 위치 갱신, 병렬로 부를 수 있는 Subtask 안내
+        refresh_schedule(session, targets[0] if targets else None)
+        result["dispatch"] = format_dispatch_block(project_hash, session.state)
 
     return result
 
@@ -229,42 +262,29 @@ def generate_gate_blocked_message(gate_id: str, message: str) -> str:
 """
 
 
-def process_code_read(file_path: str, content: str, project_hash: str) -> list:
-    """코드 파일 Read 시 패턴 분석"""
-    if not content:
-        return []
+def process_code_read(file_path: str, tool_response: dict, session: StateSession) -> list:
+    """
+    코드 파일 Read 시 패턴 분석 (이미 분석한 파일은 다시 읽거나 스캔하지 않음)
 
-    # 패턴 감지
-    new_patterns = detect_code_patterns(file_path, content)
+    새 키인지는 knowledge 키 색인으로 확인하고 (knowledge 전체는 읽지 않음),
+    새 키만 delta로 기록한다.
+    """
+    cache = AnalysisCache(session.project_hash)
+    new_patterns = analyze_read(file_path, tool_response, cache)
+    cache.save()
     if not new_patterns:
         return []
 
-    # knowledge.yaml 로드/생성
-    knowledge = load_knowledge(project_hash)
-    if not knowledge:
-        knowledge = {
-            "version": 1,
-            "project": {
-                "path": os.getcwd(),
-                "hash": project_hash,
-            },
-            "patterns": {},
-            "decisions": [],
-            "pitfalls": [],
-        }
-
-    # 패턴 병합
-    existing_patterns = knowledge.get("patterns", {})
-    merged, added = merge_patterns(existing_patterns, new_patterns)
-
+    # 새 키만 delta로 기록 (기존 값 우선)
+    existing_keys = load_knowledge_keys(session.project_hash)["patterns"]
+    added = {key: value for key, value in new_patterns.items() if key not in existing_keys}
     if added:
-        knowledge["patterns"] = merged
-        knowledge["updated_at"] = get_timestamp()
-        save_knowledge(project_hash, knowledge)
+        session.record_knowledge({"op": "patterns", "values": added})
 
-    return added
+    return [f"{key}: {value}" for key, value in added.items()]
 
 
+@instrument_hook("post_tool_use")
 def main():
     """PostToolUse Hook 메인 함수"""
     input_data = read_stdin_json()
@@ -284,50 +304,66 @@ def main():
     updates = []
     messages = []
 
+    # state/knowledge는 이 세션에서 한 번만 읽고, 끝에서 한 번만 저장
+    session = StateSession(project_hash)
+
     # Write/Edit: Contract 파일 처리
     if tool_name in ["Write", "Edit"]:
+        transition_result = {"transition": None, "gate_id": "GATE", "gate_result": (True, ""), "next_action": None,
+                             "dispatch": ""}
         if is_contract_file(file_path):
-            # 1. knowledge.yaml 업데이트
-            updates = process_contract_file(file_path, project_hash)
-
-            # 2. 상태 전환 처리
-            transition_result = process_state_transition(file_path, project_hash)
-
-            if transition_result["transition"]:
-                messages.append(f"[State] {transition_result['transition']}")
-
-            # 게이트 검증 결과
-            gate_passed, gate_message = transition_result["gate_result"]
-            enforcement = get_gate_enforcement()
+            # 1. Contract 레지스트리에 경로/크기/mtime/해시 기록
+            register_contract(session, file_path)
+
+            # 2. knowledge.yaml 업데이트
+            updates = process_contract_file(file_path, session)
+
+            # 3. 상태 전환 처리
+            transition_result = process_state_transition(file_path, session)
+
+        # 4. implementation phase에서 쓴 파일: GATE-3(스코프), GATE-4(설계 불변 조건)
+        if transition_result["gate_result"][0]:
+            gate_id, passed, message = check_implementation_gates(session, file_path)
+            if not passed:
+                transition_result["gate_id"] = gate_id
+                transition_result["gate_result"] = (False, message)
+        session.commit()
+
+        if transition_result["transition"]:
+            messages.append(f"[State] {transition_result['transition']}")
+
+        # 게이트 검증 결과
+        gate_passed, gate_message = transition_result["gate_result"]
+        enforcement = get_gate_enforcement()
+
+        if not gate_passed:
+            if enforcement == "block":
+                # 엄격 차단
+                gate_blocked_msg = generate_gate_blocked_message(
+                    transition_result["gate_id"], gate_message
+                )
+                output_json({
+                    "decision": "block",
+                    "reason": gate_blocked_msg,
+                })
+                return
+            else:
+                # 경고만
+                messages.append(f"[Warning] {gate_message}")
 
-            if not gate_passed:
-                if enforcement == "block":
-                    # 엄격 차단
-                    gate_blocked_msg = generate_gate_blocked_message(
-                        "GATE", gate_message
-                    )
-                    output_json({
-                        "decision": "block",
-                        "reason": gate_blocked_msg,
-                    })
-                    return
-                else:
-                    # 경고만
-                    messages.append(f"[Warning] {gate_message}")
-
-            if transition_result["next_action"]:
-                messages.append(f"[Next] {transition_result['next_action']}")
+        if transition_result["next_action"]:
+            messages.append(f"[Next] {transition_result['next_action']}")
+        if transition_result.get("dispatch"):
+            messages.append(transition_result["dispatch"])
 
     # Read: 코드 패턴 분석
     elif tool_name == "Read":
-        # Read 도구의 경우 content가 tool_input에 없을 수 있음
-        # 실제로 파일 내용을 읽어야 함
-        if Path(file_path).exists():
-            try:
-                content = Path(file_path).read_text(encoding="utf-8")
-                updates = process_code_read(file_path, content, project_hash)
-            except Exception:
-                pass
+        # 파일 내용은 tool_response에 전체가 있으면 그것을 쓰고, 없으면 디스크에서 읽음
+        try:
+            updates = process_code_read(file_path, input_data.get("tool_response"), session)
+            session.commit()
+        except Exception:
+            pass
 
     # 결과 출력
     all_outputs = []
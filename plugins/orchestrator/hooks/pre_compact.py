@@ -19,14 +19,21 @@ from hooks.common import (
     output_result,
     get_project_hash,
     load_state,
+    sync_state_json,
     load_knowledge,
+    compact_knowledge,
     count_pending_subtasks,
     count_pending_tasks,
     get_current_work,
     format_knowledge_summary,
+    format_pitfall,
+    top_knowledge_items,
 )
+from hooks.injection import reset_injection_record
+from hooks.stats import instrument_hook
 
 
+@instrument_hook("pre_compact")
 def main():
     """PreCompact Hook 메인 함수"""
     # stdin에서 입력 읽기
@@ -34,12 +41,21 @@ def main():
 
     project_hash = get_project_hash()
 
+    # 쌓인 knowledge delta를 knowledge.yaml에 합치기
+    compact_knowledge(project_hash)
+
     # state.json 확인
     state = load_state(project_hash)
     if not state:
         # 오케스트레이터 세션 없음
         return
 
+    # sqlite 백엔드: 압축 후 state.json을 다시 읽어도 최신 상태가 보이도록 내보내기
+    sync_state_json(project_hash)
+
+    # 압축으로 이전 주입 내용이 사라지므로 다음 UserPromptSubmit은 전체 컨텍스트 주입
+    reset_injection_record(project_hash)
+
     request = state.get("request", {})
     if request.get("status") != "active":
         # 활성 세션 아님
@@ -77,9 +93,8 @@ def main():
         if pitfalls:
             lines.append("")
             lines.append("Key Pitfalls:")
-            for p in pitfalls[:3]:
-                desc = p.get("description", "")[:60]
-                lines.append(f"- {desc}")
+            for p in top_knowledge_items(pitfalls, 3):
+                lines.append(f"- {format_pitfall(p, 60)}")
 
     lines.extend([
         "",
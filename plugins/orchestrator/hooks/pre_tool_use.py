@@ -1,14 +1,14 @@
 #!/usr/bin/env python3
 """
-PreToolUse Hook - STUB
+PreToolUse Hook - 도구 실행 전 정책 검증
 
-도구 실행 전 검증을 위한 훅.
-향후 구현 예정:
-- 위험 명령어 차단 (rm -rf, git push --force 등)
-- 민감 파일 보호 (.env, credentials 등)
-- 특정 디렉터리 보호
+도구 실행 직전에 실행되어:
+1. 위험 명령어 차단 (rm -rf, git push --force 등)
+2. 민감 파일 보호 (.env, credentials 등)
+3. 보호 디렉토리 쓰기 차단 (policy.protected_dirs)
 
-현재는 모든 도구 실행을 허용합니다.
+규칙은 orchestrator-config.yaml의 policy 섹션에서 관리하며,
+매치되지 않으면 아무것도 출력하지 않아 도구 실행을 허용합니다.
 """
 
 import sys
@@ -17,17 +17,32 @@ import os
 # hooks 패키지 경로 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from hooks.common import read_stdin_json
+from hooks.common import (
+    read_stdin_json,
+    output_permission_decision,
+    log_orchestrator,
+)
+from hooks.policy import get_policy_engine
+from hooks.stats import instrument_hook
 
 
+@instrument_hook("pre_tool_use")
 def main():
-    """PreToolUse Hook 메인 함수 - STUB"""
-    # stdin에서 입력 읽기 (프로토콜 준수)
-    _ = read_stdin_json()
+    """PreToolUse Hook 메인 함수"""
+    input_data = read_stdin_json()
 
-    # TODO: 향후 구현
-    # 현재는 모든 도구 실행 허용 (아무것도 출력하지 않음)
-    pass
+    tool_name = input_data.get("tool_name", "")
+    tool_input = input_data.get("tool_input", {})
+    if not tool_name or not isinstance(tool_input, dict):
+        return
+
+    verdict = get_policy_engine().evaluate(tool_name, tool_input)
+    if not verdict:
+        return
+
+    reason = f"[Policy {verdict['rule_id']}] {verdict['message']}"
+    log_orchestrator(f"{tool_name} {verdict['action']}: {verdict['rule_id']}")
+    output_permission_decision(verdict["action"], reason)
 
 
 if __name__ == "__main__":
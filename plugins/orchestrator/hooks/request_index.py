@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - 요청 인덱스
+
+한 프로젝트에서 여러 요청(기능)을 동시에 진행할 수 있도록 요청마다 state를 따로 둔다.
+
+    sessions/{hash}/
+    ├── index.json               # 현재 요청 + 요청별 요약 (상태, 원문, 생성 시각, Claude Code 세션)
+    ├── state.json               # 현재 요청 state.json을 가리키는 심볼릭 링크 (에이전트/외부 도구용)
+    ├── requests/{R1,R2,...}/
+    │   └── state.json           # 요청별 state (sqlite 백엔드는 state.db의 행 + 내보낸 사본)
+    └── contracts/{R1,R2,...}/   # 요청별 Contract
+
+훅은 index.json의 `current`로 현재 요청을 찾고 그 요청의 state만 읽는다.
+index.json은 요청이 생기거나 요약(상태 등)이 바뀔 때만 다시 쓰므로 phase 변경 같은
+일반 갱신은 요청 state만 고쳐 쓴다. 인덱스를 고칠 때는 잠금 안에서 디스크의 최신
+인덱스를 다시 읽어 고치므로, 병렬 훅이 동시에 요청을 등록해도 한쪽이 사라지지 않는다.
+
+예전처럼 sessions/{hash}/state.json 하나만 있는 프로젝트는 처음 인덱스를 읽을 때
+requests/{id}/state.json으로 옮기고 인덱스를 만든다. 옮긴 뒤에도 그 경로는 현재 요청의
+state.json을 가리키는 링크로 남아 예전 경로를 읽는 에이전트와 도구가 그대로 동작한다
+(심볼릭 링크를 만들 수 없는 환경에서는 링크 없이 requests/{id}/state.json만 사용).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# hooks 패키지 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks.common import (
+    atomic_write_text,
+    get_sessions_path,
+    get_timestamp,
+    memo_load,
+    memo_store,
+)
+from hooks.locking import file_lock
+from hooks.stats import timed
+
+
+INDEX_VERSION = 1
+
+# 인덱스에 남기는 요청 원문 길이 (전체 원문은 요청 state에 있음)
+SUMMARY_REQUEST_CHARS = 200
+
+# 안내에 보여 줄 다른 요청 수 (최근 생성 순)
+MAX_LISTED_REQUESTS = 5
+
+REQUEST_ID_PATTERN = re.compile(r"\bR(\d+)\b")
+
+
+def get_index_path(project_hash: str) -> Path:
+    """요청 인덱스 경로"""
+    return get_sessions_path(project_hash) / "index.json"
+
+
+def get_request_path(project_hash: str, request_id: str) -> Path:
+    """요청별 디렉토리 (state.json)"""
+    return get_sessions_path(project_hash) / "requests" / request_id
+
+
+def get_current_state_link(project_hash: str) -> Path:
+    """현재 요청 state.json을 가리키는 링크 경로 (요청 인덱스 이전의 state 경로)"""
+    return get_sessions_path(project_hash) / "state.json"
+
+
+def create_index() -> Dict[str, Any]:
+    """빈 인덱스"""
+    return {"version": INDEX_VERSION, "current": None, "next_seq": 1, "requests": {}}
+
+
+def request_summary(state: Dict[str, Any]) -> Dict[str, Any]:
+    """인덱스에 기록하는 요청 요약"""
+    request = state.get("request", {})
+    return {
+        "status": request.get("status", ""),
+        "original_request": (request.get("original_request") or "")[:SUMMARY_REQUEST_CHARS],
+        "created_at": request.get("created_at"),
+        "claude_session_id": request.get("claude_session_id"),
+    }
+
+
+def _request_seq(request_id: str) -> int:
+    match = REQUEST_ID_PATTERN.fullmatch(request_id or "")
+    return int(match.group(1)) if match else 0
+
+
+def _legacy_states(project_hash: str) -> List[Dict[str, Any]]:
+    """요청 인덱스 이전 형식의 state (state.db의 요청 행, sessions/{hash}/state.json)"""
+    sessions_path = get_sessions_path(project_hash)
+    states: Dict[str, Dict[str, Any]] = {}
+
+    db_path = sessions_path / "state.db"
+    if db_path.exists():
+        try:
+            conn = sqlite3.connect(str(db_path), timeout=5.0)
+            try:
+                for request_id, data in conn.execute("SELECT request_id, data FROM requests"):
+                    states[request_id] = json.loads(data)
+                row = conn.execute("SELECT value FROM meta WHERE key = 'current_request'").fetchone()
+            finally:
+                conn.close()
+            if row and row[0] in states:
+                # 현재 요청을 마지막에 두어 current가 되도록
+                states[row[0]] = states.pop(row[0])
+        except (sqlite3.Error, ValueError):
+            pass
+
+    legacy_path = get_current_state_link(project_hash)
+    # 링크는 이미 옮겨진 state를 가리키므로 옮길 대상이 아님
+    if legacy_path.exists() and not legacy_path.is_symlink():
+        try:
+            state = json.loads(legacy_path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, IOError):
+            state = None
+        if isinstance(state, dict):
+            request_id = str(state.get("request", {}).get("id") or "R1")
+            target = get_request_path(project_hash, request_id) / "state.json"
+            try:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(legacy_path, target)
+            except OSError:
+                pass
+            states.pop(request_id, None)
+            states[request_id] = state
+
+    return list(states.values())
+
+
+def _migrate(project_hash: str) -> Dict[str, Any]:
+    """이전 형식의 state로 인덱스 생성 (없으면 파일을 만들지 않고 빈 인덱스, 잠금 안에서 호출)"""
+    index = create_index()
+    states = _legacy_states(project_hash)
+    if not states:
+        return index
+
+    for state in states:
+        request_id = str(state.get("request", {}).get("id") or "R1")
+        index["requests"][request_id] = request_summary(state)
+        index["current"] = request_id
+        index["next_seq"] = max(index["next_seq"], _request_seq(request_id) + 1)
+    save_index(project_hash, index)
+    return index
+
+
+@timed("state")
+def _read_index(path: Path) -> Optional[Dict[str, Any]]:
+    """디스크의 인덱스 (메모를 거치지 않음, 잠금 안에서 최신 내용 확인용)"""
+    try:
+        index = json.loads(path.read_text(encoding="utf-8"))
+    except (ValueError, IOError):
+        return None
+    if isinstance(index, dict) and index.get("version") == INDEX_VERSION:
+        memo_store(path, index)
+        return index
+    return None
+
+
+@timed("state")
+def load_index(project_hash: str) -> Dict[str, Any]:
+    """요청 인덱스 (없으면 이전 형식에서 만들거나 빈 인덱스)"""
+    path = get_index_path(project_hash)
+    try:
+        index = memo_load(path, json.loads)
+    except (ValueError, IOError):
+        index = None
+    if isinstance(index, dict) and index.get("version") == INDEX_VERSION:
+        return index
+
+    # 이전 형식 옮기기는 한 프로세스만 (다른 훅이 먼저 옮겼으면 그 인덱스를 읽음)
+    try:
+        with file_lock(path):
+            return _read_index(path) or _migrate(project_hash)
+    except OSError:
+        return create_index()
+
+
+@timed("state")
+def save_index(project_hash: str, index: Dict[str, Any]) -> bool:
+    """요청 인덱스 원자적 저장"""
+    path = get_index_path(project_hash)
+    try:
+        written = atomic_write_text(path, json.dumps(index, ensure_ascii=False, indent=2))
+        memo_store(path, index, written)
+    except OSError:
+        return False
+    link_current_state(project_hash, index.get("current"))
+    return True
+
+
+def link_current_state(project_hash: str, request_id: Optional[str]) -> bool:
+    """
+    sessions/{hash}/state.json이 현재 요청의 state.json을 가리키게 함
+
+    상대 경로 링크라 요청 state를 새 파일로 바꿔 써도 그대로 유효하고, 현재 요청이
+    바뀔 때만 다시 만든다. 같은 경로에 일반 파일이 있으면(옮기기 전 state) 건드리지 않는다.
+    """
+    if not request_id:
+        return False
+    link = get_current_state_link(project_hash)
+    target = os.path.join("requests", request_id, "state.json")
+    try:
+        if os.readlink(link) == target:
+            return True
+    except OSError:
+        if link.exists():
+            return False
+
+    temp = link.with_name(f".state.json.{os.getpid()}.link")
+    try:
+        if temp.is_symlink():
+            temp.unlink()
+        os.symlink(target, temp)
+        os.replace(temp, link)
+        return True
+    except (OSError, NotImplementedError):
+        return False
+
+
+def current_request_id(project_hash: str) -> Optional[str]:
+    """현재 요청 ID (요청이 없으면 None)"""
+    return load_index(project_hash).get("current")
+
+
+def next_request_id(project_hash: str) -> str:
+    """새 요청에 쓸 ID (저장해 인덱스에 등록되기 전까지는 예약되지 않음)"""
+    return f"R{load_index(project_hash).get('next_seq', 1)}"
+
+
+def active_requests(index: Dict[str, Any], exclude: Optional[str] = None) -> List[str]:
+    """진행 중(active)인 요청 ID 목록"""
+    return [
+        request_id for request_id, entry in index.get("requests", {}).items()
+        if entry.get("status") == "active" and request_id != exclude
+    ]
+
+
+@timed("state")
+def _update_index(project_hash: str, apply: Callable[[Dict[str, Any]], Optional[bool]]) -> bool:
+    """
+    잠금 안에서 최신 인덱스를 읽어 apply로 고치고 저장
+
+    Args:
+        apply: 인덱스를 고치는 함수. True면 저장, None이면 쓰지 않고 성공, False면 실패
+    """
+    path = get_index_path(project_hash)
+    try:
+        with file_lock(path):
+            index = _read_index(path) or _migrate(project_hash)
+            result = apply(index)
+            if result is None:
+                return True
+            if not result:
+                return False
+            index["updated_at"] = get_timestamp()
+            return save_index(project_hash, index)
+    except OSError:
+        return False
+
+
+def sync_request(project_hash: str, state: Dict[str, Any]) -> bool:
+    """
+    state의 요약이 인덱스와 다르면 인덱스 갱신
+
+    인덱스에 없는 요청은 새로 등록하고 현재 요청으로 만든다.
+    요약이 같으면 잠그지도 쓰지도 않는다.
+    """
+    request_id = (state or {}).get("request", {}).get("id")
+    if not request_id:
+        return False
+
+    summary = request_summary(state)
+    if load_index(project_hash)["requests"].get(request_id) == summary:
+        return True
+
+    def apply(index: Dict[str, Any]) -> Optional[bool]:
+        if index["requests"].get(request_id) == summary:
+            return None
+        if request_id not in index["requests"]:
+            index["current"] = request_id
+            index["next_seq"] = max(index.get("next_seq", 1), _request_seq(request_id) + 1)
+        index["requests"][request_id] = summary
+        return True
+
+    return _update_index(project_hash, apply)
+
+
+def set_current_request(project_hash: str, request_id: str) -> bool:
+    """현재 요청 전환"""
+    index = load_index(project_hash)
+    if request_id not in index["requests"]:
+        return False
+    if index.get("current") == request_id:
+        return True
+
+    def apply(index: Dict[str, Any]) -> Optional[bool]:
+        if request_id not in index["requests"]:
+            return False
+        if index.get("current") == request_id:
+            return None
+        index["current"] = request_id
+        return True
+
+    return _update_index(project_hash, apply)
+
+
+def find_request_ref(prompt: str, index: Dict[str, Any]) -> Optional[str]:
+    """프롬프트에 있는 인덱스의 요청 ID (예: '/orchestrator resume R2')"""
+    for match in REQUEST_ID_PATTERN.finditer(prompt.upper()):
+        request_id = f"R{int(match.group(1))}"
+        if request_id in index.get("requests", {}):
+            return request_id
+    return None
+
+
+def format_active_requests(index: Dict[str, Any], exclude: Optional[str] = None) -> str:
+    """다른 진행 중 요청 안내 (없으면 빈 문자열)"""
+    request_ids = active_requests(index, exclude)
+    if not request_ids:
+        return ""
+
+    lines = ["진행 중인 다른 요청:"]
+    for request_id in request_ids[-MAX_LISTED_REQUESTS:]:
+        entry = index["requests"][request_id]
+        text = entry.get("original_request", "").splitlines()[0] if entry.get("original_request") else ""
+        if len(text) > 60:
+            text = text[:60] + "..."
+        lines.append(f"  - {request_id}: {text}")
+    if len(request_ids) > MAX_LISTED_REQUESTS:
+        lines.append(f"  (외 {len(request_ids) - MAX_LISTED_REQUESTS}개)")
+    lines.append("전환: '/orchestrator resume <요청 ID>'")
+    return "\n".join(lines)
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - Subtask 의존성 스케줄러
+
+Planner가 task-breakdown.yaml에 Subtask(또는 Task) 간 의존성(depends_on)을 적으면
+서로 기다릴 필요 없는 Subtask를 동시에 진행한다.
+
+    tasks:
+      - id: T1
+        subtasks:
+          - id: T1-S1
+            depends_on: []          # 바로 시작 가능
+          - id: T1-S2
+            depends_on: []          # T1-S1과 병렬
+          - id: T1-S3
+            depends_on: [T1-S1, T1-S2]
+      - id: T2
+        depends_on: [T1]            # Task ID는 그 Task의 모든 Subtask
+
+- depends_on이 없는 Subtask는 바로 앞 Subtask(Task의 첫 Subtask는 앞 Task 전체)에
+  의존한다. 의존성을 적지 않은 계획은 이전처럼 한 번에 하나씩 진행된다.
+- ready: 시작 전(pending)이고 의존하는 Subtask가 모두 끝난 Subtask.
+  state의 request.ready에 기록하고 전환이 있을 때마다 다시 계산한다.
+- in flight: 진행 중(in_progress)인 Subtask. 각자 phase를 가지며, PostToolUse는
+  Contract 경로(contracts/{요청}/{Task}/{Subtask}/...)로 어느 Subtask의 전환인지 구분한다.
+- request.current_task / current_subtask는 마지막으로 전환된 Subtask를 가리킨다
+  (현재 위치 하나만 보는 안내/게이트와 호환).
+- 임계 경로: Subtask부터 의존 사슬 끝까지 남은 추정 시간의 최댓값 (phase별 추정은
+  hooks/durations.py의 소요 시간 기록). ready 집합과 병렬 안내, 현재 위치를 옮길 때는
+  task_order 대신 이 값이 큰 Subtask부터 (같으면 계획 순서).
+"""
+
+import copy
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# hooks 패키지 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks.common import contract_exists, get_subtask_work
+from hooks.contracts import contract_registry_key
+from hooks.durations import format_duration, phase_estimates, remaining_seconds
+
+
+# Subtask phase별 다음에 부를 에이전트와 할 일 (phase가 없으면 아직 설계 전)
+PHASE_ACTIONS = {
+    "": ("orchestrator:architect", "설계 (design-contract.yaml)"),
+    "test_first": ("orchestrator:qa-engineer", "테스트 먼저 작성 (test-contract.yaml)"),
+    "implementation": ("orchestrator:implementer", "구현"),
+    "verification": ("orchestrator:qa-engineer", "검증 (test-result.yaml)"),
+}
+
+# 안내에 나열할 최대 Subtask 수
+MAX_LISTED_SUBTASKS = 8
+
+
+def iter_subtasks(state: Dict[str, Any]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+    """(task_id, subtask_id, subtask) - task_order/subtask_order 순서"""
+    tasks = state.get("tasks", {}) or {}
+    for task_id in state.get("task_order") or list(tasks):
+        task = tasks.get(task_id) or {}
+        subtasks = task.get("subtasks", {}) or {}
+        for subtask_id in task.get("subtask_order") or list(subtasks):
+            yield task_id, subtask_id, subtasks.get(subtask_id) or {}
+
+
+def dependency_graph(state: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Subtask ID -> 먼저 끝나야 하는 Subtask ID 목록 (없는 ID는 무시, import_breakdown이 미리 거부)"""
+    tasks = state.get("tasks", {}) or {}
+    members: Dict[str, List[str]] = {}
+    for task_id, subtask_id, _ in iter_subtasks(state):
+        members.setdefault(task_id, []).append(subtask_id)
+    known = {subtask_id for subtask_ids in members.values() for subtask_id in subtask_ids}
+
+    def expand(ids: Any) -> List[str]:
+        result = []
+        for ref in ids if isinstance(ids, list) else [ids]:
+            for subtask_id in members.get(ref, [ref]):
+                if subtask_id in known and subtask_id not in result:
+                    result.append(subtask_id)
+        return result
+
+    graph: Dict[str, List[str]] = {}
+    previous_task: List[str] = []
+    for task_id, subtask_ids in members.items():
+        task = tasks.get(task_id) or {}
+        task_deps = expand(task.get("depends_on") or [])
+        previous = None
+        for subtask_id in subtask_ids:
+            subtask = task.get("subtasks", {}).get(subtask_id) or {}
+            if "depends_on" in subtask:
+                deps = expand(subtask.get("depends_on") or [])
+            elif previous:
+                deps = [previous]
+            elif "depends_on" in task:
+                deps = []
+            else:
+                deps = list(previous_task)
+            graph[subtask_id] = [d for d in dict.fromkeys(deps + task_deps) if d != subtask_id]
+            previous = subtask_id
+        previous_task = subtask_ids
+    return graph
+
+
+def _find_cycle(graph: Dict[str, List[str]]) -> List[str]:
+    """순환 의존성 하나 (A, B, ..., A 순서, A가 B에 의존). 없으면 빈 목록"""
+    visiting, done = set(), set()
+    for root in graph:
+        if root in done:
+            continue
+        # 긴 사슬에서도 재귀 한도에 걸리지 않도록 스택으로 DFS
+        path = [root]
+        stack = [iter(graph[root])]
+        visiting.add(root)
+        while stack:
+            for dep in stack[-1]:
+                if dep in visiting:
+                    return path[path.index(dep):] + [dep]
+                if dep not in done and dep in graph:
+                    path.append(dep)
+                    stack.append(iter(graph[dep]))
+                    visiting.add(dep)
+                    break
+            else:
+                stack.pop()
+                node = path.pop()
+                visiting.discard(node)
+                done.add(node)
+    return []
+
+
+def dependency_problems(state: Dict[str, Any]) -> List[str]:
+    """
+    depends_on의 없는 ID와 순환 의존성 (문제가 없으면 빈 목록)
+
+    dependency_graph는 없는 ID를 무시하므로 오타면 의도한 순서가 사라지고,
+    순환이 있으면 그 Subtask들은 ready가 되지 않아 계획이 멈춘다.
+    """
+    tasks = state.get("tasks", {}) or {}
+    known = set(tasks)
+    owners: List[Tuple[str, Any]] = []
+    for task_id in state.get("task_order") or list(tasks):
+        if "depends_on" in (tasks.get(task_id) or {}):
+            owners.append((task_id, tasks[task_id]["depends_on"]))
+    for _, subtask_id, subtask in iter_subtasks(state):
+        known.add(subtask_id)
+        if "depends_on" in subtask:
+            owners.append((subtask_id, subtask["depends_on"]))
+
+    problems = []
+    for owner, ids in owners:
+        for ref in ids if isinstance(ids, list) else [ids]:
+            if ref is not None and str(ref) not in known:
+                problems.append(f"{owner}의 depends_on에 없는 ID: {ref}")
+    cycle = _find_cycle(dependency_graph(state))
+    if cycle:
+        problems.append(f"순환 의존성: {' → '.join(cycle)}")
+    return problems
+
+
+def ready_subtasks(state: Dict[str, Any], graph: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """시작 전이고 의존하는 Subtask가 모두 끝난 Subtask ID 목록"""
+    graph = dependency_graph(state) if graph is None else graph
+    status = {subtask_id: subtask.get("status") for _, subtask_id, subtask in iter_subtasks(state)}
+    return [
+        subtask_id for subtask_id, deps in graph.items()
+        if status.get(subtask_id) in (None, "", "pending")
+        and all(status.get(dep) == "completed" for dep in deps)
+    ]
+
+
+def in_flight_subtasks(state: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """진행 중인 (task_id, subtask_id) 목록"""
+    return [
+        (task_id, subtask_id) for task_id, subtask_id, subtask in iter_subtasks(state)
+        if subtask.get("status") == "in_progress"
+    ]
+
+
+def find_task(state: Dict[str, Any], subtask_id: str) -> Optional[str]:
+    """Subtask가 속한 Task ID"""
+    for task_id, candidate, _ in iter_subtasks(state):
+        if candidate == subtask_id:
+            return task_id
+    return None
+
+
+def critical_path_lengths(state: Dict[str, Any], estimates: Dict[str, float],
+                          graph: Optional[Dict[str, List[str]]] = None) -> Dict[str, float]:
+    """Subtask ID -> 그 Subtask부터 의존 사슬 끝까지 남은 추정 시간의 최댓값 (초)"""
+    graph = dependency_graph(state) if graph is None else graph
+    own = {subtask_id: remaining_seconds(subtask, estimates) for _, subtask_id, subtask in iter_subtasks(state)}
+    dependents: Dict[str, List[str]] = {subtask_id: [] for subtask_id in graph}
+    for subtask_id, deps in graph.items():
+        for dep in deps:
+            dependents.setdefault(dep, []).append(subtask_id)
+
+    # 의존하는 Subtask가 없는 것부터 위상 순서 (순환에 걸린 Subtask는 자기 시간만)
+    pending = {subtask_id: len(set(deps)) for subtask_id, deps in graph.items()}
+    order = [subtask_id for subtask_id, count in pending.items() if count == 0]
+    for subtask_id in order:
+        for dependent in dependents.get(subtask_id, []):
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                order.append(dependent)
+
+    lengths = {subtask_id: own.get(subtask_id, 0.0) for subtask_id in graph}
+    for subtask_id in reversed(order):
+        tail = [lengths[d] for d in dependents.get(subtask_id, []) if d in lengths]
+        lengths[subtask_id] = own.get(subtask_id, 0.0) + max(tail, default=0.0)
+    return lengths
+
+
+def critical_path(state: Dict[str, Any], lengths: Dict[str, float],
+                  graph: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """남은 추정 시간이 가장 긴 의존 사슬 (끝나지 않은 Subtask만)"""
+    graph = dependency_graph(state) if graph is None else graph
+    dependents: Dict[str, List[str]] = {}
+    for subtask_id, deps in graph.items():
+        for dep in deps:
+            dependents.setdefault(dep, []).append(subtask_id)
+
+    path: List[str] = []
+    visited = set()
+    candidates = [subtask_id for subtask_id in graph if lengths.get(subtask_id, 0.0) > 0]
+    while candidates:
+        subtask_id = max(candidates, key=lambda s: lengths[s])
+        path.append(subtask_id)
+        visited.add(subtask_id)
+        candidates = [d for d in dependents.get(subtask_id, []) if lengths.get(d, 0.0) > 0 and d not in visited]
+    return path
+
+
+def by_critical_path(subtask_ids: List[str], lengths: Dict[str, float]) -> List[str]:
+    """임계 경로가 긴 Subtask부터 (같으면 원래 순서)"""
+    return sorted(subtask_ids, key=lambda subtask_id: -lengths.get(subtask_id, 0.0))
+
+
+def progress_estimates(project_hash: str, state: Dict[str, Any]) -> Tuple[Dict[str, str], str]:
+    """
+    진행 트리에 붙일 남은 시간 표시와 요약 한 줄
+
+    Returns:
+        ({Task/Subtask ID: "~25분" (임계 경로의 Subtask는 "*" 표시)}, "예상 남은 시간 ...")
+    """
+    estimates = phase_estimates(project_hash)
+    graph = dependency_graph(state)
+    lengths = critical_path_lengths(state, estimates, graph)
+    path = critical_path(state, lengths, graph)
+    on_path = set(path)
+
+    labels: Dict[str, str] = {}
+    totals: Dict[str, float] = {}
+    for task_id, subtask_id, subtask in iter_subtasks(state):
+        remaining = remaining_seconds(subtask, estimates)
+        if remaining > 0:
+            labels[subtask_id] = format_duration(remaining) + (" *" if subtask_id in on_path else "")
+            totals[task_id] = totals.get(task_id, 0.0) + remaining
+    for task_id, total in totals.items():
+        labels[task_id] = format_duration(total)
+
+    if not path:
+        return labels, ""
+    shown = " → ".join(path[:6]) + (" → ..." if len(path) > 6 else "")
+    return labels, f"예상 남은 시간 {format_duration(lengths[path[0]])} (* 임계 경로: {shown})"
+
+
+def target_subtasks(project_hash: str, state: Dict[str, Any], file_path: str) -> List[Tuple[str, str]]:
+    """
+    Contract 저장이 전환시킬 Subtask 목록
+
+    - contracts/{요청}/{Task}/{Subtask}/...: 그 Subtask
+    - contracts/{요청}/{Task}/...: 그 Task에서 진행 중이거나 시작할 수 있는 Subtask
+    - 그 밖(경로로 알 수 없음): 현재 Subtask
+    """
+    key = contract_registry_key(project_hash, file_path)
+    parts = key.split("/") if key else []
+    tasks = state.get("tasks", {}) or {}
+
+    if len(parts) == 4 and parts[2] in (tasks.get(parts[1]) or {}).get("subtasks", {}):
+        return [(parts[1], parts[2])]
+    if len(parts) == 3 and parts[1] in tasks:
+        ready = set(ready_subtasks(state))
+        targets = [
+            (task_id, subtask_id) for task_id, subtask_id, subtask in iter_subtasks(state)
+            if task_id == parts[1] and (subtask.get("status") == "in_progress" or subtask_id in ready)
+        ]
+        if targets:
+            return targets
+
+    request = state.get("request", {})
+    task_id = request.get("current_task")
+    subtask_id = (tasks.get(task_id) or {}).get("current_subtask") if task_id else None
+    return [(task_id, subtask_id)] if subtask_id else []
+
+
+def start_subtask(session, task_id: str, subtask_id: str) -> None:
+    """Subtask와 그 Task를 진행 중으로 (이미 진행 중이거나 끝났으면 그대로)"""
+    task = session.state["tasks"][task_id]
+    if task["subtasks"][subtask_id].get("status") in (None, "", "pending"):
+        session.set(("tasks", task_id, "subtasks", subtask_id, "status"), "in_progress")
+    if task.get("status") in (None, "", "pending"):
+        session.set(("tasks", task_id, "status"), "in_progress")
+
+
+def complete_subtask(session, task_id: str, subtask_id: str) -> None:
+    """Subtask 완료 (Task의 모든 Subtask가 끝났으면 Task도 완료)"""
+    session.set_phase("complete", "subtask", task_id, subtask_id)
+    session.set(("tasks", task_id, "subtasks", subtask_id, "status"), "completed")
+    task = session.state["tasks"][task_id]
+    if all(s.get("status") == "completed" for s in task.get("subtasks", {}).values()):
+        session.set(("tasks", task_id, "status"), "completed")
+
+
+def refresh_schedule(session, focus: Optional[Tuple[str, str]] = None) -> List[str]:
+    """
+    request.ready를 다시 계산하고 현재 위치 갱신
+
+    ready는 임계 경로가 긴 Subtask부터. 현재 위치는 focus(방금 전환한 Subtask)가 끝나지
+    않았으면 focus, 끝났으면 진행 중인 Subtask → 시작할 수 있는 Subtask 중 임계 경로가
+    가장 긴 것으로 옮긴다.
+
+    Returns:
+        ready Subtask ID 목록
+    """
+    state = session.state
+    if not state:
+        return []
+    graph = dependency_graph(state)
+    lengths = critical_path_lengths(state, phase_estimates(session.project_hash), graph)
+    ready = by_critical_path(ready_subtasks(state, graph), lengths)
+    if state.get("request", {}).get("ready") != ready:
+        session.set(("request", "ready"), ready)
+    for subtask_id in ready:
+        session.mark_ready(find_task(state, subtask_id), subtask_id)
+
+    tasks = state.get("tasks", {})
+    current = focus
+    if current is None:
+        task_id = state["request"].get("current_task")
+        subtask_id = (tasks.get(task_id) or {}).get("current_subtask") if task_id else None
+        current = (task_id, subtask_id) if subtask_id else None
+    if current is not None and current[1] not in (tasks.get(current[0]) or {}).get("subtasks", {}):
+        current = None
+    if current is None or tasks[current[0]]["subtasks"][current[1]].get("status") == "completed":
+        candidates = in_flight_subtasks(state) + [(find_task(state, s), s) for s in ready]
+        if candidates:
+            current = max(candidates, key=lambda candidate: lengths.get(candidate[1], 0.0))
+    if current is not None:
+        if state["request"].get("current_task") != current[0]:
+            session.set(("request", "current_task"), current[0])
+        if tasks[current[0]].get("current_subtask") != current[1]:
+            session.set(("tasks", current[0], "current_subtask"), current[1])
+    return ready
+
+
+def import_breakdown(session, breakdown: Dict[str, Any]) -> Tuple[bool, str]:
+    """
+    task-breakdown.yaml의 Task/Subtask와 depends_on을 state에 반영
+
+    state에 없는 Task/Subtask는 pending으로 추가하고, 있는 것은 depends_on만 갱신한다.
+    계획 때 한 번이므로 state 전체를 교체해 저장한다 (sqlite 백엔드도 행 추가가 필요).
+    depends_on에 없는 ID나 순환이 있으면 반영하지 않는다 (dependency_problems).
+
+    Returns:
+        (반영 여부, 거부 사유 - 문제가 없으면 빈 문자열)
+    """
+    root = breakdown.get("task_breakdown", breakdown) if isinstance(breakdown, dict) else None
+    if not session.state or not isinstance(root, dict) or not isinstance(root.get("tasks"), list):
+        return False, ""
+
+    state = copy.deepcopy(session.state)
+    tasks = state.setdefault("tasks", {})
+    task_order = state.setdefault("task_order", [])
+    for task in root["tasks"]:
+        if not isinstance(task, dict) or not task.get("id"):
+            continue
+        task_id = str(task["id"])
+        if task_id not in tasks:
+            tasks[task_id] = {
+                "name": task.get("name", ""), "status": "pending", "current_subtask": None,
+                "subtask_order": [], "subtasks": {},
+            }
+            task_order.append(task_id)
+        existing = tasks[task_id]
+        if "depends_on" in task:
+            existing["depends_on"] = task["depends_on"]
+
+        for subtask in task.get("subtasks") or []:
+            if not isinstance(subtask, dict) or not subtask.get("id"):
+                continue
+            subtask_id = str(subtask["id"])
+            if subtask_id not in existing.setdefault("subtasks", {}):
+                existing["subtasks"][subtask_id] = {"name": subtask.get("name", ""), "status": "pending", "phase": ""}
+                existing.setdefault("subtask_order", []).append(subtask_id)
+            if "depends_on" in subtask:
+                existing["subtasks"][subtask_id]["depends_on"] = subtask["depends_on"]
+
+    problems = dependency_problems(state)
+    if problems:
+        listed = "\n".join(f"- {problem}" for problem in problems[:MAX_LISTED_SUBTASKS])
+        if len(problems) > MAX_LISTED_SUBTASKS:
+            listed += f"\n- (외 {len(problems) - MAX_LISTED_SUBTASKS}개)"
+        return False, f"task-breakdown.yaml의 의존성(depends_on)을 반영하지 않았습니다:\n{listed}"
+
+    if state == session.state:
+        return False, ""
+    session.replace_state(state)
+    return True, ""
+
+
+def dispatchable(project_hash: str, state: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    지금 병렬로 에이전트를 부를 수 있는 Subtask (임계 경로가 긴 것부터, 남은 경로 추정 포함)
+
+    시작할 수 있는 Subtask는 Task 설계(design-contract.yaml)가 이미 있으면 테스트부터.
+    """
+    registry = state.get("contracts")
+    graph = dependency_graph(state)
+    lengths = critical_path_lengths(state, phase_estimates(project_hash), graph)
+    items = []
+    for task_id, subtask_id in in_flight_subtasks(state):
+        work = get_subtask_work(state, task_id, subtask_id)
+        if work["phase"] in PHASE_ACTIONS:
+            items.append(work)
+    for subtask_id in ready_subtasks(state, graph):
+        work = get_subtask_work(state, find_task(state, subtask_id), subtask_id)
+        if not work["phase"] and contract_exists(project_hash, work, "design-contract.yaml", registry=registry):
+            work["phase"] = "test_first"
+        if work["phase"] in PHASE_ACTIONS:
+            items.append(work)
+    for work in items:
+        work["path_seconds"] = lengths.get(work["subtask_id"], 0.0)
+    return sorted(items, key=lambda work: -work["path_seconds"])
+
+
+def format_dispatch_block(project_hash: str, state: Dict[str, Any], minimum: int = 2) -> str:
+    """병렬로 진행할 수 있는 Subtask 안내 (minimum개보다 적으면 빈 문자열)"""
+    items = dispatchable(project_hash, state)
+    if len(items) < minimum:
+        return ""
+
+    lines = [f"## 병렬 진행 가능 ({len(items)}개)", ""]
+    for work in items[:MAX_LISTED_SUBTASKS]:
+        agent, action = PHASE_ACTIONS[work["phase"]]
+        lines.append(f"- {work['subtask_id']} {work['subtask_name']}: {action} → {agent} "
+                     f"(남은 경로 {format_duration(work['path_seconds'])})")
+    if len(items) > MAX_LISTED_SUBTASKS:
+        lines.append(f"- (외 {len(items) - MAX_LISTED_SUBTASKS}개)")
+    lines.extend([
+        "",
+        "서로 의존하지 않으므로 에이전트를 한 메시지에서 병렬로 호출하고 (에이전트가 부족하면 위에서부터),",
+        "각 Contract는 contracts/{요청}/{Task}/{Subtask}/ 아래에 저장하세요.",
+    ])
+    return "\n".join(lines)
@@ -0,0 +1,562 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - YAML 직렬화 계층
+
+knowledge.yaml / Contract / config를 읽고 쓰는 경로를 한 곳에 모은다.
+
+- PyYAML에 libyaml이 있으면 CSafeLoader/CSafeDumper 사용 (순수 Python 구현보다 수 배 빠름)
+- PyYAML이 없으면 표준 라이브러리만으로 된 블록 YAML 부분집합 파서/출력기 사용
+  (save_knowledge가 쓰는 형식과 사람이 손으로 고친 일반적인 블록 YAML을 지원,
+  앵커/별칭/태그/복잡한 키는 지원하지 않음)
+- 파싱 결과를 marshal 스냅샷으로 만들고 읽는 함수 (원본 YAML의 mtime/size로 검증)
+
+두 구현은 같은 스칼라 타입을 돌려준다. 날짜/시각처럼 보이는 값은 PyYAML에서도
+date/datetime이 아닌 원문 문자열로 읽고 (state/knowledge의 시각은 모두 ISO 문자열),
+60진수(1:30)는 부분집합 파서에서도 PyYAML처럼 숫자로 읽는다.
+
+이 모듈은 hooks.common에 의존하지 않는다. 파일 쓰기와 스냅샷 경로 관리는 common이 한다.
+"""
+
+import json
+import marshal
+import math
+import re
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+# 스냅샷 형식이 바뀌면 올려서 이전 스냅샷을 무효화
+SNAPSHOT_VERSION = 1
+
+HAS_LIBYAML = yaml is not None and hasattr(yaml, "CSafeLoader")
+
+
+class SerializationError(ValueError):
+    """YAML 파싱 실패 (PyYAML 유무와 관계없이 같은 예외)"""
+
+
+_TIMESTAMP_TAG = "tag:yaml.org,2002:timestamp"
+
+if yaml is not None:
+    class _Loader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+        """timestamp 암묵 해석을 뺀 SafeLoader (날짜는 문자열, 부분집합 파서와 같은 타입)"""
+
+    _Loader.yaml_implicit_resolvers = {
+        first: [(tag, regexp) for tag, regexp in resolvers if tag != _TIMESTAMP_TAG]
+        for first, resolvers in yaml.SafeLoader.yaml_implicit_resolvers.items()
+    }
+
+    class _Dumper(getattr(yaml, "CSafeDumper", yaml.SafeDumper)):
+        """같은 객체가 여러 번 나와도 &id001 앵커를 만들지 않음 (부분집합 파서 호환)"""
+
+        def ignore_aliases(self, data):
+            return True
+
+
+def get_backend() -> str:
+    """현재 사용하는 YAML 구현 ("libyaml" | "pyyaml" | "stdlib")"""
+    if yaml is None:
+        return "stdlib"
+    return "libyaml" if HAS_LIBYAML else "pyyaml"
+
+
+def yaml_loads(text: str) -> Any:
+    """YAML 텍스트 파싱. 실패 시 SerializationError"""
+    if yaml is None:
+        return _BlockParser(text).parse()
+    try:
+        return yaml.load(text, Loader=_Loader)
+    except yaml.YAMLError as e:
+        raise SerializationError(str(e)) from e
+
+
+def yaml_dumps(data: Any) -> str:
+    """블록 스타일 YAML 텍스트 (키 순서 유지, 유니코드 그대로)"""
+    if yaml is None:
+        return _dump_block(data)
+    return yaml.dump(data, Dumper=_Dumper, allow_unicode=True, default_flow_style=False, sort_keys=False)
+
+
+# =============================================================================
+# marshal 스냅샷
+# =============================================================================
+
+def dump_snapshot(signature: Tuple[int, int], data: Any) -> bytes:
+    """
+    원본 YAML의 (mtime_ns, size)와 파싱 결과를 묶은 스냅샷.
+
+    YAML이 만든 date 등 marshal이 못 다루는 값은 문자열로 바꿔 저장한다.
+    """
+    payload = {"version": SNAPSHOT_VERSION, "signature": tuple(signature), "data": data}
+    try:
+        return marshal.dumps(payload)
+    except ValueError:
+        payload["data"] = json.loads(json.dumps(data, ensure_ascii=False, default=str))
+        return marshal.dumps(payload)
+
+
+def load_snapshot(raw: bytes, signature: Tuple[int, int]) -> Tuple[bool, Any]:
+    """스냅샷이 원본과 일치하면 (True, data), 아니면 (False, None)"""
+    try:
+        payload = marshal.loads(raw)
+    except (EOFError, ValueError, TypeError):
+        return False, None
+    if (
+        not isinstance(payload, dict)
+        or payload.get("version") != SNAPSHOT_VERSION
+        or tuple(payload.get("signature", ())) != tuple(signature)
+    ):
+        return False, None
+    return True, payload.get("data")
+
+
+def get_snapshot_path(path: Path) -> Path:
+    """YAML 파일 옆 숨김 스냅샷 경로 (knowledge.yaml → .knowledge.yaml.marshal)"""
+    return path.with_name(f".{path.name}.marshal")
+
+
+# =============================================================================
+# 표준 라이브러리 블록 YAML 부분집합 (PyYAML이 없을 때)
+# =============================================================================
+
+_NULLS = {"", "~", "null", "Null", "NULL"}
+_TRUES = {"true", "True", "TRUE", "yes", "Yes", "YES", "on", "On", "ON"}
+_FALSES = {"false", "False", "FALSE", "no", "No", "NO", "off", "Off", "OFF"}
+_INT_RE = re.compile(r"^[-+]?(?:0b[01_]+|0x[0-9a-fA-F_]+|0[0-7_]+|0|[1-9][0-9_]*)$")
+_FLOAT_RE = re.compile(r"^[-+]?(?:[0-9][0-9_]*\.[0-9_]*(?:[eE][-+][0-9]+)?|\.[0-9_]+(?:[eE][-+][0-9]+)?)$")
+_SEXAGESIMAL_INT_RE = re.compile(r"^[-+]?[1-9][0-9_]*(?::[0-5]?[0-9])+$")
+_SEXAGESIMAL_FLOAT_RE = re.compile(r"^[-+]?[0-9][0-9_]*(?::[0-5]?[0-9])+\.[0-9_]*$")
+_INF_NAN = {
+    **{f"{sign}.{word}": math.inf * (-1 if sign == "-" else 1) for sign in ("", "+", "-") for word in ("inf", "Inf", "INF")},
+    **{f".{word}": math.nan for word in ("nan", "NaN", "NAN")},
+}
+_DOUBLE_ESCAPES = {
+    "0": "\0", "a": "\a", "b": "\b", "t": "\t", "\t": "\t", "n": "\n", "v": "\v", "f": "\f",
+    "r": "\r", "e": "\x1b", " ": " ", '"': '"', "/": "/", "\\": "\\", "N": "\x85", "_": "\xa0",
+    "L": "\u2028", "P": "\u2029",
+}
+_HEX_ESCAPE_LENGTHS = {"x": 2, "u": 4, "U": 8}
+_INLINE_BREAK_INDENT_RE = re.compile(r"([\x85\u2028\u2029])[ \t]+")
+
+
+def _resolve_plain(text: str) -> Any:
+    """따옴표 없는 스칼라의 타입 결정 (PyYAML SafeLoader의 bool/null/int/float 규칙)"""
+    if text in _NULLS:
+        return None
+    if text in _TRUES:
+        return True
+    if text in _FALSES:
+        return False
+    if text in _INF_NAN:
+        return _INF_NAN[text]
+    if _INT_RE.match(text):
+        digits = text.replace("_", "")
+        sign = -1 if digits[0] == "-" else 1
+        digits = digits.lstrip("+-")
+        if digits.startswith("0b"):
+            return sign * int(digits[2:], 2)
+        if digits.startswith("0x"):
+            return sign * int(digits[2:], 16)
+        if len(digits) > 1 and digits.startswith("0"):
+            return sign * int(digits, 8)
+        return sign * int(digits)
+    if _FLOAT_RE.match(text):
+        return float(text.replace("_", ""))
+    if _SEXAGESIMAL_INT_RE.match(text) or _SEXAGESIMAL_FLOAT_RE.match(text):
+        return _resolve_sexagesimal(text)
+    return text
+
+
+def _resolve_sexagesimal(text: str) -> Any:
+    """60진수 스칼라 (YAML 1.1: 1:30 → 90, 1:30.5 → 90.5)"""
+    digits = text.replace("_", "")
+    sign = -1 if digits[0] == "-" else 1
+    convert = float if "." in digits else int
+    value = 0
+    for part in digits.lstrip("+-").split(":"):
+        value = value * 60 + convert(part)
+    return sign * value
+
+
+def _unescape_double(body: str) -> str:
+    out = []
+    i = 0
+    while i < len(body):
+        char = body[i]
+        if char != "\\":
+            out.append(char)
+            i += 1
+            continue
+        code = body[i + 1:i + 2]
+        if code in _HEX_ESCAPE_LENGTHS:
+            length = _HEX_ESCAPE_LENGTHS[code]
+            digits = body[i + 2:i + 2 + length]
+            try:
+                out.append(chr(int(digits, 16)))
+            except ValueError:
+                raise SerializationError(f"invalid escape: \\{code}{digits}")
+            i += 2 + length
+        elif code in _DOUBLE_ESCAPES:
+            out.append(_DOUBLE_ESCAPES[code])
+            i += 2
+        else:
+            raise SerializationError(f"invalid escape: \\{code}")
+    return "".join(out)
+
+
+def _scan_quoted(text: str, start: int) -> Tuple[str, int]:
+    """text[start]의 따옴표로 시작하는 스칼라 → (값, 닫는 따옴표 다음 위치)"""
+    quote = text[start]
+    i = start + 1
+    if quote == "'":
+        parts = []
+        while True:
+            end = text.find("'", i)
+            if end < 0:
+                raise SerializationError("unterminated single-quoted scalar")
+            parts.append(text[i:end])
+            if text[end + 1:end + 2] == "'":
+                parts.append("'")
+                i = end + 2
+                continue
+            return "".join(parts), end + 1
+    while i < len(text):
+        if text[i] == "\\":
+            i += 2
+        elif text[i] == '"':
+            return _unescape_double(text[start + 1:i]), i + 1
+        else:
+            i += 1
+    raise SerializationError("unterminated double-quoted scalar")
+
+
+def _fold(lines: List[str], escaped_breaks: bool = False) -> str:
+    """
+    여러 줄에 걸친 스칼라 접기 (줄바꿈 하나는 공백, 빈 줄은 줄바꿈).
+
+    escaped_breaks=True(double-quoted)면 '\\'로 끝나는 줄은 공백 없이 이어 붙인다.
+    """
+    out = ""
+    pending_breaks = 0
+    for line in lines:
+        if not line:
+            pending_breaks += 1
+            continue
+        if out and escaped_breaks and not pending_breaks and (len(out) - len(out.rstrip("\\"))) % 2:
+            out = out[:-1]
+        elif out:
+            out += "\n" * pending_breaks if pending_breaks else " "
+        out += line
+        pending_breaks = 0
+    return out
+
+
+def _strip_comment(text: str) -> str:
+    """따옴표 없는 값 뒤의 ' #...' 주석 제거"""
+    index = text.find(" #")
+    return text[:index].rstrip(" \t") if index >= 0 else text
+
+
+def _parse_flow(text: str, i: int = 0) -> Tuple[Any, int]:
+    """한 줄짜리 flow 컬렉션/스칼라 ([a, b], {k: v}) → (값, 다음 위치)"""
+    while i < len(text) and text[i] == " ":
+        i += 1
+    if i >= len(text):
+        raise SerializationError("unexpected end of flow collection")
+
+    if text[i] in "[{":
+        closing = "]" if text[i] == "[" else "}"
+        result: Any = [] if closing == "]" else {}
+        i += 1
+        while True:
+            while i < len(text) and text[i] == " ":
+                i += 1
+            if text[i:i + 1] == closing:
+                return result, i + 1
+            item, i = _parse_flow(text, i)
+            if closing == "}":
+                while i < len(text) and text[i] == " ":
+                    i += 1
+                value = None
+                if text[i:i + 1] == ":":
+                    value, i = _parse_flow(text, i + 1) if text[i + 1:i + 2] not in (",", "}") else (None, i + 1)
+                result[item] = value
+            else:
+                result.append(item)
+            while i < len(text) and text[i] == " ":
+                i += 1
+            if text[i:i + 1] == ",":
+                i += 1
+            elif text[i:i + 1] != closing:
+                raise SerializationError(f"unexpected character in flow collection: {text[i:i + 1]!r}")
+
+    if text[i] in "'\"":
+        return _scan_quoted(text, i)
+
+    end = i
+    while end < len(text) and text[end] not in ",]}" and not (text[end] == ":" and text[end + 1:end + 2] in (" ", "", ",", "}")):
+        end += 1
+    return _resolve_plain(text[i:end].strip(" \t")), end
+
+
+class _BlockParser:
+    """들여쓰기 기반 블록 매핑/시퀀스 + 스칼라 파서"""
+
+    def __init__(self, text: str):
+        self.lines: List[Tuple[int, str]] = []
+        # str.splitlines()는 \u2028 등도 줄바꿈으로 보지만 PyYAML은 따옴표 안에 그대로 씀
+        for raw in text.replace("\r\n", "\n").split("\n"):
+            stripped = raw.strip(" \t\r")
+            if stripped in ("---", "...") or stripped.startswith("%"):
+                continue
+            if "\t" in raw[:len(raw) - len(raw.lstrip())]:
+                raise SerializationError("tabs are not allowed in indentation")
+            self.lines.append((len(raw) - len(raw.lstrip(" ")), stripped))
+        self.i = 0
+
+    def _skip_blank(self) -> None:
+        """빈 줄과 주석 줄 건너뛰기 (따옴표/블록 스칼라 안의 '#' 줄은 여기를 거치지 않음)"""
+        while self.i < len(self.lines) and (not self.lines[self.i][1] or self.lines[self.i][1][0] == "#"):
+            self.i += 1
+
+    def _peek(self) -> Optional[Tuple[int, str]]:
+        self._skip_blank()
+        return self.lines[self.i] if self.i < len(self.lines) else None
+
+    def parse(self) -> Any:
+        line = self._peek()
+        if line is None:
+            return None
+        value = self._block(line[0])
+        if self._peek() is not None:
+            raise SerializationError(f"unexpected content at line {self.i + 1}")
+        return value
+
+    def _block(self, indent: int) -> Any:
+        indent_, text = self._peek()
+        if text == "-" or text.startswith("- "):
+            return self._sequence(indent_)
+        if self._split_key(text) is not None:
+            return self._mapping(indent_)
+        # 최상위/중첩된 단독 스칼라
+        self.i += 1
+        return self._scalar(text, indent - 1)
+
+    def _sequence(self, indent: int) -> List[Any]:
+        items = []
+        while True:
+            line = self._peek()
+            if line is None or line[0] != indent or not (line[1] == "-" or line[1].startswith("- ")):
+                return items
+            rest = line[1][1:].lstrip(" ")
+            if not rest or rest[0] == "#":
+                self.i += 1
+                items.append(self._nested(indent, allow_indentless=False))
+                continue
+            # "- key: value" / "- - x": 같은 줄의 나머지를 더 깊은 들여쓰기의 새 줄로 취급
+            self.lines[self.i] = (indent + len(line[1]) - len(rest), rest)
+            if rest == "-" or rest.startswith("- ") or self._split_key(rest) is not None:
+                items.append(self._block(self.lines[self.i][0]))
+            else:
+                self.i += 1
+                items.append(self._scalar(rest, indent))
+
+    def _mapping(self, indent: int) -> dict:
+        result = {}
+        while True:
+            line = self._peek()
+            if line is None or line[0] != indent or line[1] == "-" or line[1].startswith("- "):
+                return result
+            split = self._split_key(line[1])
+            if split is None:
+                raise SerializationError(f"expected a mapping key at line {self.i + 1}")
+            key, rest = split
+            self.i += 1
+            if rest and rest[0] != "#":
+                result[key] = self._scalar(rest, indent)
+            else:
+                result[key] = self._nested(indent, allow_indentless=True)
+
+    def _nested(self, indent: int, allow_indentless: bool) -> Any:
+        """'key:' 또는 '-' 다음 줄부터의 값 (없으면 None)"""
+        line = self._peek()
+        if line is None:
+            return None
+        if line[0] > indent:
+            return self._block(line[0])
+        # PyYAML은 매핑 값인 시퀀스를 키와 같은 들여쓰기로 출력함
+        if allow_indentless and line[0] == indent and (line[1] == "-" or line[1].startswith("- ")):
+            return self._sequence(indent)
+        return None
+
+    @staticmethod
+    def _split_key(text: str) -> Optional[Tuple[Any, str]]:
+        """'key: value' → (key, value 텍스트). 매핑 줄이 아니면 None"""
+        if text[0] in "'\"":
+            try:
+                key, end = _scan_quoted(text, 0)
+            except SerializationError:
+                return None
+            if text[end:end + 1] != ":" or text[end + 1:end + 2] not in ("", " "):
+                return None
+            return key, text[end + 1:].strip(" \t")
+        if text[0] in "[{":
+            return None
+        match = re.search(r":(?: |$)", text)
+        if match is None:
+            return None
+        key = text[:match.start()].rstrip(" \t")
+        if "#" in key and re.search(r"\s#", key):
+            return None
+        return _resolve_plain(key), text[match.end():].strip(" \t")
+
+    def _continuation(self, indent: int, quoted: bool = False) -> List[str]:
+        """indent보다 깊게 들여쓴 이어지는 줄들 (빈 줄 포함, 따옴표 밖이면 주석 줄에서 끝)"""
+        lines = []
+        while self.i < len(self.lines):
+            line_indent, text = self.lines[self.i]
+            if text and (line_indent <= indent or (not quoted and text[0] == "#")):
+                break
+            lines.append((line_indent, text))
+            self.i += 1
+        # 끝의 빈 줄은 다음 블록 몫
+        while lines and not lines[-1][1]:
+            lines.pop()
+            self.i -= 1
+        return lines
+
+    def _scalar(self, text: str, indent: int) -> Any:
+        if text[0] in "|>":
+            return self._block_scalar(text, indent)
+        if text[0] in "&*!":
+            raise SerializationError("anchors, aliases and tags are not supported")
+
+        if text[0] in "'\"":
+            joined = _fold([text] + [t for _, t in self._continuation(indent, quoted=True)], escaped_breaks=text[0] == '"')
+            # 따옴표 안의 \u2028 등도 YAML에서는 줄바꿈이라 PyYAML이 그 뒤를 들여씀
+            joined = _INLINE_BREAK_INDENT_RE.sub(r"\1", joined)
+            value, end = _scan_quoted(joined, 0)
+            if _strip_comment(joined[end:]).strip(" \t"):
+                raise SerializationError(f"unexpected text after quoted scalar near line {self.i}")
+            return value
+        if text[0] in "[{":
+            joined = _fold([text] + [t for _, t in self._continuation(indent)])
+            value, end = _parse_flow(_strip_comment(joined))
+            if _strip_comment(joined)[end:].strip(" \t"):
+                raise SerializationError(f"unexpected text after flow collection near line {self.i}")
+            return value
+
+        if text == "-" or text.startswith("- "):
+            raise SerializationError(f"sequence entries are not allowed here near line {self.i}")
+        parts = [_strip_comment(text)] + [_strip_comment(t) for _, t in self._continuation(indent)]
+        for part in parts:
+            # PyYAML처럼 따옴표 없는 값 안의 ': '(줄 끝의 ':')는 매핑 표시로 보고 거부
+            if ": " in part or part.endswith(":"):
+                raise SerializationError(f"mapping values are not allowed here near line {self.i}")
+        if len(parts) > 1:
+            return _fold(parts)
+        return _resolve_plain(parts[0])
+
+    def _block_scalar(self, header: str, indent: int) -> str:
+        """| (줄바꿈 유지) / > (접기) 블록 스칼라"""
+        header = _strip_comment(header)
+        chomp = "+" if "+" in header else "-" if "-" in header else ""
+        lines = []
+        while self.i < len(self.lines):
+            line_indent, text = self.lines[self.i]
+            if text and line_indent <= indent:
+                break
+            lines.append((line_indent, text))
+            self.i += 1
+        trailing = 0
+        while lines and not lines[-1][1]:
+            lines.pop()
+            trailing += 1
+        if not lines:
+            return ""
+        base = min(line_indent for line_indent, text in lines if text)
+        body = [(" " * (line_indent - base) + text) if text else "" for line_indent, text in lines]
+        value = "\n".join(body) if header[0] == "|" else _fold(body)
+        if chomp == "-":
+            return value
+        if chomp == "+":
+            return value + "\n" * (trailing + 1)
+        return value + "\n"
+
+
+_PLAIN_SAFE_RE = re.compile(r"^[^\s\-?:,\[\]{}#&*!|>'\"%@`][^\n]*(?<!\s)$")
+_PLAIN_UNSAFE_RE = re.compile(r": |:$| #|[\x00-\x1f\x7f\x85\u2028\u2029\ufeff]")
+_YAML_BREAKS_RE = re.compile(r"[\x7f-\x9f\u2028\u2029\ufeff]")
+
+
+def _dump_scalar(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ".nan"
+        if math.isinf(value):
+            return ".inf" if value > 0 else "-.inf"
+        return repr(value)
+    text = value if isinstance(value, str) else str(value)
+    # 숫자/날짜처럼 보이는 문자열은 PyYAML이 다른 타입으로 읽을 수 있으므로 항상 따옴표
+    if (
+        _PLAIN_SAFE_RE.match(text)
+        and not _PLAIN_UNSAFE_RE.search(text)
+        and not text[0].isdigit() and text[0] not in "+.=<"
+        and _resolve_plain(text) == text
+    ):
+        return text
+    # JSON 문자열은 YAML double-quoted 스칼라로도 유효함 (JSON이 그대로 두는 YAML 줄바꿈 문자만 이스케이프)
+    return _YAML_BREAKS_RE.sub(lambda m: f"\\u{ord(m.group()):04x}", json.dumps(text, ensure_ascii=False))
+
+
+def _dump_collection(value: Any, indent: int) -> List[str]:
+    """비어 있지 않은 dict/list를 indent 칸 들여쓴 블록 줄들로 (PyYAML 출력과 같은 모양)"""
+    pad = " " * indent
+    lines = []
+    if isinstance(value, dict):
+        for key, item in value.items():
+            head = f"{pad}{_dump_scalar(key)}:"
+            if isinstance(item, dict) and item:
+                lines.append(head)
+                lines.extend(_dump_collection(item, indent + 2))
+            elif isinstance(item, list) and item:
+                # 매핑 값인 시퀀스는 키와 같은 들여쓰기
+                lines.append(head)
+                lines.extend(_dump_collection(item, indent))
+            else:
+                lines.append(f"{head} {_dump_inline(item)}")
+        return lines
+
+    for item in value:
+        if isinstance(item, (dict, list)) and item:
+            nested = _dump_collection(item, indent + 2)
+            lines.append(f"{pad}- {nested[0][indent + 2:]}")
+            lines.extend(nested[1:])
+        else:
+            lines.append(f"{pad}- {_dump_inline(item)}")
+    return lines
+
+
+def _dump_inline(value: Any) -> str:
+    if isinstance(value, dict):
+        return "{}"
+    if isinstance(value, list):
+        return "[]"
+    return _dump_scalar(value)
+
+
+def _dump_block(data: Any) -> str:
+    if isinstance(data, (dict, list)) and data:
+        return "\n".join(_dump_collection(data, 0)) + "\n"
+    return _dump_inline(data) + "\n"
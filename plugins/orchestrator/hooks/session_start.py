@@ -5,11 +5,15 @@ SessionStart Hook - 세션 시작 시 오케스트레이션 세션 관리
 Claude 세션이 시작될 때 실행되어:
 1. 기존 미완료 세션이 있으면 → 이어서 작업할지 선택 안내
 2. 기존 세션이 없거나 완료 상태 → 새 세션 시작 준비
+   (현재 요청 외에 진행 중인 요청이 있으면 함께 안내)
+3. /orchestrator learn을 한 적이 있으면 바뀐 파일만 다시 학습
+4. Claude Code 세션을 프로젝트의 세션 레지스트리에 등록하고 TTL이 지난 세션 정리
 """
 
 import sys
 import os
 import uuid
+from pathlib import Path
 
 # hooks 패키지 경로 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -21,20 +25,27 @@ from hooks.common import (
     get_project_hash,
     load_state,
     load_knowledge,
+    compact_knowledge,
     count_pending_subtasks,
     count_pending_tasks,
     get_current_work,
     format_progress_tree,
     format_knowledge_summary,
     initialize_session,
-    save_current_session_id,
+    register_session,
 )
+from hooks.injection import remove_injection_records
+from hooks.learn import refresh_learned_patterns
+from hooks.request_index import format_active_requests, load_index
+from hooks.scheduler import progress_estimates
+from hooks.stats import instrument_hook
 
 
-def generate_recovery_message(state: dict, current_work: dict, knowledge: dict) -> str:
+def generate_recovery_message(state: dict, current_work: dict, knowledge: dict, project_hash: str = "") -> str:
     """기존 세션 복구 안내 메시지 생성"""
     pending_subtasks = count_pending_subtasks(state)
     pending_tasks = count_pending_tasks(state)
+    estimates, remaining = progress_estimates(project_hash, state) if project_hash else ({}, "")
 
     lines = [
         "[Orchestrator Session Found]",
@@ -57,8 +68,10 @@ def generate_recovery_message(state: dict, current_work: dict, knowledge: dict)
         f"남은 Subtasks: {pending_subtasks}",
         "",
         "Progress:",
-        format_progress_tree(state),
+        format_progress_tree(state, estimates=estimates),
     ])
+    if remaining:
+        lines.append(remaining)
 
     # knowledge 정보 추가
     if knowledge:
@@ -95,19 +108,36 @@ def generate_new_session_message() -> str:
     return "\n".join(lines)
 
 
+@instrument_hook("session_start")
 def main():
     """SessionStart Hook 메인 함수"""
     # stdin에서 입력 읽기 (프로토콜 준수)
     input_data = read_stdin_json()
 
-    # 새 Claude Code 세션 ID 생성 및 저장
-    session_id = str(uuid.uuid4())[:8]
-    save_current_session_id(session_id)
-
     project_hash = get_project_hash()
 
-    # 1. state.json 확인
+    # Claude Code 세션 등록 (입력의 session_id, 없으면 새로 만듦) + 끝난 세션 정리
+    session_id = input_data.get("session_id") or str(uuid.uuid4())[:8]
+    expired = register_session(project_hash, session_id, input_data.get("source", ""))
+    if expired:
+        remove_injection_records(project_hash, expired)
+
+    # 0. 지난 세션에서 쌓인 knowledge delta를 합치고, learn한 프로젝트면 바뀐 파일만 다시 학습
+    compact_knowledge(project_hash)
+    try:
+        learned = refresh_learned_patterns(Path.cwd(), project_hash)
+    except Exception:
+        learned = None
+    if learned and (learned["added"] or learned["retracted"]):
+        log_orchestrator(
+            f"Knowledge refreshed: +{len(learned['added'])} -{len(learned['retracted'])} "
+            f"({learned['scanned']} files rescanned)"
+        )
+
+    # 1. 현재 요청의 state 확인 (요청 인덱스로 찾음)
     state = load_state(project_hash)
+    index = load_index(project_hash)
+    others = format_active_requests(index, exclude=index.get("current"))
 
     # 2. 기존 세션 상태 판단
     if state:
@@ -122,13 +152,17 @@ def main():
                 # 미완료 작업이 있는 세션 → 복구 안내
                 current_work = get_current_work(state)
                 knowledge = load_knowledge(project_hash)
-                message = generate_recovery_message(state, current_work, knowledge)
+                message = generate_recovery_message(state, current_work, knowledge, project_hash)
+                if others:
+                    message = f"{message.rstrip()}\n\n{others}"
                 log_orchestrator(f"Session found: {pending_subtasks} subtasks remaining")
                 output_result(message, hook_event="SessionStart")
                 return
 
     # 3. 기존 세션 없거나 완료 상태 → 새 세션 준비 안내
     message = generate_new_session_message()
+    if others:
+        message = f"{message.rstrip()}\n\n{others}"
     log_orchestrator("Ready")
     output_result(message, hook_event="SessionStart")
 
@@ -0,0 +1,782 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - 세션 상태 저장소
+
+state의 저장 방식을 config의 `state.backend`로 선택한다.
+저장소는 요청 하나에 묶이고, 요청 ID는 요청 인덱스가 정한다 (hooks/request_index.py).
+
+- json: 요청마다 requests/{id}/state.json 하나에 전체 문서를 저장 (기본값)
+- sqlite: 프로젝트의 state.db(WAL 모드)에 request/task/subtask를 행 단위로 저장하고,
+  phase 변경 같은 단일 필드 갱신은 해당 행만 고쳐 쓴다
+
+sqlite 백엔드는 요청의 state.json과 양방향으로 동기화된다.
+- Stop/PreCompact 시점에 변경분이 있으면 state.json으로 내보냄 (sync_json)
+- 다른 도구가 state.json을 고쳤으면 다음 로드 때 가져옴
+
+훅 안에서는 StateSession으로 state/knowledge를 한 번만 읽고 한 번만 저장한다.
+병렬 서브에이전트의 훅이 같은 요청을 동시에 고칠 수 있으므로 json 백엔드는
+state.json 쓰기를 파일 잠금(hooks/locking.py)으로 감싸고, 로드 이후 다른 프로세스가
+썼으면 최신 state에 바뀐 필드만 다시 적용한다 (낙관적 버전 확인).
+sqlite 백엔드는 BEGIN IMMEDIATE 트랜잭션이 같은 역할을 한다.
+
+명령줄에서 직접 내보내기/가져오기:
+    python3 hooks/state_store.py export [--request R1] [--path PATH]
+    python3 hooks/state_store.py import [--request R1] [--path PATH]
+"""
+
+import json
+import marshal
+import os
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# hooks 패키지 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hooks.common import (
+    append_knowledge_deltas,
+    apply_knowledge_delta,
+    atomic_write_text,
+    create_initial_knowledge,
+    get_current_work,
+    get_project_hash,
+    get_sessions_path,
+    get_state_store,
+    get_timestamp,
+    load_knowledge,
+    memo_load,
+    memo_store,
+    _file_signature,
+    _memo_bytes,
+)
+from hooks.durations import parse_timestamp, phase_name, record_phase_durations
+from hooks.locking import file_lock
+from hooks.request_index import current_request_id, get_request_path, sync_request
+from hooks.serializer import SerializationError, yaml_loads
+from hooks.stats import timed
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS requests (
+    request_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    request_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (request_id, task_id)
+);
+CREATE TABLE IF NOT EXISTS subtasks (
+    request_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    subtask_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (request_id, task_id, subtask_id)
+);
+"""
+
+
+def _dumps(data: Any) -> str:
+    """행 비교가 가능하도록 항상 같은 형태로 직렬화"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _get_path(data: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _set_path(data: Dict[str, Any], path: Tuple[str, ...], value: Any) -> bool:
+    for key in path[:-1]:
+        child = data.get(key)
+        if not isinstance(child, dict):
+            return False
+        data = child
+    data[path[-1]] = value
+    return True
+
+
+def write_state_json(state_path: Path, state: Dict[str, Any]) -> os.stat_result:
+    """state.json 원자적 저장. 쓴 파일의 stat 반환 (memo_store용)"""
+    return atomic_write_text(state_path, json.dumps(state, ensure_ascii=False, indent=2))
+
+
+class JsonStateStore:
+    """요청의 state.json 전체를 읽고 쓰는 기본 저장소"""
+
+    backend = "json"
+
+    def __init__(self, request_path: Optional[Path]):
+        self.state_path = request_path / "state.json" if request_path else None
+
+    @timed("state")
+    def load(self) -> Optional[Dict[str, Any]]:
+        if self.state_path is None:
+            return None
+        try:
+            return memo_load(self.state_path, json.loads)
+        except (json.JSONDecodeError, IOError):
+            return None
+
+    def _read_disk(self) -> Optional[Dict[str, Any]]:
+        """디스크의 state (메모를 거치지 않음, 잠금 안에서 최신 내용 확인용)"""
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, IOError):
+            return None
+        memo_store(self.state_path, state)
+        return state
+
+    def version(self) -> Optional[Tuple[int, int, int]]:
+        """
+        state.json 버전 토큰 (inode, mtime_ns, size)
+
+        state.json은 항상 새 파일을 rename해 쓰므로 누가 쓰면 inode가 바뀐다.
+        """
+        if self.state_path is None:
+            return None
+        try:
+            stat = os.stat(self.state_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    @timed("state")
+    def save(self, state: Dict[str, Any]) -> bool:
+        if self.state_path is None:
+            return False
+        try:
+            with file_lock(self.state_path):
+                written = write_state_json(self.state_path, state)
+            memo_store(self.state_path, state, written)
+            return True
+        except IOError:
+            return False
+
+    @timed("state")
+    def save_changes(
+        self,
+        state: Dict[str, Any],
+        changes: Dict[Tuple[str, ...], Any],
+        loaded_version: Optional[Tuple[int, int, int]],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        로드한 state에 changes를 적용한 결과 저장 (StateSession.commit)
+
+        로드 이후 state.json이 그대로면 메모리의 state를 그대로 쓰고,
+        다른 프로세스가 썼으면 디스크의 최신 state에 changes만 다시 적용해 쓴다.
+
+        Returns:
+            저장한 state (실패 시 None)
+        """
+        if self.state_path is None:
+            return None
+        try:
+            with file_lock(self.state_path):
+                if loaded_version is None or self.version() != loaded_version:
+                    state = self._read_disk()
+                    if not state or not all(_set_path(state, path, value) for path, value in changes.items()):
+                        return None
+                written = write_state_json(self.state_path, state)
+            memo_store(self.state_path, state, written)
+            return state
+        except IOError:
+            return None
+
+    @timed("state")
+    def get(self, path: Tuple[str, ...]) -> Any:
+        """state 안의 값 하나 조회 (예: ("request", "current_task"))"""
+        return _get_path(self.load(), path)
+
+    @timed("state")
+    def update(self, path: Tuple[str, ...], value: Any) -> bool:
+        """state 안의 값 하나 갱신"""
+        return self.update_many({path: value})
+
+    @timed("state")
+    def update_many(self, updates: Dict[Tuple[str, ...], Any]) -> bool:
+        """state 안의 값 여러 개를 한 번의 저장으로 갱신 (잠금 안에서 최신 state에 적용)"""
+        return self.save_changes({}, updates, None) is not None
+
+    @timed("state")
+    def sync_json(self) -> bool:
+        """state.json이 곧 원본이므로 동기화할 것이 없음"""
+        return True
+
+
+# 상주 데몬에서는 db 연결을 재사용
+_CONNECTIONS: Dict[str, sqlite3.Connection] = {}
+
+# 조립한 요청 문서 메모: (db 경로, 요청 ID) -> (연결, (data_version, total_changes), marshal 바이트)
+# data_version은 다른 연결의 커밋에, total_changes는 같은 연결의 쓰기에 바뀐다
+_DOCUMENTS: Dict[Tuple[str, str], Tuple[sqlite3.Connection, Tuple[int, int], bytes]] = {}
+
+
+class SqliteStateStore:
+    """
+    request/task/subtask를 행 단위로 저장하는 SQLite 저장소
+
+    - requests.data: tasks를 제외한 state 문서 (version, request, task_order 등)
+    - tasks.data: subtasks를 제외한 task 객체
+    - subtasks.data: subtask 객체
+    position 컬럼으로 JSON 객체의 키 순서를 보존한다.
+    db는 프로젝트에 하나이고 저장소는 그중 한 요청의 행을 다룬다.
+    revision 등 동기화 메타는 요청별로 둔다.
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, sessions_path: Path, request_id: Optional[str], request_path: Optional[Path]):
+        self.db_path = sessions_path / "state.db"
+        self.request_id = request_id
+        self.state_path = request_path / "state.json" if request_path else None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        key = str(self.db_path)
+        conn = _CONNECTIONS.get(key)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # 트랜잭션은 직접 관리 (BEGIN IMMEDIATE)
+            conn = sqlite3.connect(key, isolation_level=None, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SQLITE_SCHEMA)
+            _CONNECTIONS[key] = conn
+        return conn
+
+    # -------------------------------------------------------------------------
+    # meta
+    # -------------------------------------------------------------------------
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (f"{key}:{self.request_id}",)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: Optional[str]) -> None:
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (f"{key}:{self.request_id}", value),
+        )
+
+    def _bump_revision(self) -> None:
+        revision = int(self._meta("revision") or 0) + 1
+        self._set_meta("revision", str(revision))
+
+    # -------------------------------------------------------------------------
+    # state.json 동기화
+    # -------------------------------------------------------------------------
+
+    def _json_signature(self) -> Optional[str]:
+        if self.state_path is None:
+            return None
+        signature = _file_signature(self.state_path)
+        return f"{signature[0]}:{signature[1]}" if signature else None
+
+    def _import_if_changed(self) -> None:
+        """마지막 동기화 이후 state.json이 바뀌었으면 가져오기"""
+        signature = self._json_signature()
+        if signature is None or signature == self._meta("json_signature"):
+            return
+        self.import_json()
+
+    def import_json(self, path: Optional[Path] = None) -> bool:
+        """state.json 형식 문서를 db로 가져오기"""
+        source = path or self.state_path
+        if source is None:
+            return False
+        try:
+            state = json.loads(source.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, IOError):
+            return False
+        if not isinstance(state, dict):
+            return False
+
+        if not self._write(state):
+            return False
+        if source == self.state_path:
+            # 방금 가져온 파일은 db와 같으므로 내보낼 필요 없음
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._set_meta("json_signature", self._json_signature())
+            self._set_meta("exported_revision", self._meta("revision"))
+            self.conn.execute("COMMIT")
+        return True
+
+    def export_json(self, path: Optional[Path] = None) -> bool:
+        """db 내용을 state.json 형식으로 내보내기"""
+        target = path or self.state_path
+        state = self._read()
+        if state is None or target is None:
+            return False
+        try:
+            written = write_state_json(target, state)
+        except IOError:
+            return False
+
+        if target == self.state_path:
+            memo_store(self.state_path, state, written)
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._set_meta("json_signature", self._json_signature())
+            self._set_meta("exported_revision", self._meta("revision"))
+            self.conn.execute("COMMIT")
+        return True
+
+    @timed("state")
+    def sync_json(self) -> bool:
+        """마지막 내보내기 이후 변경이 있을 때만 state.json 갱신"""
+        if self._meta("revision") == self._meta("exported_revision"):
+            return True
+        return self.export_json()
+
+    # -------------------------------------------------------------------------
+    # 문서 단위 읽기/쓰기
+    # -------------------------------------------------------------------------
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        """요청 문서 (db가 그대로면 메모에서, 바뀌었으면 행을 읽어 다시 조립)"""
+        request_id = self.request_id
+        if request_id is None:
+            return None
+
+        conn = self.conn
+        key = (str(self.db_path), request_id)
+        token = (conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes)
+        cached = _DOCUMENTS.get(key)
+        if cached and cached[0] is conn and cached[1] == token:
+            return marshal.loads(cached[2])
+
+        state = self._read_rows()
+        if state is None:
+            _DOCUMENTS.pop(key, None)
+        else:
+            _DOCUMENTS[key] = (conn, token, _memo_bytes(state))
+        return state
+
+    def _read_rows(self) -> Optional[Dict[str, Any]]:
+        """request/task/subtask 행을 읽어 문서로 조립"""
+        request_id = self.request_id
+        row = self.conn.execute(
+            "SELECT data FROM requests WHERE request_id = ?", (request_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        state = json.loads(row[0])
+
+        tasks: Dict[str, Dict[str, Any]] = {}
+        for task_id, data in self.conn.execute(
+            "SELECT task_id, data FROM tasks WHERE request_id = ? ORDER BY position",
+            (request_id,),
+        ):
+            task = json.loads(data)
+            task["subtasks"] = {}
+            tasks[task_id] = task
+
+        for task_id, subtask_id, data in self.conn.execute(
+            "SELECT task_id, subtask_id, data FROM subtasks WHERE request_id = ? ORDER BY task_id, position",
+            (request_id,),
+        ):
+            if task_id in tasks:
+                tasks[task_id]["subtasks"][subtask_id] = json.loads(data)
+
+        state["tasks"] = tasks
+        return state
+
+    def _write(self, state: Dict[str, Any]) -> bool:
+        """문서를 행으로 나눠 바뀐 행만 upsert, 사라진 행은 삭제"""
+        request_id = self.request_id
+        if request_id is None or str(state.get("request", {}).get("id") or request_id) != request_id:
+            # 다른 요청의 문서는 그 요청의 저장소로 (get_state_store(project_hash, request_id))
+            return False
+
+        document = {key: value for key, value in state.items() if key != "tasks"}
+        task_rows: Dict[str, Tuple[int, str]] = {}
+        subtask_rows: Dict[Tuple[str, str], Tuple[int, str]] = {}
+        for position, (task_id, task) in enumerate((state.get("tasks") or {}).items()):
+            task = dict(task or {})
+            subtasks = task.pop("subtasks", None) or {}
+            task_rows[task_id] = (position, _dumps(task))
+            for sub_position, (subtask_id, subtask) in enumerate(subtasks.items()):
+                subtask_rows[(task_id, subtask_id)] = (sub_position, _dumps(subtask or {}))
+
+        conn = self.conn
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+
+            conn.execute(
+                "INSERT INTO requests (request_id, data) VALUES (?, ?) "
+                "ON CONFLICT(request_id) DO UPDATE SET data = excluded.data "
+                "WHERE requests.data != excluded.data",
+                (request_id, _dumps(document)),
+            )
+
+            existing_tasks = {
+                task_id: (position, data)
+                for task_id, position, data in conn.execute(
+                    "SELECT task_id, position, data FROM tasks WHERE request_id = ?", (request_id,)
+                )
+            }
+            conn.executemany(
+                "INSERT OR REPLACE INTO tasks (request_id, task_id, position, data) VALUES (?, ?, ?, ?)",
+                [
+                    (request_id, task_id, position, data)
+                    for task_id, (position, data) in task_rows.items()
+                    if existing_tasks.get(task_id) != (position, data)
+                ],
+            )
+            conn.executemany(
+                "DELETE FROM tasks WHERE request_id = ? AND task_id = ?",
+                [(request_id, task_id) for task_id in existing_tasks if task_id not in task_rows],
+            )
+
+            existing_subtasks = {
+                (task_id, subtask_id): (position, data)
+                for task_id, subtask_id, position, data in conn.execute(
+                    "SELECT task_id, subtask_id, position, data FROM subtasks WHERE request_id = ?",
+                    (request_id,),
+                )
+            }
+            conn.executemany(
+                "INSERT OR REPLACE INTO subtasks (request_id, task_id, subtask_id, position, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (request_id, task_id, subtask_id, position, data)
+                    for (task_id, subtask_id), (position, data) in subtask_rows.items()
+                    if existing_subtasks.get((task_id, subtask_id)) != (position, data)
+                ],
+            )
+            conn.executemany(
+                "DELETE FROM subtasks WHERE request_id = ? AND task_id = ? AND subtask_id = ?",
+                [(request_id, *key) for key in existing_subtasks if key not in subtask_rows],
+            )
+
+            self._bump_revision()
+            conn.execute("COMMIT")
+            return True
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return False
+
+    # -------------------------------------------------------------------------
+    # 저장소 인터페이스
+    # -------------------------------------------------------------------------
+
+    @timed("state")
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            self._import_if_changed()
+            return self._read()
+        except sqlite3.Error:
+            return None
+
+    @timed("state")
+    def save(self, state: Dict[str, Any]) -> bool:
+        try:
+            return self._write(state)
+        except sqlite3.Error:
+            return False
+
+    def _locate(self, path: Tuple[str, ...]) -> Tuple[str, tuple, Tuple[str, ...]]:
+        """state 경로를 (테이블, 키, 행 안의 경로)로 변환"""
+        request_id = self.request_id
+        if len(path) >= 5 and path[0] == "tasks" and path[2] == "subtasks":
+            return "subtasks", (request_id, path[1], path[3]), path[4:]
+        if len(path) >= 3 and path[0] == "tasks" and path[2] != "subtasks":
+            return "tasks", (request_id, path[1]), path[2:]
+        return "requests", (request_id,), path
+
+    @timed("state")
+    def get(self, path: Tuple[str, ...]) -> Any:
+        """값 하나 조회 - 해당 행만 읽음"""
+        try:
+            self._import_if_changed()
+            table, key, inner = self._locate(path)
+            if key[0] is None:
+                return None
+            row = self.conn.execute(*self._select_row(table, key)).fetchone()
+        except sqlite3.Error:
+            return None
+        return _get_path(json.loads(row[0]), inner) if row else None
+
+    @timed("state")
+    def update(self, path: Tuple[str, ...], value: Any) -> bool:
+        """값 하나 갱신 - 해당 행만 고쳐 씀"""
+        return self.update_many({path: value})
+
+    @timed("state")
+    def update_many(self, updates: Dict[Tuple[str, ...], Any]) -> bool:
+        """여러 값을 한 트랜잭션에서 갱신 - 바뀐 행만 한 번씩 고쳐 씀"""
+        conn = self.conn
+        try:
+            self._import_if_changed()
+            rows: Dict[Tuple[str, tuple], List] = {}
+            for path, value in updates.items():
+                table, key, inner = self._locate(path)
+                if key[0] is None or not inner:
+                    return False
+                rows.setdefault((table, key), []).append((inner, value))
+
+            conn.execute("BEGIN IMMEDIATE")
+            for (table, key), changes in rows.items():
+                row = conn.execute(*self._select_row(table, key)).fetchone()
+                data = json.loads(row[0]) if row else None
+                if data is None or not all(_set_path(data, inner, value) for inner, value in changes):
+                    conn.execute("ROLLBACK")
+                    return False
+
+                where = " AND ".join(f"{column} = ?" for column in self._key_columns(table))
+                conn.execute(f"UPDATE {table} SET data = ? WHERE {where}", (_dumps(data), *key))
+            self._bump_revision()
+            conn.execute("COMMIT")
+            return True
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            return False
+
+    @staticmethod
+    def _key_columns(table: str) -> List[str]:
+        return {
+            "requests": ["request_id"],
+            "tasks": ["request_id", "task_id"],
+            "subtasks": ["request_id", "task_id", "subtask_id"],
+        }[table]
+
+    def _select_row(self, table: str, key: tuple) -> Tuple[str, tuple]:
+        where = " AND ".join(f"{column} = ?" for column in self._key_columns(table))
+        return f"SELECT data FROM {table} WHERE {where}", key
+
+
+_UNLOADED = object()
+
+
+class StateSession:
+    """
+    한 훅 실행 동안의 state/knowledge 작업 단위
+
+    state와 knowledge는 처음 접근할 때 한 번만 로드하고, 변경은 메모리에 모았다가
+    commit()에서 한 번에 저장한다. json 백엔드는 state.json을 한 번 쓰고,
+    sqlite 백엔드는 바뀐 필드가 속한 행만 한 트랜잭션으로 갱신한다.
+    knowledge 변경은 knowledge.yaml을 읽거나 다시 쓰지 않고 delta 로그(spool)에 추가하며,
+    중복 제거는 delta를 합칠 때 한다 (apply_knowledge_delta).
+
+        with StateSession(project_hash) as session:
+            session.set_phase("implementation")
+            session.record_knowledge({"op": "pitfall", "item": pitfall})
+
+    with 블록이 예외로 끝나면 아무것도 저장하지 않는다.
+    """
+
+    def __init__(self, project_hash: str):
+        self.project_hash = project_hash
+        self.store = get_state_store(project_hash)
+        self._state = _UNLOADED
+        self._knowledge = _UNLOADED
+        self._contracts: Dict[str, Any] = {}
+        self._dirty: Dict[Tuple[str, ...], Any] = {}
+        self._replaced = False
+        self._version: Optional[Tuple[int, int, int]] = None
+        self._knowledge_deltas: List[Dict[str, Any]] = []
+        self._phase_samples: List[Tuple[str, float]] = []
+
+    def __enter__(self) -> "StateSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+
+    # -------------------------------------------------------------------------
+    # state
+    # -------------------------------------------------------------------------
+
+    @property
+    def state(self) -> Optional[Dict[str, Any]]:
+        if self._state is _UNLOADED:
+            # 버전은 로드 전에 (사이에 바뀌면 commit 때 다시 읽고 적용하는 쪽으로)
+            if self.store.backend == "json":
+                self._version = self.store.version()
+            self._state = self.store.load()
+            if self._state:
+                # 훅 밖에서 고친 요청 상태를 인덱스에 반영 (같으면 쓰지 않음)
+                sync_request(self.project_hash, self._state)
+        return self._state
+
+    def current_work(self) -> Dict[str, str]:
+        return get_current_work(self.state) if self.state else {}
+
+    def set(self, path: Tuple[str, ...], value: Any) -> bool:
+        """state 안의 값 하나 변경 (commit 때 저장)"""
+        if not self.state or not _set_path(self.state, path, value):
+            return False
+        self._dirty[path] = value
+        return True
+
+    def replace_state(self, state: Dict[str, Any]) -> None:
+        """state 전체 교체 (commit 때 전체 저장)"""
+        self._state = state
+        self._replaced = True
+        self._dirty.clear()
+
+    def set_phase(self, new_phase: str, level: str = "subtask",
+                  task_id: Optional[str] = None, subtask_id: Optional[str] = None) -> bool:
+        """
+        update_state_phase와 같은 규칙으로 phase 변경
+
+        task_id/subtask_id를 주면 현재 Subtask 대신 그 Subtask (병렬 진행 중인 Subtask).
+        Subtask phase가 바뀌면 이전 phase의 소요 시간을 모아 commit 때 기록한다 (hooks/durations.py).
+        """
+        if level == "global":
+            return self.set(("request", "global_phase"), new_phase)
+        if level != "subtask" or not self.state:
+            return False
+
+        if subtask_id is None:
+            task_id = self.state.get("request", {}).get("current_task")
+            task = (self.state.get("tasks", {}).get(task_id) or {}) if task_id else {}
+            subtask_id = task.get("current_subtask")
+        if not task_id or not subtask_id:
+            return False
+
+        path = ("tasks", task_id, "subtasks", subtask_id)
+        subtask = (self.state.get("tasks", {}).get(task_id) or {}).get("subtasks", {}).get(subtask_id)
+        if subtask is not None and (subtask.get("phase") or "") != new_phase:
+            now = get_timestamp()
+            started = parse_timestamp(subtask.get("phase_started_at"))
+            if started is not None:
+                self._phase_samples.append((phase_name(subtask.get("phase")), parse_timestamp(now) - started))
+            self.set(path + ("phase_started_at",), now if new_phase != "complete" else None)
+        return self.set(path + ("phase",), new_phase)
+
+    def mark_ready(self, task_id: str, subtask_id: str) -> None:
+        """시작할 수 있게 된 Subtask의 설계(phase 없음) 시작 시각 기록"""
+        subtask = self.state["tasks"][task_id]["subtasks"][subtask_id]
+        if not subtask.get("phase") and not subtask.get("phase_started_at"):
+            self.set(("tasks", task_id, "subtasks", subtask_id, "phase_started_at"), get_timestamp())
+
+    # -------------------------------------------------------------------------
+    # knowledge
+    # -------------------------------------------------------------------------
+
+    @property
+    def knowledge(self) -> Optional[Dict[str, Any]]:
+        if self._knowledge is _UNLOADED:
+            self._knowledge = load_knowledge(self.project_hash)
+        return self._knowledge
+
+    def knowledge_for_update(self) -> Dict[str, Any]:
+        """수정할 knowledge (없으면 빈 knowledge 생성)"""
+        if not self.knowledge:
+            self._knowledge = create_initial_knowledge(self.project_hash)
+        return self._knowledge
+
+    def record_knowledge(self, delta: Dict[str, Any]) -> None:
+        """
+        knowledge 변경을 delta로 기록 (commit 때 delta 로그에 추가)
+
+        knowledge를 이미 로드했으면 메모리 view에도 반영하지만, 기록하려고 로드하지는 않는다.
+        """
+        if self._knowledge is not _UNLOADED and self._knowledge is not None:
+            apply_knowledge_delta(self._knowledge, delta)
+        self._knowledge_deltas.append(delta)
+
+    # -------------------------------------------------------------------------
+    # contract
+    # -------------------------------------------------------------------------
+
+    def contract(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """Contract YAML을 한 번만 파싱 (지식 추출과 상태 전환이 같은 결과를 공유)"""
+        if file_path not in self._contracts:
+            try:
+                content = yaml_loads(Path(file_path).read_text(encoding="utf-8"))
+            except (SerializationError, IOError, UnicodeDecodeError):
+                content = None
+            self._contracts[file_path] = content if isinstance(content, dict) else None
+        return self._contracts[file_path]
+
+    # -------------------------------------------------------------------------
+    # 저장
+    # -------------------------------------------------------------------------
+
+    def commit(self) -> bool:
+        """모아 둔 변경을 한 번에 저장"""
+        ok = True
+        request_changed = self._replaced or any(path[0] == "request" for path in self._dirty)
+        if self._replaced:
+            ok = self.store.save(self._state)
+        elif self._dirty and self.store.backend == "json":
+            saved = self.store.save_changes(self._state, self._dirty, self._version)
+            ok = saved is not None
+            if saved is not None:
+                self._state = saved
+        elif self._dirty:
+            ok = self.store.update_many(self._dirty)
+        if self._replaced or self._dirty:
+            # 다음 commit은 디스크의 최신 state에 다시 적용
+            self._version = None
+        if ok and request_changed and self._state:
+            ok = sync_request(self.project_hash, self._state)
+
+        if self._knowledge_deltas:
+            # 압축이 필요해도 훅은 기다리지 않음 (백그라운드 flush)
+            ok = append_knowledge_deltas(self.project_hash, self._knowledge_deltas, background=True) and ok
+        if self._phase_samples and ok:
+            record_phase_durations(self.project_hash, self._phase_samples)
+
+        self._dirty = {}
+        self._replaced = False
+        self._knowledge_deltas = []
+        self._phase_samples = []
+        return ok
+
+
+def open_state_store(project_hash: str, backend: str = "json", request_id: Optional[str] = None):
+    """요청의 state 저장소 생성 (request_id가 None이면 비어 있는 저장소)"""
+    request_path = get_request_path(project_hash, request_id) if request_id else None
+    if backend == "sqlite":
+        return SqliteStateStore(get_sessions_path(project_hash), request_id, request_path)
+    return JsonStateStore(request_path)
+
+
+def main():
+    """state.db ↔ state.json 내보내기/가져오기"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="orchestrator state.db ↔ state.json 변환")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("--project-hash", default=None, help="기본값: 현재 디렉토리의 프로젝트 해시")
+    parser.add_argument("--request", default=None, help="기본값: 요청 인덱스의 현재 요청")
+    parser.add_argument("--path", type=Path, default=None, help="기본값: 요청 디렉토리의 state.json")
+    args = parser.parse_args()
+
+    project_hash = args.project_hash or get_project_hash()
+    request_id = args.request or current_request_id(project_hash)
+    if request_id is None:
+        print("[Orchestrator] 요청이 없습니다")
+        sys.exit(1)
+    store = open_state_store(project_hash, "sqlite", request_id)
+    if args.command == "export":
+        ok = store.export_json(args.path)
+    else:
+        ok = store.import_json(args.path)
+
+    target = args.path or store.state_path
+    print(f"[Orchestrator] {args.command} {'완료' if ok else '실패'}: {target}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
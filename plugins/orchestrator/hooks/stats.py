@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Claude DevKit Hooks - 훅 지연 시간 계측과 통계 (/orchestrator stats)
+
+계측은 켰을 때만 한다 (stats.enabled: true 또는 ORCHESTRATOR_HOOK_STATS=1, 기본 꺼짐).
+켜져 있으면 각 훅의 main은 @instrument_hook("post_tool_use")로 감싸 전체 시간(wall)과
+구간(span)별 시간을 잰다. 구간은 I/O 함수에 붙인 @timed("...")가 훅 실행 중에만 기록한다.
+- stdin: 입력 JSON 파싱 (read_stdin_json)
+- config: 설정 스냅샷 로드 (load_config_snapshot)
+- state: state 저장소와 요청 인덱스 읽기/쓰기
+- knowledge: knowledge 로드, delta 추가, 압축, 저장
+- output: 결과 출력
+같은 이름의 구간이 중첩되면 바깥 것만 센다 (이름이 다른 구간은 겹칠 수 있음).
+실행 중인 훅은 스레드마다 따로 두므로, 여러 스레드에서 훅을 실행해도 구간이 섞이지 않는다.
+통계 기록이 실패해도 훅은 실패하지 않는다.
+
+기록은 프로젝트별 링 버퍼 파일(세션 디렉토리의 hook-stats.ring)에 남는다.
+헤더 뒤에 고정 크기 슬롯이 stats.capacity개 있고, 쓸 때마다 슬롯 하나와 헤더의
+기록 수만 바꾸므로 쓰기 비용이 기록 수와 무관하고 파일 크기가 일정하다
+(가득 차면 가장 오래된 기록부터 덮어씀).
+
+이 모듈은 hooks.common이 import하므로 표준 라이브러리만 module 수준에서 import한다.
+
+사용법:
+    python3 hooks/stats.py [--hook post_tool_use] [--json]
+"""
+
+import functools
+import json
+import math
+import os
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# hooks 패키지 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# 링 버퍼 헤더: magic, 형식 버전, 슬롯 크기, 슬롯 수, 지금까지 쓴 기록 수
+RING_MAGIC = b"OHST"
+RING_VERSION = 1
+RING_HEADER = struct.Struct("<4sHHIQ")
+
+# 슬롯 하나의 크기 (바이트). 넘치는 기록은 구간을 빼고 저장
+SLOT_SIZE = 256
+
+DEFAULT_STATS_CONFIG = {"enabled": False, "capacity": 2000}
+
+# 통계에 쓰는 구간 이름 (표시 순서)
+SPAN_NAMES = ("stdin", "config", "state", "knowledge", "output")
+
+PERCENTILES = (50, 95, 99)
+
+# 계측을 켜고 끄는 환경변수 (설정보다 우선, 벤치마크의 기준 측정 등)
+STATS_ENV_KEY = "ORCHESTRATOR_HOOK_STATS"
+
+
+class HookRecord:
+    """실행 중인 훅 하나의 측정값"""
+
+    __slots__ = ("hook", "started", "spans", "open")
+
+    def __init__(self, hook: str):
+        self.hook = hook
+        self.started = time.perf_counter()
+        self.spans: Dict[str, float] = {}
+        self.open: set = set()
+
+
+# 실행 중인 훅 (스레드마다 따로, 훅 밖에서 불린 I/O 함수는 기록하지 않음)
+_ACTIVE = threading.local()
+
+# 프로세스 내 메모: 작업 디렉토리 -> 링 버퍼 경로 (데몬은 요청마다 디렉토리가 다를 수 있음)
+_STATS_PATHS: Dict[str, Path] = {}
+
+
+def timed(span: str) -> Callable:
+    """훅 실행 중에 함수가 걸린 시간을 span 구간에 더함"""
+    def decorate(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            record = getattr(_ACTIVE, "record", None)
+            if record is None or span in record.open:
+                return func(*args, **kwargs)
+            record.open.add(span)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record.spans[span] = record.spans.get(span, 0.0) + time.perf_counter() - start
+                record.open.discard(span)
+        return wrapper
+    return decorate
+
+
+def instrument_hook(hook: str) -> Callable:
+    """훅 main을 감싸 전체/구간 시간을 링 버퍼에 기록 (기록 실패는 훅에 영향 없음)"""
+    def decorate(main: Callable) -> Callable:
+        @functools.wraps(main)
+        def wrapper(*args, **kwargs):
+            # 꺼져 있으면 기록 객체도 만들지 않음 (@timed 구간도 재지 않음)
+            if getattr(_ACTIVE, "record", None) is not None or not is_stats_enabled():
+                return main(*args, **kwargs)
+
+            record = _ACTIVE.record = HookRecord(hook)
+            status = 0
+            try:
+                return main(*args, **kwargs)
+            except SystemExit as e:
+                status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                raise
+            except BaseException:
+                status = 1
+                raise
+            finally:
+                wall = time.perf_counter() - record.started
+                _ACTIVE.record = None
+                try:
+                    write_record(record, wall, status)
+                except Exception:
+                    # 통계는 부가 기능: 어떤 이유로든 기록하지 못해도 훅 결과는 그대로
+                    pass
+        return wrapper
+    return decorate
+
+
+# =============================================================================
+# 링 버퍼
+# =============================================================================
+
+def is_stats_enabled() -> bool:
+    """계측 여부 (ORCHESTRATOR_HOOK_STATS가 있으면 그 값, 없으면 stats.enabled)"""
+    value = os.environ.get(STATS_ENV_KEY)
+    if value is not None:
+        return value.lower() not in ("", "0", "false", "no")
+    try:
+        return bool(get_stats_config().get("enabled"))
+    except Exception:
+        return False
+
+
+def get_stats_config() -> Dict[str, Any]:
+    """stats 설정 (capacity: 프로젝트별로 남길 최근 훅 실행 수)"""
+    from hooks.common import load_orchestrator_config
+
+    config = load_orchestrator_config().get("stats", {}) or {}
+    return {**DEFAULT_STATS_CONFIG, **config}
+
+
+def get_stats_path(project_hash: str) -> Path:
+    """프로젝트의 훅 통계 링 버퍼 경로"""
+    from hooks.common import get_sessions_path
+
+    return get_sessions_path(project_hash) / "hook-stats.ring"
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """기록 하나 -> 슬롯 바이트 (공백으로 채움)"""
+    data = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    if len(data) > SLOT_SIZE:
+        data = json.dumps({**record, "spans": {}}, separators=(",", ":")).encode("utf-8")[:SLOT_SIZE]
+    return data.ljust(SLOT_SIZE, b" ")
+
+
+def append_record(path: Path, record: Dict[str, Any], capacity: int) -> None:
+    """링 버퍼에 기록 하나 추가 (용량이 바뀌었거나 형식이 다르면 새로 시작)"""
+    from hooks.locking import file_lock
+
+    # 잘리지 않게 열고(O_CREAT만), seek + read/write로 슬롯과 헤더만 씀 (pread/pwrite는 Windows에 없음)
+    flags = os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0)
+    with file_lock(path):
+        try:
+            fd = os.open(str(path), flags, 0o644)
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(str(path), flags, 0o644)
+        with os.fdopen(fd, "r+b") as f:
+            header = f.read(RING_HEADER.size)
+            written = 0
+            if len(header) == RING_HEADER.size:
+                magic, version, slot_size, slots, written = RING_HEADER.unpack(header)
+                if (magic, version, slot_size, slots) != (RING_MAGIC, RING_VERSION, SLOT_SIZE, capacity):
+                    written = 0
+                    f.truncate(0)
+            f.seek(RING_HEADER.size + (written % capacity) * SLOT_SIZE)
+            f.write(encode_record(record))
+            f.seek(0)
+            f.write(RING_HEADER.pack(RING_MAGIC, RING_VERSION, SLOT_SIZE, capacity, written + 1))
+
+
+def write_record(record: HookRecord, wall: float, status: int) -> None:
+    """끝난 훅의 측정값을 현재 프로젝트의 링 버퍼에 기록"""
+    from hooks.common import get_project_hash
+
+    config = get_stats_config()
+    cwd = os.getcwd()
+    path = _STATS_PATHS.get(cwd)
+    if path is None:
+        path = _STATS_PATHS[cwd] = get_stats_path(get_project_hash())
+    append_record(path, {
+        "hook": record.hook,
+        "at": round(time.time(), 3),
+        "wall": round(wall * 1000, 3),
+        "spans": {name: round(seconds * 1000, 3) for name, seconds in record.spans.items()},
+        "status": status,
+    }, max(1, int(config.get("capacity") or DEFAULT_STATS_CONFIG["capacity"])))
+
+
+def read_records(path: Path) -> List[Dict[str, Any]]:
+    """링 버퍼의 기록 (오래된 것부터)"""
+    try:
+        data = path.read_bytes()
+    except IOError:
+        return []
+    if len(data) < RING_HEADER.size:
+        return []
+    magic, version, slot_size, slots, written = RING_HEADER.unpack_from(data)
+    if (magic, version) != (RING_MAGIC, RING_VERSION) or not slots:
+        return []
+
+    count = min(written, slots)
+    first = written % slots if written > slots else 0
+    records = []
+    for i in range(count):
+        offset = RING_HEADER.size + ((first + i) % slots) * slot_size
+        try:
+            records.append(json.loads(data[offset:offset + slot_size]))
+        except ValueError:
+            continue
+    return records
+
+
+# =============================================================================
+# 통계
+# =============================================================================
+
+def percentile(values: List[float], p: float) -> float:
+    """nearest-rank 백분위수 (values는 정렬되어 있어야 함)"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def summarize(records: List[Dict[str, Any]], hook: Optional[str] = None) -> Dict[str, Any]:
+    """
+    훅별 실행 수와 wall/구간별 p50/p95/p99 (ms)
+
+    Returns:
+        {hook: {"count": int, "errors": int, "wall": {50: ms, ...}, "spans": {span: {50: ms, ...}}}}
+    """
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    errors: Dict[str, int] = {}
+    for record in records:
+        name = record.get("hook", "")
+        if hook and name != hook:
+            continue
+        columns = samples.setdefault(name, {"wall": []})
+        columns["wall"].append(float(record.get("wall", 0.0)))
+        for span in SPAN_NAMES:
+            # 구간을 거치지 않은 실행은 0으로 (실행마다 비용 분포를 보도록)
+            columns.setdefault(span, []).append(float((record.get("spans") or {}).get(span, 0.0)))
+        if record.get("status"):
+            errors[name] = errors.get(name, 0) + 1
+
+    summary = {}
+    for name, columns in sorted(samples.items()):
+        ordered = {column: sorted(values) for column, values in columns.items()}
+        summary[name] = {
+            "count": len(ordered["wall"]),
+            "errors": errors.get(name, 0),
+            "wall": {p: percentile(ordered["wall"], p) for p in PERCENTILES},
+            "spans": {span: {p: percentile(ordered[span], p) for p in PERCENTILES} for span in SPAN_NAMES},
+        }
+    return summary
+
+
+def format_stats(summary: Dict[str, Any]) -> str:
+    """'/orchestrator stats' 출력"""
+    if not summary:
+        hint = "" if is_stats_enabled() else " 계측을 켜려면 stats.enabled: true 또는 ORCHESTRATOR_HOOK_STATS=1로 설정하세요."
+        return "[Orchestrator Stats] 기록된 훅 실행이 없습니다." + hint
+
+    def cells(values: Dict[int, float]) -> str:
+        return " | ".join(f"{values[p]:.1f}" for p in PERCENTILES)
+
+    lines = [
+        "[Orchestrator Stats] 훅 지연 시간 (ms, 최근 기록 기준)",
+        "",
+        "| Hook | 실행 수 | p50 | p95 | p99 |",
+        "|------|--------|-----|-----|-----|",
+    ]
+    for name, entry in summary.items():
+        errors = f" (실패 {entry['errors']})" if entry["errors"] else ""
+        lines.append(f"| {name} | {entry['count']}{errors} | {cells(entry['wall'])} |")
+
+    lines.extend(["", "| Hook | 구간 | p50 | p95 | p99 |", "|------|------|-----|-----|-----|"])
+    for name, entry in summary.items():
+        for span in SPAN_NAMES:
+            values = entry["spans"][span]
+            if values[99] > 0:
+                lines.append(f"| {name} | {span} | {cells(values)} |")
+    return "\n".join(lines)
+
+
+def main():
+    """훅 통계 출력 (현재 디렉토리의 프로젝트)"""
+    import argparse
+
+    from hooks.common import get_project_hash
+
+    parser = argparse.ArgumentParser(description="훅 지연 시간 통계 (p50/p95/p99)")
+    parser.add_argument("--hook", help="이 훅만")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+
+    summary = summarize(read_records(get_stats_path(get_project_hash())), args.hook)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print(format_stats(summary))
+
+
+if __name__ == "__main__":
+    main()
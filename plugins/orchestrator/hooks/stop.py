@@ -20,14 +20,17 @@ from hooks.common import (
     log_orchestrator,
     get_project_hash,
     load_state,
+    sync_state_json,
     load_knowledge,
-    save_knowledge,
+    compact_knowledge,
+    append_knowledge_deltas,
     count_pending_subtasks,
     count_pending_tasks,
     get_current_work,
     format_progress_tree,
     get_timestamp,
 )
+from hooks.stats import instrument_hook
 
 
 # 무한 루프 방지용 환경변수
@@ -48,13 +51,14 @@ def auto_update_knowledge_on_complete(project_hash: str, state: dict) -> list:
     updates = []
 
     # 완료된 Task/Subtask에서 패턴 추출 (향후 확장)
-    # 현재는 timestamp만 업데이트
-    knowledge["updated_at"] = get_timestamp()
-    save_knowledge(project_hash, knowledge)
+    # 현재는 timestamp만 업데이트 - knowledge.yaml을 통째로 다시 쓰면 병렬 훅이
+    # 그사이 추가한 delta가 사라지므로 delta로 기록
+    append_knowledge_deltas(project_hash, [{"op": "set", "key": "updated_at", "value": get_timestamp()}])
 
     return updates
 
 
+@instrument_hook("stop")
 def main():
     """Stop Hook 메인 함수"""
     # 무한 루프 방지
@@ -69,12 +73,18 @@ def main():
 
         project_hash = get_project_hash()
 
+        # 쌓인 knowledge delta를 knowledge.yaml에 합치기
+        compact_knowledge(project_hash)
+
         # state.json 로드
         state = load_state(project_hash)
         if not state:
             # 오케스트레이터 세션 없음 - 조용히 종료
             return
 
+        # sqlite 백엔드: 이번 턴의 변경분을 state.json에 반영
+        sync_state_json(project_hash)
+
         request = state.get("request", {})
         request_status = request.get("status")
 
@@ -5,8 +5,9 @@ SubagentStop Hook - 서브에이전트 결과 수집 및 상태 업데이트
 메인 에이전트가 생성한 서브에이전트가 종료될 때 실행되어:
 1. 서브에이전트 유형 확인 (Planner, Architect, QA Engineer 등)
 2. 에이전트별 출력 Contract 파일 확인 (config에서 로드)
-3. state.json 자동 업데이트
+3. state.json 자동 업데이트 (Subtask phase 진행)
 4. 다음 단계 안내 메시지 반환
+   (병렬로 진행 중인 Subtask가 여럿이면 Subtask마다, 함께 부를 수 있는 Subtask 목록 포함)
 """
 
 import sys
@@ -23,29 +24,20 @@ from hooks.common import (
     get_project_hash,
     load_state,
     get_current_work,
-    get_sessions_path,
     get_agent_config,
+    contract_exists,
+    get_subtask_work,
     load_orchestrator_config,
 )
+from hooks.scheduler import format_dispatch_block, in_flight_subtasks
+from hooks.state_store import StateSession
+from hooks.stats import instrument_hook
 
 
-def check_contract_exists(project_hash: str, current_work: dict, contract_name: str, level: str) -> bool:
-    """Contract 파일 존재 여부 확인"""
-    sessions_path = get_sessions_path(project_hash)
-    request_id = current_work.get("request_id", "R1")
-    task_id = current_work.get("task_id", "")
-    subtask_id = current_work.get("subtask_id", "")
-
-    if level == "request":
-        contract_path = sessions_path / "contracts" / request_id / contract_name
-    elif level == "task" and task_id:
-        contract_path = sessions_path / "contracts" / request_id / task_id / contract_name
-    elif level == "subtask" and task_id and subtask_id:
-        contract_path = sessions_path / "contracts" / request_id / task_id / subtask_id / contract_name
-    else:
-        return False
-
-    return contract_path.exists()
+def check_contract_exists(project_hash: str, current_work: dict, contract_name: str, level: str,
+                          registry: dict = None) -> bool:
+    """Contract 파일 존재 여부 확인 (state의 Contract 레지스트리에서, 파일은 stat하지 않음)"""
+    return contract_exists(project_hash, current_work, contract_name, level, registry)
 
 
 def get_next_phase_message(agent_type: str, current_phase: str) -> str:
@@ -73,6 +65,41 @@ def get_next_phase_message(agent_type: str, current_phase: str) -> str:
     return phase_messages.get(next_phase, f"다음 Phase: {next_phase}")
 
 
+def advance_subtasks(project_hash: str, agent_type: str, works: list, registry: dict) -> list:
+    """
+    에이전트가 끝난 Subtask의 phase 진행 (PostToolUse가 Contract로 이미 옮겼으면 그대로)
+
+    - QA Engineer(test_first): Subtask에 test-contract.yaml이 있으면 implementation
+    - Implementer: 구현 중인 Subtask가 하나뿐일 때만 verification
+      (출력 Contract가 없어 여럿이면 어느 Subtask를 끝냈는지 알 수 없음. 그때는 Subtask 경로에
+      검증 결과 test-result.yaml이 저장될 때 PostToolUse가 verification으로 옮긴다)
+    완료(verification → complete)는 테스트 결과를 봐야 하므로 PostToolUse만 한다.
+
+    Returns:
+        phase를 옮긴 Subtask ID 목록
+    """
+    moves = []
+    if agent_type == "qa-engineer":
+        moves = [
+            (work, "implementation") for work in works
+            if work.get("phase") == "test_first"
+            and check_contract_exists(project_hash, work, "test-contract.yaml", "subtask", registry)
+        ]
+    elif agent_type == "implementer":
+        implementing = [work for work in works if work.get("phase") == "implementation"]
+        if len(implementing) == 1:
+            moves = [(implementing[0], "verification")]
+    if not moves:
+        return []
+
+    with StateSession(project_hash) as session:
+        for work, phase in moves:
+            session.set_phase(phase, "subtask", work["task_id"], work["subtask_id"])
+            work["phase"] = phase
+    return [work["subtask_id"] for work, _ in moves]
+
+
+@instrument_hook("subagent_stop")
 def main():
     """SubagentStop Hook 메인 함수"""
     input_data = read_stdin_json()
@@ -99,34 +126,58 @@ def main():
         return
 
     current_work = get_current_work(state)
-    current_phase = current_work.get("phase", "")
     level = agent_config.get("level", "request")
+    registry = state.get("contracts")
+
+    # Subtask 레벨 에이전트: 병렬로 진행 중인 Subtask가 여럿이면 Subtask마다 확인
+    in_flight = in_flight_subtasks(state) if level == "subtask" else []
+    if len(in_flight) > 1:
+        works = [get_subtask_work(state, task_id, subtask_id) for task_id, subtask_id in in_flight]
+    else:
+        works = [current_work]
+    phases = {work.get("subtask_id"): work.get("phase", "") for work in works}
+    advanced = advance_subtasks(project_hash, agent_type, works, registry) if level == "subtask" else []
 
     # Contract 파일 존재 확인
     contract_name = agent_config.get("output")
     contracts = agent_config.get("outputs", [contract_name] if contract_name else [])
 
-    created_contracts = []
-    for contract in contracts:
-        if contract and check_contract_exists(project_hash, current_work, contract, level):
-            created_contracts.append(contract)
-
-    # 다음 단계 메시지 생성
-    next_message = get_next_phase_message(agent_type, current_phase)
-
-    # 결과 메시지 생성
     lines = []
-
-    if created_contracts:
-        contracts_str = ", ".join(created_contracts)
-        lines.append(f"[{agent_type.title()} completed] {contracts_str} created")
-        log_orchestrator(f"{agent_type.title()} completed: {contracts_str}")
+    if len(works) == 1:
+        created_contracts = [
+            contract for contract in contracts
+            if contract and check_contract_exists(project_hash, current_work, contract, level, registry)
+        ]
+        # 다음 단계 메시지 생성
+        next_message = get_next_phase_message(agent_type, phases[current_work.get("subtask_id")])
+
+        if created_contracts:
+            contracts_str = ", ".join(created_contracts)
+            lines.append(f"[{agent_type.title()} completed] {contracts_str} created")
+            log_orchestrator(f"{agent_type.title()} completed: {contracts_str}")
+        else:
+            lines.append(f"[{agent_type.title()} completed]")
+            log_orchestrator(f"{agent_type.title()} completed")
+
+        if next_message:
+            lines.append(f"-> {next_message}")
     else:
-        lines.append(f"[{agent_type.title()} completed]")
-        log_orchestrator(f"{agent_type.title()} completed")
-
-    if next_message:
-        lines.append(f"-> {next_message}")
+        lines.append(f"[{agent_type.title()} completed] 진행 중인 Subtask {len(works)}개")
+        for work in works:
+            created = [
+                contract for contract in contracts
+                if contract and check_contract_exists(project_hash, work, contract, level, registry)
+            ]
+            phase = work.get("phase", "")
+            moved = f" ({phases[work['subtask_id']]} → {phase})" if work["subtask_id"] in advanced else ""
+            lines.append(f"- {work['subtask_id']} [{phase or '-'}]{moved}: "
+                         f"{', '.join(created) + ' created' if created else 'Contract 없음'}")
+        log_orchestrator(f"{agent_type.title()} completed ({len(works)} subtasks in flight)")
+
+    if level == "subtask":
+        dispatch = format_dispatch_block(project_hash, load_state(project_hash) if advanced else state)
+        if dispatch:
+            lines.extend(["", dispatch])
 
     output_result("\n".join(lines), hook_event="SubagentStop")
 
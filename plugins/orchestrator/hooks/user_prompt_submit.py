@@ -4,13 +4,16 @@ UserPromptSubmit Hook - 키워드 감지 및 오케스트레이션 세션 관리
 
 사용자 프롬프트 제출 시 실행되어:
 1. 오케스트레이션 키워드 감지
-2. 세션 생성/재개/새로시작 처리
+2. 세션 생성/재개/새로시작 처리 (요청마다 state가 따로 있어 새 요청이 진행 중인 요청을 덮어쓰지 않음,
+   '/orchestrator resume R2'처럼 요청 ID로 전환)
 3. 오케스트레이션 지시문 주입
+4. /orchestrator learn 요청 시 프로젝트 전체 패턴 학습을 백그라운드로 시작 (hooks/learn.py)
+5. /orchestrator stats 요청 시 훅 지연 시간 통계 (hooks/stats.py)
 """
 
 import sys
 import os
-import re
+from pathlib import Path
 
 # hooks 패키지 경로 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -21,50 +24,32 @@ from hooks.common import (
     log_orchestrator,
     get_project_hash,
     load_state,
-    save_state,
     get_current_work,
-    format_progress_tree,
     is_orchestration_enabled,
-    is_orchestration_keyword,
+    classify_prompt,
     get_template,
     initialize_session,
     count_pending_subtasks,
     is_same_session,
 )
-
-
-# 세션 관리 키워드
-RESUME_KEYWORDS = [
-    r"이어서\s*진행",
-    r"이어서\s*작업",
-    r"계속\s*진행",
-    r"resume",
-    r"/orchestrator\s+resume",
-]
-
-NEW_SESSION_KEYWORDS = [
-    r"새\s*세션",
-    r"새로\s*시작",
-    r"처음부터",
-    r"reset",
-    r"/orchestrator\s+reset",
-]
-
-
-def is_resume_keyword(prompt: str) -> bool:
-    """세션 재개 키워드 감지"""
-    for pattern in RESUME_KEYWORDS:
-        if re.search(pattern, prompt, re.IGNORECASE):
-            return True
-    return False
-
-
-def is_new_session_keyword(prompt: str) -> bool:
-    """새 세션 시작 키워드 감지"""
-    for pattern in NEW_SESSION_KEYWORDS:
-        if re.search(pattern, prompt, re.IGNORECASE):
-            return True
-    return False
+from hooks.injection import (
+    diff_snapshots,
+    fit_to_budget,
+    get_injection_config,
+    plan_injection,
+    record_injection,
+    within_budget,
+)
+from hooks.request_index import (
+    current_request_id,
+    find_request_ref,
+    format_active_requests,
+    load_index,
+    set_current_request,
+)
+from hooks.scheduler import format_dispatch_block, progress_estimates
+from hooks.state_store import StateSession
+from hooks.stats import format_stats, get_stats_path, instrument_hook, read_records, summarize
 
 
 def generate_orchestration_start_message(request: str) -> str:
@@ -206,18 +191,25 @@ Task tool 사용, subagent_type: "orchestrator:qa-engineer"
 현재 상태를 확인하고 적절한 에이전트를 호출하세요."""
 
 
-def generate_resume_message(state: dict, current_work: dict) -> str:
-    """세션 재개 메시지 생성"""
+def generate_resume_message(state: dict, current_work: dict, footer: str = "", project_hash: str = "") -> str:
+    """세션 재개 메시지 생성 (footer 포함 injection 예산을 넘으면 완료된 Task부터 접음)"""
     global_phase = current_work.get("global_phase", "unknown")
     current_task = current_work.get("task_id", "없음")
     current_subtask = current_work.get("subtask_id", "없음")
     phase = current_work.get("phase", "")
     request = current_work.get("request", "")
 
-    progress_tree = format_progress_tree(state)
     next_action = get_next_action_instruction(global_phase, phase, current_work)
+    # 의존하지 않는 Subtask가 여럿이면 함께 진행하도록 안내
+    dispatch = format_dispatch_block(project_hash, state) if project_hash else ""
+    if dispatch:
+        next_action = f"{next_action}\n\n{dispatch}"
+    # 이전 phase 소요 시간으로 추정한 남은 시간과 임계 경로
+    estimates, remaining = progress_estimates(project_hash, state) if project_hash else ({}, "")
+    remaining = f"\n{remaining}\n" if remaining else ""
 
-    return f"""[TDD Orchestration Mode - Resume]
+    def render(progress_tree: str) -> str:
+        return f"""[TDD Orchestration Mode - Resume]
 
 기존 세션을 재개합니다.
 
@@ -228,6 +220,7 @@ def generate_resume_message(state: dict, current_work: dict) -> str:
 
 | 항목 | 값 |
 |------|-----|
+| Request | {current_work.get("request_id", "")} |
 | Global Phase | {global_phase} |
 | Current Task | {current_task} |
 | Current Subtask | {current_subtask} |
@@ -236,11 +229,69 @@ def generate_resume_message(state: dict, current_work: dict) -> str:
 ## Progress
 
 {progress_tree}
-
+{remaining}
 {next_action}
-"""
+""" + (f"\n{footer}\n" if footer else "")
 
+    return fit_to_budget(render, state, get_injection_config(), estimates)
 
+
+def generate_continue_message(kind: str, snapshot: dict, previous: dict, current_work: dict,
+                              project_hash: str = "", state: dict = None) -> str:
+    """마지막 주입 이후 변경분만 담은 짧은 메시지 (구조가 같을 때)"""
+    subtask = current_work.get("subtask_id") or "-"
+    phase = current_work.get("phase", "")
+    position = f"{current_work.get('task_id') or '-'} / {subtask}{f' ({phase})' if phase else ''}"
+    if kind == "unchanged":
+        return f"[TDD Orchestration Mode - Continue] 변경 없음. 현재: {position}"
+
+    lines = [
+        "[TDD Orchestration Mode - Continue]",
+        "",
+        "마지막 안내 이후 변경분입니다. (전체 상태: '/orchestrator resume')",
+        "",
+        "## 변경",
+        *diff_snapshots(previous["snapshot"], snapshot),
+        "",
+        f"현재: {position}",
+    ]
+
+    # 현재 위치나 phase가 바뀌었을 때만 다음 행동을 다시 안내
+    previous_position = previous["snapshot"]["current"]
+    previous_phase = previous["snapshot"]["items"].get(previous_position[1], ["", "", ""])[2]
+    if previous_position != snapshot["current"] or previous_phase != phase:
+        lines.extend([
+            "",
+            get_next_action_instruction(current_work.get("global_phase", ""), phase, current_work),
+        ])
+
+    # 변경으로 함께 진행할 수 있는 Subtask가 생겼으면 안내
+    dispatch = format_dispatch_block(project_hash, state) if project_hash and state else ""
+    if dispatch:
+        lines.extend(["", dispatch])
+    return "\n".join(lines)
+
+
+def is_active_session(state: dict) -> bool:
+    """미완료 Subtask가 남은 active 요청인지"""
+    if not state:
+        return False
+    return state.get("request", {}).get("status") == "active" and count_pending_subtasks(state) > 0
+
+
+def other_active_requests(project_hash: str) -> str:
+    """현재 요청 외 진행 중인 요청 안내 (없으면 빈 문자열)"""
+    index = load_index(project_hash)
+    return format_active_requests(index, exclude=index.get("current"))
+
+
+def with_active_requests(message: str, project_hash: str) -> str:
+    """메시지 뒤에 현재 요청 외 진행 중인 요청 안내 추가"""
+    others = other_active_requests(project_hash)
+    return f"{message.rstrip()}\n\n{others}" if others else message
+
+
+@instrument_hook("user_prompt_submit")
 def main():
     """UserPromptSubmit Hook 메인 함수"""
     input_data = read_stdin_json()
@@ -255,61 +306,100 @@ def main():
         return
 
     project_hash = get_project_hash()
+    # 현재 요청의 state (요청 인덱스로 찾음)
     state = load_state(project_hash)
 
-    # 기존 미완료 세션 존재 여부
-    has_active_session = False
-    if state:
-        request_status = state.get("request", {}).get("status")
-        pending = count_pending_subtasks(state)
-        has_active_session = (request_status == "active" and pending > 0)
+    # 현재 요청이 미완료인지
+    has_active_session = is_active_session(state)
+
+    # 키워드 분류 (resume > new > learn > skip > trigger 우선순위, 한 번의 스캔)
+    category = classify_prompt(prompt)
 
     # 1. 세션 재개 키워드
-    if is_resume_keyword(prompt):
+    if category == "resume":
+        # 요청 ID를 지정하면 그 요청으로 전환 ('/orchestrator resume R2')
+        target = find_request_ref(prompt, load_index(project_hash))
+        if target and target != current_request_id(project_hash):
+            set_current_request(project_hash, target)
+            state = load_state(project_hash)
+            has_active_session = is_active_session(state)
+
         if has_active_session:
             current_work = get_current_work(state)
-            message = generate_resume_message(state, current_work)
-            log_orchestrator("Resuming session")
+            message = generate_resume_message(state, current_work, other_active_requests(project_hash), project_hash)
+            kind, snapshot, previous = plan_injection(project_hash, state, force_full=True)
+            record_injection(project_hash, kind, snapshot, previous)
+            log_orchestrator(f"Resuming session ({current_work.get('request_id')})")
             output_result(message, hook_event="UserPromptSubmit")
         else:
             log_orchestrator("No session to resume")
-            output_result("[Orchestrator] 재개할 세션이 없습니다. 새 요청을 입력하세요.", hook_event="UserPromptSubmit")
+            message = "[Orchestrator] 재개할 세션이 없습니다. 새 요청을 입력하세요."
+            output_result(with_active_requests(message, project_hash), hook_event="UserPromptSubmit")
         return
 
     # 2. 새 세션 시작 키워드
-    if is_new_session_keyword(prompt):
-        # 기존 세션이 있으면 완료 처리
+    if category == "new":
+        # 현재 요청이 진행 중이면 취소 처리 (다른 요청은 그대로)
         if has_active_session:
-            state["request"]["status"] = "cancelled"
-            save_state(project_hash, state)
+            # 요청 상태만 고쳐 씀 (그사이 다른 훅이 쓴 변경을 덮어쓰지 않도록)
+            with StateSession(project_hash) as session:
+                session.set(("request", "status"), "cancelled")
 
         log_orchestrator("Starting new session")
         output_result("[Orchestrator] 새 세션을 시작합니다. 요청을 입력하세요.", hook_event="UserPromptSubmit")
         return
 
-    # 3. 오케스트레이션 키워드 감지
-    if not is_orchestration_keyword(prompt):
+    # 3. 프로젝트 패턴 학습 (세션 상태는 건드리지 않음)
+    if category == "learn":
+        # 전체 스캔은 대형 저장소에서 몇 분씩 걸리므로 백그라운드로 띄우고 바로 응답
+        from hooks.learn import pop_learn_summary, spawn_learn
+
+        previous = pop_learn_summary(project_hash)
+        if spawn_learn(Path.cwd(), project_hash):
+            log_orchestrator("Learning project patterns in background")
+            message = ("[Orchestrator] 프로젝트 패턴 학습을 백그라운드에서 시작했습니다. "
+                       "새 패턴은 찾는 대로 knowledge에 반영되고, 요약은 다음 /orchestrator learn 때 보여드립니다.")
+        else:
+            message = "[Orchestrator] 프로젝트 패턴 학습이 이미 진행 중입니다."
+        if previous:
+            message += f"\n\n## 지난 학습 결과\n{previous}"
+        output_result(message, hook_event="UserPromptSubmit")
+        return
+
+    # 4. 훅 지연 시간 통계 (세션 상태는 건드리지 않음)
+    if category == "stats":
+        summary = summarize(read_records(get_stats_path(project_hash)))
+        output_result(format_stats(summary), hook_event="UserPromptSubmit")
+        return
+
+    # 5. 오케스트레이션 키워드 감지
+    if category != "trigger":
         # active 세션이 있고, 같은 Claude Code 세션이면 컨텍스트 주입
-        if has_active_session and is_same_session(state):
+        if has_active_session and is_same_session(state, project_hash):
             current_work = get_current_work(state)
-            message = generate_resume_message(state, current_work)
-            log_orchestrator("Continuing session")
+            # 구조가 그대로면 마지막 주입 이후 변경분만
+            kind, snapshot, previous = plan_injection(project_hash, state)
+            if kind != "full":
+                message = generate_continue_message(kind, snapshot, previous, current_work, project_hash, state)
+                # 한꺼번에 많이 바뀌어 변경분이 예산을 넘으면 (접힌) 전체 메시지가 더 짧음
+                if not within_budget(message, get_injection_config()):
+                    kind = "full"
+            if kind == "full":
+                message = generate_resume_message(state, current_work, project_hash=project_hash)
+            record_injection(project_hash, kind, snapshot, previous)
+            log_orchestrator(f"Continuing session ({kind})")
             output_result(message, hook_event="UserPromptSubmit")
         return
 
-    # 4. 세션 처리
-    if has_active_session:
-        # 기존 미완료 세션이 있지만 새 키워드 요청 → 새 세션으로 덮어쓰기
-        # (사용자가 새 요청을 했으니 이전 세션은 버림)
-        pass
-
-    # 5. 새 세션 생성
+    # 6. 새 요청 생성
+    # 진행 중인 요청이 있어도 덮어쓰지 않고 새 요청(R{n})을 만들어 현재 요청으로 전환
+    # (이전 요청은 인덱스에 active로 남아 '/orchestrator resume R1'로 돌아갈 수 있음)
     initialize_session(project_hash, prompt)
 
-    # 6. 시작 메시지 출력
+    # 7. 시작 메시지 출력
     message = generate_orchestration_start_message(prompt)
-    log_orchestrator("New session started - Global Discovery")
-    output_result(message, hook_event="UserPromptSubmit")
+    log_orchestrator(f"New session started ({current_request_id(project_hash)}) - Global Discovery")
+    output_result(with_active_requests(message, project_hash), hook_event="UserPromptSubmit")
 
 
 if __name__ == "__main__":